@@ -0,0 +1,33 @@
+"""add per-phase timing columns to api_metrics
+
+Revision ID: add_phase_timings
+Revises: add_stroke_data
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_phase_timings'
+down_revision: Union[str, None] = 'add_stroke_data'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Same numbers as the Server-Timing response header
+    op.add_column('api_metrics', sa.Column('auth_time_ms', sa.Float(), nullable=True))
+    op.add_column('api_metrics', sa.Column('db_time_ms', sa.Float(), nullable=True))
+    op.add_column('api_metrics', sa.Column('image_time_ms', sa.Float(), nullable=True))
+    op.add_column('api_metrics', sa.Column('serialization_time_ms', sa.Float(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('api_metrics', 'serialization_time_ms')
+    op.drop_column('api_metrics', 'image_time_ms')
+    op.drop_column('api_metrics', 'db_time_ms')
+    op.drop_column('api_metrics', 'auth_time_ms')
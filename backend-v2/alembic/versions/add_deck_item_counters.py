@@ -0,0 +1,58 @@
+"""add running correct-rate counters to deck_items
+
+Revision ID: add_deck_item_counters
+Revises: add_prompt_shuffle_states
+Create Date: 2026-10-19 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_deck_item_counters'
+down_revision: Union[str, None] = 'add_prompt_shuffle_states'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COUNTERS = ('rounds_played', 'human_correct_count', 'ai_guess_count', 'ai_correct_count')
+
+
+def upgrade() -> None:
+    for name in COUNTERS:
+        op.add_column('deck_items', sa.Column(name, sa.Integer(), nullable=True, server_default='0'))
+
+    # Backfill from existing rounds; they carry no deck id, so match on prompt text
+    op.execute("""
+        UPDATE deck_items SET
+            rounds_played = (
+                SELECT COUNT(*) FROM game_rounds gr WHERE gr.correct_option = deck_items.prompt
+            ),
+            human_correct_count = (
+                SELECT COUNT(*) FROM game_rounds gr
+                WHERE gr.correct_option = deck_items.prompt AND gr.human_is_correct
+            ),
+            ai_guess_count = (
+                SELECT COUNT(*) FROM game_rounds gr
+                WHERE gr.correct_option = deck_items.prompt AND gr.ai_is_correct IS NOT NULL
+            ),
+            ai_correct_count = (
+                SELECT COUNT(*) FROM game_rounds gr
+                WHERE gr.correct_option = deck_items.prompt AND gr.ai_is_correct
+            )
+    """)
+    op.execute("""
+        UPDATE deck_items SET avg_human_correct_rate = CAST(human_correct_count AS FLOAT) / rounds_played
+        WHERE rounds_played > 0
+    """)
+    op.execute("""
+        UPDATE deck_items SET avg_ai_correct_rate = CAST(ai_correct_count AS FLOAT) / ai_guess_count
+        WHERE ai_guess_count > 0
+    """)
+
+
+def downgrade() -> None:
+    for name in reversed(COUNTERS):
+        op.drop_column('deck_items', name)
@@ -0,0 +1,36 @@
+"""add prompt_shuffle_states for per-session no-repeat prompt draws
+
+Revision ID: add_prompt_shuffle_states
+Revises: add_phase_timings
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_prompt_shuffle_states'
+down_revision: Union[str, None] = 'add_phase_timings'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'prompt_shuffle_states',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('session_key', sa.String(), nullable=False),
+        sa.Column('deck_id', sa.Integer(), nullable=False),
+        sa.Column('item_ids', sa.LargeBinary(), nullable=False),
+        sa.Column('cursor', sa.Integer(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('session_key', 'deck_id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('prompt_shuffle_states')
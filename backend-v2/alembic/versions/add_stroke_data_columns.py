@@ -0,0 +1,29 @@
+"""add stroke_data columns to game_rounds and ai_analysis_logs
+
+Revision ID: add_stroke_data
+Revises: baseline
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_stroke_data'
+down_revision: Union[str, None] = 'baseline'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Replayable vector drawings sent instead of (or alongside) PNGs
+    op.add_column('game_rounds', sa.Column('stroke_data', sa.JSON(), nullable=True))
+    op.add_column('ai_analysis_logs', sa.Column('stroke_data', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('ai_analysis_logs', 'stroke_data')
+    op.drop_column('game_rounds', 'stroke_data')
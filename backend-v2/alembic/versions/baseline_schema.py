@@ -0,0 +1,174 @@
+"""baseline schema: the tables as they were before migrations were introduced
+
+Revision ID: baseline
+Revises:
+Create Date: 2026-10-19 08:00:00.000000
+
+Databases created by the old import-time create_all already have these tables
+and are stamped at this revision instead of running it.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'baseline'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'games',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('total_rounds', sa.Integer(), nullable=True),
+        sa.Column('final_score', sa.Integer(), nullable=True),
+        sa.Column('unity_session_id', sa.String(), nullable=True),
+        sa.Column('player_count', sa.Integer(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table(
+        'game_rounds',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('game_id', sa.Integer(), nullable=True),
+        sa.Column('round_number', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('image_data', sa.Text(), nullable=True),
+        sa.Column('drawing_time_seconds', sa.Float(), nullable=True),
+        sa.Column('all_options', sa.JSON(), nullable=True),
+        sa.Column('correct_option', sa.String(), nullable=True),
+        sa.Column('correct_option_index', sa.Integer(), nullable=True),
+        sa.Column('human_guess', sa.String(), nullable=True),
+        sa.Column('human_guess_index', sa.Integer(), nullable=True),
+        sa.Column('human_is_correct', sa.Boolean(), nullable=True),
+        sa.Column('ai_provider', sa.String(), nullable=True),
+        sa.Column('ai_model', sa.String(), nullable=True),
+        sa.Column('ai_prompt_version', sa.String(), nullable=True),
+        sa.Column('ai_guess', sa.String(), nullable=True),
+        sa.Column('ai_guess_index', sa.Integer(), nullable=True),
+        sa.Column('ai_confidence', sa.Float(), nullable=True),
+        sa.Column('ai_reasoning', sa.Text(), nullable=True),
+        sa.Column('ai_response_time_ms', sa.Integer(), nullable=True),
+        sa.Column('ai_tokens_used', sa.Integer(), nullable=True),
+        sa.Column('ai_is_correct', sa.Boolean(), nullable=True),
+        sa.Column('round_score', sa.Integer(), nullable=True),
+        sa.Column('round_modifiers', sa.JSON(), nullable=True),
+        sa.Column('ai_raw_response', sa.JSON(), nullable=True),
+        sa.Column('error_message', sa.Text(), nullable=True),
+        sa.ForeignKeyConstraint(['game_id'], ['games.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table(
+        'experiment_logs',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('game_id', sa.Integer(), nullable=True),
+        sa.Column('experiment_name', sa.String(), nullable=True),
+        sa.Column('experiment_variant', sa.String(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('parameters', sa.JSON(), nullable=True),
+        sa.Column('success_metric', sa.Float(), nullable=True),
+        sa.Column('additional_metrics', sa.JSON(), nullable=True),
+        sa.ForeignKeyConstraint(['game_id'], ['games.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table(
+        'model_performance',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('ai_provider', sa.String(), nullable=True),
+        sa.Column('ai_model', sa.String(), nullable=True),
+        sa.Column('prompt_version', sa.String(), nullable=True),
+        sa.Column('date', sa.DateTime(), nullable=True),
+        sa.Column('total_predictions', sa.Integer(), nullable=True),
+        sa.Column('correct_predictions', sa.Integer(), nullable=True),
+        sa.Column('accuracy', sa.Float(), nullable=True),
+        sa.Column('average_confidence', sa.Float(), nullable=True),
+        sa.Column('average_response_time_ms', sa.Float(), nullable=True),
+        sa.Column('average_tokens_used', sa.Float(), nullable=True),
+        sa.Column('human_vs_ai_agreement', sa.Float(), nullable=True),
+        sa.Column('human_correct_ai_wrong', sa.Integer(), nullable=True),
+        sa.Column('ai_correct_human_wrong', sa.Integer(), nullable=True),
+        sa.Column('both_correct', sa.Integer(), nullable=True),
+        sa.Column('both_wrong', sa.Integer(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table(
+        'api_metrics',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('endpoint', sa.String(), nullable=True),
+        sa.Column('method', sa.String(), nullable=True),
+        sa.Column('status_code', sa.Integer(), nullable=True),
+        sa.Column('response_time_ms', sa.Float(), nullable=True),
+        sa.Column('ai_processing_time_ms', sa.Float(), nullable=True),
+        sa.Column('ai_provider', sa.String(), nullable=True),
+        sa.Column('ai_model', sa.String(), nullable=True),
+        sa.Column('prompt_version', sa.String(), nullable=True),
+        sa.Column('error_type', sa.String(), nullable=True),
+        sa.Column('error_message', sa.Text(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table(
+        'ai_analysis_logs',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('image_data', sa.Text(), nullable=True),
+        sa.Column('options', sa.JSON(), nullable=True),
+        sa.Column('prompt_version', sa.String(), nullable=True),
+        sa.Column('ai_provider', sa.String(), nullable=True),
+        sa.Column('ai_model', sa.String(), nullable=True),
+        sa.Column('success', sa.Boolean(), nullable=True),
+        sa.Column('guess_index', sa.Integer(), nullable=True),
+        sa.Column('guess_text', sa.String(), nullable=True),
+        sa.Column('confidence', sa.Float(), nullable=True),
+        sa.Column('reasoning', sa.Text(), nullable=True),
+        sa.Column('response_time_ms', sa.Integer(), nullable=True),
+        sa.Column('tokens_used', sa.Integer(), nullable=True),
+        sa.Column('error_message', sa.Text(), nullable=True),
+        sa.Column('raw_response', sa.JSON(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table(
+        'decks',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('category', sa.String(), nullable=True),
+        sa.Column('difficulty', sa.String(), nullable=True),
+        sa.Column('is_active', sa.Boolean(), nullable=True),
+        sa.Column('is_public', sa.Boolean(), nullable=True),
+        sa.Column('created_by', sa.String(), nullable=True),
+        sa.Column('total_items', sa.Integer(), nullable=True),
+        sa.Column('usage_count', sa.Integer(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table(
+        'deck_items',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('deck_id', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('prompt', sa.String(), nullable=False),
+        sa.Column('difficulty', sa.String(), nullable=True),
+        sa.Column('usage_count', sa.Integer(), nullable=True),
+        sa.Column('avg_human_correct_rate', sa.Float(), nullable=True),
+        sa.Column('avg_ai_correct_rate', sa.Float(), nullable=True),
+        sa.ForeignKeyConstraint(['deck_id'], ['decks.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('deck_items')
+    op.drop_table('decks')
+    op.drop_table('ai_analysis_logs')
+    op.drop_table('api_metrics')
+    op.drop_table('model_performance')
+    op.drop_table('experiment_logs')
+    op.drop_table('game_rounds')
+    op.drop_table('games')
@@ -0,0 +1,91 @@
+"""partition api_metrics and ai_analysis_logs by month (Postgres only)
+
+Revision ID: partition_log_tables
+Revises: add_deck_item_counters
+Create Date: 2026-10-19 19:00:00.000000
+
+"""
+from datetime import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'partition_log_tables'
+down_revision: Union[str, None] = 'add_deck_item_counters'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ('api_metrics', 'ai_analysis_logs')
+MONTHS_AHEAD = 3
+
+
+def month_start(moment: datetime, months: int = 0) -> datetime:
+    index = moment.year * 12 + moment.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1)
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+    now = datetime.utcnow()
+    boundary = month_start(now)
+    for table_name in TABLES:
+        already_done = bind.execute(
+            sa.text("SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:name)"),
+            {"name": table_name}
+        ).first()
+        if already_done:
+            continue
+
+        # Existing rows stay in <table>_legacy, a partition covering everything before this month
+        legacy = f"{table_name}_legacy"
+        sequence = bind.execute(
+            sa.text("SELECT pg_get_serial_sequence(:name, 'id')"), {"name": table_name}
+        ).scalar()
+        op.execute(f"LOCK TABLE {table_name} IN ACCESS EXCLUSIVE MODE")
+        # The partition key has to be part of the primary key, so it cannot be NULL
+        op.execute(f"UPDATE {table_name} SET created_at = (now() AT TIME ZONE 'utc') WHERE created_at IS NULL")
+        op.execute(f"ALTER TABLE {table_name} ALTER COLUMN created_at SET NOT NULL")
+        op.execute(f"ALTER TABLE {table_name} RENAME TO {legacy}")
+        op.execute(f"ALTER TABLE {legacy} RENAME CONSTRAINT {table_name}_pkey TO {legacy}_pkey")
+        op.execute(
+            f"CREATE TABLE {table_name} (LIKE {legacy} INCLUDING DEFAULTS INCLUDING CONSTRAINTS) "
+            f"PARTITION BY RANGE (created_at)"
+        )
+        op.execute(f"ALTER TABLE {table_name} ADD PRIMARY KEY (id, created_at)")
+        op.execute(f"ALTER SEQUENCE {sequence} OWNED BY {table_name}.id")
+        op.execute(
+            f"ALTER TABLE {table_name} ATTACH PARTITION {legacy} "
+            f"FOR VALUES FROM (MINVALUE) TO ('{boundary.isoformat(sep=' ')}')"
+        )
+        op.execute(f"CREATE TABLE {table_name}_default PARTITION OF {table_name} DEFAULT")
+
+        # This month and the next few; scripts/retention.py keeps creating them from here on
+        for offset in range(MONTHS_AHEAD + 1):
+            start, end = month_start(now, offset), month_start(now, offset + 1)
+            op.execute(
+                f"CREATE TABLE {table_name}_p{start:%Y_%m} PARTITION OF {table_name} "
+                f"FOR VALUES FROM ('{start.isoformat(sep=' ')}') TO ('{end.isoformat(sep=' ')}')"
+            )
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+    for table_name in TABLES:
+        # Tables created by SQLAlchemy, by hand or restored from a dump may name it differently
+        sequence = bind.execute(
+            sa.text("SELECT pg_get_serial_sequence(:name, 'id')"), {"name": table_name}
+        ).scalar()
+        op.execute(f"CREATE TABLE {table_name}_plain (LIKE {table_name} INCLUDING DEFAULTS)")
+        op.execute(f"INSERT INTO {table_name}_plain SELECT * FROM {table_name}")
+        op.execute(f"ALTER SEQUENCE {sequence} OWNED BY {table_name}_plain.id")
+        op.execute(f"DROP TABLE {table_name} CASCADE")
+        op.execute(f"ALTER TABLE {table_name}_plain RENAME TO {table_name}")
+        op.execute(f"ALTER TABLE {table_name} ADD PRIMARY KEY (id)")
+        op.execute(f"ALTER TABLE {table_name} ALTER COLUMN created_at DROP NOT NULL")
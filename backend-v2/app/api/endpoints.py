@@ -1,15 +1,32 @@
 import time
+import json
+import asyncio
+import base64
+import binascii
+import tempfile
+import io
+import hashlib
+import secrets
 from datetime import datetime
-from typing import Dict, Any
-from fastapi import APIRouter, HTTPException, Depends, Header
+from typing import Dict, Any, List, Optional, Tuple, Type, TypeVar, Union
+from fastapi import APIRouter, HTTPException, Depends, Header, Request, UploadFile, File, Form
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 import structlog
 
-from ..models import get_db, Game, GameRound, APIMetrics, AIAnalysisLog
+from ..models import get_db, Game, GameRound, AIAnalysisLog
+from ..models.database import SessionLocal
 from ..schemas.requests import (
     CreateGameRequest, 
+    DrawingInputRequest,
     DrawingAnalysisRequest, 
+    DrawingAnalysisMetadata,
+    BatchAnalysisRequest,
+    BatchDrawingItem,
     SaveGameRoundRequest,
+    GameRoundMetadata,
     CreateDeckRequest,
     UpdateDeckRequest,
     DeckSelectionRequest,
@@ -19,6 +36,8 @@ from ..schemas.requests import (
 from ..schemas.responses import (
     CreateGameResponse,
     DrawingAnalysisResponse, 
+    BatchAnalysisItemResponse,
+    JobResponse,
     SaveGameRoundResponse,
     GameStatsResponse,
     ModelComparisonResponse,
@@ -29,79 +48,135 @@ from ..schemas.responses import (
     DeckListResponse,
     DeckWithItemsResponse,
     RandomPromptsResponse,
+    DeckImportResponse,
     DeckStatsResponse
 )
-from ..core.ai_interface import AIProvider, DrawingAnalysisRequest as AIDrawingRequest
-from ..services import OpenAIProvider, AnthropicProvider, PromptManager, metrics_service
+from ..core.ai_interface import AIModelInterface, AIProvider, AIResponse, DrawingAnalysisRequest as AIDrawingRequest
+from ..services import OpenAIProvider, AnthropicProvider, FakeProvider, PromptManager, metrics_service, image_processor
+from ..services.analytics_export import DATASETS, stream_export
+from ..services.columnar import (
+    EXTENSIONS as COLUMNAR_EXTENSIONS,
+    FORMATS as COLUMNAR_FORMATS,
+    MEDIA_TYPES as COLUMNAR_MEDIA_TYPES,
+    require_pyarrow
+)
+from ..services.deck_cache import deck_cache
 from ..services.deck_service import DeckService
+from ..services.deck_transfer import FORMATS, MEDIA_TYPES, DeckImportError, detect_format
+from ..services.image_processor import ProcessedImage
+from ..services.item_stats import RoundOutcome, record_round_outcomes
+from ..services.job_service import Job, JobQueueFullError, job_service
+from ..services.metrics_sink import metrics_record, metrics_sink
+from ..services.stroke_rasterizer import StrokeDrawing, decode_stroke_stream, from_point_lists
+from ..core.timing import current_timings, label_request, timed_phase, track_timings
 from ..config import settings
+from .routing import FastJSONRoute, cached_json_response
 
 logger = structlog.get_logger(__name__)
-router = APIRouter()
+router = APIRouter(route_class=FastJSONRoute)
 
 # Initialize AI providers
 ai_providers = {}
 if settings.openai_api_key:
     ai_providers[AIProvider.OPENAI] = OpenAIProvider(
         settings.openai_api_key, 
-        settings.default_model
+        settings.default_model,
+        base_url=settings.openai_base_url
     )
 if settings.anthropic_api_key:
     ai_providers[AIProvider.ANTHROPIC] = AnthropicProvider(
         settings.anthropic_api_key
     )
+if settings.fake_provider_enabled:
+    ai_providers[AIProvider.FAKE] = FakeProvider.from_settings(settings)
 
 prompt_manager = PromptManager()
 
+MetadataT = TypeVar("MetadataT", bound=BaseModel)
+
 
-def verify_api_key(x_api_key: str = Header(..., alias="X-API-Key")):
+async def verify_api_key(x_api_key: str = Header(..., alias="X-API-Key")):
     """Verify API key from header"""
-    if x_api_key != settings.api_key:
-        raise HTTPException(status_code=401, detail="Invalid API key")
-    return x_api_key
+    # async so FastAPI does not hop to the threadpool for a string compare
+    with timed_phase("auth"):
+        if x_api_key != settings.api_key:
+            raise HTTPException(status_code=401, detail="Invalid API key")
+        return x_api_key
 
 
-async def log_api_metrics(
-    endpoint: str,
-    method: str,
-    status_code: int,
-    response_time_ms: float,
-    db: Session,
-    ai_processing_time_ms: float = None,
-    ai_provider: str = None,
-    ai_model: str = None,
-    prompt_version: str = None,
-    error_type: str = None,
-    error_message: str = None
-):
-    """Log API metrics to database"""
-    if not settings.enable_metrics:
-        return
+async def verify_admin_key(x_admin_key: Optional[str] = Header(None, alias="X-Admin-Key")):
+    """Verify the admin key for bulk data access; refused outright when none is configured"""
+    if not settings.admin_api_key:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled (ADMIN_API_KEY not set)")
+    if x_admin_key is None or not secrets.compare_digest(x_admin_key, settings.admin_api_key):
+        raise HTTPException(status_code=403, detail="Invalid admin key")
+    return x_admin_key
+
+
+def load_stroke_drawing(request: DrawingInputRequest) -> Optional[StrokeDrawing]:
+    """Decode vector drawing input (stroke JSON or binary point stream), if any"""
+    try:
+        if request.strokes is not None:
+            return from_point_lists(
+                request.strokes.width,
+                request.strokes.height,
+                [stroke.model_dump() for stroke in request.strokes.strokes]
+            )
+        if request.stroke_stream is not None:
+            return decode_stroke_stream(base64.b64decode(request.stroke_stream, validate=True))
+    except (ValueError, binascii.Error) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid stroke data: {e}")
+    return None
+
+
+async def prepare_drawing(request: DrawingInputRequest) -> Tuple[ProcessedImage, Optional[Dict[str, Any]]]:
+    """Turn any drawing input into a provider-ready image plus replayable stroke data"""
+    drawing = load_stroke_drawing(request)
+    
+    if drawing is None:
+        return await image_processor.process_async(request.image_data), None
     
+    image = await image_processor.process_strokes_async(drawing)
+    return image, drawing.to_json()
+
+
+def parse_metadata(model: Type[MetadataT], raw: str) -> MetadataT:
+    """Validate the JSON metadata sent alongside a binary upload"""
     try:
-        metric = APIMetrics(
-            endpoint=endpoint,
-            method=method,
-            status_code=status_code,
-            response_time_ms=response_time_ms,
-            ai_processing_time_ms=ai_processing_time_ms,
-            ai_provider=ai_provider,
-            ai_model=ai_model,
-            prompt_version=prompt_version,
-            error_type=error_type,
-            error_message=error_message
-        )
-        db.add(metric)
-        db.commit()
-    except Exception as e:
-        logger.error("Failed to log API metrics", error=str(e))
+        return model.model_validate_json(raw or "{}")
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=json.loads(e.json()))
+
+
+async def read_upload(upload: UploadFile) -> bytes:
+    """Read a multipart file part (already spooled by Starlette) with a size cap"""
+    if upload.size is not None and upload.size > settings.max_upload_bytes:
+        raise HTTPException(status_code=413, detail="Drawing is too large")
+    raw = await upload.read(settings.max_upload_bytes + 1)
+    if len(raw) > settings.max_upload_bytes:
+        raise HTTPException(status_code=413, detail="Drawing is too large")
+    if not raw:
+        raise HTTPException(status_code=400, detail="Empty drawing upload")
+    return raw
+
+
+async def read_raw_body(http_request: Request) -> bytes:
+    """Read an application/octet-stream body, rejecting it as soon as it passes the size cap"""
+    # The decoder needs the whole image in memory anyway, so there is nothing to spool
+    body = bytearray()
+    async for chunk in http_request.stream():
+        body += chunk
+        if len(body) > settings.max_upload_bytes:
+            raise HTTPException(status_code=413, detail="Drawing is too large")
+    
+    if not body:
+        raise HTTPException(status_code=400, detail="Empty drawing upload")
+    return bytes(body)
 
 
 @router.get("/health", response_model=HealthCheckResponse)
 async def health_check(db: Session = Depends(get_db)):
     """Health check endpoint"""
-    start_time = time.time()
-    
     try:
         # Test database connection
         db.execute("SELECT 1").fetchone()
@@ -114,10 +189,6 @@ async def health_check(db: Session = Depends(get_db)):
     for provider, client in ai_providers.items():
         ai_status[provider.value] = client is not None
     
-    response_time = (time.time() - start_time) * 1000
-    
-    await log_api_metrics("/health", "GET", 200, response_time, db)
-    
     return HealthCheckResponse(
         status="healthy" if db_connected else "degraded",
         timestamp=datetime.utcnow(),
@@ -135,71 +206,330 @@ async def analyze_drawing(
     api_key: str = Depends(verify_api_key)
 ):
     """Analyze a drawing using AI with automatic prompt generation from decks"""
-    start_time = time.time()
-    ai_start_time = None
+    return await run_drawing_analysis(request, db)
+
+
+@router.post("/analyze-drawing/upload", response_model=DrawingAnalysisResponse)
+async def analyze_drawing_upload(
+    image: UploadFile = File(..., description="PNG/JPEG/WebP drawing"),
+    metadata: str = Form("{}", description="DrawingAnalysisMetadata as JSON"),
+    db: Session = Depends(get_db),
+    api_key: str = Depends(verify_api_key)
+):
+    """Analyze a drawing uploaded as multipart/form-data (no base64 inflation)"""
+    analysis_request = parse_metadata(DrawingAnalysisMetadata, metadata)
+    raw = await read_upload(image)
+    processed = await image_processor.process_bytes_async(raw)
+    return await run_drawing_analysis(
+        analysis_request, db, image=processed
+    )
+
+
+@router.post("/analyze-drawing/raw", response_model=DrawingAnalysisResponse)
+async def analyze_drawing_raw(
+    http_request: Request,
+    metadata: str = Header("{}", alias="X-Drawing-Metadata"),
+    db: Session = Depends(get_db),
+    api_key: str = Depends(verify_api_key)
+):
+    """Analyze a drawing sent as an application/octet-stream body"""
+    analysis_request = parse_metadata(DrawingAnalysisMetadata, metadata)
+    raw = await read_raw_body(http_request)
+    processed = await image_processor.process_bytes_async(raw)
+    return await run_drawing_analysis(
+        analysis_request, db, image=processed
+    )
+
+
+@router.post("/analyze-drawing/jobs", response_model=JobResponse, status_code=202)
+async def submit_analysis_job(
+    request: DrawingAnalysisRequest,
+    api_key: str = Depends(verify_api_key)
+):
+    """Queue a drawing analysis and return a job id immediately"""
+    # Identical submissions (client retries) map onto the same job
+    job_key = hashlib.sha256(request.model_dump_json().encode()).hexdigest()
+    
+    async def work() -> Dict[str, Any]:
+        db = SessionLocal()
+        # The job runs after this request has finished; time and record it under its own label
+        with track_timings() as timings:
+            status_code, error = 500, None
+            try:
+                result = await run_drawing_analysis(request, db)
+                status_code = 200
+                return result.model_dump(mode="json")
+            except HTTPException as e:
+                status_code = e.status_code
+                raise
+            except Exception as e:
+                error = e
+                raise
+            finally:
+                db.close()
+                metrics_sink.record(metrics_record("job:analyze-drawing", "JOB", status_code, timings, error))
     
     try:
-        # Get or generate options
-        options = None
-        correct_index = None
-        correct_option = None
-        deck_id_used = None
+        job = await job_service.submit(job_key, work)
+    except JobQueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+    
+    logger.info("Analysis job submitted", job_id=job.id, status=job.status.value)
+    return job_to_response(job)
+
+
+@router.get("/jobs/{job_id}", response_model=JobResponse)
+async def get_job(
+    job_id: str,
+    api_key: str = Depends(verify_api_key)
+):
+    """Poll the state of an analysis job"""
+    job = await job_service.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job_to_response(job)
+
+
+@router.get("/jobs/{job_id}/events")
+async def stream_job_events(
+    job_id: str,
+    api_key: str = Depends(verify_api_key)
+):
+    """Subscribe to job state changes as server-sent events"""
+    if not await job_service.get(job_id):
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    async def event_stream():
+        async for job in job_service.updates(job_id):
+            if job is None:
+                yield ": keep-alive\n\n"
+                continue
+            payload = job_to_response(job).model_dump_json()
+            yield f"event: {job.status.value}\ndata: {payload}\n\n"
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+def sse_event(event: str, payload: Dict[str, Any]) -> str:
+    """Format one server-sent event"""
+    return f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+
+
+@router.post("/analyze-drawing/stream")
+async def analyze_drawing_stream(
+    request: DrawingAnalysisRequest,
+    db: Session = Depends(get_db),
+    api_key: str = Depends(verify_api_key)
+):
+    """Analyze a drawing and stream the guess as server-sent events
+    
+    Events: `guess` as soon as the model commits to an index, `reasoning`
+    deltas while it keeps writing, then `result` with the full response. If
+    the provider fails mid-stream the last event is `error` instead.
+    """
+    # Fail fast with a normal HTTP error before the stream starts
+    options, correct_index, correct_option, deck_id_used = resolve_analysis_options(request, db)
+    ai_client = resolve_ai_client(request.ai_provider)
+    image, stroke_data = await prepare_drawing(request)
+    
+    ai_request = AIDrawingRequest(
+        image_data=image.data,
+        options=options,
+        prompt_version=request.prompt_version,
+        model_override=request.model_override,
+        provider_override=request.ai_provider,
+        media_type=image.media_type
+    )
+    
+    async def event_stream():
+        ai_start_time = time.time()
+        ai_response = None
+        failure = None
         
-        if request.options:
-            # Use explicit options (backward compatibility)
-            options = request.options
-            logger.info("Using explicit options", count=len(options))
-        else:
-            # Generate options from decks (new approach)
-            deck_service = DeckService(db)
-            try:
-                prompt_result = deck_service.get_random_prompts(
-                    count=request.prompt_count,
-                    deck_id=request.deck_id,
-                    exclude_recent=request.exclude_recent
-                )
-                options = prompt_result["prompts"]
-                correct_index = prompt_result["correct_index"]
-                correct_option = prompt_result["correct_prompt"]
-                deck_id_used = prompt_result["deck_id_used"]
-                logger.info("Generated prompts from deck", count=len(options), deck_id=deck_id_used)
-            except ValueError as e:
-                raise HTTPException(status_code=400, detail=str(e))
+        try:
+            async for event in ai_client.stream_drawing_analysis(ai_request):
+                if event.type == "guess":
+                    guess_index = event.guess_index
+                    yield sse_event("guess", {
+                        "guess_index": guess_index,
+                        "guess_text": options[guess_index] if 0 <= guess_index < len(options) else None,
+                        "options": options,
+                        "correct_index": correct_index,
+                        "correct_option": correct_option,
+                        "time_to_guess_ms": int((time.time() - ai_start_time) * 1000)
+                    })
+                elif event.type == "reasoning":
+                    yield sse_event("reasoning", {"text": event.text})
+                elif event.type == "done":
+                    ai_response = event.response
+            if ai_response is None:
+                failure = "AI stream ended without a result"
+        except Exception as e:
+            failure = str(e) or type(e).__name__
+        
+        if failure is not None:
+            # The response is already streaming: log the failed analysis and end on an `error` event
+            logger.error("Streamed analysis failed", error=failure, deck_id_used=deck_id_used)
+            ai_response = stream_failure_response(ai_client, ai_request, ai_start_time, failure)
+            label_request(
+                ai_provider=ai_response.provider.value,
+                ai_model=ai_response.model_used,
+                prompt_version=request.prompt_version
+            )
+            await log_analyses([analysis_log_values(ai_response, options, request.prompt_version, image, stroke_data)])
+            yield sse_event("error", {"detail": "Failed to analyze drawing"})
+            return
         
-        if not options or len(options) < 2:
-            raise HTTPException(status_code=400, detail="At least 2 options required")
+        label_request(
+            ai_provider=ai_response.provider.value,
+            ai_model=ai_response.model_used,
+            prompt_version=request.prompt_version
+        )
         
-        # Determine which AI provider to use
-        provider = request.ai_provider or AIProvider(settings.default_ai_provider)
+        await log_analyses([analysis_log_values(ai_response, options, request.prompt_version, image, stroke_data)])
         
-        if provider not in ai_providers:
-            raise HTTPException(
-                status_code=400, 
-                detail=f"AI provider {provider} not available"
+        logger.info(
+            "Drawing analyzed (streamed)",
+            success=ai_response.success,
+            provider=ai_response.provider.value,
+            model=ai_response.model_used,
+            response_time_ms=ai_response.response_time_ms,
+            deck_id_used=deck_id_used
+        )
+        
+        result = build_analysis_response(
+            ai_response, options, request.prompt_version,
+            correct_index=correct_index,
+            correct_option=correct_option,
+            deck_id_used=deck_id_used
+        )
+        yield f"event: result\ndata: {result.model_dump_json()}\n\n"
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.post("/analyze-drawings/batch")
+async def analyze_drawings_batch(
+    request: BatchAnalysisRequest,
+    api_key: str = Depends(verify_api_key)
+):
+    """Analyze many drawings concurrently, streaming one NDJSON line per drawing as it finishes"""
+    if len(request.drawings) > settings.batch_max_items:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch is limited to {settings.batch_max_items} drawings"
+        )
+    
+    ai_client = resolve_ai_client(request.ai_provider)
+    label_request(ai_provider=ai_client.get_provider().value, prompt_version=request.prompt_version)
+    concurrency = min(request.concurrency or settings.batch_max_concurrency, settings.batch_max_concurrency)
+    semaphore = asyncio.Semaphore(concurrency)
+    
+    async def analyze_item(index: int, item: BatchDrawingItem) -> Tuple[BatchAnalysisItemResponse, Optional[Dict[str, Any]]]:
+        async with semaphore:
+            try:
+                image, stroke_data = await prepare_drawing(item)
+                ai_response = await ai_client.analyze_drawing(AIDrawingRequest(
+                    image_data=image.data,
+                    options=item.options,
+                    prompt_version=request.prompt_version,
+                    model_override=request.model_override,
+                    provider_override=request.ai_provider,
+                    media_type=image.media_type
+                ))
+            except HTTPException as e:
+                return BatchAnalysisItemResponse(index=index, id=item.id, error_message=str(e.detail)), None
+            except Exception as e:
+                logger.error("Batch item failed", index=index, error=str(e))
+                return BatchAnalysisItemResponse(index=index, id=item.id, error_message="Failed to analyze drawing"), None
+        
+        result = build_analysis_response(ai_response, item.options, request.prompt_version)
+        log_values = analysis_log_values(ai_response, item.options, request.prompt_version, image, stroke_data)
+        return BatchAnalysisItemResponse(index=index, id=item.id, result=result), log_values
+    
+    async def result_stream():
+        tasks = [
+            asyncio.create_task(analyze_item(index, item))
+            for index, item in enumerate(request.drawings)
+        ]
+        log_rows: List[Dict[str, Any]] = []
+        
+        try:
+            for finished in asyncio.as_completed(tasks):
+                item_response, log_values = await finished
+                if log_values is not None:
+                    log_rows.append(log_values)
+                yield item_response.model_dump_json() + "\n"
+        finally:
+            # Client went away: stop spending provider calls on the rest
+            for task in tasks:
+                task.cancel()
+            
+            if log_rows:
+                # One multi-row INSERT for the whole batch
+                await log_analyses(log_rows)
+            
+            logger.info(
+                "Batch analyzed",
+                drawings=len(request.drawings),
+                logged=len(log_rows),
+                concurrency=concurrency,
+                total_time_ms=int(current_timings().elapsed_ms())
             )
+    
+    return StreamingResponse(result_stream(), media_type="application/x-ndjson")
+
+
+def job_to_response(job: Job) -> JobResponse:
+    """Convert a Job to its response schema"""
+    return JobResponse(
+        job_id=job.id,
+        status=job.status.value,
+        created_at=datetime.utcfromtimestamp(job.created_at),
+        updated_at=datetime.utcfromtimestamp(job.updated_at),
+        result=job.result,
+        error_message=job.error_message
+    )
+
+
+async def run_drawing_analysis(
+    request: DrawingAnalysisMetadata,
+    db: Session,
+    image: Optional[ProcessedImage] = None,
+    stroke_data: Optional[Dict[str, Any]] = None
+) -> DrawingAnalysisResponse:
+    """Shared analysis pipeline; `image` is prepared from the request when not given"""
+    try:
+        options, correct_index, correct_option, deck_id_used = resolve_analysis_options(request, db)
+        
+        ai_client = resolve_ai_client(request.ai_provider)
         
-        ai_client = ai_providers[provider]
+        # Rasterize strokes or crop/downscale the PNG off the event loop
+        if image is None:
+            image, stroke_data = await prepare_drawing(request)
         
         # Create AI request
         ai_request = AIDrawingRequest(
-            image_data=request.image_data,
+            image_data=image.data,
             options=options,
             prompt_version=request.prompt_version,
             model_override=request.model_override,
-            provider_override=request.ai_provider
+            provider_override=request.ai_provider,
+            media_type=image.media_type
         )
         
         # Analyze drawing
-        ai_start_time = time.time()
         ai_response = await ai_client.analyze_drawing(ai_request)
-        ai_processing_time = (time.time() - ai_start_time) * 1000
         
-        total_response_time = (time.time() - start_time) * 1000
-        
-        # Log metrics
-        await log_api_metrics(
-            "/analyze-drawing", "POST", 200, total_response_time, db,
-            ai_processing_time_ms=ai_processing_time,
+        label_request(
             ai_provider=ai_response.provider.value,
             ai_model=ai_response.model_used,
             prompt_version=request.prompt_version
@@ -207,23 +537,7 @@ async def analyze_drawing(
         
         # Log AI analysis for analytics
         try:
-            analysis_log = AIAnalysisLog(
-                image_data=request.image_data,
-                options=options,
-                prompt_version=request.prompt_version,
-                ai_provider=ai_response.provider.value,
-                ai_model=ai_response.model_used,
-                success=ai_response.success,
-                guess_index=ai_response.guess_index,
-                guess_text=ai_response.guess_text,
-                confidence=ai_response.confidence,
-                reasoning=ai_response.reasoning,
-                response_time_ms=ai_response.response_time_ms,
-                tokens_used=ai_response.tokens_used,
-                error_message=ai_response.error_message,
-                raw_response=ai_response.raw_response
-            )
-            db.add(analysis_log)
+            db.add(build_analysis_log(ai_response, options, request.prompt_version, image, stroke_data))
             db.commit()
         except Exception as e:
             logger.error("Failed to log AI analysis", error=str(e))
@@ -234,39 +548,22 @@ async def analyze_drawing(
             provider=ai_response.provider.value,
             model=ai_response.model_used,
             response_time_ms=ai_response.response_time_ms,
-            deck_id_used=deck_id_used
+            deck_id_used=deck_id_used,
+            image_bytes=image.processed_bytes,
+            image_original_bytes=image.original_bytes
         )
         
-        return DrawingAnalysisResponse(
-            success=ai_response.success,
-            guess_index=ai_response.guess_index,
-            guess_text=ai_response.guess_text,
-            confidence=ai_response.confidence,
-            reasoning=ai_response.reasoning,
-            options=options,
+        return build_analysis_response(
+            ai_response, options, request.prompt_version,
             correct_index=correct_index,
             correct_option=correct_option,
-            deck_id_used=deck_id_used,
-            model_used=ai_response.model_used,
-            provider=ai_response.provider,
-            response_time_ms=ai_response.response_time_ms,
-            tokens_used=ai_response.tokens_used,
-            prompt_version=request.prompt_version,
-            error_message=ai_response.error_message
+            deck_id_used=deck_id_used
         )
         
     except HTTPException:
         raise
     except Exception as e:
-        total_response_time = (time.time() - start_time) * 1000
-        ai_processing_time = (time.time() - ai_start_time) * 1000 if ai_start_time else None
-        
-        await log_api_metrics(
-            "/analyze-drawing", "POST", 500, total_response_time, db,
-            ai_processing_time_ms=ai_processing_time,
-            error_type="analysis_error", error_message=str(e)
-        )
-        
+        label_request(error_type=type(e).__name__, error_message=str(e))
         logger.error("Failed to analyze drawing", error=str(e))
         raise HTTPException(status_code=500, detail="Failed to analyze drawing")
 
@@ -278,8 +575,41 @@ async def save_game_round(
     api_key: str = Depends(verify_api_key)
 ):
     """Save a complete game round with AI analysis"""
-    start_time = time.time()
+    image, stroke_data = await prepare_drawing(request)
+    return await store_game_round(
+        request, db, image,
+        stored_image=request.image_data,
+        stroke_data=stroke_data
+    )
+
+
+@router.post("/save-game-round/upload", response_model=SaveGameRoundResponse)
+async def save_game_round_upload(
+    image: UploadFile = File(..., description="PNG/JPEG/WebP drawing"),
+    metadata: str = Form(..., description="GameRoundMetadata as JSON"),
+    db: Session = Depends(get_db),
+    api_key: str = Depends(verify_api_key)
+):
+    """Save a game round whose drawing is uploaded as multipart/form-data"""
+    round_request = parse_metadata(GameRoundMetadata, metadata)
+    raw = await read_upload(image)
+    processed = await image_processor.process_bytes_async(raw)
     
+    # Store the drawing as uploaded, like the JSON endpoint, not the downscaled copy sent to the model
+    return await store_game_round(
+        round_request, db, processed,
+        stored_image=base64.b64encode(raw).decode("ascii")
+    )
+
+
+async def store_game_round(
+    request: GameRoundMetadata,
+    db: Session,
+    image: ProcessedImage,
+    stored_image: Optional[str],
+    stroke_data: Optional[Dict[str, Any]] = None
+) -> SaveGameRoundResponse:
+    """Shared save pipeline for JSON and binary uploads"""
     try:
         # Auto-create game if it doesn't exist (for round 1)
         game = db.query(Game).filter(Game.id == request.game_id).first()
@@ -299,63 +629,34 @@ async def save_game_round(
         
         # Analyze drawing if we have image data
         ai_response = None
-        if request.image_data and request.all_options:
-            analysis_request = DrawingAnalysisRequest(
-                image_data=request.image_data,
-                options=request.all_options,
-                prompt_version=request.ai_prompt_version
-            )
-            
-            # Call our existing analyze function
+        if request.all_options:
+            # Call our existing analysis pipeline with the already prepared image
             try:
-                ai_analysis = await analyze_drawing(analysis_request, db)
+                analysis_request = DrawingAnalysisMetadata(
+                    options=request.all_options,
+                    prompt_version=request.ai_prompt_version
+                )
+                ai_analysis = await run_drawing_analysis(
+                    analysis_request, db, image=image, stroke_data=stroke_data
+                )
                 if ai_analysis.success:
                     ai_response = ai_analysis
             except Exception as e:
                 logger.error("AI analysis failed during save", error=str(e))
         
         # Calculate round score
-        ai_correct = (ai_response and ai_response.success and 
-                     ai_response.guess_index == request.correct_option_index)
+        ai_correct = bool(ai_response and ai_response.success and 
+                          ai_response.guess_index == request.correct_option_index)
         human_correct = request.human_is_correct
-        
-        # Scoring: +1 if human right and AI wrong, -1 if AI right and human wrong, 0 otherwise
-        round_score = 0
-        if human_correct and not ai_correct:
-            round_score = 1
-        elif ai_correct and not human_correct:
-            round_score = -1
+        round_score = calculate_round_score(human_correct, ai_correct)
         
         # Create game round record
-        game_round = GameRound(
-            game_id=request.game_id,
-            round_number=request.round_number,
-            image_data=request.image_data,
-            drawing_time_seconds=request.drawing_time_seconds,
-            all_options=request.all_options,
-            correct_option=request.correct_option,
-            correct_option_index=request.correct_option_index,
-            human_guess=request.human_guess,
-            human_guess_index=request.human_guess_index,
-            human_is_correct=request.human_is_correct,
-            round_score=round_score,
-            round_modifiers=request.round_modifiers
+        game_round = build_game_round(
+            request, stored_image, stroke_data, round_score, ai_response, ai_correct
         )
         
-        # Add AI analysis data if available
-        if ai_response and ai_response.success:
-            game_round.ai_provider = ai_response.provider.value
-            game_round.ai_model = ai_response.model_used
-            game_round.ai_prompt_version = ai_response.prompt_version
-            game_round.ai_guess = ai_response.guess_text
-            game_round.ai_guess_index = ai_response.guess_index
-            game_round.ai_confidence = ai_response.confidence
-            game_round.ai_reasoning = ai_response.reasoning
-            game_round.ai_response_time_ms = ai_response.response_time_ms
-            game_round.ai_tokens_used = ai_response.tokens_used
-            game_round.ai_is_correct = ai_correct
-        
         db.add(game_round)
+        record_round_outcomes(db, [build_round_outcome(request, ai_response, ai_correct)])
         db.commit()
         db.refresh(game_round)
         
@@ -363,9 +664,6 @@ async def save_game_round(
         game.final_score += round_score
         db.commit()
         
-        response_time = (time.time() - start_time) * 1000
-        await log_api_metrics("/save-game-round", "POST", 200, response_time, db)
-        
         logger.info(
             "Game round saved",
             round_id=game_round.id,
@@ -386,40 +684,256 @@ async def save_game_round(
             message="Round saved successfully"
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
-        response_time = (time.time() - start_time) * 1000
-        await log_api_metrics(
-            "/save-game-round", "POST", 500, response_time, db,
-            error_type="save_error", error_message=str(e)
-        )
+        label_request(error_type=type(e).__name__, error_message=str(e))
         logger.error("Failed to save game round", error=str(e))
         raise HTTPException(status_code=500, detail="Failed to save game round")
 
 
+def prompt_session_key(request: Union[DrawingAnalysisMetadata, DeckSelectionRequest]) -> Optional[str]:
+    """Key of the no-repeat prompt order the request draws from, if any"""
+    if request.unity_session_id:
+        return request.unity_session_id
+    if request.game_id is not None:
+        return f"game:{request.game_id}"
+    return None
+
+
+def resolve_analysis_options(
+    request: DrawingAnalysisMetadata,
+    db: Session
+) -> Tuple[List[str], Optional[int], Optional[str], Optional[int]]:
+    """Return (options, correct_index, correct_option, deck_id_used) for an analysis"""
+    correct_index = None
+    correct_option = None
+    deck_id_used = None
+    
+    if request.options:
+        # Use explicit options (backward compatibility)
+        options = request.options
+        logger.info("Using explicit options", count=len(options))
+    else:
+        # Generate options from decks (new approach)
+        deck_service = DeckService(db)
+        try:
+            prompt_result = deck_service.get_random_prompts(
+                count=request.prompt_count,
+                deck_id=request.deck_id,
+                exclude_recent=request.exclude_recent,
+                session_key=prompt_session_key(request),
+                weighting=request.weighting,
+                target_difficulty=request.target_difficulty
+            )
+            options = prompt_result["prompts"]
+            correct_index = prompt_result["correct_index"]
+            correct_option = prompt_result["correct_prompt"]
+            deck_id_used = prompt_result["deck_id_used"]
+            logger.info("Generated prompts from deck", count=len(options), deck_id=deck_id_used)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    
+    if not options or len(options) < 2:
+        raise HTTPException(status_code=400, detail="At least 2 options required")
+    
+    return options, correct_index, correct_option, deck_id_used
+
+
+def resolve_ai_client(ai_provider: Optional[AIProvider]) -> AIModelInterface:
+    """Pick the requested (or default) AI provider client"""
+    provider = ai_provider or AIProvider(settings.default_ai_provider)
+    
+    if provider not in ai_providers:
+        raise HTTPException(
+            status_code=400, 
+            detail=f"AI provider {provider} not available"
+        )
+    
+    return ai_providers[provider]
+
+
+def build_analysis_log(
+    ai_response: AIResponse,
+    options: List[str],
+    prompt_version: str,
+    image: ProcessedImage,
+    stroke_data: Optional[Dict[str, Any]]
+) -> AIAnalysisLog:
+    """Build (but do not commit) an AIAnalysisLog row"""
+    return AIAnalysisLog(**analysis_log_values(ai_response, options, prompt_version, image, stroke_data))
+
+
+def analysis_log_values(
+    ai_response: AIResponse,
+    options: List[str],
+    prompt_version: str,
+    image: ProcessedImage,
+    stroke_data: Optional[Dict[str, Any]]
+) -> Dict[str, Any]:
+    """Column values for an AIAnalysisLog row (usable with bulk inserts)"""
+    return dict(
+        image_data=image.data,
+        stroke_data=stroke_data,
+        options=options,
+        prompt_version=prompt_version,
+        ai_provider=ai_response.provider.value,
+        ai_model=ai_response.model_used,
+        success=ai_response.success,
+        guess_index=ai_response.guess_index,
+        guess_text=ai_response.guess_text,
+        confidence=ai_response.confidence,
+        reasoning=ai_response.reasoning,
+        response_time_ms=ai_response.response_time_ms,
+        tokens_used=ai_response.tokens_used,
+        error_message=ai_response.error_message,
+        raw_response=ai_response.raw_response
+    )
+
+
+def stream_failure_response(
+    ai_client: AIModelInterface,
+    ai_request: AIDrawingRequest,
+    start_time: float,
+    error_message: str
+) -> AIResponse:
+    """Failed AIResponse for a stream that raised or ended without a `done` event"""
+    return AIResponse(
+        success=False,
+        guess_index=None,
+        guess_text=None,
+        confidence=0.0,
+        reasoning=None,
+        model_used=ai_request.model_override or ai_client.model_name,
+        provider=ai_client.get_provider(),
+        response_time_ms=int((time.time() - start_time) * 1000),
+        error_message=error_message
+    )
+
+
+def write_analysis_logs(rows: List[Dict[str, Any]]) -> None:
+    """Insert AIAnalysisLog rows in one statement on a session of its own (blocking)"""
+    db = SessionLocal()
+    try:
+        db.execute(insert(AIAnalysisLog), rows)
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.error("Failed to log AI analysis", rows=len(rows), error=str(e))
+    finally:
+        db.close()
+
+
+async def log_analyses(rows: List[Dict[str, Any]]) -> None:
+    """Write analysis logs from a streaming response without blocking the event loop
+    
+    The request-scoped session may already be closed once streaming starts. The
+    write is shielded, so it still completes when the client disconnects and the
+    stream is cancelled.
+    """
+    await asyncio.shield(asyncio.to_thread(write_analysis_logs, rows))
+
+
+def build_analysis_response(
+    ai_response: AIResponse,
+    options: List[str],
+    prompt_version: str,
+    correct_index: Optional[int] = None,
+    correct_option: Optional[str] = None,
+    deck_id_used: Optional[int] = None
+) -> DrawingAnalysisResponse:
+    """Convert an AIResponse to the API response schema"""
+    return DrawingAnalysisResponse(
+        success=ai_response.success,
+        guess_index=ai_response.guess_index,
+        guess_text=ai_response.guess_text,
+        confidence=ai_response.confidence,
+        reasoning=ai_response.reasoning,
+        options=options,
+        correct_index=correct_index,
+        correct_option=correct_option,
+        deck_id_used=deck_id_used,
+        model_used=ai_response.model_used,
+        provider=ai_response.provider,
+        response_time_ms=ai_response.response_time_ms,
+        tokens_used=ai_response.tokens_used,
+        prompt_version=prompt_version,
+        error_message=ai_response.error_message
+    )
+
+
+def calculate_round_score(human_correct: bool, ai_correct: bool) -> int:
+    """Scoring: +1 if human right and AI wrong, -1 if AI right and human wrong, 0 otherwise"""
+    if human_correct and not ai_correct:
+        return 1
+    if ai_correct and not human_correct:
+        return -1
+    return 0
+
+
+def build_game_round(
+    request: GameRoundMetadata,
+    stored_image: Optional[str],
+    stroke_data: Optional[Dict[str, Any]],
+    round_score: int,
+    ai_response: Optional[DrawingAnalysisResponse],
+    ai_correct: bool
+) -> GameRound:
+    """Build (but do not commit) a GameRound row"""
+    game_round = GameRound(
+        game_id=request.game_id,
+        round_number=request.round_number,
+        image_data=stored_image,
+        stroke_data=stroke_data,
+        drawing_time_seconds=request.drawing_time_seconds,
+        all_options=request.all_options,
+        correct_option=request.correct_option,
+        correct_option_index=request.correct_option_index,
+        human_guess=request.human_guess,
+        human_guess_index=request.human_guess_index,
+        human_is_correct=request.human_is_correct,
+        round_score=round_score,
+        round_modifiers=request.round_modifiers
+    )
+    
+    # Add AI analysis data if available
+    if ai_response and ai_response.success:
+        game_round.ai_provider = ai_response.provider.value
+        game_round.ai_model = ai_response.model_used
+        game_round.ai_prompt_version = ai_response.prompt_version
+        game_round.ai_guess = ai_response.guess_text
+        game_round.ai_guess_index = ai_response.guess_index
+        game_round.ai_confidence = ai_response.confidence
+        game_round.ai_reasoning = ai_response.reasoning
+        game_round.ai_response_time_ms = ai_response.response_time_ms
+        game_round.ai_tokens_used = ai_response.tokens_used
+        game_round.ai_is_correct = ai_correct
+    
+    return game_round
+
+
+def build_round_outcome(
+    request: GameRoundMetadata,
+    ai_response: Optional[DrawingAnalysisResponse],
+    ai_correct: bool
+) -> RoundOutcome:
+    """The round's contribution to its prompt's running correct rates"""
+    return RoundOutcome(
+        prompt=request.correct_option,
+        deck_id=request.deck_id,
+        human_correct=request.human_is_correct,
+        ai_correct=ai_correct if ai_response and ai_response.success else None
+    )
+
+
 @router.get("/stats", response_model=GameStatsResponse)
 async def get_game_stats(
     db: Session = Depends(get_db),
     api_key: str = Depends(verify_api_key)
 ):
     """Get game statistics"""
-    start_time = time.time()
-    
-    try:
-        stats = metrics_service.get_real_time_stats(db)
-        
-        response_time = (time.time() - start_time) * 1000
-        await log_api_metrics("/stats", "GET", 200, response_time, db)
-        
-        return GameStatsResponse(**stats)
-        
-    except Exception as e:
-        response_time = (time.time() - start_time) * 1000
-        await log_api_metrics(
-            "/stats", "GET", 500, response_time, db,
-            error_type="stats_error", error_message=str(e)
-        )
-        logger.error("Failed to get stats", error=str(e))
-        raise HTTPException(status_code=500, detail="Failed to get statistics")
+    stats = metrics_service.get_real_time_stats(db)
+    return GameStatsResponse(**stats)
 
 
 @router.get("/model-comparison", response_model=ModelComparisonResponse)
@@ -429,24 +943,8 @@ async def get_model_comparison(
     api_key: str = Depends(verify_api_key)
 ):
     """Compare AI model performance"""
-    start_time = time.time()
-    
-    try:
-        comparison = metrics_service.get_model_comparison(db, days)
-        
-        response_time = (time.time() - start_time) * 1000
-        await log_api_metrics("/model-comparison", "GET", 200, response_time, db)
-        
-        return ModelComparisonResponse(**comparison)
-        
-    except Exception as e:
-        response_time = (time.time() - start_time) * 1000
-        await log_api_metrics(
-            "/model-comparison", "GET", 500, response_time, db,
-            error_type="comparison_error", error_message=str(e)
-        )
-        logger.error("Failed to get model comparison", error=str(e))
-        raise HTTPException(status_code=500, detail="Failed to get model comparison")
+    comparison = metrics_service.get_model_comparison(db, days)
+    return ModelComparisonResponse(**comparison)
 
 
 @router.get("/api-performance", response_model=APIPerformanceResponse)
@@ -456,57 +954,58 @@ async def get_api_performance(
     api_key: str = Depends(verify_api_key)
 ):
     """Get API performance metrics"""
-    start_time = time.time()
-    
+    perf_stats = metrics_service.get_api_performance_stats(db, hours)
+    return APIPerformanceResponse(**perf_stats)
+
+
+@router.get("/export/{dataset}")
+async def export_dataset(
+    dataset: str,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    format: str = "parquet",
+    include_images: bool = False,
+    api_key: str = Depends(verify_api_key),
+    admin_key: str = Depends(verify_admin_key)
+):
+    """
+    Stream game rounds or analysis logs created in [start, end) as Parquet or
+    Arrow IPC record batches, without base64 images unless include_images
+    (admin only: the rows hold every player's drawings and guesses)
+    """
+    if dataset not in DATASETS:
+        raise HTTPException(status_code=404, detail=f"Unknown dataset; one of {', '.join(DATASETS)}")
+    if format not in COLUMNAR_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of {', '.join(COLUMNAR_FORMATS)}")
     try:
-        perf_stats = metrics_service.get_api_performance_stats(db, hours)
-        
-        response_time = (time.time() - start_time) * 1000
-        await log_api_metrics("/api-performance", "GET", 200, response_time, db)
-        
-        return APIPerformanceResponse(**perf_stats)
-        
-    except Exception as e:
-        response_time = (time.time() - start_time) * 1000
-        await log_api_metrics(
-            "/api-performance", "GET", 500, response_time, db,
-            error_type="performance_error", error_message=str(e)
-        )
-        logger.error("Failed to get API performance", error=str(e))
-        raise HTTPException(status_code=500, detail="Failed to get API performance")
+        require_pyarrow()
+    except RuntimeError as e:
+        raise HTTPException(status_code=501, detail=str(e))
+    
+    span = "_".join(f"{moment:%Y%m%dT%H%M%S}" for moment in (start, end) if moment)
+    filename = f"{dataset}{'_' + span if span else ''}{COLUMNAR_EXTENSIONS[format]}"
+    return StreamingResponse(
+        stream_export(dataset, format, start, end, include_images),
+        media_type=COLUMNAR_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
 
 
 @router.get("/prompt-versions", response_model=PromptVersionsResponse)
 async def get_prompt_versions(
-    db: Session = Depends(get_db),
     api_key: str = Depends(verify_api_key)
 ):
     """Get available prompt versions"""
-    start_time = time.time()
+    versions = prompt_manager.get_available_versions()
+    version_info = {}
     
-    try:
-        versions = prompt_manager.get_available_versions()
-        version_info = {}
-        
-        for version in versions:
-            version_info[version] = prompt_manager.get_prompt_info(version)
-        
-        response_time = (time.time() - start_time) * 1000
-        await log_api_metrics("/prompt-versions", "GET", 200, response_time, db)
-        
-        return PromptVersionsResponse(
-            available_versions=versions,
-            version_info=version_info
-        )
-        
-    except Exception as e:
-        response_time = (time.time() - start_time) * 1000
-        await log_api_metrics(
-            "/prompt-versions", "GET", 500, response_time, db,
-            error_type="prompt_error", error_message=str(e)
-        )
-        logger.error("Failed to get prompt versions", error=str(e))
-        raise HTTPException(status_code=500, detail="Failed to get prompt versions")
+    for version in versions:
+        version_info[version] = prompt_manager.get_prompt_info(version)
+    
+    return PromptVersionsResponse(
+        available_versions=versions,
+        version_info=version_info
+    )
 
 
 @router.get("/analysis-logs")
@@ -516,29 +1015,25 @@ async def get_analysis_logs(
     api_key: str = Depends(verify_api_key)
 ):
     """Get recent AI analysis logs for debugging"""
-    try:
-        logs = db.query(AIAnalysisLog).order_by(AIAnalysisLog.created_at.desc()).limit(limit).all()
-        
-        return [
-            {
-                "id": log.id,
-                "created_at": log.created_at,
-                "ai_provider": log.ai_provider,
-                "ai_model": log.ai_model,
-                "prompt_version": log.prompt_version,
-                "success": log.success,
-                "guess_index": log.guess_index,
-                "guess_text": log.guess_text,
-                "confidence": log.confidence,
-                "response_time_ms": log.response_time_ms,
-                "tokens_used": log.tokens_used,
-                "options": log.options
-            }
-            for log in logs
-        ]
-    except Exception as e:
-        logger.error("Failed to get analysis logs", error=str(e))
-        raise HTTPException(status_code=500, detail="Failed to get analysis logs")
+    logs = db.query(AIAnalysisLog).order_by(AIAnalysisLog.created_at.desc()).limit(limit).all()
+    
+    return [
+        {
+            "id": log.id,
+            "created_at": log.created_at,
+            "ai_provider": log.ai_provider,
+            "ai_model": log.ai_model,
+            "prompt_version": log.prompt_version,
+            "success": log.success,
+            "guess_index": log.guess_index,
+            "guess_text": log.guess_text,
+            "confidence": log.confidence,
+            "response_time_ms": log.response_time_ms,
+            "tokens_used": log.tokens_used,
+            "options": log.options
+        }
+        for log in logs
+    ]
 
 
 # =============================================================================
@@ -547,68 +1042,44 @@ async def get_analysis_logs(
 
 @router.get("/decks", response_model=DeckListResponse)
 async def get_all_decks(
+    request: Request,
     include_inactive: bool = False,
     db: Session = Depends(get_db),
     api_key: str = Depends(verify_api_key)
 ):
-    """Get all available decks"""
-    start_time = time.time()
+    """Get all available decks (cached, supports If-None-Match)"""
+    service = DeckService(db)
     
-    try:
-        deck_service = DeckService(db)
-        decks = deck_service.get_all_decks(include_inactive)
-        
-        response_time = (time.time() - start_time) * 1000
-        await log_api_metrics("/decks", "GET", 200, response_time, db)
-        
-        return DeckListResponse(
-            decks=decks,
-            total_count=len(decks)
-        )
-        
-    except Exception as e:
-        response_time = (time.time() - start_time) * 1000
-        await log_api_metrics(
-            "/decks", "GET", 500, response_time, db,
-            error_type="deck_error", error_message=str(e)
-        )
-        logger.error("Failed to get decks", error=str(e))
-        raise HTTPException(status_code=500, detail="Failed to get decks")
+    def build() -> DeckListResponse:
+        decks = service.get_all_decks(include_inactive)
+        return DeckListResponse(decks=decks, total_count=len(decks))
+    
+    cached = deck_cache.get_or_build(("decks", include_inactive), service.get_decks_stamp(), build)
+    return cached_json_response(request, cached)
 
 
 @router.get("/decks/{deck_id}", response_model=DeckWithItemsResponse)
 async def get_deck_with_items(
+    request: Request,
     deck_id: int,
     db: Session = Depends(get_db),
     api_key: str = Depends(verify_api_key)
 ):
-    """Get a specific deck with all its items"""
-    start_time = time.time()
+    """Get a specific deck with all its items (cached, supports If-None-Match)"""
+    service = DeckService(db)
+    stamp = service.get_deck_stamp(deck_id)
+    if stamp is None:
+        raise HTTPException(status_code=404, detail="Deck not found")
     
-    try:
-        deck_service = DeckService(db)
-        deck_data = deck_service.get_deck_with_items(deck_id)
-        
-        if not deck_data:
-            response_time = (time.time() - start_time) * 1000
-            await log_api_metrics("/decks/{deck_id}", "GET", 404, response_time, db)
-            raise HTTPException(status_code=404, detail="Deck not found")
-        
-        response_time = (time.time() - start_time) * 1000
-        await log_api_metrics("/decks/{deck_id}", "GET", 200, response_time, db)
-        
-        return DeckWithItemsResponse(**deck_data)
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        response_time = (time.time() - start_time) * 1000
-        await log_api_metrics(
-            "/decks/{deck_id}", "GET", 500, response_time, db,
-            error_type="deck_error", error_message=str(e)
-        )
-        logger.error("Failed to get deck", deck_id=deck_id, error=str(e))
-        raise HTTPException(status_code=500, detail="Failed to get deck")
+    def build() -> Optional[DeckWithItemsResponse]:
+        deck_data = service.get_deck_with_items(deck_id)
+        return DeckWithItemsResponse(**deck_data) if deck_data else None
+    
+    cached = deck_cache.get_or_build(("deck", deck_id), stamp, build)
+    if not cached:
+        raise HTTPException(status_code=404, detail="Deck not found")
+    
+    return cached_json_response(request, cached)
 
 
 @router.post("/decks", response_model=DeckResponse)
@@ -618,26 +1089,11 @@ async def create_deck(
     api_key: str = Depends(verify_api_key)
 ):
     """Create a new deck"""
-    start_time = time.time()
+    deck_service = DeckService(db)
+    deck = deck_service.create_deck(request)
     
-    try:
-        deck_service = DeckService(db)
-        deck = deck_service.create_deck(request)
-        
-        response_time = (time.time() - start_time) * 1000
-        await log_api_metrics("/decks", "POST", 201, response_time, db)
-        
-        logger.info("Deck created", deck_id=deck.id, name=deck.name)
-        return deck
-        
-    except Exception as e:
-        response_time = (time.time() - start_time) * 1000
-        await log_api_metrics(
-            "/decks", "POST", 500, response_time, db,
-            error_type="deck_creation_error", error_message=str(e)
-        )
-        logger.error("Failed to create deck", error=str(e))
-        raise HTTPException(status_code=500, detail="Failed to create deck")
+    logger.info("Deck created", deck_id=deck.id, name=deck.name)
+    return deck
 
 
 @router.put("/decks/{deck_id}", response_model=DeckResponse)
@@ -648,33 +1104,14 @@ async def update_deck(
     api_key: str = Depends(verify_api_key)
 ):
     """Update an existing deck"""
-    start_time = time.time()
+    deck_service = DeckService(db)
+    deck = deck_service.update_deck(deck_id, request)
     
-    try:
-        deck_service = DeckService(db)
-        deck = deck_service.update_deck(deck_id, request)
-        
-        if not deck:
-            response_time = (time.time() - start_time) * 1000
-            await log_api_metrics("/decks/{deck_id}", "PUT", 404, response_time, db)
-            raise HTTPException(status_code=404, detail="Deck not found")
-        
-        response_time = (time.time() - start_time) * 1000
-        await log_api_metrics("/decks/{deck_id}", "PUT", 200, response_time, db)
-        
-        logger.info("Deck updated", deck_id=deck_id)
-        return deck
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        response_time = (time.time() - start_time) * 1000
-        await log_api_metrics(
-            "/decks/{deck_id}", "PUT", 500, response_time, db,
-            error_type="deck_update_error", error_message=str(e)
-        )
-        logger.error("Failed to update deck", deck_id=deck_id, error=str(e))
-        raise HTTPException(status_code=500, detail="Failed to update deck")
+    if not deck:
+        raise HTTPException(status_code=404, detail="Deck not found")
+    
+    logger.info("Deck updated", deck_id=deck_id)
+    return deck
 
 
 @router.delete("/decks/{deck_id}")
@@ -684,33 +1121,14 @@ async def delete_deck(
     api_key: str = Depends(verify_api_key)
 ):
     """Delete a deck and all its items"""
-    start_time = time.time()
+    deck_service = DeckService(db)
+    success = deck_service.delete_deck(deck_id)
     
-    try:
-        deck_service = DeckService(db)
-        success = deck_service.delete_deck(deck_id)
-        
-        if not success:
-            response_time = (time.time() - start_time) * 1000
-            await log_api_metrics("/decks/{deck_id}", "DELETE", 404, response_time, db)
-            raise HTTPException(status_code=404, detail="Deck not found")
-        
-        response_time = (time.time() - start_time) * 1000
-        await log_api_metrics("/decks/{deck_id}", "DELETE", 200, response_time, db)
-        
-        logger.info("Deck deleted", deck_id=deck_id)
-        return {"message": "Deck deleted successfully"}
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        response_time = (time.time() - start_time) * 1000
-        await log_api_metrics(
-            "/decks/{deck_id}", "DELETE", 500, response_time, db,
-            error_type="deck_deletion_error", error_message=str(e)
-        )
-        logger.error("Failed to delete deck", deck_id=deck_id, error=str(e))
-        raise HTTPException(status_code=500, detail="Failed to delete deck")
+    if not success:
+        raise HTTPException(status_code=404, detail="Deck not found")
+    
+    logger.info("Deck deleted", deck_id=deck_id)
+    return {"message": "Deck deleted successfully"}
 
 
 @router.post("/decks/prompts", response_model=RandomPromptsResponse)
@@ -720,50 +1138,34 @@ async def get_random_prompts(
     api_key: str = Depends(verify_api_key)
 ):
     """Get random prompts from specified decks for game rounds"""
-    start_time = time.time()
-    
+    deck_service = DeckService(db)
     try:
-        deck_service = DeckService(db)
         result = deck_service.get_random_prompts(
             count=request.count,
             deck_id=request.deck_id,
-            exclude_recent=request.exclude_recent
-        )
-        
-        response_time = (time.time() - start_time) * 1000
-        await log_api_metrics("/decks/prompts", "POST", 200, response_time, db)
-        
-        logger.info(
-            "Random prompts selected",
-            count=request.count,
-            deck_id=request.deck_id,
-            deck_id_used=result["deck_id_used"]
-        )
-        
-        return RandomPromptsResponse(
-            success=True,
-            prompts=result["prompts"],
-            correct_index=result["correct_index"],
-            correct_prompt=result["correct_prompt"],
-            deck_id_used=result["deck_id_used"]
+            exclude_recent=request.exclude_recent,
+            session_key=prompt_session_key(request),
+            weighting=request.weighting,
+            target_difficulty=request.target_difficulty
         )
-        
     except ValueError as e:
-        response_time = (time.time() - start_time) * 1000
-        await log_api_metrics(
-            "/decks/prompts", "POST", 400, response_time, db,
-            error_type="insufficient_prompts", error_message=str(e)
-        )
         logger.error("Insufficient prompts available", error=str(e))
         raise HTTPException(status_code=400, detail=str(e))
-    except Exception as e:
-        response_time = (time.time() - start_time) * 1000
-        await log_api_metrics(
-            "/decks/prompts", "POST", 500, response_time, db,
-            error_type="prompt_selection_error", error_message=str(e)
-        )
-        logger.error("Failed to get random prompts", error=str(e))
-        raise HTTPException(status_code=500, detail="Failed to get random prompts")
+    
+    logger.info(
+        "Random prompts selected",
+        count=request.count,
+        deck_id=request.deck_id,
+        deck_id_used=result["deck_id_used"]
+    )
+    
+    return RandomPromptsResponse(
+        success=True,
+        prompts=result["prompts"],
+        correct_index=result["correct_index"],
+        correct_prompt=result["correct_prompt"],
+        deck_id_used=result["deck_id_used"]
+    )
 
 
 @router.post("/decks/{deck_id}/items", response_model=DeckResponse)
@@ -774,33 +1176,14 @@ async def add_items_to_deck(
     api_key: str = Depends(verify_api_key)
 ):
     """Add new items to an existing deck"""
-    start_time = time.time()
+    deck_service = DeckService(db)
+    deck = deck_service.add_items_to_deck(deck_id, request.items)
     
-    try:
-        deck_service = DeckService(db)
-        deck = deck_service.add_items_to_deck(deck_id, request.items)
-        
-        if not deck:
-            response_time = (time.time() - start_time) * 1000
-            await log_api_metrics("/decks/{deck_id}/items", "POST", 404, response_time, db)
-            raise HTTPException(status_code=404, detail="Deck not found")
-        
-        response_time = (time.time() - start_time) * 1000
-        await log_api_metrics("/decks/{deck_id}/items", "POST", 200, response_time, db)
-        
-        logger.info("Items added to deck", deck_id=deck_id, item_count=len(request.items))
-        return deck
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        response_time = (time.time() - start_time) * 1000
-        await log_api_metrics(
-            "/decks/{deck_id}/items", "POST", 500, response_time, db,
-            error_type="deck_item_addition_error", error_message=str(e)
-        )
-        logger.error("Failed to add items to deck", deck_id=deck_id, error=str(e))
-        raise HTTPException(status_code=500, detail="Failed to add items to deck")
+    if not deck:
+        raise HTTPException(status_code=404, detail="Deck not found")
+    
+    logger.info("Items added to deck", deck_id=deck_id, item_count=len(request.items))
+    return deck
 
 
 @router.delete("/decks/{deck_id}/items", response_model=DeckResponse)
@@ -811,33 +1194,98 @@ async def remove_items_from_deck(
     api_key: str = Depends(verify_api_key)
 ):
     """Remove specific items from a deck"""
-    start_time = time.time()
+    deck_service = DeckService(db)
+    deck = deck_service.remove_items_from_deck(deck_id, request.item_ids)
     
-    try:
-        deck_service = DeckService(db)
-        deck = deck_service.remove_items_from_deck(deck_id, request.item_ids)
-        
-        if not deck:
-            response_time = (time.time() - start_time) * 1000
-            await log_api_metrics("/decks/{deck_id}/items", "DELETE", 404, response_time, db)
-            raise HTTPException(status_code=404, detail="Deck not found")
-        
-        response_time = (time.time() - start_time) * 1000
-        await log_api_metrics("/decks/{deck_id}/items", "DELETE", 200, response_time, db)
-        
-        logger.info("Items removed from deck", deck_id=deck_id, item_count=len(request.item_ids))
-        return deck
+    if not deck:
+        raise HTTPException(status_code=404, detail="Deck not found")
+    
+    logger.info("Items removed from deck", deck_id=deck_id, item_count=len(request.item_ids))
+    return deck
+
+
+@router.post("/decks/{deck_id}/import", response_model=DeckImportResponse)
+async def import_deck_items(
+    http_request: Request,
+    deck_id: int,
+    format: Optional[str] = None,
+    header: Optional[bool] = None,
+    db: Session = Depends(get_db),
+    api_key: str = Depends(verify_api_key)
+):
+    """
+    Bulk-add items from a CSV or NDJSON body (format from `?format=` or the
+    Content-Type), skipping prompts the deck already has, in one transaction;
+    `?header=` says whether a CSV body starts with a header row (default: detected)
+    """
+    fmt = format or detect_format(http_request.headers.get("content-type"))
+    if fmt not in FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of {', '.join(FORMATS)}")
+    
+    with tempfile.SpooledTemporaryFile(max_size=settings.upload_spool_bytes) as spool:
+        total = 0
+        async for chunk in http_request.stream():
+            total += len(chunk)
+            if total > settings.deck_import_max_bytes:
+                raise HTTPException(status_code=413, detail="Import is too large")
+            spool.write(chunk)
+        spool.seek(0)
+        
+        def run_import() -> Optional[Dict[str, Any]]:
+            text = io.TextIOWrapper(spool, encoding="utf-8-sig", newline="")
+            try:
+                return DeckService(db).import_items(deck_id, text, fmt, settings.deck_import_batch_size, header)
+            finally:
+                text.detach()
         
-    except HTTPException:
-        raise
-    except Exception as e:
-        response_time = (time.time() - start_time) * 1000
-        await log_api_metrics(
-            "/decks/{deck_id}/items", "DELETE", 500, response_time, db,
-            error_type="deck_item_removal_error", error_message=str(e)
-        )
-        logger.error("Failed to remove items from deck", deck_id=deck_id, error=str(e))
-        raise HTTPException(status_code=500, detail="Failed to remove items from deck")
+        try:
+            result = await asyncio.to_thread(run_import)
+        except DeckImportError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except UnicodeDecodeError:
+            raise HTTPException(status_code=400, detail="Import must be UTF-8 text")
+    
+    if not result:
+        raise HTTPException(status_code=404, detail="Deck not found")
+    
+    logger.info(
+        "Deck items imported",
+        deck_id=deck_id,
+        format=fmt,
+        items_added=result["items_added"],
+        duplicates_skipped=result["duplicates_skipped"]
+    )
+    return DeckImportResponse(**result)
+
+
+@router.get("/decks/{deck_id}/export")
+async def export_deck_items(
+    deck_id: int,
+    format: str = "csv",
+    db: Session = Depends(get_db),
+    api_key: str = Depends(verify_api_key)
+):
+    """Stream a deck's items as CSV or NDJSON"""
+    if format not in FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of {', '.join(FORMATS)}")
+    
+    deck = DeckService(db).get_deck_by_id(deck_id)
+    if not deck:
+        raise HTTPException(status_code=404, detail="Deck not found")
+    
+    def export_stream():
+        # Own session: the request's is closed once the handler returns
+        export_db = SessionLocal()
+        try:
+            yield from DeckService(export_db).export_items(deck_id, format, settings.deck_import_batch_size)
+        finally:
+            export_db.close()
+    
+    return StreamingResponse(
+        export_stream(),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="deck-{deck_id}.{format}"'}
+    )
 
 
 @router.get("/decks/{deck_id}/stats", response_model=DeckStatsResponse)
@@ -847,29 +1295,10 @@ async def get_deck_stats(
     api_key: str = Depends(verify_api_key)
 ):
     """Get detailed statistics for a deck"""
-    start_time = time.time()
+    deck_service = DeckService(db)
+    stats = deck_service.get_deck_stats(deck_id)
     
-    try:
-        deck_service = DeckService(db)
-        stats = deck_service.get_deck_stats(deck_id)
-        
-        if not stats:
-            response_time = (time.time() - start_time) * 1000
-            await log_api_metrics("/decks/{deck_id}/stats", "GET", 404, response_time, db)
-            raise HTTPException(status_code=404, detail="Deck not found")
-        
-        response_time = (time.time() - start_time) * 1000
-        await log_api_metrics("/decks/{deck_id}/stats", "GET", 200, response_time, db)
-        
-        return DeckStatsResponse(**stats)
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        response_time = (time.time() - start_time) * 1000
-        await log_api_metrics(
-            "/decks/{deck_id}/stats", "GET", 500, response_time, db,
-            error_type="deck_stats_error", error_message=str(e)
-        )
-        logger.error("Failed to get deck stats", deck_id=deck_id, error=str(e))
-        raise HTTPException(status_code=500, detail="Failed to get deck stats")
\ No newline at end of file
+    if not stats:
+        raise HTTPException(status_code=404, detail="Deck not found")
+    
+    return DeckStatsResponse(**stats)
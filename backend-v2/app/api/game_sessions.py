@@ -0,0 +1,385 @@
+"""
+WebSocket channel for Unity multiplayer game sessions
+
+One authenticated, long-lived connection per player replaces the per-round
+`/decks/prompts` -> `/analyze-drawing` -> `/save-game-round` HTTP sequence.
+
+Client -> server messages (JSON, discriminated by `type`):
+    request_prompts  {deck_id?, count?, round_number?, weighting?, target_difficulty?}, no repeats within the session
+    analyze          {image_data | strokes | stroke_stream, options?, prompt_version?, ai_provider?, model_override?}
+    submit_round     GameRoundMetadata fields (game_id is implied), optional drawing
+    ping             {}
+
+Server -> client events:
+    session_joined, prompts (requester only), round_started, ai_guess,
+    score_update, player_left, pong, error
+
+`session.lock` guards the shared round state and DB session only. Drawing
+preparation and the AI call run without it, so one slow model request does not
+hold up the other players' messages.
+"""
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect
+from pydantic import ValidationError
+import structlog
+
+from ..config import settings
+from ..models import APIMetrics, Game
+from ..models.database import SessionLocal
+from ..schemas.requests import DrawingAnalysisRequest, GameRoundMetadata, SessionPromptsRequest
+from ..core.ai_interface import AIResponse, DrawingAnalysisRequest as AIDrawingRequest
+from ..services.deck_service import DeckService
+from ..services.image_processor import ProcessedImage
+from ..services.item_stats import record_round_outcomes
+from ..services.session_hub import GameSession, RoundState, session_hub
+from .endpoints import (
+    build_analysis_log,
+    build_analysis_response,
+    build_game_round,
+    build_round_outcome,
+    calculate_round_score,
+    prepare_drawing,
+    resolve_ai_client
+)
+
+logger = structlog.get_logger(__name__)
+router = APIRouter()
+
+DRAWING_FIELDS = ("image_data", "strokes", "stroke_stream")
+
+MessageHandler = Callable[[GameSession, WebSocket, Dict[str, Any]], Awaitable[None]]
+
+
+@router.websocket("/sessions/{session_id}/ws")
+async def game_session_channel(websocket: WebSocket, session_id: str):
+    """Long-lived game channel for every player in a Unity session"""
+    # Authenticate once per connection; browsers cannot set headers, so allow a query param
+    api_key = websocket.headers.get("x-api-key") or websocket.query_params.get("api_key")
+    if api_key != settings.api_key:
+        await websocket.close(code=4401, reason="Invalid API key")
+        return
+
+    await websocket.accept()
+    session = session_hub.join(session_id, websocket, lambda: open_game_session(session_id))
+
+    await websocket.send_json({
+        "type": "session_joined",
+        "session_id": session_id,
+        "game_id": session.game_id,
+        "players": len(session.connections),
+        "last_round_number": session.last_round_number
+    })
+    logger.info("Player joined session", session_id=session_id, players=len(session.connections))
+
+    try:
+        while True:
+            try:
+                message = await websocket.receive_json()
+            except (ValueError, KeyError):
+                # Text that is not JSON (ValueError) or a binary frame (KeyError)
+                await session_hub.send(websocket, {"type": "error", "detail": "Messages must be JSON text"})
+                continue
+            await dispatch_message(session, websocket, message)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        closed = session_hub.leave(session_id, websocket)
+        if closed is not None:
+            close_game_session(closed)
+        else:
+            await session_hub.broadcast(session, {
+                "type": "player_left",
+                "players": len(session.connections)
+            })
+        logger.info("Player left session", session_id=session_id)
+
+
+async def dispatch_message(session: GameSession, websocket: WebSocket, message: Dict[str, Any]) -> None:
+    """Route one client message to its handler and report failures as error events"""
+    message_type = message.get("type") if isinstance(message, dict) else None
+    handler = MESSAGE_HANDLERS.get(message_type)
+
+    if handler is None:
+        await session_hub.send(websocket, {"type": "error", "detail": f"Unknown message type: {message_type}"})
+        return
+
+    try:
+        await handler(session, websocket, message)
+    except HTTPException as e:
+        await session_hub.send(websocket, {"type": "error", "request": message_type, "detail": e.detail})
+    except ValidationError as e:
+        await session_hub.send(websocket, {"type": "error", "request": message_type, "detail": e.errors(include_context=False)})
+    except Exception as e:
+        async with session.lock:
+            session.db.rollback()
+        logger.error("Session message failed", session_id=session.session_id, type=message_type, error=str(e))
+        await session_hub.send(websocket, {"type": "error", "request": message_type, "detail": "Internal error"})
+
+
+def open_game_session(session_id: str) -> GameSession:
+    """Create the shared DB session and find or create the Game for this Unity session"""
+    db = SessionLocal()
+
+    game = db.query(Game).filter(Game.unity_session_id == session_id)\
+        .order_by(Game.id.desc()).first()
+    if not game:
+        game = Game(
+            total_rounds=10,  # Default, can be updated later
+            unity_session_id=session_id,
+            player_count=1,
+            final_score=0
+        )
+        db.add(game)
+        db.commit()
+        db.refresh(game)
+        logger.info("Auto-created game for session", game_id=game.id, session_id=session_id)
+
+    last_round = game.rounds[-1].round_number if game.rounds else 0
+    return GameSession(session_id=session_id, db=db, game_id=game.id, last_round_number=last_round)
+
+
+def close_game_session(session: GameSession) -> None:
+    """Flush anything left over (e.g. an analysis for an unsubmitted round) and release the DB session"""
+    try:
+        if session.current_round and session.current_round.pending_rows:
+            session.db.add_all(session.current_round.pending_rows)
+            session.db.commit()
+    except Exception as e:
+        session.db.rollback()
+        logger.error("Failed to flush session on close", session_id=session.session_id, error=str(e))
+    finally:
+        session.db.close()
+
+
+async def handle_request_prompts(session: GameSession, websocket: WebSocket, message: Dict[str, Any]) -> None:
+    """Draw prompts for the next round; only the requester (drawer) sees the answer"""
+    request = SessionPromptsRequest.model_validate({key: value for key, value in message.items() if key != "type"})
+
+    async with session.lock:
+        try:
+            result = DeckService(session.db).get_random_prompts(
+                count=request.count,
+                deck_id=request.deck_id,
+                session_key=session.session_id,
+                weighting=request.weighting,
+                target_difficulty=request.target_difficulty
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        round_number = request.round_number or session.last_round_number + 1
+        session.current_round = RoundState(
+            round_number=round_number,
+            options=result["prompts"],
+            correct_index=result["correct_index"],
+            correct_option=result["correct_prompt"],
+            deck_id_used=result["deck_id_used"]
+        )
+
+    await session_hub.send(websocket, {
+        "type": "prompts",
+        "round_number": round_number,
+        "prompts": result["prompts"],
+        "correct_index": result["correct_index"],
+        "correct_prompt": result["correct_prompt"],
+        "deck_id_used": result["deck_id_used"]
+    })
+    await session_hub.broadcast(session, {
+        "type": "round_started",
+        "round_number": round_number,
+        "options": result["prompts"]
+    }, exclude=websocket)
+
+
+async def handle_analyze(session: GameSession, websocket: WebSocket, message: Dict[str, Any]) -> None:
+    """Run the AI guess for the current drawing and push it to every player"""
+    async with session.lock:
+        current = session.current_round
+        payload = {key: value for key, value in message.items() if key != "type"}
+        if not payload.get("options") and current:
+            payload["options"] = current.options
+
+        request = DrawingAnalysisRequest.model_validate(payload)
+        if current is None or (request.options and request.options != current.options):
+            current = session.current_round = RoundState(
+                round_number=payload.get("round_number") or session.last_round_number + 1,
+                options=request.options or []
+            )
+
+        if not current.options or len(current.options) < 2:
+            raise HTTPException(status_code=400, detail="At least 2 options required")
+
+    image, stroke_data, ai_response = await analyze_drawing(current, request)
+
+    async with session.lock:
+        attach_analysis(current, request, image, stroke_data, ai_response)
+        if session.current_round is not current:
+            # Submitted or replaced while the model was busy: keep the log, drop the guess
+            session.db.add_all(current.pending_rows)
+            session.db.commit()
+            current.pending_rows.clear()
+            stale = True
+        else:
+            stale = False
+
+    if stale:
+        await session_hub.send(websocket, {
+            "type": "error",
+            "request": "analyze",
+            "detail": f"Round {current.round_number} ended before the analysis finished"
+        })
+        return
+
+    await session_hub.broadcast(session, {
+        "type": "ai_guess",
+        "round_number": current.round_number,
+        "analysis": current.analysis.model_dump(mode="json")
+    })
+
+
+async def analyze_drawing(
+    current: RoundState,
+    request: DrawingAnalysisRequest
+) -> Tuple[ProcessedImage, Optional[Dict[str, Any]], AIResponse]:
+    """Prepare the drawing and call the AI provider; touches no session state, so it runs unlocked"""
+    image, stroke_data = await prepare_drawing(request)
+    ai_client = resolve_ai_client(request.ai_provider)
+
+    ai_response = await ai_client.analyze_drawing(AIDrawingRequest(
+        image_data=image.data,
+        options=current.options,
+        prompt_version=request.prompt_version,
+        model_override=request.model_override,
+        provider_override=request.ai_provider,
+        media_type=image.media_type
+    ))
+    return image, stroke_data, ai_response
+
+
+def attach_analysis(
+    current: RoundState,
+    request: DrawingAnalysisRequest,
+    image: ProcessedImage,
+    stroke_data: Optional[Dict[str, Any]],
+    ai_response: AIResponse
+) -> None:
+    """Keep the analysis on the round; its log row stays pending until the round is submitted"""
+    current.image, current.stroke_data = image, stroke_data
+    current.stored_image = request.image_data
+    current.analysis = build_analysis_response(
+        ai_response, current.options, request.prompt_version,
+        deck_id_used=current.deck_id_used
+    )
+    current.pending_rows.append(build_analysis_log(
+        ai_response, current.options, request.prompt_version,
+        image, stroke_data
+    ))
+
+
+async def handle_submit_round(session: GameSession, websocket: WebSocket, message: Dict[str, Any]) -> None:
+    """Score the round and write round, analysis log, game score and metrics in one commit"""
+    start_time = time.time()
+    async with session.lock:
+        current = session.current_round
+        payload = {key: value for key, value in message.items() if key not in ("type", *DRAWING_FIELDS)}
+        payload["game_id"] = session.game_id
+        payload.setdefault("round_number", current.round_number if current else session.last_round_number + 1)
+
+        if current is not None:
+            payload.setdefault("all_options", current.options)
+            if current.correct_index is not None:
+                payload.setdefault("correct_option_index", current.correct_index)
+                payload.setdefault("correct_option", current.correct_option)
+                payload.setdefault("deck_id", current.deck_id_used)
+
+        round_request = GameRoundMetadata.model_validate(payload)
+
+    # A drawing sent with the submission is analyzed now, unlocked, into a round
+    # state of its own
+    if any(message.get(key) is not None for key in DRAWING_FIELDS):
+        analysis_request = DrawingAnalysisRequest.model_validate({
+            **{key: message.get(key) for key in DRAWING_FIELDS},
+            "options": round_request.all_options,
+            "prompt_version": round_request.ai_prompt_version
+        })
+        submitted = RoundState(
+            round_number=round_request.round_number,
+            options=round_request.all_options
+        )
+        attach_analysis(submitted, analysis_request, *await analyze_drawing(submitted, analysis_request))
+    else:
+        submitted = current
+
+    async with session.lock:
+        ai_response = submitted.analysis if submitted and submitted.analysis and submitted.analysis.success else None
+        ai_correct = bool(ai_response and ai_response.guess_index == round_request.correct_option_index)
+        round_score = calculate_round_score(round_request.human_is_correct, ai_correct)
+
+        game_round = build_game_round(
+            round_request,
+            submitted.stored_image if submitted else None,
+            submitted.stroke_data if submitted else None,
+            round_score, ai_response, ai_correct
+        )
+
+        db = session.db
+        game = db.query(Game).filter(Game.id == session.game_id).first()
+        game.final_score += round_score
+        game.player_count = max(game.player_count or 1, len(session.connections))
+
+        rows = [game_round, *(submitted.pending_rows if submitted else [])]
+        if settings.enable_metrics:
+            rows.append(APIMetrics(
+                endpoint="/sessions/{session_id}/ws:submit_round",
+                method="WS",
+                status_code=200,
+                response_time_ms=(time.time() - start_time) * 1000,
+                ai_processing_time_ms=ai_response.response_time_ms if ai_response else None,
+                ai_provider=ai_response.provider.value if ai_response else None,
+                ai_model=ai_response.model_used if ai_response else None,
+                prompt_version=round_request.ai_prompt_version
+            ))
+        db.add_all(rows)
+        record_round_outcomes(db, [build_round_outcome(round_request, ai_response, ai_correct)])
+        db.commit()
+        if submitted is not None:
+            submitted.pending_rows.clear()
+
+        # Another player may have started the next round meanwhile
+        if session.current_round is current:
+            session.current_round = None
+        session.last_round_number = max(session.last_round_number, round_request.round_number)
+        round_id, total_score = game_round.id, game.final_score
+
+    logger.info(
+        "Session round saved",
+        session_id=session.session_id,
+        game_id=session.game_id,
+        round_id=round_id,
+        round_score=round_score
+    )
+
+    await session_hub.broadcast(session, {
+        "type": "score_update",
+        "round_id": round_id,
+        "round_number": round_request.round_number,
+        "round_score": round_score,
+        "total_score": total_score,
+        "human_correct": round_request.human_is_correct,
+        "ai_correct": ai_correct,
+        "correct_option_index": round_request.correct_option_index
+    })
+
+
+async def handle_ping(session: GameSession, websocket: WebSocket, message: Dict[str, Any]) -> None:
+    await session_hub.send(websocket, {"type": "pong"})
+
+
+MESSAGE_HANDLERS: Dict[str, MessageHandler] = {
+    "request_prompts": handle_request_prompts,
+    "analyze": handle_analyze,
+    "submit_round": handle_submit_round,
+    "ping": handle_ping
+}
@@ -0,0 +1,103 @@
+"""
+Fast JSON responses for the v2 API
+
+FastAPI re-validates whatever an endpoint returns against its `response_model`,
+dumps it to Python objects and then encodes those with the stdlib `json`
+module. Our handlers already return the response model they declare, so
+`FastJSONRoute` renders such results straight to JSON bytes with pydantic-core
+and everything else (plain dicts and lists) with orjson, which handles
+datetimes natively. Cached bodies are served with ETag / `If-None-Match`
+support by `cached_json_response`.
+"""
+import functools
+from decimal import Decimal
+from typing import Any, Callable, Optional
+
+import orjson
+from fastapi import Request
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from starlette.responses import Response
+
+from ..middleware import TimedRoute
+from ..services.deck_cache import CachedBody
+
+# Clients may keep the body but must revalidate it; responses depend on the API key
+CACHE_CONTROL = "private, no-cache"
+
+
+def _default(obj: Any) -> Any:
+    """orjson fallback for the types jsonable_encoder would have handled"""
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json", by_alias=True)
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered by pydantic-core (models) or orjson (everything else)"""
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, BaseModel):
+            return content.__pydantic_serializer__.to_json(content, by_alias=True)
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+
+
+class FastJSONRoute(TimedRoute):
+    """Route class skipping FastAPI's response validation and encoding for
+    results the endpoint built itself
+
+    A result that is exactly the declared `response_model` (or any result of a
+    route without one) is rendered directly; anything else, such as a dict
+    for a model route, still goes through FastAPI's validation.
+    """
+
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs: Any):
+        super().__init__(path, endpoint, **kwargs)
+        # Per-route response filters need FastAPI's serializer
+        self._direct_render = not (
+            self.response_model_include
+            or self.response_model_exclude
+            or self.response_model_exclude_unset
+            or self.response_model_exclude_defaults
+            or self.response_model_exclude_none
+        )
+
+    def _wrap(self, endpoint: Callable[..., Any]) -> Callable[..., Any]:
+        timed_endpoint = super()._wrap(endpoint)
+
+        @functools.wraps(endpoint)
+        async def fast_endpoint(*args: Any, **kwargs: Any) -> Any:
+            return self._render(await timed_endpoint(*args, **kwargs))
+
+        fast_endpoint._timed = True
+        return fast_endpoint
+
+    def _render(self, result: Any) -> Any:
+        if isinstance(result, Response) or not self._direct_render:
+            return result
+        model: Optional[Any] = self.response_model
+        if model is None or type(result) is model:
+            return FastJSONResponse(result, status_code=self.status_code or 200)
+        return result
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an `If-None-Match` header against our ETag (RFC 9110)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return any(tag.removeprefix("W/") == etag.removeprefix("W/") for tag in candidates)
+
+
+def cached_json_response(request: Request, cached: CachedBody) -> Response:
+    """Serve a cached body, or an empty 304 when the client already has it"""
+    headers = {"ETag": cached.etag, "Cache-Control": CACHE_CONTROL}
+    if etag_matches(request.headers.get("if-none-match"), cached.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(cached.body, media_type="application/json", headers=headers)
@@ -8,20 +8,100 @@ class Settings(BaseSettings):
     supabase_anon_key: str
     supabase_service_key: str
     database_url: str
+    database_auto_create: bool = True  # Create missing tables at startup; turn off when migrating with Alembic
     
     # AI Model Configuration
     openai_api_key: Optional[str] = None
     anthropic_api_key: Optional[str] = None
     default_ai_provider: str = "openai"
     default_model: str = "gpt-4o"
+    openai_base_url: Optional[str] = None  # e.g. scripts/fake_openai_server.py
     
     # App Configuration
     environment: str = "development"
     api_key: str
+    admin_api_key: Optional[str] = None  # Unlocks /export and debug features such as on-demand profiling
     log_level: str = "INFO"
     
     # Metrics Configuration
     enable_metrics: bool = True
+    metrics_batch_size: int = 200  # APIMetrics rows per INSERT
+    metrics_flush_interval: float = 1.0  # Seconds to wait for a batch to fill
+    metrics_queue_size: int = 10000  # Records beyond this are dropped
+    
+    # Image Preprocessing
+    image_preprocessing_enabled: bool = True
+    image_max_side: int = 512
+    image_color_mode: str = "grayscale"  # "grayscale" or "palette"
+    image_crop_padding: int = 16
+    image_workers: int = 2
+    
+    # Binary Uploads
+    max_upload_bytes: int = 5 * 1024 * 1024
+    upload_spool_bytes: int = 1024 * 1024  # Spill deck import bodies to disk above this size
+    
+    # HTTP Compression
+    compression_enabled: bool = True
+    compression_min_size: int = 1024  # Smaller responses are sent uncompressed
+    compression_offload_size: int = 256 * 1024  # Compress larger bodies in a worker thread
+    compression_max_request_bytes: int = 20 * 1024 * 1024  # Limit for decompressed request bodies
+    
+    # Async Analysis Jobs
+    job_store_backend: str = "memory"
+    job_workers: int = 4
+    job_queue_size: int = 100
+    job_ttl_seconds: int = 600
+    
+    # Deck Response Cache
+    deck_cache_enabled: bool = True
+    deck_cache_ttl_seconds: float = 60.0  # Bounds staleness of usage counters and other workers' writes
+    
+    # Data Retention (scripts/retention.py)
+    metrics_retention_days: int = 30
+    analysis_log_retention_days: int = 180
+    retention_archive_dir: str = "archive"  # Expired rows are exported here before removal
+    retention_archive_format: str = "parquet"  # "parquet" or "arrow" (needs the "analytics" extra)
+    retention_partitions_ahead: int = 3  # Monthly partitions created in advance (Postgres)
+    
+    # Deck Import / Export
+    deck_import_max_bytes: int = 50 * 1024 * 1024
+    deck_import_batch_size: int = 1000  # DeckItem rows per multi-row INSERT
+    
+    # Per-session Prompt Shuffling
+    prompt_shuffle_max_sessions: int = 10000
+    prompt_shuffle_ttl_seconds: float = 6 * 3600
+    prompt_shuffle_persist: bool = False  # Also keep draw order in prompt_shuffle_states
+    prompt_weights_max_age_seconds: float = 60.0  # Rebuild weighted-sampling tables to pick up new item stats
+    
+    # Batch Analysis
+    batch_max_items: int = 500
+    batch_max_concurrency: int = 8
+    
+    # Fake AI Provider (load testing)
+    fake_provider_enabled: bool = False
+    fake_latency_distribution: str = "lognormal"  # fixed, uniform, lognormal or replay
+    fake_latency_ms: float = 800.0  # Median (lognormal) or center (fixed/uniform)
+    fake_latency_jitter: float = 0.35  # Sigma (lognormal) or +/- fraction (uniform)
+    fake_error_rate: float = 0.0
+    fake_prompt_tokens: int = 850
+    fake_completion_tokens: int = 60
+    fake_seed: int = 0
+    fake_replay_limit: int = 5000  # Recorded AIAnalysisLog latencies to replay
+    
+    # Request Profiling (requires the "profiling" extra)
+    profiling_enabled: bool = False
+    profiling_sample_rate: float = 0.0  # Fraction of requests profiled without the X-Profile header
+    profiling_output_dir: str = "profiles"
+    profiling_format: str = "speedscope"  # speedscope or html
+    profiling_interval: float = 0.001
+    
+    # Tracing (requires the "tracing" extra)
+    tracing_enabled: bool = False
+    tracing_exporter: str = "file"  # file, otlp or console
+    tracing_file: str = "traces/spans.jsonl"
+    tracing_otlp_endpoint: Optional[str] = None  # Defaults to http://localhost:4318/v1/traces
+    tracing_sample_ratio: float = 1.0
+    tracing_service_name: str = "picaictionary-backend-v2"
     
     class Config:
         env_file = ".env"
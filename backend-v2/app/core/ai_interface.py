@@ -1,6 +1,6 @@
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, AsyncIterator
 from enum import Enum
 
 
@@ -8,6 +8,7 @@ class AIProvider(str, Enum):
     OPENAI = "openai"
     ANTHROPIC = "anthropic"
     GOOGLE = "google"
+    FAKE = "fake"  # Local deterministic stand-in for load tests
     # Add more providers as needed
 
 
@@ -35,6 +36,16 @@ class DrawingAnalysisRequest:
     prompt_version: str = "v1"
     model_override: Optional[str] = None
     provider_override: Optional[AIProvider] = None
+    media_type: str = "image/png"
+
+
+@dataclass
+class AIStreamEvent:
+    """One event from a streaming analysis: `guess`, `reasoning` or `done`"""
+    type: str
+    guess_index: Optional[int] = None
+    text: Optional[str] = None
+    response: Optional[AIResponse] = None  # Set on `done`
 
 
 class AIModelInterface(ABC):
@@ -49,6 +60,18 @@ class AIModelInterface(ABC):
         """Analyze a drawing and return the AI's guess"""
         pass
     
+    async def stream_drawing_analysis(self, request: DrawingAnalysisRequest) -> AsyncIterator[AIStreamEvent]:
+        """Stream the guess as soon as it is known, then the reasoning, then the full response
+        
+        Providers without streaming support fall back to a single completion.
+        """
+        response = await self.analyze_drawing(request)
+        if response.guess_index is not None:
+            yield AIStreamEvent(type="guess", guess_index=response.guess_index)
+        if response.reasoning:
+            yield AIStreamEvent(type="reasoning", text=response.reasoning)
+        yield AIStreamEvent(type="done", guess_index=response.guess_index, response=response)
+    
     @abstractmethod
     def get_provider(self) -> AIProvider:
         """Return the provider type"""
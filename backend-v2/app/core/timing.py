@@ -0,0 +1,116 @@
+"""
+Per-request phase timings (auth, db, image, ai, serialization)
+
+A `RequestTimings` lives in a contextvar for the duration of a request (or a
+background job). Code that does measurable work wraps it in `timed_phase`, SQL
+time is added by engine events, and the totals are reported as a
+`Server-Timing` header and stored with the request's API metrics, together
+with any labels set through `label_request`.
+"""
+import contextlib
+import time
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, Optional
+
+PHASES = ("auth", "db", "image", "ai", "serialization")
+
+
+class RequestTimings:
+    """Accumulated nanoseconds per phase since the request started"""
+
+    __slots__ = ("start_ns", "phases", "endpoint_done_ns", "labels")
+
+    def __init__(self):
+        self.start_ns = time.perf_counter_ns()
+        self.phases: Dict[str, int] = {}
+        self.endpoint_done_ns: Optional[int] = None
+        self.labels: Dict[str, Any] = {}  # e.g. ai_provider, stored with the request's metrics
+
+    def add(self, phase: str, duration_ns: int) -> None:
+        self.phases[phase] = self.phases.get(phase, 0) + duration_ns
+
+    def phase_ms(self, phase: str) -> Optional[float]:
+        duration_ns = self.phases.get(phase)
+        return round(duration_ns / 1e6, 3) if duration_ns is not None else None
+
+    def elapsed_ms(self) -> float:
+        return round((time.perf_counter_ns() - self.start_ns) / 1e6, 3)
+
+    def as_dict(self) -> Dict[str, float]:
+        return {phase: self.phase_ms(phase) for phase in PHASES if phase in self.phases}
+
+    def server_timing(self) -> str:
+        """`Server-Timing` header value, e.g. `db;dur=3.2, ai;dur=812.0, total;dur=830.4`"""
+        metrics = [f"{phase};dur={duration:.1f}" for phase, duration in self.as_dict().items()]
+        metrics.append(f"total;dur={self.elapsed_ms():.1f}")
+        return ", ".join(metrics)
+
+
+_current: ContextVar[Optional[RequestTimings]] = ContextVar("request_timings", default=None)
+
+
+def current_timings() -> Optional[RequestTimings]:
+    return _current.get()
+
+
+@contextlib.contextmanager
+def track_timings() -> Iterator[RequestTimings]:
+    """Start a fresh set of timings for the enclosed request or job"""
+    timings = RequestTimings()
+    token = _current.set(timings)
+    try:
+        yield timings
+    finally:
+        _current.reset(token)
+
+
+def record_phase(phase: str, duration_ns: int) -> None:
+    timings = _current.get()
+    if timings is not None:
+        timings.add(phase, duration_ns)
+
+
+def label_request(**labels: Any) -> None:
+    """Attach metadata (ai_provider, ai_model, prompt_version) to the current request's metrics"""
+    timings = _current.get()
+    if timings is not None:
+        timings.labels.update(labels)
+
+
+@contextlib.contextmanager
+def timed_phase(phase: str) -> Iterator[None]:
+    """Add the wall time of the enclosed block to `phase` of the current request"""
+    start = time.perf_counter_ns()
+    try:
+        yield
+    finally:
+        record_phase(phase, time.perf_counter_ns() - start)
+
+
+def mark_endpoint_done() -> None:
+    """Everything between this and the response start counts as serialization"""
+    timings = _current.get()
+    if timings is not None:
+        timings.endpoint_done_ns = time.perf_counter_ns()
+
+
+def instrument_engine_timings(engine: Any) -> None:
+    """Add the time of every SQL statement on `engine` to the `db` phase"""
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("timing_starts", []).append(time.perf_counter_ns())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get("timing_starts")
+        if starts:
+            record_phase("db", time.perf_counter_ns() - starts.pop())
+
+    @event.listens_for(engine, "handle_error")
+    def _handle_error(exception_context):
+        conn = exception_context.connection
+        starts = conn.info.get("timing_starts") if conn is not None else None
+        if starts:
+            record_phase("db", time.perf_counter_ns() - starts.pop())
@@ -0,0 +1,238 @@
+"""
+Span-based tracing built on the OpenTelemetry API
+
+Only the API package is a hard dependency; without a configured SDK every helper
+here is a no-op. `configure_tracing` installs the SDK (the "tracing" extra),
+exports finished spans to a JSON-lines file, an OTLP collector or the console,
+and times each SQLAlchemy statement. Request root spans come from
+`app.middleware.TracingMiddleware`.
+"""
+import contextlib
+import os
+import threading
+import time
+from typing import Any, Dict, Iterator, Optional, Sequence
+
+from opentelemetry import trace
+from opentelemetry.trace import INVALID_SPAN, Span, SpanKind, Status, StatusCode
+
+from .ai_interface import AIModelInterface, AIResponse, DrawingAnalysisRequest
+from .timing import record_phase
+
+tracer = trace.get_tracer("picaictionary.backend")
+
+# Flipped by configure_tracing; keeps span helpers free when tracing is off
+_enabled = False
+_NOOP_SPAN = contextlib.nullcontext(INVALID_SPAN)
+
+MAX_STATEMENT_LENGTH = 2000
+
+
+def tracing_enabled() -> bool:
+    return _enabled
+
+
+def start_span(
+    name: str,
+    attributes: Optional[Dict[str, Any]] = None,
+    kind: SpanKind = SpanKind.INTERNAL
+):
+    """Context manager for a child of the current span (a shared no-op when tracing is off)"""
+    if not _enabled:
+        return _NOOP_SPAN
+    return tracer.start_as_current_span(name, kind=kind, attributes=attributes)
+
+
+@contextlib.contextmanager
+def ai_span(model: AIModelInterface, request: DrawingAnalysisRequest, streaming: bool = False) -> Iterator[Span]:
+    """Span around one provider call, also counted as the request's `ai` phase
+
+    The span is not made current, so it is safe to hold open across the yields
+    of a streaming async generator.
+    """
+    start = time.perf_counter_ns()
+    span = INVALID_SPAN
+    if _enabled:
+        span = tracer.start_span(
+            f"ai.{model.get_provider().value}",
+            kind=SpanKind.CLIENT,
+            attributes={
+                "gen_ai.system": model.get_provider().value,
+                "gen_ai.request.model": request.model_override or model.model_name,
+                "ai.prompt_version": request.prompt_version,
+                "ai.options": len(request.options),
+                "ai.image_bytes": len(request.image_data),
+                "ai.streaming": streaming
+            }
+        )
+    try:
+        yield span
+    except GeneratorExit:
+        # The client went away mid-stream
+        span.set_attribute("ai.cancelled", True)
+        raise
+    except Exception as e:
+        span.record_exception(e)
+        span.set_status(Status(StatusCode.ERROR, str(e)))
+        raise
+    finally:
+        record_phase("ai", time.perf_counter_ns() - start)
+        span.end()
+
+
+def record_ai_response(
+    span: Span,
+    response: AIResponse,
+    input_tokens: Optional[int] = None,
+    output_tokens: Optional[int] = None
+) -> None:
+    """Attach the outcome and token usage of a provider call to its span"""
+    if not span.is_recording():
+        return
+
+    attributes = {
+        "ai.success": response.success,
+        "ai.response_time_ms": response.response_time_ms,
+        "gen_ai.response.model": response.model_used
+    }
+    if response.guess_index is not None:
+        attributes["ai.guess_index"] = response.guess_index
+    if response.tokens_used is not None:
+        attributes["gen_ai.usage.total_tokens"] = response.tokens_used
+    if input_tokens is not None:
+        attributes["gen_ai.usage.input_tokens"] = input_tokens
+    if output_tokens is not None:
+        attributes["gen_ai.usage.output_tokens"] = output_tokens
+    span.set_attributes(attributes)
+
+    if response.error_message:
+        span.set_status(Status(StatusCode.ERROR, response.error_message))
+
+
+def add_trace_context(logger: Any, method_name: str, event_dict: Dict[str, Any]) -> Dict[str, Any]:
+    """structlog processor adding the current trace and span ids"""
+    context = trace.get_current_span().get_span_context()
+    if context.is_valid:
+        event_dict["trace_id"] = format(context.trace_id, "032x")
+        event_dict["span_id"] = format(context.span_id, "016x")
+    return event_dict
+
+
+def instrument_engine(engine: Any) -> None:
+    """Record a span for every SQL statement executed on `engine`"""
+    from sqlalchemy import event
+
+    system = engine.dialect.name
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        spans = conn.info.setdefault("trace_spans", [])
+        # Statements outside a request (startup, seeding) would each become their own trace
+        if not trace.get_current_span().get_span_context().is_valid:
+            spans.append(None)
+            return
+
+        operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "SQL"
+        span = tracer.start_span(
+            f"db.{operation}",
+            kind=SpanKind.CLIENT,
+            attributes={
+                "db.system": system,
+                "db.operation": operation,
+                "db.statement": statement[:MAX_STATEMENT_LENGTH],
+                "db.executemany": executemany
+            }
+        )
+        spans.append(span)
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        spans = conn.info.get("trace_spans")
+        span = spans.pop() if spans else None
+        if span is not None:
+            if cursor.rowcount is not None and cursor.rowcount >= 0:
+                span.set_attribute("db.rowcount", cursor.rowcount)
+            span.end()
+
+    @event.listens_for(engine, "handle_error")
+    def _handle_error(exception_context):
+        conn = exception_context.connection
+        spans = conn.info.get("trace_spans") if conn is not None else None
+        span = spans.pop() if spans else None
+        if span is not None:
+            span.record_exception(exception_context.original_exception)
+            span.set_status(Status(StatusCode.ERROR, str(exception_context.original_exception)))
+            span.end()
+
+
+class JsonLinesSpanExporter:
+    """Append finished spans to a file, one JSON object per line"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def export(self, spans: Sequence[Any]) -> Any:
+        from opentelemetry.sdk.trace.export import SpanExportResult
+
+        lines = "".join(span.to_json(indent=None) + "\n" for span in spans)
+        try:
+            with self._lock, open(self.path, "a") as f:
+                f.write(lines)
+        except OSError:
+            return SpanExportResult.FAILURE
+        return SpanExportResult.SUCCESS
+
+    def shutdown(self) -> None:
+        pass
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        return True
+
+
+def configure_tracing(settings: Any, engine: Any = None) -> Any:
+    """Install the OpenTelemetry SDK with the configured exporter; returns the provider"""
+    global _enabled
+
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
+    from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+
+    if settings.tracing_exporter == "otlp":
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        exporter = OTLPSpanExporter(endpoint=settings.tracing_otlp_endpoint)
+    elif settings.tracing_exporter == "console":
+        exporter = ConsoleSpanExporter()
+    elif settings.tracing_exporter == "file":
+        exporter = JsonLinesSpanExporter(settings.tracing_file)
+    else:
+        raise ValueError(f"Unknown tracing exporter: {settings.tracing_exporter}")
+
+    provider = TracerProvider(
+        resource=Resource.create({
+            "service.name": settings.tracing_service_name,
+            "deployment.environment": settings.environment
+        }),
+        sampler=ParentBased(TraceIdRatioBased(settings.tracing_sample_ratio))
+    )
+    # Batching keeps exporting off the request path
+    provider.add_span_processor(BatchSpanProcessor(exporter))
+    trace.set_tracer_provider(provider)
+
+    if engine is not None:
+        instrument_engine(engine)
+
+    _enabled = True
+    return provider
+
+
+def shutdown_tracing(provider: Any) -> None:
+    """Flush pending spans"""
+    global _enabled
+    _enabled = False
+    if provider is not None:
+        provider.shutdown()
@@ -1,3 +1,5 @@
+import importlib.util
+
 import structlog
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
@@ -5,7 +7,23 @@ from contextlib import asynccontextmanager
 
 from .config import settings
 from .api.endpoints import router
+from .api.game_sessions import router as game_sessions_router
+from .api.routing import FastJSONResponse
 from .services.metrics_service import metrics_service
+from .services.image_processor import image_processor
+from .services.job_service import job_service
+from .services.metrics_sink import metrics_sink
+from .core.timing import instrument_engine_timings
+from .core.tracing import add_trace_context, configure_tracing, shutdown_tracing
+from .middleware import (
+    CompressionMiddleware,
+    MetricsMiddleware,
+    ProfilingMiddleware,
+    ServerTimingMiddleware,
+    TracingMiddleware,
+    register_error_handlers
+)
+from .models.database import engine, init_db
 
 
 # Configure structured logging
@@ -14,6 +32,7 @@ structlog.configure(
         structlog.stdlib.filter_by_level,
         structlog.stdlib.add_logger_name,
         structlog.stdlib.add_log_level,
+        add_trace_context,
         structlog.stdlib.PositionalArgumentsFormatter(),
         structlog.processors.TimeStamper(fmt="iso"),
         structlog.processors.StackInfoRenderer(),
@@ -29,6 +48,14 @@ structlog.configure(
 
 logger = structlog.get_logger(__name__)
 
+# Tracing is opt-in; without the SDK every span helper is a no-op
+tracer_provider = None
+if settings.tracing_enabled:
+    try:
+        tracer_provider = configure_tracing(settings, engine=engine)
+    except ImportError:
+        logger.warning("Tracing enabled but the OpenTelemetry SDK is not installed; install the 'tracing' extra")
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -45,9 +72,20 @@ async def lifespan(app: FastAPI):
     # This could be done with a background task scheduler like Celery
     # For now, it's manual via the /update-performance endpoint
     
+    if settings.database_auto_create:
+        init_db()
+    
+    await job_service.start()
+    metrics_sink.start()
+    
     yield
     
     # Shutdown
+    await job_service.stop()
+    await metrics_sink.stop()
+    image_processor.shutdown()
+    if tracer_provider is not None:
+        shutdown_tracing(tracer_provider)
     logger.info("Shutting down PicAictionary Backend V2")
 
 
@@ -56,6 +94,7 @@ app = FastAPI(
     title="PicAictionary Backend V2",
     description="Modular AI-powered drawing game backend with comprehensive metrics",
     version="2.0.0",
+    default_response_class=FastJSONResponse,
     lifespan=lifespan
 )
 
@@ -70,10 +109,48 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE"],
     allow_headers=["*"],
+    expose_headers=["ETag", "Server-Timing", "X-Trace-Id"],
 )
 
+register_error_handlers(app)
+
+# One APIMetrics row per request; runs inside ServerTimingMiddleware, which owns the timings
+app.add_middleware(MetricsMiddleware, strip_prefix="/api/v2", skip_paths=("/", "/health"))
+
+# Per-phase timings for the Server-Timing header and API metrics
+instrument_engine_timings(engine)
+app.add_middleware(ServerTimingMiddleware)
+
+# Opt-in request profiling; not installed at all when disabled
+if settings.profiling_enabled:
+    if importlib.util.find_spec("pyinstrument") is None:
+        logger.warning("Profiling enabled but pyinstrument is not installed; install the 'profiling' extra")
+    else:
+        app.add_middleware(
+            ProfilingMiddleware,
+            sample_rate=settings.profiling_sample_rate,
+            admin_api_key=settings.admin_api_key,
+            output_dir=settings.profiling_output_dir,
+            output_format=settings.profiling_format,
+            interval=settings.profiling_interval
+        )
+
+if settings.compression_enabled:
+    # Outside the timing middleware, so Server-Timing does not include compression
+    app.add_middleware(
+        CompressionMiddleware,
+        min_size=settings.compression_min_size,
+        offload_size=settings.compression_offload_size,
+        max_request_bytes=settings.compression_max_request_bytes
+    )
+
+if tracer_provider is not None:
+    # Added last so the request span wraps every other middleware
+    app.add_middleware(TracingMiddleware)
+
 # Include API routes
 app.include_router(router, prefix="/api/v2")
+app.include_router(game_sessions_router, prefix="/api/v2")
 
 
 @app.get("/")
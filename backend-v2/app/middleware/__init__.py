@@ -0,0 +1,16 @@
+from .compression import CompressionMiddleware
+from .metrics import MetricsMiddleware, register_error_handlers
+from .profiling import ProfilingMiddleware
+from .server_timing import ServerTimingMiddleware, TimedRoute
+from .tracing import TracingMiddleware, route_template
+
+__all__ = [
+    "CompressionMiddleware",
+    "MetricsMiddleware",
+    "ProfilingMiddleware",
+    "ServerTimingMiddleware",
+    "TimedRoute",
+    "TracingMiddleware",
+    "register_error_handlers",
+    "route_template"
+]
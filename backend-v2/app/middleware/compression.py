@@ -0,0 +1,321 @@
+"""
+Negotiated response compression and compressed request bodies
+
+Responses with a compressible content type are encoded with the best codec
+the client accepts: zstd and Brotli when their packages are installed (the
+"compression" extra), gzip always. Bodies below `min_size` are sent as is,
+bodies above `offload_size` are compressed in a worker thread, and streaming
+responses (SSE, NDJSON) are compressed chunk by chunk with a flush after each
+one so events still arrive immediately.
+
+Requests may send a `Content-Encoding: gzip | br | zstd` body (e.g. a gzipped
+JSON with a base64 drawing); it is decompressed while the app reads it, up to
+`max_request_bytes` of decoded data. Every decompressor stops producing output
+once that limit is passed, so a small compression bomb is rejected with 413
+before it is expanded in memory.
+"""
+import asyncio
+import gzip
+import json
+import zlib
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.exceptions import HTTPException
+
+try:
+    import brotli
+except ImportError:  # Optional: the "compression" extra
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # Optional: the "compression" extra
+    zstandard = None
+
+# Levels tuned for large JSON: close to the codec's best ratio at a few ms per 100 KB
+LEVELS = {"zstd": 6, "br": 5, "gzip": 6}
+
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/x-ndjson",
+    "application/xml",
+    "application/javascript",
+    "image/svg+xml",
+    "text/"
+)
+
+
+class _GzipStream:
+    def __init__(self, level: int):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+class _BrotliStream:
+    def __init__(self, level: int):
+        self._compressor = brotli.Compressor(quality=level)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data) + self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class _ZstdStream:
+    def __init__(self, level: int):
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+def _gzip_decompressor() -> Callable[[bytes, int], bytes]:
+    decompressor = zlib.decompressobj(wbits=47)  # gzip or zlib header
+    # max_length stops a small bomb from expanding past the limit in one call
+    return lambda data, limit: decompressor.decompress(data, limit + 1)
+
+
+def _brotli_decompressor() -> Callable[[bytes, int], bytes]:
+    decompressor = brotli.Decompressor()
+    # The output buffer stops growing past the limit; the caller then rejects the body
+    return lambda data, limit: decompressor.process(data, output_buffer_limit=limit + 1)
+
+
+class _LimitReached(Exception):
+    pass
+
+
+class _BoundedSink:
+    """Write target for zstd's stream_writer that aborts decompression past a limit"""
+
+    def __init__(self):
+        self.chunks: List[bytes] = []
+        self.size = 0
+        self.limit = 0
+
+    def write(self, data: bytes) -> int:
+        self.chunks.append(bytes(data))
+        self.size += len(data)
+        if self.size > self.limit:
+            raise _LimitReached
+        return len(data)
+
+    def take(self) -> bytes:
+        body = b"".join(self.chunks)
+        self.chunks.clear()
+        self.size = 0
+        return body
+
+
+def _zstd_decompressor() -> Callable[[bytes, int], bytes]:
+    # zstandard's decompressobj has no max_length, so output goes through a sink
+    # that stops the decoder one write_size chunk past the limit
+    sink = _BoundedSink()
+    writer = zstandard.ZstdDecompressor().stream_writer(sink, write_size=64 * 1024, closefd=False)
+
+    def decompress(data: bytes, limit: int) -> bytes:
+        sink.limit = limit
+        try:
+            writer.write(data)
+        except _LimitReached:
+            pass
+        return sink.take()
+
+    return decompress
+
+
+def available_encodings() -> Dict[str, Tuple[Callable[[bytes, int], bytes], Callable[[int], Any], Callable[[], Any]]]:
+    """Codec name -> (one-shot compress, stream factory, decompressor factory), in server preference order"""
+    codecs = {}
+    if zstandard is not None:
+        codecs["zstd"] = (
+            lambda body, level: zstandard.ZstdCompressor(level=level).compress(body),
+            _ZstdStream,
+            _zstd_decompressor
+        )
+    if brotli is not None:
+        codecs["br"] = (lambda body, level: brotli.compress(body, quality=level), _BrotliStream, _brotli_decompressor)
+    codecs["gzip"] = (lambda body, level: gzip.compress(body, compresslevel=level, mtime=0), _GzipStream, _gzip_decompressor)
+    return codecs
+
+
+def negotiate(accept_encoding: Optional[str], encodings: List[str]) -> Optional[str]:
+    """Pick the client's highest-q encoding we support; ties go to our order"""
+    if not accept_encoding:
+        return None
+
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[name.strip().lower()] = q
+
+    wildcard = weights.get("*", 0.0)
+    best, best_q = None, 0.0
+    for encoding in encodings:
+        q = weights.get(encoding, wildcard)
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+class CompressionMiddleware:
+    """ASGI middleware compressing responses and decompressing request bodies"""
+
+    def __init__(
+        self,
+        app: Any,
+        min_size: int = 1024,
+        offload_size: int = 256 * 1024,
+        max_request_bytes: int = 20 * 1024 * 1024
+    ):
+        self.app = app
+        self.min_size = min_size
+        self.offload_size = offload_size
+        self.max_request_bytes = max_request_bytes
+        self.codecs = available_encodings()
+        self.encodings = list(self.codecs)
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        request_encoding = headers.get("content-encoding", "identity").strip().lower()
+        if request_encoding != "identity":
+            if request_encoding not in self.codecs:
+                await self._reject(send, 415, f"Unsupported Content-Encoding: {request_encoding}")
+                return
+            scope = dict(scope)
+            scope["headers"] = [
+                (name, value) for name, value in scope["headers"]
+                if name not in (b"content-encoding", b"content-length")
+            ]
+            receive = self._decompressing_receive(receive, self.codecs[request_encoding][2]())
+
+        encoding = negotiate(headers.get("accept-encoding"), self.encodings)
+        if encoding is None or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressingResponder(self, send, encoding)
+        await self.app(scope, receive, responder.send)
+
+    def _decompressing_receive(self, receive: Any, decompress: Callable[[bytes, int], bytes]) -> Any:
+        total = 0
+
+        async def decompressing_receive() -> Dict[str, Any]:
+            nonlocal total
+            message = await receive()
+            if message["type"] != "http.request":
+                return message
+            try:
+                body = decompress(message.get("body", b""), self.max_request_bytes - total)
+            except Exception:
+                raise HTTPException(status_code=400, detail="Malformed compressed request body")
+            total += len(body)
+            if total > self.max_request_bytes:
+                raise HTTPException(status_code=413, detail="Decompressed request body too large")
+            return {**message, "body": body}
+
+        return decompressing_receive
+
+    @staticmethod
+    async def _reject(send: Any, status_code: int, detail: str) -> None:
+        body = json.dumps({"detail": detail}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": status_code,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+        })
+        await send({"type": "http.response.body", "body": body})
+
+
+class _CompressingResponder:
+    """Per-response state: holds the start message until the first body chunk
+    shows whether the response is complete or streaming"""
+
+    def __init__(self, middleware: CompressionMiddleware, send: Any, encoding: str):
+        self.middleware = middleware
+        self._send = send
+        self.encoding = encoding
+        self.compress, self.stream_factory, _ = middleware.codecs[encoding]
+        self.level = LEVELS[encoding]
+        self.start: Optional[Dict[str, Any]] = None
+        self.stream: Optional[Any] = None
+        self.passthrough = False
+
+    async def send(self, message: Dict[str, Any]) -> None:
+        if message["type"] == "http.response.start":
+            self.start = message
+            headers = Headers(raw=message.get("headers", []))
+            content_type = headers.get("content-type", "")
+            self.passthrough = (
+                "content-encoding" in headers
+                or message["status"] in (204, 304)
+                or not content_type.startswith(COMPRESSIBLE_TYPES)
+            )
+            if self.passthrough:
+                await self._send(message)
+            return
+
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.stream is None and self.start is not None:
+            start, self.start = self.start, None
+            headers = MutableHeaders(raw=list(start.get("headers", [])))
+            headers.add_vary_header("Accept-Encoding")
+
+            if not more_body:
+                # Complete body: compress in one go when it is worth it
+                if len(body) >= self.middleware.min_size:
+                    body = await self._run(self.compress, body, self.level)
+                    self._mark_encoded(headers)
+                    headers["content-length"] = str(len(body))
+                await self._send({**start, "headers": headers.raw})
+                await self._send({**message, "body": body})
+                return
+
+            self.stream = self.stream_factory(self.level)
+            self._mark_encoded(headers)
+            del headers["content-length"]
+            await self._send({**start, "headers": headers.raw})
+
+        chunk = await self._run(self.stream.compress, body) if body else b""
+        if not more_body:
+            chunk += self.stream.finish()
+        await self._send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+    def _mark_encoded(self, headers: MutableHeaders) -> None:
+        headers["content-encoding"] = self.encoding
+        # The encoded bytes differ, so a strong validator no longer applies
+        etag = headers.get("etag")
+        if etag and not etag.startswith("W/"):
+            headers["etag"] = f"W/{etag}"
+
+    async def _run(self, func: Callable[..., bytes], data: bytes, *args: Any) -> bytes:
+        if len(data) >= self.middleware.offload_size:
+            return await asyncio.to_thread(func, data, *args)
+        return func(data, *args)
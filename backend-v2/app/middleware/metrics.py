@@ -0,0 +1,106 @@
+"""
+One place that records API metrics for every HTTP request
+
+Replaces the per-handler try/except + `log_api_metrics` boilerplate: the
+middleware records route template, method, status, latency (perf_counter_ns via
+the request's `RequestTimings`), phase timings and the error class, then hands
+the record to the non-blocking `metrics_sink`.
+"""
+from typing import Any, Dict, Optional
+
+import structlog
+from fastapi import Request
+from fastapi.exception_handlers import http_exception_handler, request_validation_exception_handler
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import JSONResponse
+from starlette.exceptions import HTTPException as StarletteHTTPException
+
+from ..core.timing import current_timings
+from ..services.metrics_sink import metrics_record, metrics_sink
+from .tracing import route_template
+
+logger = structlog.get_logger(__name__)
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording one APIMetrics row per HTTP request
+
+    Must run inside `ServerTimingMiddleware`, which owns the request timings.
+    """
+
+    def __init__(self, app: Any, strip_prefix: str = "", skip_paths: tuple = ()):
+        self.app = app
+        self.strip_prefix = strip_prefix
+        self.skip_paths = frozenset(skip_paths)
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http" or scope["path"] in self.skip_paths:
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        error: Optional[BaseException] = None
+
+        async def send_wrapper(message: Dict[str, Any]) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            timings = current_timings()
+            if timings is not None:
+                metrics_sink.record(metrics_record(
+                    self._endpoint(scope), scope["method"], status_code, timings, error
+                ))
+
+    def _endpoint(self, scope: Dict[str, Any]) -> str:
+        # Unknown paths share one label so scanners cannot blow up cardinality
+        if scope.get("route") is None:
+            return UNMATCHED_ROUTE
+        template = route_template(scope)
+        if self.strip_prefix and template.startswith(self.strip_prefix):
+            template = template[len(self.strip_prefix):] or "/"
+        return template
+
+
+def label_error(error_type: str, error_message: Any) -> None:
+    timings = current_timings()
+    if timings is not None:
+        timings.labels.setdefault("error_type", error_type)
+        timings.labels.setdefault("error_message", str(error_message))
+
+
+async def labelled_http_exception_handler(request: Request, exc: StarletteHTTPException):
+    """FastAPI's handler, plus the error class on the request's metrics"""
+    label_error(type(exc).__name__, exc.detail)
+    return await http_exception_handler(request, exc)
+
+
+async def labelled_validation_exception_handler(request: Request, exc: RequestValidationError):
+    label_error(type(exc).__name__, exc.errors())
+    return await request_validation_exception_handler(request, exc)
+
+
+async def unhandled_exception_handler(request: Request, exc: Exception):
+    """JSON 500 for errors a handler did not turn into an HTTPException"""
+    logger.error(
+        "Unhandled error",
+        path=request.url.path,
+        error_type=type(exc).__name__,
+        error=str(exc)
+    )
+    return JSONResponse(status_code=500, content={"detail": "Internal server error"})
+
+
+def register_error_handlers(app: Any) -> None:
+    app.add_exception_handler(StarletteHTTPException, labelled_http_exception_handler)
+    app.add_exception_handler(RequestValidationError, labelled_validation_exception_handler)
+    app.add_exception_handler(Exception, unhandled_exception_handler)
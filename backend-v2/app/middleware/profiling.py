@@ -0,0 +1,169 @@
+"""
+Opt-in sampling profiler for individual requests
+
+A fraction of requests (`profiling_sample_rate`), plus any request sending
+`X-Profile: <admin api key>`, runs under pyinstrument. The profile is written
+as a speedscope or HTML file and a per-request breakdown (DB, AI, image,
+serialization, other) is logged. The middleware is only installed when
+`profiling_enabled` is set, so it costs nothing when off.
+
+Install the extra first: `uv pip install -e ".[profiling]"`.
+"""
+import asyncio
+import json
+import os
+import random
+import re
+import secrets
+import time
+from typing import Any, Dict, Optional
+
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+PROFILE_HEADER = b"x-profile"
+
+# Innermost matching frame decides where time is attributed
+CATEGORY_PATTERNS = (
+    ("db", re.compile(r"sqlalchemy|psycopg2|sqlite3")),
+    ("ai", re.compile(r"[/\\](openai|anthropic|httpx|httpcore)[/\\]|ai_providers\.py|fake_provider\.py")),
+    ("image", re.compile(r"[/\\]PIL[/\\]|numpy|image_processor\.py|stroke_rasterizer\.py")),
+    ("serialization", re.compile(r"pydantic|[/\\]json[/\\]|orjson|fastapi[/\\]encoders\.py|starlette[/\\]responses\.py")),
+)
+
+
+def classify(file_path: Optional[str]) -> Optional[str]:
+    if not file_path:
+        return None
+    for category, pattern in CATEGORY_PATTERNS:
+        if pattern.search(file_path):
+            return category
+    return None
+
+
+def time_breakdown(root_frame: Any) -> Dict[str, float]:
+    """Split sampled time (ms) into categories by walking the pyinstrument call tree"""
+    totals: Dict[str, float] = {}
+    stack = [(root_frame, "other")]
+
+    while stack:
+        frame, inherited = stack.pop()
+        category = classify(frame.file_path) or inherited
+        # total_self_time already includes synthetic self/await children
+        totals[category] = totals.get(category, 0.0) + frame.total_self_time * 1000
+        stack.extend((child, category) for child in frame.children if not child.is_synthetic)
+
+    return {category: round(ms, 2) for category, ms in sorted(totals.items())}
+
+
+class ProfilingMiddleware:
+    """ASGI middleware profiling sampled or explicitly requested HTTP requests"""
+
+    def __init__(
+        self,
+        app: Any,
+        sample_rate: float = 0.0,
+        admin_api_key: Optional[str] = None,
+        output_dir: str = "profiles",
+        output_format: str = "speedscope",
+        interval: float = 0.001
+    ):
+        from pyinstrument import Profiler  # Optional dependency, only needed when enabled
+
+        self.app = app
+        self.profiler_class = Profiler
+        self.sample_rate = sample_rate
+        self.admin_api_key = admin_api_key.encode() if admin_api_key else None
+        self.output_dir = output_dir
+        self.output_format = output_format
+        self.interval = interval
+        # pyinstrument hooks the thread's profiler, so profile one request at a time
+        self._active = False
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http" or self._active or not self._should_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        self._active = True
+        status_code = 500
+        profiler = self.profiler_class(interval=self.interval, async_mode="enabled")
+
+        async def send_wrapper(message: Dict[str, Any]) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            profiler.stop()
+            self._active = False
+            duration_ms = (time.perf_counter() - start) * 1000
+            await self._save(profiler, scope, status_code, duration_ms)
+
+    def _should_profile(self, scope: Dict[str, Any]) -> bool:
+        if self.admin_api_key:
+            for name, value in scope["headers"]:
+                if name == PROFILE_HEADER:
+                    return secrets.compare_digest(value, self.admin_api_key)
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    async def _save(self, profiler: Any, scope: Dict[str, Any], status_code: int, duration_ms: float) -> None:
+        try:
+            session = profiler.last_session
+            if session is None:
+                return
+            breakdown = time_breakdown(session.root_frame())
+            path = await asyncio.to_thread(self._write, profiler, scope, status_code, duration_ms, breakdown)
+            logger.info(
+                "Request profiled",
+                method=scope["method"],
+                path=scope["path"],
+                status_code=status_code,
+                duration_ms=round(duration_ms, 2),
+                breakdown_ms=breakdown,
+                profile=path
+            )
+        except Exception as e:
+            logger.warning("Failed to save request profile", error=str(e))
+
+    def _write(
+        self,
+        profiler: Any,
+        scope: Dict[str, Any],
+        status_code: int,
+        duration_ms: float,
+        breakdown: Dict[str, float]
+    ) -> str:
+        from pyinstrument.renderers import HTMLRenderer, SpeedscopeRenderer
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        slug = re.sub(r"[^A-Za-z0-9]+", "_", scope["path"]).strip("_") or "root"
+        base = os.path.join(
+            self.output_dir,
+            f"{time.strftime('%Y%m%dT%H%M%S')}-{scope['method']}-{slug}-{int(duration_ms)}ms"
+        )
+
+        if self.output_format == "html":
+            path = f"{base}.html"
+            content = profiler.output(renderer=HTMLRenderer())
+        else:
+            path = f"{base}.speedscope.json"
+            content = profiler.output(renderer=SpeedscopeRenderer())
+
+        with open(path, "w") as f:
+            f.write(content)
+        with open(f"{base}.breakdown.json", "w") as f:
+            json.dump({
+                "method": scope["method"],
+                "path": scope["path"],
+                "status_code": status_code,
+                "duration_ms": round(duration_ms, 2),
+                "breakdown_ms": breakdown
+            }, f, indent=2)
+        return path
@@ -0,0 +1,63 @@
+"""
+`Server-Timing` headers from the per-request phase timings
+
+Lets clients such as the Unity `AIGuessingService` tell network time apart from
+our auth, database, image, model and serialization time. Streaming responses
+send their headers early, so they only report the phases finished by then.
+"""
+import functools
+import inspect
+import time
+from typing import Any, Callable, Dict
+
+from fastapi.routing import APIRoute
+
+from ..core.timing import mark_endpoint_done, track_timings
+
+SERVER_TIMING_HEADER = b"server-timing"
+
+
+class ServerTimingMiddleware:
+    """ASGI middleware owning the request's `RequestTimings`"""
+
+    def __init__(self, app: Any):
+        self.app = app
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with track_timings() as timings:
+            async def send_wrapper(message: Dict[str, Any]) -> None:
+                if message["type"] == "http.response.start":
+                    if timings.endpoint_done_ns is not None:
+                        timings.add("serialization", time.perf_counter_ns() - timings.endpoint_done_ns)
+                        timings.endpoint_done_ns = None
+                    message["headers"] = list(message.get("headers", [])) + [
+                        (SERVER_TIMING_HEADER, timings.server_timing().encode("latin-1"))
+                    ]
+                await send(message)
+
+            await self.app(scope, receive, send_wrapper)
+
+
+class TimedRoute(APIRoute):
+    """Route class marking when the endpoint returns, so response validation
+    and encoding show up as the `serialization` phase"""
+
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs: Any):
+        if inspect.iscoroutinefunction(endpoint) and not getattr(endpoint, "_timed", False):
+            endpoint = self._wrap(endpoint)
+        super().__init__(path, endpoint, **kwargs)
+
+    def _wrap(self, endpoint: Callable[..., Any]) -> Callable[..., Any]:
+        @functools.wraps(endpoint)
+        async def timed_endpoint(*args: Any, **kwargs: Any) -> Any:
+            try:
+                return await endpoint(*args, **kwargs)
+            finally:
+                mark_endpoint_done()
+
+        timed_endpoint._timed = True
+        return timed_endpoint
@@ -0,0 +1,66 @@
+"""
+Root span per HTTP request
+
+Continues an incoming W3C `traceparent` if the caller sent one, names the span
+after the matched route template and returns the trace id in `X-Trace-Id` so a
+slow response can be looked up in the exported traces.
+"""
+from typing import Any, Dict
+
+from opentelemetry import context as trace_context
+from opentelemetry import propagate
+from opentelemetry.trace import SpanKind, Status, StatusCode
+
+from ..core.tracing import tracer
+
+TRACE_ID_HEADER = b"x-trace-id"
+
+
+def route_template(scope: Dict[str, Any]) -> str:
+    """The matched route's path template (e.g. `/api/v2/decks/{deck_id}`), else the raw path"""
+    route = scope.get("route")
+    return getattr(route, "path", None) or scope["path"]
+
+
+class TracingMiddleware:
+    """ASGI middleware opening a server span around every HTTP request"""
+
+    def __init__(self, app: Any):
+        self.app = app
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        carrier = {name.decode("latin-1"): value.decode("latin-1") for name, value in scope["headers"]}
+        with tracer.start_as_current_span(
+            scope["method"],
+            # Falls back to the current context when the caller sent no traceparent
+            context=propagate.extract(carrier, context=trace_context.get_current()),
+            kind=SpanKind.SERVER,
+            attributes={
+                "http.request.method": scope["method"],
+                "url.path": scope["path"],
+                "url.scheme": scope.get("scheme", "http")
+            },
+            record_exception=True,
+            set_status_on_exception=True
+        ) as span:
+            trace_id = format(span.get_span_context().trace_id, "032x").encode()
+
+            async def send_wrapper(message: Dict[str, Any]) -> None:
+                if message["type"] == "http.response.start":
+                    status_code = message["status"]
+                    span.set_attribute("http.response.status_code", status_code)
+                    if status_code >= 500:
+                        span.set_status(Status(StatusCode.ERROR))
+                    message["headers"] = list(message.get("headers", [])) + [(TRACE_ID_HEADER, trace_id)]
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                template = route_template(scope)
+                span.update_name(f"{scope['method']} {template}")
+                span.set_attribute("http.route", template)
@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine, Column, Integer, String, DateTime, Boolean, Text, Float, JSON
+from sqlalchemy import create_engine, Column, Integer, String, DateTime, Boolean, Text, Float, JSON, LargeBinary, UniqueConstraint
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship
 from sqlalchemy import ForeignKey
@@ -48,6 +48,7 @@ class GameRound(Base):
     
     # Drawing data
     image_data = Column(Text)  # Base64 encoded image
+    stroke_data = Column(JSON, nullable=True)  # Replayable vector drawing, if sent as strokes
     drawing_time_seconds = Column(Float, nullable=True)
     
     # Game options
@@ -151,6 +152,10 @@ class APIMetrics(Base):
     # Timing
     response_time_ms = Column(Float)
     ai_processing_time_ms = Column(Float, nullable=True)  # Time spent on AI call specifically
+    auth_time_ms = Column(Float, nullable=True)
+    db_time_ms = Column(Float, nullable=True)  # Summed SQL statement time
+    image_time_ms = Column(Float, nullable=True)  # Preprocessing, including pool queueing
+    serialization_time_ms = Column(Float, nullable=True)  # Response validation and encoding
     
     # Request metadata
     ai_provider = Column(String, nullable=True)
@@ -171,6 +176,7 @@ class AIAnalysisLog(Base):
     
     # Request data
     image_data = Column(Text)  # Base64 image
+    stroke_data = Column(JSON, nullable=True)  # Replayable vector drawing, if sent as strokes
     options = Column(JSON)  # Available options
     prompt_version = Column(String)
     
@@ -234,12 +240,32 @@ class DeckItem(Base):
     avg_human_correct_rate = Column(Float, default=0.0)  # How often humans guess correctly
     avg_ai_correct_rate = Column(Float, default=0.0)    # How often AI guesses correctly
     
+    # Running counters behind the rates, incremented as rounds are saved
+    rounds_played = Column(Integer, default=0, server_default='0')
+    human_correct_count = Column(Integer, default=0, server_default='0')
+    ai_guess_count = Column(Integer, default=0, server_default='0')  # Rounds with a successful AI guess
+    ai_correct_count = Column(Integer, default=0, server_default='0')
+    
     # Relationships
     deck = relationship("Deck", back_populates="items")
 
 
-# Create all tables
-Base.metadata.create_all(bind=engine)
+class PromptShuffleState(Base):
+    """Persisted no-repeat draw order of a deck for one game session"""
+    __tablename__ = 'prompt_shuffle_states'
+    __table_args__ = (UniqueConstraint('session_key', 'deck_id'),)
+    
+    id = Column(Integer, primary_key=True)
+    session_key = Column(String, nullable=False)  # unity_session_id or "game:<id>"
+    deck_id = Column(Integer, nullable=False)
+    item_ids = Column(LargeBinary, nullable=False)  # Permutation of DeckItem ids, packed uint32
+    cursor = Column(Integer, default=0)  # Items before this position have been drawn
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+def init_db() -> None:
+    """Create missing tables; only for databases whose schema is not migrated with Alembic"""
+    Base.metadata.create_all(bind=engine)
 
 
 # Dependency to get DB session
@@ -1,8 +1,16 @@
-from pydantic import BaseModel, Field
+from enum import Enum
+from pydantic import BaseModel, Field, model_validator
 from typing import List, Optional
 from ..core.ai_interface import AIProvider
 
 
+class PromptWeighting(str, Enum):
+    """How prompts are picked from a deck"""
+    UNIFORM = "uniform"
+    HUMAN_OVER_AI = "human_over_ai"  # Humans guess it, the AI misses
+    LEAST_USED = "least_used"
+
+
 class CreateGameRequest(BaseModel):
     """Request to create a new game"""
     total_rounds: int = Field(..., ge=1, le=50, description="Number of rounds in the game")
@@ -10,9 +18,38 @@ class CreateGameRequest(BaseModel):
     player_count: int = Field(1, ge=1, le=10, description="Number of players")
 
 
-class DrawingAnalysisRequest(BaseModel):
-    """Request to analyze a drawing"""
-    image_data: str = Field(..., description="Base64 encoded image data")
+class StrokeData(BaseModel):
+    """A single stroke of a vector drawing"""
+    points: List[float] = Field(..., min_length=2, description="Flat [x0, y0, x1, y1, ...] list normalized to 0-1, origin bottom-left")
+    thickness: float = Field(2.0, gt=0, le=64, description="Stroke thickness in canvas pixels")
+
+
+class DrawingStrokes(BaseModel):
+    """Compact vector drawing, matching the Unity client's DrawingData"""
+    width: int = Field(512, ge=1, le=2048, description="Canvas width in pixels")
+    height: int = Field(512, ge=1, le=2048, description="Canvas height in pixels")
+    strokes: List[StrokeData] = Field(..., max_length=5000, description="Strokes in drawing order")
+
+
+class DrawingInputRequest(BaseModel):
+    """Accepts a drawing as a PNG, stroke JSON or a binary point stream"""
+    image_data: Optional[str] = Field(None, description="Base64 encoded image data")
+    strokes: Optional[DrawingStrokes] = Field(None, description="Vector drawing, rasterized server-side")
+    stroke_stream: Optional[str] = Field(None, description="Base64 encoded binary point stream (see stroke_rasterizer)")
+    
+    @model_validator(mode="after")
+    def check_single_drawing_input(self):
+        provided = [
+            name for name in ("image_data", "strokes", "stroke_stream")
+            if getattr(self, name) is not None
+        ]
+        if len(provided) != 1:
+            raise ValueError("Provide exactly one of image_data, strokes or stroke_stream")
+        return self
+
+
+class DrawingAnalysisMetadata(BaseModel):
+    """Everything about an analysis request except the drawing itself"""
     
     # Option 1: Explicit options (backward compatibility)
     options: Optional[List[str]] = Field(None, min_items=2, max_items=10, description="Explicit options (optional)")
@@ -20,7 +57,15 @@ class DrawingAnalysisRequest(BaseModel):
     # Option 2: Single deck selection (new approach)
     deck_id: Optional[int] = Field(None, description="Single deck ID to use (if not using explicit options)")
     prompt_count: int = Field(4, ge=2, le=10, description="Number of prompts to generate")
-    exclude_recent: Optional[List[str]] = Field(None, description="Recently used prompts to exclude")
+    exclude_recent: Optional[List[str]] = Field(
+        None, description="Recently used prompts to exclude (ignored when game_id or unity_session_id is set)"
+    )
+    game_id: Optional[int] = Field(None, description="Draw prompts without repeats across this game's rounds")
+    unity_session_id: Optional[str] = Field(None, description="Draw prompts without repeats across this Unity session")
+    weighting: PromptWeighting = Field(
+        PromptWeighting.UNIFORM, description="Weighted sampling mode"
+    )
+    target_difficulty: Optional[str] = Field(None, description="Favor prompts of this difficulty (easy, medium, hard)")
     
     # AI settings
     prompt_version: str = Field("v1", description="Prompt version to use")
@@ -28,19 +73,38 @@ class DrawingAnalysisRequest(BaseModel):
     model_override: Optional[str] = Field(None, description="Model override")
 
 
-class SaveGameRoundRequest(BaseModel):
-    """Request to save a game round"""
+class DrawingAnalysisRequest(DrawingInputRequest, DrawingAnalysisMetadata):
+    """Request to analyze a drawing"""
+
+
+class BatchDrawingItem(DrawingInputRequest):
+    """One drawing in a batch analysis request"""
+    id: Optional[str] = Field(None, description="Client reference echoed back with the result")
+    options: List[str] = Field(..., min_length=2, max_length=10, description="Options to choose from")
+
+
+class BatchAnalysisRequest(BaseModel):
+    """Request to analyze many drawings in one call"""
+    drawings: List[BatchDrawingItem] = Field(..., min_length=1, description="Drawings to analyze")
+    prompt_version: str = Field("v1", description="Prompt version to use")
+    ai_provider: Optional[AIProvider] = Field(None, description="AI provider override")
+    model_override: Optional[str] = Field(None, description="Model override")
+    concurrency: Optional[int] = Field(None, ge=1, description="Max concurrent provider calls (capped by the server)")
+
+
+class GameRoundMetadata(BaseModel):
+    """Everything about a game round except the drawing itself"""
     game_id: int = Field(..., description="Game ID")
     round_number: int = Field(..., ge=1, description="Round number")
     
     # Drawing data
-    image_data: str = Field(..., description="Base64 encoded drawing")
     drawing_time_seconds: Optional[float] = Field(None, ge=0, description="Time spent drawing")
     
     # Game options
     all_options: List[str] = Field(..., description="All available options")
     correct_option: str = Field(..., description="The correct answer")
     correct_option_index: int = Field(..., ge=0, description="Index of correct option")
+    deck_id: Optional[int] = Field(None, description="Deck the prompts were drawn from (deck_id_used)")
     
     # Human player data
     human_guess: Optional[str] = Field(None, description="Human player's guess")
@@ -56,6 +120,10 @@ class SaveGameRoundRequest(BaseModel):
     round_modifiers: Optional[List[str]] = Field(None, description="Drawing modifiers applied")
 
 
+class SaveGameRoundRequest(DrawingInputRequest, GameRoundMetadata):
+    """Request to save a game round"""
+
+
 class AppAttestationRequest(BaseModel):
     """Request with app attestation"""
     integrity_token: str = Field(..., description="Platform integrity token")
@@ -88,7 +156,24 @@ class DeckSelectionRequest(BaseModel):
     """Request to get prompts from a single deck"""
     count: int = Field(4, ge=2, le=10, description="Number of prompts to return")
     deck_id: int = Field(..., description="Single deck ID to use for the game")
-    exclude_recent: Optional[List[str]] = Field(None, description="Recently used prompts to exclude")
+    exclude_recent: Optional[List[str]] = Field(
+        None, description="Recently used prompts to exclude (ignored when game_id or unity_session_id is set)"
+    )
+    game_id: Optional[int] = Field(None, description="Draw prompts without repeats across this game's rounds")
+    unity_session_id: Optional[str] = Field(None, description="Draw prompts without repeats across this Unity session")
+    weighting: PromptWeighting = Field(
+        PromptWeighting.UNIFORM, description="Weighted sampling mode"
+    )
+    target_difficulty: Optional[str] = Field(None, description="Favor prompts of this difficulty (easy, medium, hard)")
+
+
+class SessionPromptsRequest(BaseModel):
+    """`request_prompts` message on the game-session WebSocket"""
+    count: int = Field(4, ge=2, le=10, description="Number of prompts to return")
+    deck_id: Optional[int] = Field(None, description="Deck to draw from (None = Base Deck)")
+    round_number: Optional[int] = Field(None, ge=1, description="Defaults to the round after the last submitted one")
+    weighting: PromptWeighting = Field(PromptWeighting.UNIFORM, description="Weighted sampling mode")
+    target_difficulty: Optional[str] = Field(None, description="Favor prompts of this difficulty (easy, medium, hard)")
 
 
 class AddItemsToDeckRequest(BaseModel):
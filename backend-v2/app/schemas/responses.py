@@ -36,6 +36,24 @@ class DrawingAnalysisResponse(BaseModel):
     error_message: Optional[str] = Field(None, description="Error message if failed")
 
 
+class JobResponse(BaseModel):
+    """Response for an asynchronous analysis job"""
+    job_id: str = Field(..., description="Job ID to poll or subscribe to")
+    status: str = Field(..., description="queued, running, completed or failed")
+    created_at: datetime = Field(..., description="Submission timestamp")
+    updated_at: datetime = Field(..., description="Last state change timestamp")
+    result: Optional[DrawingAnalysisResponse] = Field(None, description="Analysis result once completed")
+    error_message: Optional[str] = Field(None, description="Error message if failed")
+
+
+class BatchAnalysisItemResponse(BaseModel):
+    """One NDJSON line of a batch analysis, emitted as soon as that drawing finishes"""
+    index: int = Field(..., description="Position of the drawing in the request")
+    id: Optional[str] = Field(None, description="Client reference from the request")
+    result: Optional[DrawingAnalysisResponse] = Field(None, description="Analysis result")
+    error_message: Optional[str] = Field(None, description="Why this drawing could not be analyzed")
+
+
 class SaveGameRoundResponse(BaseModel):
     """Response for saving game round"""
     success: bool = Field(..., description="Whether round was saved successfully")
@@ -78,6 +96,10 @@ class APIPerformanceResponse(BaseModel):
     success_rate: float = Field(..., description="Success rate (0-1)")
     
     response_time_ms: Dict[str, float] = Field(..., description="Response time statistics")
+    phase_time_ms: Dict[str, Dict[str, float]] = Field(
+        default_factory=dict,
+        description="Average auth/db/image/ai/serialization time per endpoint"
+    )
 
 
 class PromptVersionsResponse(BaseModel):
@@ -146,6 +168,15 @@ class RandomPromptsResponse(BaseModel):
     message: Optional[str] = Field(None, description="Status message")
 
 
+class DeckImportResponse(BaseModel):
+    """Response for a bulk deck import"""
+    success: bool = Field(True, description="Whether the import was committed")
+    deck: DeckResponse = Field(..., description="Deck after the import")
+    rows_read: int = Field(..., description="Non-blank rows in the source")
+    items_added: int = Field(..., description="New items inserted")
+    duplicates_skipped: int = Field(..., description="Rows whose prompt the deck already had")
+
+
 class DeckStatsResponse(BaseModel):
     """Response for deck statistics"""
     deck: DeckResponse = Field(..., description="Deck information")
@@ -1,5 +1,7 @@
 from .ai_providers import OpenAIProvider, AnthropicProvider
+from .fake_provider import FakeProvider
 from .prompt_manager import PromptManager
 from .metrics_service import metrics_service
+from .image_processor import image_processor
 
-__all__ = ["OpenAIProvider", "AnthropicProvider", "PromptManager", "metrics_service"]
\ No newline at end of file
+__all__ = ["OpenAIProvider", "AnthropicProvider", "FakeProvider", "PromptManager", "metrics_service", "image_processor"]
\ No newline at end of file
@@ -1,113 +1,179 @@
 import time
-import json
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, AsyncIterator, List
 import httpx
 import openai
-from anthropic import Anthropic
+from anthropic import AsyncAnthropic
 
 from ..core.ai_interface import (
     AIModelInterface, 
     AIResponse, 
     AIProvider, 
+    AIStreamEvent,
     DrawingAnalysisRequest
 )
+from ..core.tracing import ai_span, record_ai_response
 from ..services.prompt_manager import PromptManager
+from ..services.guess_parser import GuessStreamParser, parse_guess_response
 
 
 class OpenAIProvider(AIModelInterface):
     """OpenAI GPT-4 Vision implementation"""
     
-    def __init__(self, api_key: str, model_name: str = "gpt-4o"):
+    def __init__(self, api_key: str, model_name: str = "gpt-4o", base_url: Optional[str] = None):
         super().__init__(api_key, model_name)
-        self.client = openai.AsyncOpenAI(api_key=api_key)
+        self.client = openai.AsyncOpenAI(api_key=api_key, base_url=base_url)
         self.prompt_manager = PromptManager()
     
     async def analyze_drawing(self, request: DrawingAnalysisRequest) -> AIResponse:
         start_time = time.time()
         
-        try:
-            # Get the prompt for this version
-            prompt = self.prompt_manager.get_drawing_analysis_prompt(
-                version=request.prompt_version,
-                options=request.options
-            )
-            
-            response = await self.client.chat.completions.create(
-                model=request.model_override or self.model_name,
-                messages=[
+        with ai_span(self, request) as span:
+            try:
+                # Get the prompt for this version
+                prompt = self.prompt_manager.get_drawing_analysis_prompt(
+                    version=request.prompt_version,
+                    options=request.options
+                )
+                
+                response = await self.client.chat.completions.create(
+                    model=request.model_override or self.model_name,
+                    messages=self._build_messages(prompt, request),
+                    max_tokens=500,
+                    temperature=0.1
+                )
+                
+                response_time = int((time.time() - start_time) * 1000)
+                
+                # Parse the response
+                content = response.choices[0].message.content
+                
+                result = self._build_response(
+                    request, content, response_time,
+                    tokens_used=response.usage.total_tokens,
+                    raw_response=response.model_dump()
+                )
+                record_ai_response(span, result, response.usage.prompt_tokens, response.usage.completion_tokens)
+                return result
+                
+            except Exception as e:
+                result = self._error_response(start_time, e)
+                record_ai_response(span, result)
+                return result
+    
+    async def stream_drawing_analysis(self, request: DrawingAnalysisRequest) -> AsyncIterator[AIStreamEvent]:
+        """Stream the completion, emitting the guess index as soon as it appears"""
+        start_time = time.time()
+        parser = GuessStreamParser()
+        usage = None
+        
+        with ai_span(self, request, streaming=True) as span:
+            try:
+                prompt = self.prompt_manager.get_drawing_analysis_prompt(
+                    version=request.prompt_version,
+                    options=request.options
+                )
+                
+                stream = await self.client.chat.completions.create(
+                    model=request.model_override or self.model_name,
+                    messages=self._build_messages(prompt, request),
+                    max_tokens=500,
+                    temperature=0.1,
+                    stream=True,
+                    stream_options={"include_usage": True}
+                )
+                
+                async for chunk in stream:
+                    if chunk.usage is not None:
+                        usage = chunk.usage
+                    if not chunk.choices:
+                        continue
+                    
+                    delta = chunk.choices[0].delta.content
+                    if not delta:
+                        continue
+                    
+                    guess_index = parser.feed(delta)
+                    if guess_index is not None:
+                        span.add_event("guess", {"ai.guess_index": guess_index})
+                        yield AIStreamEvent(type="guess", guess_index=guess_index)
+                    yield AIStreamEvent(type="reasoning", text=delta)
+                
+                response_time = int((time.time() - start_time) * 1000)
+                response = self._build_response(
+                    request, parser.buffer, response_time,
+                    tokens_used=usage.total_tokens if usage else None,
+                    raw_response={"content": parser.buffer, "streamed": True}
+                )
+                record_ai_response(
+                    span, response,
+                    usage.prompt_tokens if usage else None,
+                    usage.completion_tokens if usage else None
+                )
+                
+            except Exception as e:
+                response = self._error_response(start_time, e)
+                record_ai_response(span, response)
+        
+        yield AIStreamEvent(type="done", guess_index=response.guess_index, response=response)
+    
+    def _build_messages(self, prompt: str, request: DrawingAnalysisRequest) -> List[Dict[str, Any]]:
+        return [
+            {
+                "role": "user",
+                "content": [
+                    {"type": "text", "text": prompt},
                     {
-                        "role": "user",
-                        "content": [
-                            {"type": "text", "text": prompt},
-                            {
-                                "type": "image_url",
-                                "image_url": {
-                                    "url": f"data:image/png;base64,{request.image_data}"
-                                }
-                            }
-                        ]
+                        "type": "image_url",
+                        "image_url": {
+                            "url": f"data:{request.media_type};base64,{request.image_data}"
+                        }
                     }
-                ],
-                max_tokens=500,
-                temperature=0.1
-            )
-            
-            response_time = int((time.time() - start_time) * 1000)
-            
-            # Parse the response
-            content = response.choices[0].message.content
-            
-            # Try to extract index and reasoning
-            guess_index, reasoning = self._parse_openai_response(content)
-            guess_text = request.options[guess_index] if guess_index is not None and 0 <= guess_index < len(request.options) else None
-            
-            return AIResponse(
-                success=guess_index is not None,
-                guess_index=guess_index,
-                guess_text=guess_text,
-                confidence=self._estimate_confidence(content),
-                reasoning=reasoning,
-                model_used=self.model_name,
-                provider=AIProvider.OPENAI,
-                response_time_ms=response_time,
-                tokens_used=response.usage.total_tokens,
-                raw_response=response.model_dump()
-            )
-            
-        except Exception as e:
-            return AIResponse(
-                success=False,
-                guess_index=None,
-                guess_text=None,
-                confidence=0.0,
-                reasoning=None,
-                model_used=self.model_name,
-                provider=AIProvider.OPENAI,
-                response_time_ms=int((time.time() - start_time) * 1000),
-                error_message=str(e)
-            )
+                ]
+            }
+        ]
+    
+    def _build_response(
+        self,
+        request: DrawingAnalysisRequest,
+        content: str,
+        response_time: int,
+        tokens_used: Optional[int],
+        raw_response: Optional[Dict[str, Any]]
+    ) -> AIResponse:
+        """Parse a complete completion into an AIResponse"""
+        # Try to extract index and reasoning
+        guess_index, reasoning = self._parse_openai_response(content)
+        guess_text = request.options[guess_index] if guess_index is not None and 0 <= guess_index < len(request.options) else None
+        
+        return AIResponse(
+            success=guess_index is not None,
+            guess_index=guess_index,
+            guess_text=guess_text,
+            confidence=self._estimate_confidence(content),
+            reasoning=reasoning,
+            model_used=self.model_name,
+            provider=self.get_provider(),
+            response_time_ms=response_time,
+            tokens_used=tokens_used,
+            raw_response=raw_response
+        )
+    
+    def _error_response(self, start_time: float, error: Exception) -> AIResponse:
+        return AIResponse(
+            success=False,
+            guess_index=None,
+            guess_text=None,
+            confidence=0.0,
+            reasoning=None,
+            model_used=self.model_name,
+            provider=self.get_provider(),
+            response_time_ms=int((time.time() - start_time) * 1000),
+            error_message=str(error)
+        )
     
     def _parse_openai_response(self, content: str) -> tuple[Optional[int], Optional[str]]:
         """Parse OpenAI response to extract index and reasoning"""
-        try:
-            # Try to parse as JSON first
-            if content.strip().startswith('{'):
-                data = json.loads(content)
-                return data.get('index'), data.get('reasoning')
-            
-            # Fallback: look for number at the start
-            lines = content.strip().split('\n')
-            for line in lines:
-                line = line.strip()
-                if line and line[0].isdigit():
-                    index = int(line[0])
-                    reasoning = content
-                    return index, reasoning
-            
-            return None, content
-            
-        except:
-            return None, content
+        return parse_guess_response(content)
     
     def _estimate_confidence(self, content: str) -> float:
         """Estimate confidence from response content"""
@@ -145,75 +211,143 @@ class AnthropicProvider(AIModelInterface):
     
     def __init__(self, api_key: str, model_name: str = "claude-3-5-sonnet-20241022"):
         super().__init__(api_key, model_name)
-        self.client = Anthropic(api_key=api_key)
+        self.client = AsyncAnthropic(api_key=api_key)
         self.prompt_manager = PromptManager()
     
     async def analyze_drawing(self, request: DrawingAnalysisRequest) -> AIResponse:
         start_time = time.time()
         
-        try:
-            prompt = self.prompt_manager.get_drawing_analysis_prompt(
-                version=request.prompt_version,
-                options=request.options
-            )
-            
-            message = await self.client.messages.create(
-                model=request.model_override or self.model_name,
-                max_tokens=500,
-                messages=[
+        with ai_span(self, request) as span:
+            try:
+                prompt = self.prompt_manager.get_drawing_analysis_prompt(
+                    version=request.prompt_version,
+                    options=request.options
+                )
+                
+                message = await self.client.messages.create(
+                    model=request.model_override or self.model_name,
+                    max_tokens=500,
+                    messages=self._build_messages(prompt, request)
+                )
+                
+                response_time = int((time.time() - start_time) * 1000)
+                
+                content = message.content[0].text
+                result = self._build_response(
+                    request, content, response_time,
+                    tokens_used=message.usage.input_tokens + message.usage.output_tokens,
+                    raw_response=message.model_dump()
+                )
+                record_ai_response(span, result, message.usage.input_tokens, message.usage.output_tokens)
+                return result
+                
+            except Exception as e:
+                result = self._error_response(start_time, e)
+                record_ai_response(span, result)
+                return result
+    
+    async def stream_drawing_analysis(self, request: DrawingAnalysisRequest) -> AsyncIterator[AIStreamEvent]:
+        """Stream the completion, emitting the guess index as soon as it appears"""
+        start_time = time.time()
+        parser = GuessStreamParser()
+        
+        with ai_span(self, request, streaming=True) as span:
+            try:
+                prompt = self.prompt_manager.get_drawing_analysis_prompt(
+                    version=request.prompt_version,
+                    options=request.options
+                )
+                
+                async with self.client.messages.stream(
+                    model=request.model_override or self.model_name,
+                    max_tokens=500,
+                    messages=self._build_messages(prompt, request)
+                ) as stream:
+                    async for delta in stream.text_stream:
+                        if not delta:
+                            continue
+                        guess_index = parser.feed(delta)
+                        if guess_index is not None:
+                            span.add_event("guess", {"ai.guess_index": guess_index})
+                            yield AIStreamEvent(type="guess", guess_index=guess_index)
+                        yield AIStreamEvent(type="reasoning", text=delta)
+                    
+                    message = await stream.get_final_message()
+                
+                response_time = int((time.time() - start_time) * 1000)
+                response = self._build_response(
+                    request, parser.buffer, response_time,
+                    tokens_used=message.usage.input_tokens + message.usage.output_tokens,
+                    raw_response=message.model_dump()
+                )
+                record_ai_response(span, response, message.usage.input_tokens, message.usage.output_tokens)
+                
+            except Exception as e:
+                response = self._error_response(start_time, e)
+                record_ai_response(span, response)
+        
+        yield AIStreamEvent(type="done", guess_index=response.guess_index, response=response)
+    
+    def _build_messages(self, prompt: str, request: DrawingAnalysisRequest) -> List[Dict[str, Any]]:
+        return [
+            {
+                "role": "user",
+                "content": [
                     {
-                        "role": "user",
-                        "content": [
-                            {
-                                "type": "image",
-                                "source": {
-                                    "type": "base64",
-                                    "media_type": "image/png",
-                                    "data": request.image_data
-                                }
-                            },
-                            {"type": "text", "text": prompt}
-                        ]
-                    }
+                        "type": "image",
+                        "source": {
+                            "type": "base64",
+                            "media_type": request.media_type,
+                            "data": request.image_data
+                        }
+                    },
+                    {"type": "text", "text": prompt}
                 ]
-            )
-            
-            response_time = int((time.time() - start_time) * 1000)
-            
-            content = message.content[0].text
-            guess_index, reasoning = self._parse_anthropic_response(content)
-            guess_text = request.options[guess_index] if guess_index is not None and 0 <= guess_index < len(request.options) else None
-            
-            return AIResponse(
-                success=guess_index is not None,
-                guess_index=guess_index,
-                guess_text=guess_text,
-                confidence=self._estimate_confidence(content),
-                reasoning=reasoning,
-                model_used=self.model_name,
-                provider=AIProvider.ANTHROPIC,
-                response_time_ms=response_time,
-                tokens_used=message.usage.input_tokens + message.usage.output_tokens,
-                raw_response=message.model_dump()
-            )
-            
-        except Exception as e:
-            return AIResponse(
-                success=False,
-                guess_index=None,
-                guess_text=None,
-                confidence=0.0,
-                reasoning=None,
-                model_used=self.model_name,
-                provider=AIProvider.ANTHROPIC,
-                response_time_ms=int((time.time() - start_time) * 1000),
-                error_message=str(e)
-            )
+            }
+        ]
+    
+    def _build_response(
+        self,
+        request: DrawingAnalysisRequest,
+        content: str,
+        response_time: int,
+        tokens_used: Optional[int],
+        raw_response: Optional[Dict[str, Any]]
+    ) -> AIResponse:
+        """Parse a complete completion into an AIResponse"""
+        guess_index, reasoning = self._parse_anthropic_response(content)
+        guess_text = request.options[guess_index] if guess_index is not None and 0 <= guess_index < len(request.options) else None
+        
+        return AIResponse(
+            success=guess_index is not None,
+            guess_index=guess_index,
+            guess_text=guess_text,
+            confidence=self._estimate_confidence(content),
+            reasoning=reasoning,
+            model_used=self.model_name,
+            provider=self.get_provider(),
+            response_time_ms=response_time,
+            tokens_used=tokens_used,
+            raw_response=raw_response
+        )
+    
+    def _error_response(self, start_time: float, error: Exception) -> AIResponse:
+        return AIResponse(
+            success=False,
+            guess_index=None,
+            guess_text=None,
+            confidence=0.0,
+            reasoning=None,
+            model_used=self.model_name,
+            provider=self.get_provider(),
+            response_time_ms=int((time.time() - start_time) * 1000),
+            error_message=str(error)
+        )
     
     def _parse_anthropic_response(self, content: str) -> tuple[Optional[int], Optional[str]]:
         """Parse Anthropic response to extract index and reasoning"""
-        # Similar parsing logic as OpenAI
-        return self._parse_openai_response(content)
+        # Same parsing rules as OpenAI
+        return parse_guess_response(content)
     
     def _estimate_confidence(self, content: str) -> float:
         """Estimate confidence from response content"""
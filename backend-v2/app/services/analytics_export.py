@@ -0,0 +1,84 @@
+"""
+Columnar exports of game rounds and analysis logs for offline analysis
+
+Rows in a `created_at` range are read with a server-side cursor (`yield_per`)
+and encoded batch by batch as Parquet or Arrow IPC (see columnar), so memory
+stays flat however long the range is and the output goes straight to the
+HTTP response or a file. Base64 images are left out unless asked for; image
+exports use smaller batches to keep each batch's memory similar.
+"""
+from datetime import datetime
+from typing import BinaryIO, Dict, Iterator, List, Optional, Sequence, Type, Union
+
+from sqlalchemy import Column, Row, select
+from sqlalchemy.orm import Session
+
+from ..models.database import AIAnalysisLog, Base, GameRound, SessionLocal
+from .columnar import ColumnarWriter, encode_batches
+
+DATASETS: Dict[str, Type[Base]] = {
+    "game_rounds": GameRound,
+    "analysis_logs": AIAnalysisLog
+}
+IMAGE_COLUMNS = ("image_data",)
+
+BATCH_ROWS = 5000
+IMAGE_BATCH_ROWS = 200
+
+
+def export_columns(dataset: str, include_images: bool = False) -> List[Column]:
+    columns = DATASETS[dataset].__table__.columns
+    return [column for column in columns if include_images or column.name not in IMAGE_COLUMNS]
+
+
+def _batches(
+    db: Session,
+    dataset: str,
+    columns: List[Column],
+    start: Optional[datetime],
+    end: Optional[datetime],
+    include_images: bool
+) -> Iterator[Sequence[Row]]:
+    model = DATASETS[dataset]
+    query = select(*columns).order_by(model.id)
+    if start is not None:
+        query = query.where(model.created_at >= start)
+    if end is not None:
+        query = query.where(model.created_at < end)
+
+    batch_rows = IMAGE_BATCH_ROWS if include_images else BATCH_ROWS
+    result = db.execute(query.execution_options(yield_per=batch_rows))
+    yield from result.partitions()
+
+
+def stream_export(
+    dataset: str,
+    fmt: str,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    include_images: bool = False
+) -> Iterator[bytes]:
+    """Encoded export chunks; opens its own session, so it can outlive the request's"""
+    columns = export_columns(dataset, include_images)
+    db = SessionLocal()
+    try:
+        yield from encode_batches(_batches(db, dataset, columns, start, end, include_images), columns, fmt)
+    finally:
+        db.close()
+
+
+def write_export(
+    db: Session,
+    dataset: str,
+    sink: Union[str, BinaryIO],
+    fmt: str,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    include_images: bool = False
+) -> int:
+    """Write an export to a path or binary file; returns the number of rows"""
+    columns = export_columns(dataset, include_images)
+    with ColumnarWriter(sink, columns, fmt) as writer:
+        for rows in _batches(db, dataset, columns, start, end, include_images):
+            writer.write_rows(rows)
+    return writer.rows_written
@@ -0,0 +1,134 @@
+"""
+Streaming columnar encoding of table rows (Parquet or Arrow IPC)
+
+Rows arrive in batches, e.g. the partitions of a `yield_per` result, and each
+batch becomes one Arrow record batch (one Parquet row group) that is written
+out immediately, so memory is bounded by the batch size whatever the number of
+rows. Column types come from the SQLAlchemy columns; JSON columns are stored
+as JSON text. `encode_batches` yields the encoded bytes as they are produced,
+for streaming straight into a response. Requires the "analytics" extra
+(pyarrow).
+"""
+import io
+from typing import Any, BinaryIO, Iterable, Iterator, List, Sequence, Union
+
+import orjson
+from sqlalchemy import JSON, Boolean, Column, DateTime, Float, Integer, LargeBinary
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Optional: the "analytics" extra
+    pa = pq = None
+
+FORMATS = ("parquet", "arrow")
+MEDIA_TYPES = {"parquet": "application/vnd.apache.parquet", "arrow": "application/vnd.apache.arrow.stream"}
+EXTENSIONS = {"parquet": ".parquet", "arrow": ".arrows"}  # Arrow IPC stream format
+COMPRESSION = "zstd"
+
+
+def require_pyarrow() -> None:
+    if pa is None:
+        raise RuntimeError("Columnar export needs pyarrow: install the 'analytics' extra")
+
+
+def arrow_type(column: Column) -> "pa.DataType":
+    if isinstance(column.type, Boolean):
+        return pa.bool_()
+    if isinstance(column.type, Integer):
+        return pa.int64()
+    if isinstance(column.type, Float):
+        return pa.float64()
+    if isinstance(column.type, DateTime):
+        return pa.timestamp("us")
+    if isinstance(column.type, LargeBinary):
+        return pa.large_binary()
+    # String, Text and JSON (serialized); large_string allows > 2 GB per batch of images
+    return pa.large_string()
+
+
+def arrow_schema(columns: Sequence[Column]) -> "pa.Schema":
+    require_pyarrow()
+    return pa.schema([pa.field(column.name, arrow_type(column)) for column in columns])
+
+
+def _json_text(value: Any) -> Any:
+    return None if value is None else orjson.dumps(value).decode()
+
+
+class ColumnarWriter:
+    """Write batches of row tuples (in `columns` order) to a file or file-like sink"""
+
+    def __init__(self, sink: Union[str, BinaryIO], columns: Sequence[Column], fmt: str):
+        require_pyarrow()
+        self.schema = arrow_schema(columns)
+        self.rows_written = 0
+        self._json_columns = [i for i, column in enumerate(columns) if isinstance(column.type, JSON)]
+        if fmt == "parquet":
+            self._writer = pq.ParquetWriter(sink, self.schema, compression=COMPRESSION)
+        else:
+            self._writer = pa.ipc.new_stream(
+                sink, self.schema, options=pa.ipc.IpcWriteOptions(compression=COMPRESSION)
+            )
+
+    def write_rows(self, rows: Sequence[Sequence[Any]]) -> None:
+        if not rows:
+            return
+        values: List[Iterable[Any]] = [list(column) for column in zip(*rows)]
+        for i in self._json_columns:
+            values[i] = [_json_text(value) for value in values[i]]
+        batch = pa.RecordBatch.from_arrays(
+            [pa.array(column, type=field.type) for column, field in zip(values, self.schema)],
+            schema=self.schema
+        )
+        self._writer.write_batch(batch)
+        self.rows_written += len(rows)
+
+    def close(self) -> None:
+        self._writer.close()
+
+    def __enter__(self) -> "ColumnarWriter":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file that hands back whatever was written since the last drain"""
+
+    def __init__(self) -> None:
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data: Any) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data, self._chunks = b"".join(self._chunks), []
+        return data
+
+
+def encode_batches(
+    batches: Iterable[Sequence[Sequence[Any]]],
+    columns: Sequence[Column],
+    fmt: str
+) -> Iterator[bytes]:
+    """Encode batches of row tuples, yielding bytes after each batch"""
+    sink = _ChunkSink()
+    writer = ColumnarWriter(sink, columns, fmt)
+    for rows in batches:
+        writer.write_rows(rows)
+        chunk = sink.drain()
+        if chunk:
+            yield chunk
+    writer.close()
+    yield sink.drain()
@@ -0,0 +1,94 @@
+"""
+Server-side cache of serialized deck responses
+
+Every client fetches `GET /decks` and `GET /decks/{deck_id}` at lobby load, but
+decks change rarely. Every deck or item write stamps `Deck.updated_at` (see
+`DeckService` and `deck_seeding`), so each request reads a cheap stamp first:
+the deck's `updated_at`, or the deck count and newest `updated_at` for the
+catalog. Bodies are cached per (key, stamp) and the weak ETag is derived from
+the same pair, so a write made by another worker or a script changes both on
+the next request instead of after the TTL.
+
+Usage counters and play rates are not part of the stamp. Cached bodies still
+expire after `deck_cache_ttl_seconds`, which bounds how stale those counters
+are in a full response; a client revalidating with `If-None-Match` keeps its
+copy until the deck itself changes.
+"""
+import hashlib
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Hashable, Optional
+
+from pydantic import BaseModel
+
+from ..config import settings
+
+
+@dataclass(frozen=True)
+class CachedBody:
+    """A serialized JSON response and its validator"""
+    body: bytes
+    etag: str
+    stamp: Hashable
+    version: int
+    expires_at: float
+
+
+def make_etag(key: Hashable, stamp: Hashable) -> str:
+    """Weak validator for `key` at `stamp`; identical across workers"""
+    digest = hashlib.blake2b(repr((key, stamp)).encode(), digest_size=16).hexdigest()
+    return f'W/"{digest}"'
+
+
+class DeckCache:
+    """Map from a request key to its serialized response at a deck stamp"""
+
+    def __init__(self, ttl_seconds: float = 60.0, enabled: bool = True):
+        self.ttl_seconds = ttl_seconds
+        self.enabled = enabled
+        self.version = 0
+        self._entries: Dict[Hashable, CachedBody] = {}
+
+    def get_or_build(
+        self,
+        key: Hashable,
+        stamp: Hashable,
+        build: Callable[[], Optional[BaseModel]]
+    ) -> Optional[CachedBody]:
+        """Cached body for `key` at `stamp`, building it on a miss; None when `build` finds nothing"""
+        now = time.monotonic()
+        entry = self._entries.get(key)
+        if (
+            entry is not None
+            and entry.stamp == stamp
+            and entry.version == self.version
+            and entry.expires_at > now
+        ):
+            return entry
+
+        version = self.version
+        model = build()
+        if model is None:
+            return None
+
+        body = model.__pydantic_serializer__.to_json(model, by_alias=True)
+        entry = CachedBody(
+            body=body,
+            etag=make_etag(key, stamp),
+            stamp=stamp,
+            version=version,
+            expires_at=now + self.ttl_seconds
+        )
+        # A write during the build has already bumped the version; don't keep the stale body
+        if self.enabled and version == self.version:
+            self._entries[key] = entry
+        return entry
+
+    def invalidate(self) -> None:
+        """Drop every cached body; called after any deck or item write in this process"""
+        self.version += 1
+        self._entries.clear()
+
+
+# Global deck cache instance
+deck_cache = DeckCache(ttl_seconds=settings.deck_cache_ttl_seconds, enabled=settings.deck_cache_enabled)
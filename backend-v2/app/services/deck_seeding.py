@@ -0,0 +1,249 @@
+"""
+Set-based clearing and (re)seeding of decks
+
+Deck data has the shape of `scripts/seed_decks.py`'s DECK_DATA:
+`{name: {"description", "category", "difficulty", "items": [prompt, ...]}}`.
+
+- `clear_decks` empties the deck tables: `TRUNCATE ... RESTART IDENTITY CASCADE`
+  on Postgres (no dead rows left behind), one unqualified `DELETE` per table on
+  SQLite, which it executes as a truncate.
+- `reseed_decks` clears and bulk-loads in one transaction.
+- `sync_decks` is the idempotent alternative: it inserts, updates and deletes
+  only the items that differ from the data, leaves decks not named in it
+  alone, and keeps play statistics of unchanged items. Rows of one deck that
+  share a prompt key (left by older seeds or imports) are merged into the
+  oldest one, which gets their counters. A second run is a no-op.
+
+Every entry point refreshes `Deck.total_items` with one set-based UPDATE and
+commits once. The recount keeps `Deck.updated_at`; `sync_decks` stamps only the
+decks whose items it changed, so a no-op sync leaves deck ETags alone (see
+deck_cache).
+"""
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Tuple
+
+from sqlalchemy import Float, bindparam, case, cast, delete, func, insert, select, text, update
+from sqlalchemy.orm import Session
+
+from ..models.database import Deck, DeckItem, PromptShuffleState
+from .deck_cache import deck_cache
+from .deck_transfer import prompt_key
+
+DeckData = Dict[str, Dict[str, Any]]
+
+BATCH_SIZE = 1000
+
+_items = DeckItem.__table__
+_played = _items.c.rounds_played + bindparam("b_played")
+_human = _items.c.human_correct_count + bindparam("b_human")
+_guessed = _items.c.ai_guess_count + bindparam("b_guessed")
+_ai = _items.c.ai_correct_count + bindparam("b_ai")
+
+# Adds a duplicate's counters to the row kept; rates follow the new totals (see item_stats)
+_MERGE_COUNTERS = update(_items).values(
+    usage_count=func.coalesce(_items.c.usage_count, 0) + bindparam("b_usage"),
+    rounds_played=_played,
+    human_correct_count=_human,
+    ai_guess_count=_guessed,
+    ai_correct_count=_ai,
+    avg_human_correct_rate=case((_played > 0, cast(_human, Float) / _played), else_=_items.c.avg_human_correct_rate),
+    avg_ai_correct_rate=case((_guessed > 0, cast(_ai, Float) / _guessed), else_=_items.c.avg_ai_correct_rate)
+).where(_items.c.id == bindparam("b_id"))
+
+
+def clear_decks(db: Session) -> Tuple[int, int]:
+    """Delete every deck and item (no commit); returns (decks, items) removed"""
+    decks = db.query(func.count(Deck.id)).scalar() or 0
+    items = db.query(func.count(DeckItem.id)).scalar() or 0
+
+    if db.get_bind().dialect.name == "postgresql":
+        # Shuffle states hold deck ids, which restart too
+        db.execute(text(
+            f"TRUNCATE {DeckItem.__tablename__}, {Deck.__tablename__}, {PromptShuffleState.__tablename__} "
+            "RESTART IDENTITY CASCADE"
+        ))
+    else:
+        db.execute(delete(DeckItem))
+        db.execute(delete(Deck))
+        db.execute(delete(PromptShuffleState))
+    return decks, items
+
+
+def refresh_deck_totals(db: Session) -> None:
+    """Recount `total_items` of every deck in one statement, keeping their stamps (no commit)"""
+    db.execute(update(Deck).values(
+        total_items=select(func.count(DeckItem.id)).where(DeckItem.deck_id == Deck.id).scalar_subquery(),
+        updated_at=Deck.updated_at
+    ))
+
+
+def touch_decks(db: Session, deck_ids: Iterable[int]) -> None:
+    """Stamp `updated_at` on decks whose items were written set-based (no commit)"""
+    deck_ids = list(deck_ids)
+    if deck_ids:
+        db.execute(update(Deck).where(Deck.id.in_(deck_ids)).values(updated_at=datetime.utcnow()))
+
+
+def reseed_decks(db: Session, deck_data: DeckData, batch_size: int = BATCH_SIZE) -> Dict[str, int]:
+    """Replace all decks with `deck_data` in one transaction"""
+    try:
+        decks_removed, items_removed = clear_decks(db)
+        items_added = _load_items(db, _insert_decks(db, deck_data), deck_data, batch_size)
+        refresh_deck_totals(db)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    deck_cache.invalidate()
+    return {
+        "decks_removed": decks_removed,
+        "items_removed": items_removed,
+        "decks_added": len(deck_data),
+        "items_added": items_added
+    }
+
+
+def sync_decks(db: Session, deck_data: DeckData, batch_size: int = BATCH_SIZE) -> Dict[str, int]:
+    """Bring the decks named in `deck_data` in line with it, touching only what changed"""
+    counts = {
+        "decks_added": 0, "decks_updated": 0, "items_added": 0, "items_updated": 0, "items_removed": 0,
+        "duplicates_merged": 0
+    }
+    try:
+        existing = {deck.name: deck for deck in db.query(Deck).filter(Deck.name.in_(list(deck_data)))}
+
+        new_decks = {name: info for name, info in deck_data.items() if name not in existing}
+        deck_ids = _insert_decks(db, new_decks) if new_decks else {}
+        counts["decks_added"] = len(new_decks)
+
+        for name, deck in existing.items():
+            info = deck_data[name]
+            changed = False
+            for field in ("description", "category", "difficulty"):
+                if getattr(deck, field) != info[field]:
+                    setattr(deck, field, info[field])
+                    changed = True
+            counts["decks_updated"] += changed
+            deck_ids[name] = deck.id
+
+        # Current items of all managed decks in one query, oldest first
+        current: Dict[int, Dict[str, Tuple[int, str, str]]] = {deck_id: {} for deck_id in deck_ids.values()}
+        rows = db.query(
+            DeckItem.id, DeckItem.deck_id, DeckItem.prompt, DeckItem.difficulty, DeckItem.usage_count,
+            DeckItem.rounds_played, DeckItem.human_correct_count, DeckItem.ai_guess_count, DeckItem.ai_correct_count
+        ).filter(DeckItem.deck_id.in_(list(current))).order_by(DeckItem.id)
+
+        to_insert: List[Dict[str, Any]] = []
+        to_update: List[Dict[str, Any]] = []
+        to_merge: List[Dict[str, Any]] = []
+        to_delete: List[int] = []
+        changed_decks = set()
+        for row in rows:
+            key = prompt_key(row.prompt)
+            kept = current[row.deck_id].get(key)
+            if kept is None:
+                current[row.deck_id][key] = (row.id, row.prompt, row.difficulty)
+                continue
+            # Same prompt twice in one deck: fold this row into the one kept
+            to_merge.append({
+                "b_id": kept[0], "b_usage": row.usage_count or 0, "b_played": row.rounds_played or 0,
+                "b_human": row.human_correct_count or 0, "b_guessed": row.ai_guess_count or 0,
+                "b_ai": row.ai_correct_count or 0
+            })
+            to_delete.append(row.id)
+            changed_decks.add(row.deck_id)
+        for name, info in deck_data.items():
+            deck_id = deck_ids[name]
+            have = current[deck_id]
+            wanted = set()
+            for prompt in info["items"]:
+                key = prompt_key(prompt)
+                if key in wanted:
+                    continue
+                wanted.add(key)
+                if key not in have:
+                    to_insert.append({"deck_id": deck_id, "prompt": prompt, "difficulty": info["difficulty"]})
+                    changed_decks.add(deck_id)
+                else:
+                    item_id, old_prompt, old_difficulty = have[key]
+                    if (old_prompt, old_difficulty) != (prompt, info["difficulty"]):
+                        to_update.append({"b_id": item_id, "b_prompt": prompt, "b_difficulty": info["difficulty"]})
+                        changed_decks.add(deck_id)
+            removed = [item_id for key, (item_id, _, _) in have.items() if key not in wanted]
+            to_delete.extend(removed)
+            if removed:
+                changed_decks.add(deck_id)
+
+        for start in range(0, len(to_insert), batch_size):
+            db.execute(insert(DeckItem), to_insert[start:start + batch_size])
+        for merge in to_merge:
+            # One row per statement: several duplicates may fold into the same kept row
+            db.execute(_MERGE_COUNTERS, merge)
+        if to_update:
+            db.execute(
+                update(DeckItem.__table__)
+                .where(DeckItem.__table__.c.id == bindparam("b_id"))
+                .values(prompt=bindparam("b_prompt"), difficulty=bindparam("b_difficulty")),
+                to_update
+            )
+        for start in range(0, len(to_delete), batch_size):
+            db.execute(delete(DeckItem).where(DeckItem.id.in_(to_delete[start:start + batch_size])))
+
+        counts.update(
+            items_added=len(to_insert),
+            items_updated=len(to_update),
+            items_removed=len(to_delete) - len(to_merge),
+            duplicates_merged=len(to_merge)
+        )
+        refresh_deck_totals(db)
+        touch_decks(db, changed_decks)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    if any(counts.values()):
+        deck_cache.invalidate()
+    return counts
+
+
+def _insert_decks(db: Session, deck_data: DeckData) -> Dict[str, int]:
+    """Insert the deck rows in one statement; returns name -> id"""
+    rows = db.execute(
+        insert(Deck).returning(Deck.id, Deck.name),
+        [
+            {
+                "name": name,
+                "description": info["description"],
+                "category": info["category"],
+                "difficulty": info["difficulty"],
+                "is_active": True,
+                "is_public": True,
+                "created_by": "system"
+            }
+            for name, info in deck_data.items()
+        ]
+    )
+    return {name: deck_id for deck_id, name in rows}
+
+
+def _load_items(db: Session, deck_ids: Dict[str, int], deck_data: DeckData, batch_size: int) -> int:
+    batch: List[Dict[str, Any]] = []
+    added = 0
+    for name, info in deck_data.items():
+        seen = set()
+        for prompt in info["items"]:
+            key = prompt_key(prompt)
+            if key in seen:
+                continue
+            seen.add(key)
+            batch.append({"deck_id": deck_ids[name], "prompt": prompt, "difficulty": info["difficulty"]})
+            if len(batch) >= batch_size:
+                db.execute(insert(DeckItem), batch)
+                added += len(batch)
+                batch = []
+    if batch:
+        db.execute(insert(DeckItem), batch)
+        added += len(batch)
+    return added
@@ -2,13 +2,18 @@
 Deck management service for handling drawing prompt collections
 """
 import random
-from typing import List, Optional, Dict, Any
+from datetime import datetime
+from typing import Iterable, Iterator, List, Optional, Dict, Any, Tuple
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_
+from sqlalchemy import func, and_, insert, select, update
 
 from ..models.database import Deck, DeckItem
-from ..schemas.requests import CreateDeckRequest, UpdateDeckRequest, DeckSelectionRequest
+from ..schemas.requests import CreateDeckRequest, UpdateDeckRequest, DeckSelectionRequest, PromptWeighting
 from ..schemas.responses import DeckResponse, DeckItemResponse
+from .deck_cache import deck_cache
+from .deck_transfer import export_chunk, export_header, parse_rows, prompt_key
+from .prompt_sampler import prompt_sampler
+from .prompt_shuffler import prompt_shuffler
 
 
 class DeckService:
@@ -28,6 +33,15 @@ class DeckService:
         
         return [self._deck_to_response(deck) for deck in decks]
     
+    def get_decks_stamp(self) -> Tuple[int, Optional[datetime]]:
+        """Deck count and newest `updated_at`: changes with any deck or item write"""
+        count, newest = self.db.query(func.count(Deck.id), func.max(Deck.updated_at)).one()
+        return count, newest
+    
+    def get_deck_stamp(self, deck_id: int) -> Optional[datetime]:
+        """The deck's `updated_at`, or None when it does not exist"""
+        return self.db.query(Deck.updated_at).filter(Deck.id == deck_id).scalar()
+    
     def get_deck_by_id(self, deck_id: int) -> Optional[DeckResponse]:
         """Get a specific deck by ID"""
         deck = self.db.query(Deck).filter(Deck.id == deck_id).first()
@@ -53,36 +67,40 @@ class DeckService:
     
     def create_deck(self, request: CreateDeckRequest) -> DeckResponse:
         """Create a new deck"""
-        deck = Deck(
-            name=request.name,
-            description=request.description,
-            category=request.category or "custom",
-            difficulty=request.difficulty,
-            is_public=request.is_public,
-            created_by=request.created_by or "system"
-        )
-        
-        self.db.add(deck)
+        deck = self.add_deck(request)
         self.db.commit()
         self.db.refresh(deck)
         
         # Add items if provided
         if request.items:
-            for item_text in request.items:
-                deck_item = DeckItem(
-                    deck_id=deck.id,
-                    prompt=item_text,
-                    difficulty=request.difficulty
-                )
-                self.db.add(deck_item)
+            self.db.execute(insert(DeckItem), [
+                {"deck_id": deck.id, "prompt": item_text, "difficulty": request.difficulty}
+                for item_text in request.items
+            ])
             
             # Update total_items count
             deck.total_items = len(request.items)
             self.db.commit()
             self.db.refresh(deck)
         
+        deck_cache.invalidate()
         return self._deck_to_response(deck)
     
+    def add_deck(self, request: CreateDeckRequest) -> Deck:
+        """Stage a new deck without its items in the current transaction (flushed, not committed)"""
+        deck = Deck(
+            name=request.name,
+            description=request.description,
+            category=request.category or "custom",
+            difficulty=request.difficulty,
+            is_public=request.is_public,
+            created_by=request.created_by or "system"
+        )
+        
+        self.db.add(deck)
+        self.db.flush()
+        return deck
+    
     def update_deck(self, deck_id: int, request: UpdateDeckRequest) -> Optional[DeckResponse]:
         """Update an existing deck"""
         deck = self.db.query(Deck).filter(Deck.id == deck_id).first()
@@ -104,6 +122,7 @@ class DeckService:
         
         self.db.commit()
         self.db.refresh(deck)
+        deck_cache.invalidate()
         
         return self._deck_to_response(deck)
     
@@ -116,13 +135,17 @@ class DeckService:
         
         self.db.delete(deck)  # Cascade will delete items
         self.db.commit()
+        deck_cache.invalidate()
         
         return True
     
     def get_random_prompts(self, 
                           count: int = 4,
                           deck_id: Optional[int] = None,
-                          exclude_recent: Optional[List[str]] = None) -> Dict[str, Any]:
+                          exclude_recent: Optional[List[str]] = None,
+                          session_key: Optional[str] = None,
+                          weighting: PromptWeighting = PromptWeighting.UNIFORM,
+                          target_difficulty: Optional[str] = None) -> Dict[str, Any]:
         """
         Get random prompts for a game round from a single deck
         
@@ -130,6 +153,11 @@ class DeckService:
             count: Number of prompts to return (default 4)
             deck_id: Single deck ID to select from (None = use Base Deck)
             exclude_recent: List of prompts to exclude (recently used)
+            session_key: Game or Unity session to draw for without repeats
+                (see prompt_shuffler); exclude_recent is ignored when set
+            weighting: Weighted sampling mode (see prompt_sampler); every
+                mode except uniform ignores exclude_recent
+            target_difficulty: Favor items of this difficulty
             
         Returns:
             Dict with prompts list and correct_index
@@ -141,6 +169,82 @@ class DeckService:
                 raise ValueError("Base Deck not found. Please run database seed script.")
             deck_id = base_deck.id
         
+        if weighting != PromptWeighting.UNIFORM or target_difficulty:
+            selected_items = self._draw_weighted_items(deck_id, count, weighting, target_difficulty, session_key)
+        elif session_key is not None:
+            selected_items = self._draw_session_items(session_key, deck_id, count)
+        else:
+            selected_items = self._sample_items(deck_id, count, exclude_recent)
+        
+        # Pick one as the correct answer
+        correct_index = random.randint(0, count - 1)
+        
+        # Update usage statistics
+        for item in selected_items:
+            item.usage_count += 1
+        
+        # Update deck usage count once; a counter is not a deck change, so keep the stamp
+        self.db.execute(
+            update(Deck)
+            .where(Deck.id == deck_id)
+            .values(usage_count=Deck.usage_count + 1, updated_at=Deck.updated_at)
+        )
+        
+        self.db.commit()
+        
+        return {
+            "prompts": [item.prompt for item in selected_items],
+            "correct_index": correct_index,
+            "correct_prompt": selected_items[correct_index].prompt,
+            "deck_id_used": deck_id
+        }
+    
+    def _draw_session_items(self, session_key: str, deck_id: int, count: int) -> List[DeckItem]:
+        """Next items of the session's no-repeat order for this deck"""
+        for _ in range(2):
+            item_ids = prompt_shuffler.draw(self.db, session_key, deck_id, count)
+            if len(item_ids) < count:
+                self._raise_not_enough(deck_id, len(item_ids), count)
+            
+            # Scoped to the deck: after a reseed restarts ids, a stale order may name another deck's items
+            items = {
+                item.id: item
+                for item in self.db.query(DeckItem).filter(DeckItem.deck_id == deck_id, DeckItem.id.in_(item_ids))
+            }
+            if len(items) == len(item_ids):
+                return [items[item_id] for item_id in item_ids]
+            # Items deleted by another process: rebuild the order once
+            prompt_shuffler.forget(session_key, deck_id)
+        
+        self._raise_not_enough(deck_id, len(items), count)
+    
+    def _draw_weighted_items(
+        self,
+        deck_id: int,
+        count: int,
+        weighting: PromptWeighting,
+        target_difficulty: Optional[str],
+        session_key: Optional[str] = None
+    ) -> List[DeckItem]:
+        """Distinct items drawn from the deck's alias table, skipping the session's drawn ones"""
+        exclude = set()
+        if session_key is not None:
+            exclude = prompt_shuffler.excluded_ids(self.db, session_key, deck_id, count)
+        item_ids = prompt_sampler.draw(self.db, deck_id, count, weighting, target_difficulty, exclude)
+        items = {
+            item.id: item
+            for item in self.db.query(DeckItem).filter(DeckItem.deck_id == deck_id, DeckItem.id.in_(item_ids))
+        }
+        if len(items) < count:
+            self._raise_not_enough(deck_id, len(items), count)
+        if session_key is not None:
+            prompt_shuffler.mark_drawn(self.db, session_key, deck_id, item_ids)
+        # Random order so the heaviest prompt is not always first
+        random.shuffle(item_ids)
+        return [items[item_id] for item_id in item_ids]
+    
+    def _sample_items(self, deck_id: int, count: int, exclude_recent: Optional[List[str]]) -> List[DeckItem]:
+        """Random items from the deck, avoiding client-supplied recent prompts"""
         # Build query for deck items from the specified deck
         query = self.db.query(DeckItem).join(Deck)
         
@@ -161,32 +265,15 @@ class DeckService:
             available_items = query.all()
             
             if len(available_items) < count:
-                deck_name = self.db.query(Deck).filter(Deck.id == deck_id).first()
-                deck_name = deck_name.name if deck_name else f"Deck {deck_id}"
-                raise ValueError(f"Not enough prompts in {deck_name}. Found {len(available_items)}, need {count}")
+                self._raise_not_enough(deck_id, len(available_items), count)
         
         # Select random items from the single deck
-        selected_items = random.sample(available_items, count)
-        
-        # Pick one as the correct answer
-        correct_index = random.randint(0, count - 1)
-        
-        # Update usage statistics
-        for item in selected_items:
-            item.usage_count += 1
-        
-        # Update deck usage count once
-        deck = selected_items[0].deck
-        deck.usage_count += 1
-        
-        self.db.commit()
-        
-        return {
-            "prompts": [item.prompt for item in selected_items],
-            "correct_index": correct_index,
-            "correct_prompt": selected_items[correct_index].prompt,
-            "deck_id_used": deck_id
-        }
+        return random.sample(available_items, count)
+    
+    def _raise_not_enough(self, deck_id: int, found: int, count: int) -> None:
+        deck_name = self.db.query(Deck).filter(Deck.id == deck_id).first()
+        deck_name = deck_name.name if deck_name else f"Deck {deck_id}"
+        raise ValueError(f"Not enough prompts in {deck_name}. Found {found}, need {count}")
     
     def add_items_to_deck(self, deck_id: int, items: List[str]) -> Optional[DeckResponse]:
         """Add new items to an existing deck"""
@@ -195,22 +282,95 @@ class DeckService:
         if not deck:
             return None
         
-        # Add new items
-        for item_text in items:
-            deck_item = DeckItem(
-                deck_id=deck_id,
-                prompt=item_text,
-                difficulty=deck.difficulty  # Inherit deck difficulty
-            )
-            self.db.add(deck_item)
+        # Add new items, inheriting the deck difficulty
+        self.db.execute(insert(DeckItem), [
+            {"deck_id": deck_id, "prompt": item_text, "difficulty": deck.difficulty}
+            for item_text in items
+        ])
         
         # Update total count
         deck.total_items += len(items)
+        deck.updated_at = datetime.utcnow()
         self.db.commit()
         self.db.refresh(deck)
+        deck_cache.invalidate()
         
         return self._deck_to_response(deck)
     
+    def import_items(
+        self,
+        deck_id: int,
+        text: Iterable[str],
+        fmt: str,
+        batch_size: int = 1000,
+        header: Optional[bool] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Bulk-add items from a CSV or NDJSON source (see deck_transfer)
+        
+        Prompts the deck already has, or that repeat within the source, are
+        skipped. Rows go in as multi-row INSERTs of `batch_size` and the whole
+        import is one transaction, together with anything already pending on
+        the session (e.g. a deck staged with `add_deck`): a bad row
+        (DeckImportError) keeps nothing.
+        """
+        deck = self.db.query(Deck).filter(Deck.id == deck_id).first()
+        
+        if not deck:
+            return None
+        
+        seen = {prompt_key(prompt) for (prompt,) in self.db.query(DeckItem.prompt).filter(DeckItem.deck_id == deck_id)}
+        rows_read = items_added = duplicates = 0
+        batch: List[Dict[str, Any]] = []
+        
+        try:
+            for row in parse_rows(text, fmt, header):
+                rows_read += 1
+                key = prompt_key(row.prompt)
+                if key in seen:
+                    duplicates += 1
+                    continue
+                seen.add(key)
+                batch.append({"deck_id": deck_id, "prompt": row.prompt, "difficulty": row.difficulty or deck.difficulty})
+                if len(batch) >= batch_size:
+                    self.db.execute(insert(DeckItem), batch)
+                    items_added += len(batch)
+                    batch = []
+            
+            if batch:
+                self.db.execute(insert(DeckItem), batch)
+                items_added += len(batch)
+            
+            deck.total_items = (deck.total_items or 0) + items_added
+            if items_added:
+                deck.updated_at = datetime.utcnow()
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        
+        self.db.refresh(deck)
+        deck_cache.invalidate()
+        
+        return {
+            "deck": self._deck_to_response(deck),
+            "rows_read": rows_read,
+            "items_added": items_added,
+            "duplicates_skipped": duplicates
+        }
+    
+    def export_items(self, deck_id: int, fmt: str, batch_size: int = 1000) -> Iterator[bytes]:
+        """Encoded chunks of a deck's items, read with a server-side cursor"""
+        yield export_header(fmt)
+        result = self.db.execute(
+            select(DeckItem.prompt, DeckItem.difficulty)
+            .where(DeckItem.deck_id == deck_id)
+            .order_by(DeckItem.id)
+            .execution_options(yield_per=batch_size)
+        )
+        for rows in result.partitions():
+            yield export_chunk([tuple(row) for row in rows], fmt)
+    
     def remove_items_from_deck(self, deck_id: int, item_ids: List[int]) -> Optional[DeckResponse]:
         """Remove specific items from a deck"""
         deck = self.db.query(Deck).filter(Deck.id == deck_id).first()
@@ -227,9 +387,12 @@ class DeckService:
         deck.total_items -= deleted_count
         if deck.total_items < 0:
             deck.total_items = 0
+        if deleted_count:
+            deck.updated_at = datetime.utcnow()
         
         self.db.commit()
         self.db.refresh(deck)
+        deck_cache.invalidate()
         
         return self._deck_to_response(deck)
     
@@ -240,21 +403,26 @@ class DeckService:
         if not deck:
             return None
         
-        # Calculate item statistics
+        # Calculate item statistics from the per-item running counters
         item_stats = self.db.query(
             func.count(DeckItem.id).label('total_items'),
             func.avg(DeckItem.usage_count).label('avg_usage'),
-            func.avg(DeckItem.avg_human_correct_rate).label('avg_human_success'),
-            func.avg(DeckItem.avg_ai_correct_rate).label('avg_ai_success')
+            func.sum(DeckItem.rounds_played).label('rounds_played'),
+            func.sum(DeckItem.human_correct_count).label('human_correct'),
+            func.sum(DeckItem.ai_guess_count).label('ai_guesses'),
+            func.sum(DeckItem.ai_correct_count).label('ai_correct')
         ).filter(DeckItem.deck_id == deck_id).first()
         
+        rounds_played = item_stats.rounds_played or 0
+        ai_guesses = item_stats.ai_guesses or 0
         return {
             "deck": self._deck_to_response(deck),
             "statistics": {
                 "total_items": item_stats.total_items or 0,
                 "average_usage_per_item": float(item_stats.avg_usage or 0),
-                "average_human_success_rate": float(item_stats.avg_human_success or 0),
-                "average_ai_success_rate": float(item_stats.avg_ai_success or 0),
+                "rounds_played": rounds_played,
+                "average_human_success_rate": (item_stats.human_correct or 0) / rounds_played if rounds_played else 0.0,
+                "average_ai_success_rate": (item_stats.ai_correct or 0) / ai_guesses if ai_guesses else 0.0,
                 "deck_usage_count": deck.usage_count
             }
         }
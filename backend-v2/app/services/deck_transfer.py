@@ -0,0 +1,142 @@
+"""
+Bulk deck import and export as CSV or NDJSON
+
+Imports read the source row by row, so a deck of tens of thousands of prompts
+never has to be held in memory as one document. CSV files may have a header
+(`prompt` or the legacy `Concept` column, plus an optional `difficulty`) or
+none, in which case the first column is the prompt and the second the
+difficulty. Unless told which, the first row is taken as a header only when
+every cell in it is one of those column names, so the legacy
+`backend/clues.csv` imports as is; pass `header=False` for a headerless file
+whose first prompt is literally "Prompt" or "Concept". NDJSON lines are either
+a JSON string or an object with `prompt` and optional `difficulty`.
+
+Exports stream the same formats in batches from a server-side cursor.
+"""
+import csv
+import io
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+import orjson
+
+FORMATS = ("csv", "ndjson")
+MEDIA_TYPES = {"csv": "text/csv; charset=utf-8", "ndjson": "application/x-ndjson"}
+DIFFICULTIES = ("easy", "medium", "hard", "mixed")  # Seed decks use "mixed"
+
+# Header names accepted for the prompt column (legacy clues.csv uses "Concept")
+PROMPT_HEADERS = ("prompt", "concept")
+CSV_COLUMNS = PROMPT_HEADERS + ("difficulty",)
+MAX_PROMPT_LENGTH = 200
+
+
+class DeckImportError(ValueError):
+    """A source row that cannot be imported; nothing from the source is kept"""
+
+    def __init__(self, line: int, message: str):
+        super().__init__(f"Line {line}: {message}")
+        self.line = line
+
+
+class ImportRow(NamedTuple):
+    line: int
+    prompt: str
+    difficulty: Optional[str]
+
+
+def detect_format(content_type: Optional[str] = None, filename: Optional[str] = None) -> str:
+    """Guess the format from a Content-Type or file name; CSV when unsure"""
+    if content_type and ("ndjson" in content_type or "jsonl" in content_type):
+        return "ndjson"
+    if filename and filename.lower().endswith((".ndjson", ".jsonl")):
+        return "ndjson"
+    return "csv"
+
+
+def parse_rows(text: Iterable[str], fmt: str, header: Optional[bool] = None) -> Iterator[ImportRow]:
+    """Rows with a non-blank prompt, validated; raises DeckImportError
+
+    `header` says whether a CSV source starts with a header row; None detects it.
+    """
+    rows = _parse_csv(text, header) if fmt == "csv" else _parse_ndjson(text)
+    for row in rows:
+        if not row.prompt:
+            continue
+        if len(row.prompt) > MAX_PROMPT_LENGTH:
+            raise DeckImportError(row.line, f"prompt is longer than {MAX_PROMPT_LENGTH} characters")
+        if row.difficulty is not None and row.difficulty not in DIFFICULTIES:
+            raise DeckImportError(row.line, f"difficulty must be one of {', '.join(DIFFICULTIES)}")
+        yield row
+
+
+def _parse_csv(text: Iterable[str], header: Optional[bool]) -> Iterator[ImportRow]:
+    reader = csv.reader(text)
+    prompt_col, difficulty_col = 0, 1
+    first = header is not False
+    for record in reader:
+        if not record:
+            continue
+        if first:
+            first = False
+            names = [cell.strip().lower() for cell in record]
+            is_header = header
+            if is_header is None:
+                # Only a row made of column names is a header; anything else is the first prompt
+                is_header = (
+                    any(name in PROMPT_HEADERS for name in names)
+                    and all(name in CSV_COLUMNS for name in names if name)
+                )
+            if is_header:
+                prompt_col = next((i for i, name in enumerate(names) if name in PROMPT_HEADERS), None)
+                if prompt_col is None:
+                    raise DeckImportError(reader.line_num, f"header has no {' or '.join(PROMPT_HEADERS)} column")
+                difficulty_col = names.index("difficulty") if "difficulty" in names else None
+                continue
+
+        prompt = record[prompt_col].strip() if prompt_col < len(record) else ""
+        difficulty = None
+        if difficulty_col is not None and difficulty_col < len(record):
+            difficulty = record[difficulty_col].strip().lower() or None
+        yield ImportRow(reader.line_num, prompt, difficulty)
+
+
+def _parse_ndjson(text: Iterable[str]) -> Iterator[ImportRow]:
+    for line_number, line in enumerate(text, start=1):
+        if not line.strip():
+            continue
+        try:
+            value = orjson.loads(line)
+        except orjson.JSONDecodeError:
+            raise DeckImportError(line_number, "invalid JSON")
+
+        if isinstance(value, str):
+            yield ImportRow(line_number, value.strip(), None)
+        elif isinstance(value, dict) and isinstance(value.get("prompt"), str):
+            difficulty = value.get("difficulty")
+            yield ImportRow(
+                line_number,
+                value["prompt"].strip(),
+                difficulty.strip().lower() if isinstance(difficulty, str) and difficulty.strip() else None
+            )
+        else:
+            raise DeckImportError(line_number, 'expected a string or an object with a "prompt" string')
+
+
+def prompt_key(prompt: str) -> str:
+    """Duplicate check key: prompts differing only in case or spacing are the same"""
+    return " ".join(prompt.split()).casefold()
+
+
+def export_header(fmt: str) -> bytes:
+    return b"prompt,difficulty\r\n" if fmt == "csv" else b""
+
+
+def export_chunk(rows: List[Tuple[str, Optional[str]]], fmt: str) -> bytes:
+    """Encode a batch of (prompt, difficulty) rows"""
+    if fmt == "ndjson":
+        return b"".join(
+            orjson.dumps({"prompt": prompt, "difficulty": difficulty}) + b"\n"
+            for prompt, difficulty in rows
+        )
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    return buffer.getvalue().encode()
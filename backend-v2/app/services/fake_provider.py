@@ -0,0 +1,239 @@
+"""
+Deterministic stand-in for a vision model, for load tests and benchmarks
+
+Every random choice (latency, failure, guess, token count) is drawn from a
+generator seeded with the request contents, so replaying the same traffic
+produces the same results without API keys or cost.
+"""
+import asyncio
+import hashlib
+import json
+import math
+import random
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import structlog
+
+from ..core.ai_interface import (
+    AIModelInterface,
+    AIResponse,
+    AIProvider,
+    AIStreamEvent,
+    DrawingAnalysisRequest
+)
+from ..core.tracing import ai_span, record_ai_response
+from .guess_parser import GuessStreamParser, parse_guess_response
+
+logger = structlog.get_logger(__name__)
+
+LATENCY_DISTRIBUTIONS = ("fixed", "uniform", "lognormal", "replay")
+
+
+@dataclass
+class FakeCompletion:
+    """What the fake model "said" for one request"""
+    content: str
+    latency_ms: int
+    prompt_tokens: int
+    completion_tokens: int
+    error: Optional[str] = None
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+
+class FakeCompletionGenerator:
+    """Produces reproducible completions; shared by FakeProvider and the stand-in server"""
+
+    def __init__(
+        self,
+        latency_distribution: str = "lognormal",
+        latency_ms: float = 800.0,
+        latency_jitter: float = 0.35,
+        error_rate: float = 0.0,
+        prompt_tokens: int = 850,
+        completion_tokens: int = 60,
+        seed: int = 0,
+        recorded_latencies: Optional[List[int]] = None
+    ):
+        if latency_distribution not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(f"Unknown latency distribution: {latency_distribution}")
+        self.latency_distribution = latency_distribution
+        self.latency_ms = latency_ms
+        self.latency_jitter = latency_jitter
+        self.error_rate = error_rate
+        self.prompt_tokens = prompt_tokens
+        self.completion_tokens = completion_tokens
+        self.seed = seed
+        self.recorded_latencies = recorded_latencies or []
+
+        if latency_distribution == "replay" and not self.recorded_latencies:
+            logger.warning("No recorded latencies to replay, using lognormal")
+            self.latency_distribution = "lognormal"
+
+    def generate(self, key: str, options: List[str], json_format: bool = False) -> FakeCompletion:
+        """Build the completion for a request identified by `key`"""
+        digest = hashlib.sha256(f"{self.seed}:{key}".encode()).digest()
+        rng = random.Random(digest)
+
+        latency_ms = self._sample_latency(rng)
+        if rng.random() < self.error_rate:
+            return FakeCompletion("", latency_ms, 0, 0, error="Simulated provider error")
+
+        guess_index = rng.randrange(len(options)) if options else 0
+        guess = options[guess_index] if options else "something"
+        reasoning = f"The drawing most likely shows {guess}, the shapes match it clearly."
+
+        if json_format:
+            content = json.dumps({
+                "index": guess_index,
+                "reasoning": reasoning,
+                "confidence": "medium",
+                "visual_elements": ["lines", "shapes"]
+            }, indent=4)
+        else:
+            content = f"{guess_index}\n{reasoning}"
+
+        completion_tokens = max(1, int(rng.gauss(self.completion_tokens, self.completion_tokens * 0.2)))
+        return FakeCompletion(content, latency_ms, self.prompt_tokens, completion_tokens)
+
+    def _sample_latency(self, rng: random.Random) -> int:
+        if self.latency_distribution == "fixed":
+            return int(self.latency_ms)
+        if self.latency_distribution == "uniform":
+            spread = self.latency_ms * self.latency_jitter
+            return int(rng.uniform(self.latency_ms - spread, self.latency_ms + spread))
+        if self.latency_distribution == "replay":
+            return rng.choice(self.recorded_latencies)
+        # lognormal: `latency_ms` is the median, `latency_jitter` the sigma
+        return int(math.exp(rng.gauss(math.log(self.latency_ms), self.latency_jitter)))
+
+
+def load_recorded_latencies(limit: int = 5000) -> List[int]:
+    """Recent successful `response_time_ms` values from real providers"""
+    from ..models.database import SessionLocal, AIAnalysisLog
+
+    db = SessionLocal()
+    try:
+        rows = db.query(AIAnalysisLog.response_time_ms).filter(
+            AIAnalysisLog.success.is_(True),
+            AIAnalysisLog.response_time_ms.isnot(None),
+            AIAnalysisLog.ai_provider != AIProvider.FAKE.value
+        ).order_by(AIAnalysisLog.id.desc()).limit(limit).all()
+        return [row.response_time_ms for row in rows]
+    except Exception as e:
+        logger.warning("Could not load recorded latencies", error=str(e))
+        return []
+    finally:
+        db.close()
+
+
+class FakeProvider(AIModelInterface):
+    """AIModelInterface implementation that sleeps instead of calling a model"""
+
+    def __init__(self, generator: FakeCompletionGenerator, model_name: str = "fake-vision"):
+        super().__init__(api_key="", model_name=model_name)
+        self.generator = generator
+
+    @classmethod
+    def from_settings(cls, settings: Any) -> "FakeProvider":
+        recorded = None
+        if settings.fake_latency_distribution == "replay":
+            recorded = load_recorded_latencies(settings.fake_replay_limit)
+
+        return cls(FakeCompletionGenerator(
+            latency_distribution=settings.fake_latency_distribution,
+            latency_ms=settings.fake_latency_ms,
+            latency_jitter=settings.fake_latency_jitter,
+            error_rate=settings.fake_error_rate,
+            prompt_tokens=settings.fake_prompt_tokens,
+            completion_tokens=settings.fake_completion_tokens,
+            seed=settings.fake_seed,
+            recorded_latencies=recorded
+        ))
+
+    def _complete(self, request: DrawingAnalysisRequest) -> FakeCompletion:
+        key = f"{request.prompt_version}:{request.options}:{request.image_data}"
+        return self.generator.generate(key, request.options, json_format=request.prompt_version == "v3")
+
+    async def analyze_drawing(self, request: DrawingAnalysisRequest) -> AIResponse:
+        with ai_span(self, request) as span:
+            completion = self._complete(request)
+            await asyncio.sleep(completion.latency_ms / 1000)
+            response = self._build_response(request, completion)
+            self._record(span, response, completion)
+            return response
+
+    async def stream_drawing_analysis(self, request: DrawingAnalysisRequest) -> AsyncIterator[AIStreamEvent]:
+        """Spread the completion over the simulated latency, a few characters at a time"""
+        with ai_span(self, request, streaming=True) as span:
+            completion = self._complete(request)
+            if completion.error:
+                await asyncio.sleep(completion.latency_ms / 1000)
+            else:
+                parser = GuessStreamParser()
+                chunks = [completion.content[i:i + 8] for i in range(0, len(completion.content), 8)]
+                # Roughly a third of the latency is time-to-first-token
+                await asyncio.sleep(completion.latency_ms * 0.3 / 1000)
+                for chunk in chunks:
+                    await asyncio.sleep(completion.latency_ms * 0.7 / 1000 / len(chunks))
+                    guess_index = parser.feed(chunk)
+                    if guess_index is not None:
+                        span.add_event("guess", {"ai.guess_index": guess_index})
+                        yield AIStreamEvent(type="guess", guess_index=guess_index)
+                    yield AIStreamEvent(type="reasoning", text=chunk)
+
+            response = self._build_response(request, completion)
+            self._record(span, response, completion)
+
+        yield AIStreamEvent(type="done", guess_index=response.guess_index, response=response)
+
+    def _record(self, span: Any, response: AIResponse, completion: FakeCompletion) -> None:
+        if completion.error:
+            record_ai_response(span, response)
+        else:
+            record_ai_response(span, response, completion.prompt_tokens, completion.completion_tokens)
+
+    def _build_response(self, request: DrawingAnalysisRequest, completion: FakeCompletion) -> AIResponse:
+        if completion.error:
+            return AIResponse(
+                success=False,
+                guess_index=None,
+                guess_text=None,
+                confidence=0.0,
+                reasoning=None,
+                model_used=request.model_override or self.model_name,
+                provider=AIProvider.FAKE,
+                response_time_ms=completion.latency_ms,
+                error_message=completion.error
+            )
+
+        guess_index, reasoning = parse_guess_response(completion.content)
+        guess_text = request.options[guess_index] if guess_index is not None and 0 <= guess_index < len(request.options) else None
+
+        return AIResponse(
+            success=guess_index is not None,
+            guess_index=guess_index,
+            guess_text=guess_text,
+            confidence=0.5,
+            reasoning=reasoning,
+            model_used=request.model_override or self.model_name,
+            provider=AIProvider.FAKE,
+            response_time_ms=completion.latency_ms,
+            tokens_used=completion.total_tokens,
+            raw_response={"content": completion.content, "fake": True}
+        )
+
+    def get_provider(self) -> AIProvider:
+        return AIProvider.FAKE
+
+    def get_model_info(self) -> Dict[str, Any]:
+        return {
+            "provider": "fake",
+            "model": self.model_name,
+            "type": "vision",
+            "latency_distribution": self.generator.latency_distribution,
+            "error_rate": self.generator.error_rate
+        }
@@ -0,0 +1,93 @@
+"""
+Incremental parser that finds the guess index in a streamed model response
+
+`GuessStreamParser` follows the same rules as `parse_guess_response`, so the
+early index matches the one parsed from the full completion:
+
+- responses starting with `{` (prompt v3) are JSON; the index is the value of `"index"`
+- otherwise the index is the first digit at the start of a line (prompts v1/v2)
+"""
+import json
+import re
+from typing import Optional, Tuple
+
+_JSON_INDEX = re.compile(r'"index"\s*:\s*(\d+)(?=\D)')
+
+
+def parse_guess_response(content: str) -> Tuple[Optional[int], Optional[str]]:
+    """Parse a complete model response to extract index and reasoning"""
+    try:
+        # Try to parse as JSON first
+        if content.strip().startswith('{'):
+            data = json.loads(content)
+            return data.get('index'), data.get('reasoning')
+
+        # Fallback: look for number at the start
+        lines = content.strip().split('\n')
+        for line in lines:
+            line = line.strip()
+            if line and line[0].isdigit():
+                index = int(line[0])
+                reasoning = content
+                return index, reasoning
+
+        return None, content
+
+    except:
+        return None, content
+
+
+class GuessStreamParser:
+    """Feed text deltas; `feed` returns the guess index once, as soon as it is known"""
+
+    def __init__(self):
+        self.buffer = ""
+        self.guess_index: Optional[int] = None
+        self._json: Optional[bool] = None
+        self._line_start = 0
+
+    @property
+    def found(self) -> bool:
+        return self.guess_index is not None
+
+    def feed(self, delta: str) -> Optional[int]:
+        """Append a chunk of text; returns the index the first time it is found"""
+        if not delta:
+            return None
+        self.buffer += delta
+
+        if self.found:
+            return None
+
+        if self._json is None:
+            stripped = self.buffer.lstrip()
+            if not stripped:
+                return None
+            self._json = stripped.startswith("{")
+
+        index = self._scan_json() if self._json else self._scan_lines()
+        if index is not None:
+            self.guess_index = index
+        return index
+
+    def _scan_json(self) -> Optional[int]:
+        match = _JSON_INDEX.search(self.buffer)
+        return int(match.group(1)) if match else None
+
+    def _scan_lines(self) -> Optional[int]:
+        """Check the first non-blank character of every line seen so far"""
+        while self._line_start < len(self.buffer):
+            newline = self.buffer.find("\n", self._line_start)
+            line = self.buffer[self._line_start:] if newline == -1 else self.buffer[self._line_start:newline]
+            stripped = line.strip()
+
+            if stripped:
+                if stripped[0].isdigit():
+                    return int(stripped[0])
+                if newline == -1:
+                    return None  # Line has text but no digit prefix; wait for the next line
+            elif newline == -1:
+                return None  # Only whitespace so far
+
+            self._line_start = newline + 1
+        return None
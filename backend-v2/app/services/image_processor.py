@@ -0,0 +1,227 @@
+"""
+Image preprocessing for drawings before they are sent to vision models
+"""
+import asyncio
+import base64
+import binascii
+import io
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+import structlog
+from PIL import Image, ImageOps
+
+from ..config import settings
+from ..core.timing import timed_phase
+from ..core.tracing import start_span
+from .stroke_rasterizer import StrokeDrawing, rasterize
+
+logger = structlog.get_logger(__name__)
+
+
+@dataclass
+class ProcessedImage:
+    """A drawing ready to be forwarded to an AI provider"""
+    data: str  # Base64 encoded, no data URL prefix
+    media_type: str
+    width: int
+    height: int
+    original_bytes: int
+    processed_bytes: int
+    preprocessed: bool
+
+
+def strip_data_url(image_data: str) -> str:
+    """Remove a `data:image/...;base64,` prefix if the client sent one"""
+    if image_data.startswith("data:"):
+        _, _, image_data = image_data.partition(",")
+    return image_data
+
+
+def detect_media_type(raw: bytes) -> str:
+    """Detect the image media type from its magic bytes (defaults to PNG)"""
+    if raw.startswith(b"\xff\xd8\xff"):
+        return "image/jpeg"
+    if raw[:4] == b"RIFF" and raw[8:12] == b"WEBP":
+        return "image/webp"
+    if raw[:6] in (b"GIF87a", b"GIF89a"):
+        return "image/gif"
+    return "image/png"
+
+
+class ImageProcessor:
+    """Decode, crop, downscale and re-encode drawings off the event loop"""
+
+    def __init__(
+        self,
+        max_side: int = 512,
+        color_mode: str = "grayscale",
+        crop_padding: int = 16,
+        palette_colors: int = 16,
+        workers: int = 2,
+        enabled: bool = True
+    ):
+        self.max_side = max_side
+        self.color_mode = color_mode
+        self.crop_padding = crop_padding
+        self.palette_colors = palette_colors
+        self.workers = workers
+        self.enabled = enabled
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.workers,
+                thread_name_prefix="image-preprocess"
+            )
+        return self._executor
+
+    async def process_async(self, image_data: str) -> ProcessedImage:
+        """Run `process` in the worker pool so decoding never blocks the event loop"""
+        return await self._run_in_pool("image.process", self.process, image_data)
+
+    async def process_bytes_async(self, raw: bytes) -> ProcessedImage:
+        """Run `process_bytes` in the worker pool"""
+        return await self._run_in_pool("image.process", self.process_bytes, raw)
+
+    async def process_strokes_async(self, drawing: StrokeDrawing) -> ProcessedImage:
+        """Rasterize and normalize a vector drawing in the worker pool"""
+        return await self._run_in_pool("image.rasterize", self.process_strokes, drawing)
+
+    async def _run_in_pool(self, span_name: str, func: Callable[[Any], ProcessedImage], arg: Any) -> ProcessedImage:
+        # Both include time spent queued for a free worker
+        with timed_phase("image"), start_span(span_name) as span:
+            loop = asyncio.get_running_loop()
+            processed = await loop.run_in_executor(self.executor, func, arg)
+            if span.is_recording():
+                span.set_attributes({
+                    "image.original_bytes": processed.original_bytes,
+                    "image.processed_bytes": processed.processed_bytes,
+                    "image.width": processed.width,
+                    "image.height": processed.height,
+                    "image.preprocessed": processed.preprocessed
+                })
+            return processed
+
+    def process_strokes(self, drawing: StrokeDrawing) -> ProcessedImage:
+        """Rasterize a vector drawing; always re-encoded even when preprocessing is off"""
+        canvas = Image.fromarray(rasterize(drawing))
+        return self._process_image(canvas, original_bytes=0)
+
+    def process(self, image_data: str) -> ProcessedImage:
+        """Normalize a base64 drawing; falls back to passthrough if it cannot be decoded"""
+        encoded = strip_data_url(image_data)
+
+        try:
+            raw = base64.b64decode(encoded, validate=False)
+        except (binascii.Error, ValueError) as e:
+            logger.warning("Image is not valid base64, forwarding as-is", error=str(e))
+            return self._passthrough(encoded, b"")
+
+        if not self.enabled:
+            return self._passthrough(encoded, raw)
+
+        try:
+            return self._process_bytes(raw)
+        except Exception as e:
+            logger.warning("Image preprocessing failed, forwarding as-is", error=str(e))
+            return self._passthrough(encoded, raw)
+
+    def process_bytes(self, raw: bytes) -> ProcessedImage:
+        """Normalize an already-decoded image"""
+        if not self.enabled:
+            return self._passthrough(base64.b64encode(raw).decode("ascii"), raw)
+
+        try:
+            return self._process_bytes(raw)
+        except Exception as e:
+            logger.warning("Image preprocessing failed, forwarding as-is", error=str(e))
+            return self._passthrough(base64.b64encode(raw).decode("ascii"), raw)
+
+    def _process_bytes(self, raw: bytes) -> ProcessedImage:
+        with Image.open(io.BytesIO(raw)) as image:
+            image.load()
+            gray = self._flatten_to_grayscale(image)
+
+        return self._process_image(gray, original_bytes=len(raw))
+
+    def _process_image(self, gray: Image.Image, original_bytes: int) -> ProcessedImage:
+        gray = self._crop_to_strokes(gray)
+
+        if max(gray.size) > self.max_side:
+            gray.thumbnail((self.max_side, self.max_side), Image.Resampling.LANCZOS)
+
+        if self.color_mode == "palette":
+            output = gray.quantize(colors=self.palette_colors)
+        else:
+            output = gray
+
+        buffer = io.BytesIO()
+        output.save(buffer, format="PNG", optimize=True)
+        encoded = base64.b64encode(buffer.getbuffer()).decode("ascii")
+
+        return ProcessedImage(
+            data=encoded,
+            media_type="image/png",
+            width=output.width,
+            height=output.height,
+            original_bytes=original_bytes,
+            processed_bytes=buffer.tell(),
+            preprocessed=True
+        )
+
+    def _flatten_to_grayscale(self, image: Image.Image) -> Image.Image:
+        """Composite transparent canvases onto white and drop color channels"""
+        if image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info):
+            rgba = image.convert("RGBA")
+            background = Image.new("RGBA", rgba.size, (255, 255, 255, 255))
+            background.alpha_composite(rgba)
+            return background.convert("L")
+        return image.convert("L")
+
+    def _crop_to_strokes(self, gray: Image.Image) -> Image.Image:
+        """Crop to the bounding box of non-background pixels plus padding"""
+        # Anything noticeably darker than the white background counts as ink
+        ink = ImageOps.invert(gray).point(lambda value: 255 if value > 24 else 0)
+        bbox = ink.getbbox()
+
+        if not bbox:
+            return gray
+
+        left, top, right, bottom = bbox
+        pad = self.crop_padding
+        return gray.crop((
+            max(0, left - pad),
+            max(0, top - pad),
+            min(gray.width, right + pad),
+            min(gray.height, bottom + pad)
+        ))
+
+    def _passthrough(self, encoded: str, raw: bytes) -> ProcessedImage:
+        return ProcessedImage(
+            data=encoded,
+            media_type=detect_media_type(raw),
+            width=0,
+            height=0,
+            original_bytes=len(raw),
+            processed_bytes=len(raw),
+            preprocessed=False
+        )
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+# Global image processor instance
+image_processor = ImageProcessor(
+    max_side=settings.image_max_side,
+    color_mode=settings.image_color_mode,
+    crop_padding=settings.image_crop_padding,
+    workers=settings.image_workers,
+    enabled=settings.image_preprocessing_enabled
+)
@@ -0,0 +1,73 @@
+"""
+Running per-prompt correct rates
+
+Every saved round adds to counters on its prompt's DeckItem: rounds played,
+human correct, rounds with an AI guess and AI correct. The rates are
+recomputed from the counters in the same UPDATE, so deck stats and weighted
+sampling read current numbers without aggregating over `game_rounds`.
+
+Increments are done in SQL (`count = count + :n`) with one executemany per
+batch, never read-modify-write, so concurrent saves cannot lose updates. The
+deck cache is deliberately not invalidated: cached deck bodies and alias
+tables pick the new rates up within their TTL / max age.
+"""
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import Float, bindparam, case, cast, update
+from sqlalchemy.orm import Session
+
+from ..models.database import DeckItem
+
+
+class RoundOutcome(NamedTuple):
+    """What a saved round contributes to its prompt's stats"""
+    prompt: str
+    deck_id: Optional[int]  # None when the round used explicit options
+    human_correct: bool
+    ai_correct: Optional[bool]  # None when the AI gave no guess
+
+
+_items = DeckItem.__table__
+_played = _items.c.rounds_played + bindparam("b_played")
+_human = _items.c.human_correct_count + bindparam("b_human")
+_guessed = _items.c.ai_guess_count + bindparam("b_guessed")
+_ai = _items.c.ai_correct_count + bindparam("b_ai")
+
+# Right-hand sides see the pre-update values, so the rates use the new totals
+_increment = update(_items).values(
+    rounds_played=_played,
+    human_correct_count=_human,
+    ai_guess_count=_guessed,
+    ai_correct_count=_ai,
+    avg_human_correct_rate=cast(_human, Float) / _played,
+    avg_ai_correct_rate=case((_guessed > 0, cast(_ai, Float) / _guessed), else_=_items.c.avg_ai_correct_rate)
+).where(_items.c.prompt == bindparam("b_prompt"))
+
+_INCREMENT_IN_DECK = _increment.where(_items.c.deck_id == bindparam("b_deck_id"))
+# Without a deck the prompt text is all we have; every deck with it gets the round
+_INCREMENT_ANY_DECK = _increment
+
+
+def record_round_outcomes(db: Session, outcomes: Iterable[RoundOutcome]) -> None:
+    """Stage counter increments for saved rounds on `db`; the caller commits"""
+    deltas: Dict[Tuple[Optional[int], str], List[int]] = {}
+    for outcome in outcomes:
+        delta = deltas.setdefault((outcome.deck_id, outcome.prompt), [0, 0, 0, 0])
+        delta[0] += 1
+        delta[1] += bool(outcome.human_correct)
+        if outcome.ai_correct is not None:
+            delta[2] += 1
+            delta[3] += bool(outcome.ai_correct)
+
+    in_deck, any_deck = [], []
+    for (deck_id, prompt), (played, human, guessed, ai) in deltas.items():
+        params = {"b_prompt": prompt, "b_played": played, "b_human": human, "b_guessed": guessed, "b_ai": ai}
+        if deck_id is None:
+            any_deck.append(params)
+        else:
+            in_deck.append({**params, "b_deck_id": deck_id})
+
+    if in_deck:
+        db.execute(_INCREMENT_IN_DECK, in_deck)
+    if any_deck:
+        db.execute(_INCREMENT_ANY_DECK, any_deck)
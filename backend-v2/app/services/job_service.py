@@ -0,0 +1,242 @@
+"""
+Asynchronous job execution for long-running drawing analysis
+
+Jobs run on a fixed pool of asyncio workers fed by a bounded queue. Job state
+lives in a `JobStore`; the in-memory store is the default and another backend
+(e.g. Redis) can be plugged in by implementing the same interface.
+"""
+import asyncio
+import time
+import uuid
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+import structlog
+from opentelemetry import context as trace_context
+
+from ..config import settings
+from ..core.tracing import start_span
+
+logger = structlog.get_logger(__name__)
+
+JobWork = Callable[[], Awaitable[Dict[str, Any]]]
+
+
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+@dataclass
+class Job:
+    """State of a single submitted job"""
+    id: str
+    key: str
+    status: JobStatus = JobStatus.QUEUED
+    created_at: float = field(default_factory=time.time)
+    updated_at: float = field(default_factory=time.time)
+    result: Optional[Dict[str, Any]] = None
+    error_message: Optional[str] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (JobStatus.COMPLETED, JobStatus.FAILED)
+
+
+class JobQueueFullError(Exception):
+    """Raised when the job queue cannot accept more work"""
+
+
+class JobStore(ABC):
+    """Abstract storage for job state"""
+
+    @abstractmethod
+    async def save(self, job: Job) -> None:
+        """Create or update a job"""
+        pass
+
+    @abstractmethod
+    async def get(self, job_id: str) -> Optional[Job]:
+        """Fetch a job by id"""
+        pass
+
+    @abstractmethod
+    async def find_by_key(self, key: str) -> Optional[Job]:
+        """Fetch the most recent job for a deduplication key"""
+        pass
+
+    async def wait_for_update(self, job_id: str, since: float, timeout: float) -> Optional[Job]:
+        """Wait until the job changes after `since`; polling fallback for shared backends"""
+        deadline = time.monotonic() + timeout
+        while True:
+            job = await self.get(job_id)
+            if job is None or job.updated_at > since or time.monotonic() >= deadline:
+                return job
+            await asyncio.sleep(0.25)
+
+
+class InMemoryJobStore(JobStore):
+    """Process-local job store with TTL expiry and push notifications"""
+
+    def __init__(self, ttl_seconds: int = 600):
+        self.ttl_seconds = ttl_seconds
+        self._jobs: Dict[str, Job] = {}
+        self._keys: Dict[str, str] = {}
+        self._changed: Dict[str, asyncio.Event] = {}
+
+    async def save(self, job: Job) -> None:
+        job.updated_at = time.time()
+        self._jobs[job.id] = job
+        self._keys[job.key] = job.id
+
+        # Wake up any subscriber and arm a fresh event for the next change
+        event = self._changed.pop(job.id, None)
+        if event is not None:
+            event.set()
+        self._purge_expired()
+
+    async def get(self, job_id: str) -> Optional[Job]:
+        job = self._jobs.get(job_id)
+        if job is not None and self._is_expired(job):
+            self._remove(job)
+            return None
+        return job
+
+    async def find_by_key(self, key: str) -> Optional[Job]:
+        job_id = self._keys.get(key)
+        return await self.get(job_id) if job_id else None
+
+    async def wait_for_update(self, job_id: str, since: float, timeout: float) -> Optional[Job]:
+        job = await self.get(job_id)
+        if job is None or job.updated_at > since:
+            return job
+
+        event = self._changed.setdefault(job_id, asyncio.Event())
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        return await self.get(job_id)
+
+    def _is_expired(self, job: Job) -> bool:
+        return job.finished and time.time() - job.updated_at > self.ttl_seconds
+
+    def _remove(self, job: Job) -> None:
+        self._jobs.pop(job.id, None)
+        if self._keys.get(job.key) == job.id:
+            del self._keys[job.key]
+        self._changed.pop(job.id, None)
+
+    def _purge_expired(self) -> None:
+        for job in [job for job in self._jobs.values() if self._is_expired(job)]:
+            self._remove(job)
+
+
+class JobService:
+    """Bounded queue plus a fixed pool of asyncio workers"""
+
+    def __init__(self, store: JobStore, workers: int = 4, queue_size: int = 100):
+        self.store = store
+        self.worker_count = workers
+        self.queue_size = queue_size
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+
+    async def start(self) -> None:
+        if self._workers:
+            return
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._workers = [
+            asyncio.create_task(self._worker(index), name=f"job-worker-{index}")
+            for index in range(self.worker_count)
+        ]
+        logger.info("Job workers started", workers=self.worker_count, queue_size=self.queue_size)
+
+    async def stop(self) -> None:
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._queue = None
+
+    async def submit(self, key: str, work: JobWork) -> Job:
+        """Queue work, returning the existing job if the same key is pending or done"""
+        await self.start()
+
+        existing = await self.store.find_by_key(key)
+        if existing is not None and existing.status != JobStatus.FAILED:
+            return existing
+
+        job = Job(id=uuid.uuid4().hex, key=key)
+        try:
+            # Carry the submitting request's trace context to the worker
+            self._queue.put_nowait((job, work, trace_context.get_current()))
+        except asyncio.QueueFull:
+            raise JobQueueFullError("Job queue is full, retry later")
+
+        await self.store.save(job)
+        return job
+
+    async def get(self, job_id: str) -> Optional[Job]:
+        return await self.store.get(job_id)
+
+    async def updates(self, job_id: str, heartbeat: float = 15.0) -> AsyncIterator[Optional[Job]]:
+        """Yield the job on every change until it finishes; None means heartbeat"""
+        job = await self.store.get(job_id)
+        if job is None:
+            return
+        yield job
+
+        while not job.finished:
+            since = job.updated_at
+            updated = await self.store.wait_for_update(job_id, since, heartbeat)
+            if updated is None:
+                return
+            if updated.updated_at > since:
+                job = updated
+                yield job
+            else:
+                yield None
+
+    async def _worker(self, index: int) -> None:
+        while True:
+            job, work, parent = await self._queue.get()
+            token = trace_context.attach(parent)
+            try:
+                with start_span("job.run", {"job.id": job.id, "job.worker": index}) as span:
+                    span.set_attribute("job.queued_ms", round((time.time() - job.created_at) * 1000, 2))
+                    job.status = JobStatus.RUNNING
+                    await self.store.save(job)
+
+                    job.result = await work()
+                    job.status = JobStatus.COMPLETED
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                job.status = JobStatus.FAILED
+                job.error_message = str(e)
+                logger.error("Job failed", job_id=job.id, worker=index, error=str(e))
+            finally:
+                trace_context.detach(token)
+                self._queue.task_done()
+
+            await self.store.save(job)
+
+
+def create_job_store(backend: str) -> JobStore:
+    """Build the configured job store backend"""
+    if backend == "memory":
+        return InMemoryJobStore(ttl_seconds=settings.job_ttl_seconds)
+    raise ValueError(f"Unknown job store backend: {backend}")
+
+
+# Global job service instance
+job_service = JobService(
+    store=create_job_store(settings.job_store_backend),
+    workers=settings.job_workers,
+    queue_size=settings.job_queue_size
+)
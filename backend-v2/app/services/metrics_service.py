@@ -5,7 +5,7 @@ import structlog
 from sqlalchemy.orm import Session
 from sqlalchemy import func, desc
 
-from ..models import GameRound, ModelPerformance, get_db
+from ..models import APIMetrics, GameRound, ModelPerformance, get_db
 from ..core.ai_interface import AIResponse, AIProvider
 
 logger = structlog.get_logger()
@@ -352,8 +352,38 @@ class MetricsService:
                 "p50": p50,
                 "p95": p95,
                 "p99": p99
-            }
+            },
+            "phase_time_ms": self.get_phase_breakdown(db, hours)
         }
+    
+    def get_phase_breakdown(self, db: Session, hours: int = 24) -> Dict[str, Dict[str, float]]:
+        """Average time per request phase (as sent in Server-Timing) for each endpoint"""
+        
+        cutoff = datetime.utcnow() - timedelta(hours=hours)
+        phase_columns = {
+            "total": APIMetrics.response_time_ms,
+            "auth": APIMetrics.auth_time_ms,
+            "db": APIMetrics.db_time_ms,
+            "image": APIMetrics.image_time_ms,
+            "ai": APIMetrics.ai_processing_time_ms,
+            "serialization": APIMetrics.serialization_time_ms
+        }
+        
+        rows = db.query(
+            APIMetrics.endpoint,
+            func.count(APIMetrics.id),
+            *[func.avg(column) for column in phase_columns.values()]
+        ).filter(
+            APIMetrics.created_at >= cutoff
+        ).group_by(APIMetrics.endpoint).all()
+        
+        breakdown = {}
+        for endpoint, requests, *averages in rows:
+            breakdown[endpoint] = {"requests": requests}
+            for phase, average in zip(phase_columns, averages):
+                if average is not None:
+                    breakdown[endpoint][phase] = round(average, 2)
+        return breakdown
 
 
 # Global metrics service instance
@@ -0,0 +1,132 @@
+"""
+Non-blocking sink for per-request API metrics
+
+Requests hand a finished record to `record()`, which only appends to a bounded
+queue. A background task drains it and writes batches of APIMetrics rows with
+one multi-row INSERT in a worker thread, so metrics never add a commit to the
+request path. When the queue is full, records are dropped and counted.
+"""
+import asyncio
+import contextvars
+from typing import Any, Dict, List, Optional
+
+import structlog
+from sqlalchemy import insert
+
+from ..config import settings
+from ..core.timing import RequestTimings
+from ..models import APIMetrics
+from ..models.database import SessionLocal
+
+logger = structlog.get_logger(__name__)
+
+
+def metrics_record(
+    endpoint: str,
+    method: str,
+    status_code: int,
+    timings: RequestTimings,
+    error: Optional[BaseException] = None
+) -> Dict[str, Any]:
+    """Column values for one APIMetrics row"""
+    labels = timings.labels
+    return dict(
+        endpoint=endpoint,
+        method=method,
+        status_code=status_code,
+        response_time_ms=timings.elapsed_ms(),
+        ai_processing_time_ms=timings.phase_ms("ai"),
+        auth_time_ms=timings.phase_ms("auth"),
+        db_time_ms=timings.phase_ms("db"),
+        image_time_ms=timings.phase_ms("image"),
+        serialization_time_ms=timings.phase_ms("serialization"),
+        ai_provider=labels.get("ai_provider"),
+        ai_model=labels.get("ai_model"),
+        prompt_version=labels.get("prompt_version"),
+        error_type=type(error).__name__ if error is not None else labels.get("error_type"),
+        error_message=str(error) if error is not None else labels.get("error_message")
+    )
+
+
+class MetricsSink:
+    """Bounded queue of metric records flushed in batches by a background task"""
+
+    def __init__(self, batch_size: int = 200, flush_interval: float = 1.0, queue_size: int = 10000):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue_size = queue_size
+        self.dropped = 0
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._pending: List[Dict[str, Any]] = []
+
+    def start(self) -> None:
+        if self._task is not None:
+            return
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        # Empty context: a task started lazily must not inherit that request's timings or trace
+        self._task = asyncio.get_running_loop().create_task(
+            self._run(), name="metrics-sink", context=contextvars.Context()
+        )
+
+    async def stop(self) -> None:
+        """Stop the writer and flush whatever is still queued"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        remaining = self._pending + self._drain(self._queue.qsize())
+        self._pending = []
+        if remaining:
+            await asyncio.to_thread(self._write, remaining)
+        self._task = None
+        self._queue = None
+
+    def record(self, values: Dict[str, Any]) -> None:
+        """Queue a record without waiting; drops it if the writer is behind"""
+        if not settings.enable_metrics:
+            return
+        self.start()
+        try:
+            self._queue.put_nowait(values)
+        except asyncio.QueueFull:
+            self.dropped += 1
+            if self.dropped % 1000 == 1:
+                logger.warning("Metrics queue full, dropping records", dropped=self.dropped)
+
+    async def _run(self) -> None:
+        while True:
+            self._pending = [await self._queue.get()]
+            self._pending.extend(self._drain(self.batch_size - 1))
+            if len(self._pending) < self.batch_size:
+                # Quiet period: give a burst a moment to accumulate into one INSERT
+                await asyncio.sleep(self.flush_interval)
+                self._pending.extend(self._drain(self.batch_size - len(self._pending)))
+            
+            batch, self._pending = self._pending, []
+            try:
+                await asyncio.to_thread(self._write, batch)
+            except Exception as e:
+                logger.error("Failed to write API metrics", error=str(e), records=len(batch))
+
+    def _drain(self, limit: int) -> List[Dict[str, Any]]:
+        records = []
+        while len(records) < limit and not self._queue.empty():
+            records.append(self._queue.get_nowait())
+        return records
+
+    def _write(self, records: List[Dict[str, Any]]) -> None:
+        db = SessionLocal()
+        try:
+            db.execute(insert(APIMetrics), records)
+            db.commit()
+        finally:
+            db.close()
+
+
+# Global metrics sink instance
+metrics_sink = MetricsSink(
+    batch_size=settings.metrics_batch_size,
+    flush_interval=settings.metrics_flush_interval,
+    queue_size=settings.metrics_queue_size
+)
@@ -2,6 +2,8 @@ from typing import Dict, Any
 from dataclasses import dataclass
 import json
 
+from ..core.tracing import start_span
+
 
 @dataclass
 class PromptTemplate:
@@ -59,10 +61,11 @@ class PromptManager:
         
         template = self.prompts[prompt_key].template
         
-        # Format the options
-        formatted_options = "\n".join([f"{i}: {option}" for i, option in enumerate(options)])
-        
-        return template.format(options=formatted_options, num_options=len(options)-1)
+        with start_span("prompt.render", {"prompt.version": prompt_key, "prompt.options": len(options)}):
+            # Format the options
+            formatted_options = "\n".join([f"{i}: {option}" for i, option in enumerate(options)])
+            
+            return template.format(options=formatted_options, num_options=len(options)-1)
     
     def _get_v1_template(self) -> str:
         """Original simple prompt"""
@@ -0,0 +1,196 @@
+"""
+Weighted prompt sampling with precomputed alias tables
+
+Instead of picking prompts uniformly, a round can favor prompts that humans
+guess and the AI misses, prompts that have been played least, or a target
+difficulty. Each (deck, weighting, difficulty) gets a Walker alias table built
+with Vose's method in O(n); a draw of k distinct prompts is then O(k) whatever
+the deck size. Tables are rebuilt when the deck changes (`deck_cache.version`)
+or after `prompt_weights_max_age_seconds`, so updated item stats show up
+without rebuilding on every round.
+
+Draws for a session pass the ids it has already seen in the current pass (see
+prompt_shuffler) as `exclude`, so weighted rounds keep the no-repeat rule.
+"""
+import time
+from typing import AbstractSet, Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from ..models.database import Deck, DeckItem
+from ..schemas.requests import PromptWeighting
+from .deck_cache import deck_cache
+
+# Floor so every prompt stays drawable, however bad its stats look
+MIN_WEIGHT = 0.05
+# Prior for a rate with no rounds behind it yet: neither favored nor buried
+NEUTRAL_RATE = 0.5
+# Relative weight of prompts outside the requested difficulty
+OFF_TARGET_WEIGHT = 0.1
+
+
+def item_weight(
+    weighting: PromptWeighting,
+    difficulty: Optional[str],
+    human_rate: Optional[float],
+    ai_rate: Optional[float],
+    usage_count: Optional[int],
+    target_difficulty: Optional[str] = None
+) -> float:
+    if weighting == PromptWeighting.HUMAN_OVER_AI:
+        # Best rounds: the humans get it and the AI does not; None means never played
+        human = NEUTRAL_RATE if human_rate is None else human_rate
+        ai = NEUTRAL_RATE if ai_rate is None else ai_rate
+        weight = MIN_WEIGHT + human * (1.0 - ai)
+    elif weighting == PromptWeighting.LEAST_USED:
+        weight = 1.0 / (1.0 + (usage_count or 0))
+    else:
+        weight = 1.0
+
+    if target_difficulty and difficulty != target_difficulty:
+        weight *= OFF_TARGET_WEIGHT
+    return weight
+
+
+class AliasTable:
+    """Walker alias table over item ids for O(1) weighted draws"""
+
+    __slots__ = ("item_ids", "weights", "prob", "alias")
+
+    def __init__(self, item_ids: List[int], weights: List[float]):
+        n = len(item_ids)
+        self.item_ids = np.asarray(item_ids, dtype=np.int64)
+        self.weights = np.asarray(weights, dtype=np.float64)
+        self.prob = np.ones(n, dtype=np.float64)
+        self.alias = np.arange(n, dtype=np.int64)
+        if n == 0:
+            return
+
+        scaled = self.weights * (n / self.weights.sum())
+        small = [i for i in range(n) if scaled[i] < 1.0]
+        large = [i for i in range(n) if scaled[i] >= 1.0]
+
+        # Vose: pair each under-full column with an over-full one
+        while small and large:
+            s, l = small.pop(), large.pop()
+            self.prob[s] = scaled[s]
+            self.alias[s] = l
+            scaled[l] -= 1.0 - scaled[s]
+            (small if scaled[l] < 1.0 else large).append(l)
+        # Leftovers are 1.0 up to rounding
+        for i in small + large:
+            self.prob[i] = 1.0
+
+    def __len__(self) -> int:
+        return len(self.item_ids)
+
+    def sample(self, rng: np.random.Generator, size: int) -> np.ndarray:
+        columns = rng.integers(0, len(self.item_ids), size=size)
+        keep = rng.random(size) < self.prob[columns]
+        return self.item_ids[np.where(keep, columns, self.alias[columns])]
+
+    def sample_distinct(
+        self,
+        rng: np.random.Generator,
+        count: int,
+        exclude: AbstractSet[int] = frozenset()
+    ) -> List[int]:
+        """`count` distinct ids outside `exclude`, each drawn in proportion to its weight among those left"""
+        chosen: List[int] = []
+        seen = set(exclude)
+        # Duplicates and excluded ids are rejected; oversample so one round of
+        # draws almost always suffices while most of the table is drawable
+        if len(seen) <= len(self.item_ids) // 2:
+            for _ in range(32):
+                for item_id in self.sample(rng, 2 * count).tolist():
+                    if item_id not in seen:
+                        seen.add(item_id)
+                        chosen.append(item_id)
+                        if len(chosen) == count:
+                            return chosen
+        # Skewed weights or a mostly excluded table: weighted draw from the rest in O(n)
+        rest = np.fromiter((item_id not in seen for item_id in self.item_ids.tolist()), dtype=bool, count=len(self))
+        weights = self.weights[rest]
+        chosen.extend(rng.choice(
+            self.item_ids[rest], size=count - len(chosen), replace=False, p=weights / weights.sum()
+        ).tolist())
+        return chosen
+
+
+class PromptSampler:
+    """Alias tables per (deck, weighting, target difficulty), built on demand"""
+
+    def __init__(self, max_age_seconds: float = 60.0, seed: Optional[int] = None):
+        self.max_age_seconds = max_age_seconds
+        self.rng = np.random.default_rng(seed)
+        self._tables: Dict[Tuple[int, PromptWeighting, Optional[str]], Tuple[AliasTable, int, float]] = {}
+
+    def draw(
+        self,
+        db: Session,
+        deck_id: int,
+        count: int,
+        weighting: PromptWeighting,
+        target_difficulty: Optional[str] = None,
+        exclude: AbstractSet[int] = frozenset()
+    ) -> List[int]:
+        """
+        `count` distinct item ids, avoiding `exclude` while enough others are
+        left; fewer only if the deck is that small
+        """
+        table = self._table(db, deck_id, weighting, target_difficulty)
+        if len(table) <= count:
+            return table.item_ids.tolist()
+        exclude = exclude & set(table.item_ids.tolist()) if exclude else frozenset()
+        if len(table) - len(exclude) < count:
+            exclude = frozenset()
+        return table.sample_distinct(self.rng, count, exclude)
+
+    def _table(
+        self,
+        db: Session,
+        deck_id: int,
+        weighting: PromptWeighting,
+        target_difficulty: Optional[str]
+    ) -> AliasTable:
+        key = (deck_id, weighting, target_difficulty)
+        now = time.monotonic()
+        cached = self._tables.get(key)
+        if cached is not None:
+            table, version, built_at = cached
+            if version == deck_cache.version and now - built_at < self.max_age_seconds:
+                return table
+
+        version = deck_cache.version
+        rows = db.query(
+            DeckItem.id,
+            DeckItem.difficulty,
+            DeckItem.avg_human_correct_rate,
+            DeckItem.avg_ai_correct_rate,
+            DeckItem.usage_count,
+            DeckItem.rounds_played,
+            DeckItem.ai_guess_count
+        ).join(Deck).filter(Deck.id == deck_id, Deck.is_active == True).all()
+
+        table = AliasTable(
+            [row.id for row in rows],
+            [
+                item_weight(
+                    weighting,
+                    row.difficulty,
+                    row.avg_human_correct_rate if row.rounds_played else None,
+                    row.avg_ai_correct_rate if row.ai_guess_count else None,
+                    row.usage_count,
+                    target_difficulty
+                )
+                for row in rows
+            ]
+        )
+        self._tables[key] = (table, version, now)
+        return table
+
+
+# Global prompt sampler instance
+prompt_sampler = PromptSampler(max_age_seconds=settings.prompt_weights_max_age_seconds)
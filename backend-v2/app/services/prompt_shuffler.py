@@ -0,0 +1,201 @@
+"""
+Per-session, no-repeat prompt draws
+
+Each (session, deck) pair keeps a shuffled permutation of the deck's item ids
+and a cursor. A round takes the next `count` ids, so no prompt repeats until
+the deck is exhausted, and a draw costs O(count) instead of a growing
+`NOT IN (...)` query. When a pass runs out, the remaining ids are used first
+and a fresh permutation supplies the rest without repeating within the round.
+
+Weighted draws (see prompt_sampler) pick their own items but share the same
+pass: `excluded_ids` gives the ids drawn so far and `mark_drawn` moves the
+picked ids into the drawn prefix.
+
+States are packed `array("I")` permutations in an LRU map with a TTL. With
+`prompt_shuffle_persist` they are also written to `prompt_shuffle_states`, so
+a restart or another worker continues the same order: every draw first reads
+the saved row (locked until the caller commits on Postgres) and adopts it when
+another worker has moved the session on since this one's copy.
+"""
+import random
+import time
+from array import array
+from collections import OrderedDict
+from typing import Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from ..models.database import Deck, DeckItem, PromptShuffleState
+from .deck_cache import deck_cache
+
+
+class ShuffleState:
+    """Draw order of one deck for one session"""
+
+    __slots__ = ("item_ids", "cursor", "deck_version", "last_used")
+
+    def __init__(self, item_ids: array, cursor: int = 0):
+        self.item_ids = item_ids
+        self.cursor = cursor
+        self.deck_version = deck_cache.version  # Bumped by every deck write
+        self.last_used = time.monotonic()
+
+
+class PromptShuffler:
+    """LRU map of (session key, deck id) to shuffle state"""
+
+    def __init__(self, max_sessions: int = 10000, ttl_seconds: float = 6 * 3600, persist: bool = False):
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self.persist = persist
+        self._states: "OrderedDict[Tuple[str, int], ShuffleState]" = OrderedDict()
+
+    def draw(self, db: Session, session_key: str, deck_id: int, count: int) -> List[int]:
+        """Next `count` item ids for this session; fewer only if the deck is that small"""
+        key = (session_key, deck_id)
+        state = self._get(db, key)
+        if len(state.item_ids) < count:
+            return list(state.item_ids)
+
+        start = state.cursor
+        if start + count <= len(state.item_ids):
+            drawn = state.item_ids[start:start + count].tolist()
+            state.cursor += count
+        else:
+            drawn = self._start_new_pass(state, count)
+
+        if self.persist:
+            self._save(db, key, state)
+        return drawn
+
+    def excluded_ids(self, db: Session, session_key: str, deck_id: int, count: int) -> Set[int]:
+        """Ids drawn in the session's current pass, for a weighted draw of `count` to avoid"""
+        state = self._get(db, (session_key, deck_id))
+        if len(state.item_ids) - state.cursor < count:
+            # Too few left for a round without repeats: the pass is over
+            item_ids = state.item_ids.tolist()
+            random.shuffle(item_ids)
+            state.item_ids = array("I", item_ids)
+            state.cursor = 0
+            if self.persist:
+                self._save(db, (session_key, deck_id), state)
+        return set(state.item_ids[:state.cursor])
+
+    def mark_drawn(self, db: Session, session_key: str, deck_id: int, item_ids: Iterable[int]) -> None:
+        """Move ids picked by a weighted draw into the drawn prefix of the session's pass"""
+        key = (session_key, deck_id)
+        state = self._get(db, key)
+        ids = state.item_ids
+        positions = {item_id: index for index, item_id in enumerate(ids[state.cursor:], start=state.cursor)}
+        for item_id in item_ids:
+            index = positions.pop(item_id, None)
+            if index is None:
+                continue  # Already drawn in this pass, or no longer in the deck
+            displaced = ids[state.cursor]
+            ids[index], ids[state.cursor] = displaced, item_id
+            positions[displaced] = index
+            state.cursor += 1
+
+        if self.persist:
+            self._save(db, key, state)
+
+    def forget(self, session_key: str, deck_id: int) -> None:
+        self._states.pop((session_key, deck_id), None)
+
+    def _get(self, db: Session, key: Tuple[str, int]) -> ShuffleState:
+        now = time.monotonic()
+        state = self._states.get(key)
+        if state is not None and now - state.last_used > self.ttl_seconds:
+            state = None
+
+        if self.persist:
+            # Another worker may have drawn for this session since; the saved row wins
+            state = self._load(db, key, state)
+        if state is None:
+            item_ids = self._deck_item_ids(db, key[1])
+            random.shuffle(item_ids)
+            state = ShuffleState(array("I", item_ids))
+        elif state.deck_version != deck_cache.version:
+            self._reconcile(db, key[1], state)
+
+        state.last_used = now
+        self._states[key] = state
+        self._states.move_to_end(key)
+        while len(self._states) > self.max_sessions:
+            self._states.popitem(last=False)
+        return state
+
+    @staticmethod
+    def _start_new_pass(state: ShuffleState, count: int) -> List[int]:
+        tail = state.item_ids[state.cursor:].tolist()
+        tail_set = set(tail)
+        rest = [item_id for item_id in state.item_ids if item_id not in tail_set]
+        random.shuffle(rest)
+        random.shuffle(tail)
+
+        needed = count - len(tail)
+        # This round's tail items go last in the new pass
+        state.item_ids = array("I", rest + tail)
+        state.cursor = needed
+        return tail + rest[:needed]
+
+    def _reconcile(self, db: Session, deck_id: int, state: ShuffleState) -> None:
+        """Follow item adds/removes without repeating what was already drawn"""
+        current = self._deck_item_ids(db, deck_id)
+        current_set = set(current)
+        drawn = [item_id for item_id in state.item_ids[:state.cursor] if item_id in current_set]
+        drawn_set = set(drawn)
+        undrawn = [item_id for item_id in current if item_id not in drawn_set]
+        random.shuffle(undrawn)
+
+        state.item_ids = array("I", drawn + undrawn)
+        state.cursor = len(drawn)
+        state.deck_version = deck_cache.version
+
+    @staticmethod
+    def _deck_item_ids(db: Session, deck_id: int) -> List[int]:
+        rows = db.query(DeckItem.id).join(Deck)\
+            .filter(Deck.id == deck_id, Deck.is_active == True)\
+            .all()
+        return [row.id for row in rows]
+
+    def _load(self, db: Session, key: Tuple[str, int], cached: Optional[ShuffleState]) -> Optional[ShuffleState]:
+        """The saved state, or `cached` when nothing is saved or it matches the saved row"""
+        row = db.query(PromptShuffleState)\
+            .filter(PromptShuffleState.session_key == key[0], PromptShuffleState.deck_id == key[1])\
+            .with_for_update()\
+            .first()
+        if row is None:
+            return cached
+        if cached is not None and cached.cursor == (row.cursor or 0) and cached.item_ids.tobytes() == row.item_ids:
+            return cached
+
+        item_ids = array("I")
+        item_ids.frombytes(row.item_ids)
+        state = ShuffleState(item_ids, row.cursor or 0)
+        # Another process may have changed the deck since this was saved
+        self._reconcile(db, key[1], state)
+        return state
+
+    @staticmethod
+    def _save(db: Session, key: Tuple[str, int], state: ShuffleState) -> None:
+        """Stage the state on `db`; the caller's commit writes it"""
+        # Sessions don't autoflush: a row added earlier in this transaction must be found, not added twice
+        db.flush()
+        row = db.query(PromptShuffleState)\
+            .filter(PromptShuffleState.session_key == key[0], PromptShuffleState.deck_id == key[1])\
+            .first()
+        if row is None:
+            row = PromptShuffleState(session_key=key[0], deck_id=key[1])
+            db.add(row)
+        row.item_ids = state.item_ids.tobytes()
+        row.cursor = state.cursor
+
+
+# Global prompt shuffler instance
+prompt_shuffler = PromptShuffler(
+    max_sessions=settings.prompt_shuffle_max_sessions,
+    ttl_seconds=settings.prompt_shuffle_ttl_seconds,
+    persist=settings.prompt_shuffle_persist
+)
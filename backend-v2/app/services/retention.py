@@ -0,0 +1,289 @@
+"""
+Retention, archival and partitioning of the append-only log tables
+
+`api_metrics` and `ai_analysis_logs` get a row per request / analysis and are
+only ever queried over recent time windows. On Postgres both are range
+partitioned by month on `created_at`, so those queries prune to the recent
+partitions and expiring a month is a `DROP TABLE` instead of a huge DELETE:
+
+- `partition_table` converts an existing plain table once (`scripts/retention.py
+  --partition`; the `partition_log_tables` migration runs a frozen copy of the
+  same steps): the old table becomes the partition holding everything before
+  the current month, and a default partition catches rows outside every range.
+- `apply_retention` creates the next months' partitions, then archives and
+  drops every partition that ends before the retention cutoff. Rows that landed
+  in the default partition (dates outside every range, e.g. a late write for a
+  month already dropped) are archived and deleted once they are past the
+  cutoff. Other databases get the same archive-then-delete behaviour month by
+  month.
+
+Archives are zstd-compressed Parquet or Arrow IPC files (see columnar), one
+per partition or month, named by their time range and written to a temporary name and renamed only once complete, so
+nothing is dropped unless its archive exists. Run it daily with
+`scripts/retention.py`.
+"""
+import os
+import re
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Type
+
+from sqlalchemy import column, delete, func, select, table, text
+from sqlalchemy.engine import Connection, Engine
+
+from ..config import settings
+from ..models.database import AIAnalysisLog, APIMetrics, Base
+from .columnar import EXTENSIONS, ColumnarWriter
+
+RETAINED_MODELS: Dict[str, Type[Base]] = {
+    APIMetrics.__tablename__: APIMetrics,
+    AIAnalysisLog.__tablename__: AIAnalysisLog
+}
+
+_BOUND = re.compile(r"FROM \((.+?)\) TO \((.+?)\)")
+
+
+@dataclass
+class Partition:
+    name: str
+    start: Optional[datetime]  # None: MINVALUE (the converted legacy table)
+    end: datetime
+
+
+def retention_days(table_name: str) -> int:
+    if table_name == APIMetrics.__tablename__:
+        return settings.metrics_retention_days
+    return settings.analysis_log_retention_days
+
+
+def month_start(moment: datetime, months: int = 0) -> datetime:
+    """First instant of the month `months` after the one containing `moment`"""
+    index = moment.year * 12 + moment.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1)
+
+
+def is_postgres(bind: Any) -> bool:
+    return bind.dialect.name == "postgresql"
+
+
+def is_partitioned(conn: Connection, table_name: str) -> bool:
+    return conn.execute(
+        text("SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:name)"),
+        {"name": table_name}
+    ).first() is not None
+
+
+def partition_table(conn: Connection, table_name: str, months_ahead: int = 3) -> bool:
+    """Turn a plain Postgres table into a monthly partitioned one; False if already done"""
+    if is_partitioned(conn, table_name):
+        return False
+
+    legacy = f"{table_name}_legacy"
+    boundary = month_start(datetime.utcnow())
+    sequence = conn.execute(text("SELECT pg_get_serial_sequence(:name, 'id')"), {"name": table_name}).scalar()
+
+    for statement in (
+        f"LOCK TABLE {table_name} IN ACCESS EXCLUSIVE MODE",
+        # The partition key has to be part of the primary key, so it cannot be NULL
+        f"UPDATE {table_name} SET created_at = (now() AT TIME ZONE 'utc') WHERE created_at IS NULL",
+        f"ALTER TABLE {table_name} ALTER COLUMN created_at SET NOT NULL",
+        f"ALTER TABLE {table_name} RENAME TO {legacy}",
+        f"ALTER TABLE {legacy} RENAME CONSTRAINT {table_name}_pkey TO {legacy}_pkey",
+        f"CREATE TABLE {table_name} (LIKE {legacy} INCLUDING DEFAULTS INCLUDING CONSTRAINTS) "
+        f"PARTITION BY RANGE (created_at)",
+        f"ALTER TABLE {table_name} ADD PRIMARY KEY (id, created_at)",
+        f"ALTER SEQUENCE {sequence} OWNED BY {table_name}.id",
+        f"ALTER TABLE {table_name} ATTACH PARTITION {legacy} "
+        f"FOR VALUES FROM (MINVALUE) TO ('{boundary.isoformat(sep=' ')}')",
+        f"CREATE TABLE {table_name}_default PARTITION OF {table_name} DEFAULT",
+    ):
+        conn.execute(text(statement))
+
+    ensure_partitions(conn, table_name, months_ahead)
+    return True
+
+
+def ensure_partitions(conn: Connection, table_name: str, months_ahead: int) -> List[str]:
+    """Create the monthly partitions from this month to `months_ahead` months out"""
+    existing = {partition.name for partition in list_partitions(conn, table_name)}
+    created = []
+    now = datetime.utcnow()
+    for offset in range(months_ahead + 1):
+        start, end = month_start(now, offset), month_start(now, offset + 1)
+        name = f"{table_name}_p{start:%Y_%m}"
+        if name in existing:
+            continue
+        conn.execute(text(
+            f"CREATE TABLE {name} PARTITION OF {table_name} "
+            f"FOR VALUES FROM ('{start.isoformat(sep=' ')}') TO ('{end.isoformat(sep=' ')}')"
+        ))
+        created.append(name)
+    return created
+
+
+def list_partitions(conn: Connection, table_name: str) -> List[Partition]:
+    """Range partitions of a table, oldest first (the default partition is left out)"""
+    rows = conn.execute(text(
+        "SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) "
+        "FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = to_regclass(:name)"
+    ), {"name": table_name})
+
+    partitions = []
+    for name, bound in rows:
+        match = _BOUND.search(bound or "")
+        if not match:
+            continue
+        start, end = (value.strip("'") for value in match.groups())
+        partitions.append(Partition(
+            name,
+            None if start == "MINVALUE" else datetime.fromisoformat(start),
+            datetime.fromisoformat(end)
+        ))
+    return sorted(partitions, key=lambda partition: partition.end)
+
+
+def source_table(table_name: str, source: Optional[str] = None) -> Any:
+    """The model's table, or one of its partitions read directly by name"""
+    model_table = RETAINED_MODELS[table_name].__table__
+    if source is None:
+        return model_table
+    return table(source, *(column(col.name, col.type) for col in model_table.columns))
+
+
+def archive_range(
+    conn: Connection,
+    table_name: str,
+    start: Optional[datetime],
+    end: datetime,
+    archive_dir: str,
+    fmt: str,
+    batch_size: int = 5000,
+    source: Optional[str] = None
+) -> int:
+    """Export rows with start <= created_at < end to one columnar file; returns rows
+
+    `source` reads a single partition (e.g. the default one) instead of the
+    whole table; its name is added to the file name.
+    """
+    columns = list(RETAINED_MODELS[table_name].__table__.columns)
+    rows_from = source_table(table_name, source)
+    created_at = rows_from.c.created_at
+    query = select(*(rows_from.c[col.name] for col in columns)).where(created_at < end)
+    if start is not None:
+        query = query.where(created_at >= start)
+
+    first = start or conn.execute(select(func.min(created_at)).where(created_at < end)).scalar() or end
+    directory = os.path.join(archive_dir, table_name)
+    os.makedirs(directory, exist_ok=True)
+    name = f"{first:%Y%m%dT%H%M%S}_{end:%Y%m%dT%H%M%S}" + (f"_{source}" if source else "")
+    path = os.path.join(directory, name + EXTENSIONS[fmt])
+    partial = f"{path}.partial"
+
+    result = conn.execute(query.order_by(created_at).execution_options(yield_per=batch_size))
+    with ColumnarWriter(partial, columns, fmt) as writer:
+        for rows in result.partitions():
+            writer.write_rows(rows)
+
+    if writer.rows_written:
+        os.replace(partial, path)
+    else:
+        os.remove(partial)
+    return writer.rows_written
+
+
+def sweep_partition(
+    engine: Engine,
+    table_name: str,
+    partition_name: str,
+    cutoff: datetime,
+    archive: bool = True,
+    dry_run: bool = False
+) -> Optional[Dict[str, Any]]:
+    """Archive and delete the rows of one partition older than `cutoff`; None when it has none"""
+    rows_from = source_table(table_name, partition_name)
+    with engine.connect() as conn:
+        expired = conn.execute(
+            select(func.count()).select_from(rows_from).where(rows_from.c.created_at < cutoff)
+        ).scalar()
+    if not expired:
+        return None
+
+    action = {"action": "deleted", "partition": partition_name, "start": None, "end": cutoff, "rows": expired}
+    if dry_run:
+        return action
+    with engine.connect() as conn:
+        if archive:
+            action["archived_rows"] = archive_range(
+                conn, table_name, None, cutoff, settings.retention_archive_dir,
+                settings.retention_archive_format, source=partition_name
+            )
+    with engine.begin() as conn:
+        action["rows"] = conn.execute(delete(rows_from).where(rows_from.c.created_at < cutoff)).rowcount
+    return action
+
+
+def apply_retention(
+    engine: Engine,
+    table_name: str,
+    archive: bool = True,
+    dry_run: bool = False
+) -> List[Dict[str, Any]]:
+    """Archive and remove everything older than the table's retention; returns the actions taken"""
+    cutoff = datetime.utcnow() - timedelta(days=retention_days(table_name))
+    fmt = settings.retention_archive_format
+    actions: List[Dict[str, Any]] = []
+
+    if is_postgres(engine):
+        with engine.begin() as conn:
+            if not is_partitioned(conn, table_name):
+                raise RuntimeError(f"{table_name} is not partitioned; run the partitioning migration first")
+            if not dry_run:
+                for name in ensure_partitions(conn, table_name, settings.retention_partitions_ahead):
+                    actions.append({"action": "created", "partition": name})
+            expired = [partition for partition in list_partitions(conn, table_name) if partition.end <= cutoff]
+
+        for partition in expired:
+            action = {"action": "dropped", "partition": partition.name, "start": partition.start, "end": partition.end}
+            if not dry_run:
+                with engine.connect() as conn:
+                    if archive:
+                        # Read the partition itself: through the parent, its range would also match
+                        # default-partition rows, which the sweep below archives again
+                        action["archived_rows"] = archive_range(
+                            conn, table_name, partition.start, partition.end, settings.retention_archive_dir, fmt,
+                            source=partition.name
+                        )
+                with engine.begin() as conn:
+                    conn.execute(text(f"DROP TABLE {partition.name}"))
+            actions.append(action)
+
+        swept = sweep_partition(engine, table_name, f"{table_name}_default", cutoff, archive, dry_run)
+        if swept:
+            actions.append(swept)
+        return actions
+
+    # No partitions: archive and delete one calendar month at a time
+    model = RETAINED_MODELS[table_name]
+    with engine.connect() as conn:
+        oldest = conn.execute(select(func.min(model.created_at))).scalar()
+    if oldest is None:
+        return actions
+
+    start = oldest
+    while start < cutoff:
+        end = min(month_start(start, 1), cutoff)
+        action = {"action": "deleted", "start": start, "end": end}
+        if not dry_run:
+            with engine.connect() as conn:
+                if archive:
+                    action["archived_rows"] = archive_range(
+                        conn, table_name, start, end, settings.retention_archive_dir, fmt
+                    )
+            with engine.begin() as conn:
+                action["rows"] = conn.execute(
+                    delete(model).where(model.created_at >= start, model.created_at < end)
+                ).rowcount
+        actions.append(action)
+        start = end
+    return actions
@@ -0,0 +1,98 @@
+"""
+In-process registry of live game-session connections
+
+A Unity multiplayer session (`Game.unity_session_id`) maps to one `GameSession`
+shared by every connected player. The hub only tracks connections and fans
+events out; game logic lives in `app/api/game_sessions.py`.
+"""
+import asyncio
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Set
+
+import structlog
+from sqlalchemy.orm import Session
+
+logger = structlog.get_logger(__name__)
+
+
+@dataclass
+class RoundState:
+    """Work-in-progress round, written to the database in one batch on submit"""
+    round_number: int
+    options: List[str] = field(default_factory=list)
+    correct_index: Optional[int] = None
+    correct_option: Optional[str] = None
+    deck_id_used: Optional[int] = None
+    image: Optional[Any] = None  # ProcessedImage
+    stored_image: Optional[str] = None
+    stroke_data: Optional[Dict[str, Any]] = None
+    analysis: Optional[Any] = None  # DrawingAnalysisResponse
+    pending_rows: List[Any] = field(default_factory=list)  # Unflushed ORM rows
+
+
+@dataclass
+class GameSession:
+    """Shared state for every player connected to one Unity session"""
+    session_id: str
+    db: Session
+    game_id: Optional[int] = None
+    connections: Set[Any] = field(default_factory=set)
+    current_round: Optional[RoundState] = None
+    last_round_number: int = 0
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+
+class SessionHub:
+    """Tracks live connections per session and broadcasts events to them"""
+
+    def __init__(self):
+        self.sessions: Dict[str, GameSession] = {}
+
+    def get(self, session_id: str) -> Optional[GameSession]:
+        return self.sessions.get(session_id)
+
+    def join(
+        self,
+        session_id: str,
+        connection: Any,
+        create: Callable[[], GameSession]
+    ) -> GameSession:
+        """Register a connection, creating the session on first join"""
+        session = self.sessions.get(session_id)
+        if session is None:
+            session = self.sessions[session_id] = create()
+        session.connections.add(connection)
+        return session
+
+    def leave(self, session_id: str, connection: Any) -> Optional[GameSession]:
+        """Unregister a connection; returns the session if it is now empty"""
+        session = self.sessions.get(session_id)
+        if session is None:
+            return None
+
+        session.connections.discard(connection)
+        if session.connections:
+            return None
+
+        del self.sessions[session_id]
+        return session
+
+    async def send(self, connection: Any, event: Dict[str, Any]) -> None:
+        try:
+            await connection.send_json(event)
+        except Exception as e:
+            logger.warning("Failed to send session event", event_type=event.get("type"), error=str(e))
+
+    async def broadcast(
+        self,
+        session: GameSession,
+        event: Dict[str, Any],
+        exclude: Optional[Any] = None
+    ) -> None:
+        """Send an event to every player in the session concurrently"""
+        targets = [c for c in session.connections if c is not exclude]
+        await asyncio.gather(*(self.send(c, event) for c in targets))
+
+
+# Global session hub instance
+session_hub = SessionHub()
@@ -0,0 +1,265 @@
+"""
+Vectorized rasterizer for stroke-based drawings sent by the Unity client
+
+Strokes use the same conventions as `Drawing.DrawingData` in the Unity client:
+points are normalized to 0-1 with the origin in the bottom-left corner and a
+stroke of thickness `t` is stamped with a disc of radius `max(1, round(t))`.
+
+Binary point stream layout (little-endian, base64 encoded on the wire):
+
+    header  b"PKS1" | uint16 width | uint16 height | uint16 stroke_count
+    stroke  uint16 point_count | float32 thickness | point_count * (uint16 x, uint16 y)
+
+Point coordinates in the stream are scaled from 0-1 to 0-65535.
+
+Work is bounded by the input's size on the canvas rather than its byte size:
+a few points can describe very long zig-zags, so drawings are rejected when
+their total stroke length or brush coverage is over budget, and strokes are
+sampled in fixed-size chunks of segments.
+"""
+import struct
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Tuple
+
+import numpy as np
+
+STREAM_MAGIC = b"PKS1"
+STREAM_SCALE = 65535.0
+MAX_CANVAS_SIDE = 2048
+MAX_TOTAL_POINTS = 20_000
+MAX_THICKNESS = 64
+SAMPLES_PER_PIXEL = 2  # Centerline samples per pixel of stroke length
+# About twice the ink of a canvas scribbled over completely with a 1 px pen
+MAX_TOTAL_SAMPLES = 4 * MAX_CANVAS_SIDE * MAX_CANVAS_SIDE
+# Pixel operations for stamping brushes, ~ a 64 px brush over a full canvas
+MAX_DILATION_WORK = 256 * MAX_CANVAS_SIDE * MAX_CANVAS_SIDE
+CHUNK_SAMPLES = 1 << 16
+
+_HEADER = struct.Struct("<4sHHH")
+_STROKE_HEADER = struct.Struct("<Hf")
+
+
+@dataclass
+class RasterStroke:
+    """A single stroke with normalized (N, 2) float32 points"""
+    points: np.ndarray
+    thickness: float = 2.0
+
+
+@dataclass
+class StrokeDrawing:
+    """A complete vector drawing"""
+    width: int = 512
+    height: int = 512
+    strokes: List[RasterStroke] = field(default_factory=list)
+
+    @property
+    def point_count(self) -> int:
+        return sum(len(stroke.points) for stroke in self.strokes)
+
+    def to_json(self) -> Dict[str, Any]:
+        """Compact replayable representation for storage"""
+        return {
+            "width": self.width,
+            "height": self.height,
+            "strokes": [
+                {
+                    "thickness": stroke.thickness,
+                    "points": np.round(stroke.points, 4).ravel().tolist()
+                }
+                for stroke in self.strokes
+            ]
+        }
+
+
+def from_point_lists(
+    width: int,
+    height: int,
+    strokes: List[Dict[str, Any]]
+) -> StrokeDrawing:
+    """Build a drawing from `{"points": [x0, y0, x1, y1, ...], "thickness": t}` dicts"""
+    drawing = StrokeDrawing(width=width, height=height)
+
+    for stroke in strokes:
+        points = np.asarray(stroke["points"], dtype=np.float32)
+        if points.size % 2 != 0:
+            raise ValueError("Stroke points must be a flat list of x, y pairs")
+        drawing.strokes.append(RasterStroke(
+            points=np.clip(points.reshape(-1, 2), 0.0, 1.0),
+            thickness=float(stroke.get("thickness", 2.0))
+        ))
+
+    _validate(drawing)
+    return drawing
+
+
+def decode_stroke_stream(data: bytes) -> StrokeDrawing:
+    """Decode the binary point stream described in the module docstring"""
+    if len(data) < _HEADER.size:
+        raise ValueError("Stroke stream is too short")
+
+    magic, width, height, stroke_count = _HEADER.unpack_from(data, 0)
+    if magic != STREAM_MAGIC:
+        raise ValueError("Stroke stream has an unknown format")
+
+    drawing = StrokeDrawing(width=width, height=height)
+    offset = _HEADER.size
+
+    for _ in range(stroke_count):
+        if offset + _STROKE_HEADER.size > len(data):
+            raise ValueError("Stroke stream is truncated")
+        point_count, thickness = _STROKE_HEADER.unpack_from(data, offset)
+        offset += _STROKE_HEADER.size
+
+        end = offset + point_count * 4
+        if end > len(data):
+            raise ValueError("Stroke stream is truncated")
+
+        raw = np.frombuffer(data, dtype="<u2", count=point_count * 2, offset=offset)
+        points = raw.astype(np.float32).reshape(-1, 2) / STREAM_SCALE
+        drawing.strokes.append(RasterStroke(points=points, thickness=float(thickness)))
+        offset = end
+
+    _validate(drawing)
+    return drawing
+
+
+def rasterize(drawing: StrokeDrawing, background: int = 255, ink: int = 0) -> np.ndarray:
+    """Render a drawing into a (height, width) uint8 grayscale array"""
+    width, height = drawing.width, drawing.height
+    inked = np.zeros((height, width), dtype=bool)
+
+    # Stamp each brush radius once, only over the area its strokes cover
+    for radius, strokes in _strokes_by_radius(drawing).items():
+        left, top, right, bottom = _ink_bounds(strokes, width, height, radius)
+        mask = np.zeros((bottom - top, right - left), dtype=bool)
+        for stroke in strokes:
+            for pixels in _stroke_centerline(stroke.points, width, height):
+                mask[pixels[:, 1] - top, pixels[:, 0] - left] = True
+        inked[top:bottom, left:right] |= _dilate_disc(mask, radius)
+
+    canvas = np.full((height, width), background, dtype=np.uint8)
+    canvas[inked] = ink
+    return canvas
+
+
+def _brush_radius(stroke: RasterStroke) -> int:
+    return max(1, int(round(stroke.thickness)))
+
+
+def _strokes_by_radius(drawing: StrokeDrawing) -> Dict[int, List[RasterStroke]]:
+    groups: Dict[int, List[RasterStroke]] = defaultdict(list)
+    for stroke in drawing.strokes:
+        if len(stroke.points):
+            groups[_brush_radius(stroke)].append(stroke)
+    return groups
+
+
+def _to_pixels(points: np.ndarray, width: int, height: int) -> np.ndarray:
+    # Flip y: Unity's origin is bottom-left, image rows start at the top
+    scaled = np.empty_like(points, dtype=np.float32)
+    scaled[:, 0] = points[:, 0] * (width - 1)
+    scaled[:, 1] = (1.0 - points[:, 1]) * (height - 1)
+    return scaled
+
+
+def _ink_bounds(strokes: List[RasterStroke], width: int, height: int, radius: int) -> Tuple[int, int, int, int]:
+    """(left, top, right, bottom) of the strokes' pixels grown by the brush radius, clipped to the canvas"""
+    lows, highs = [], []
+    for stroke in strokes:
+        pixels = np.rint(_to_pixels(stroke.points, width, height)).astype(np.int64)
+        lows.append(pixels.min(axis=0))
+        highs.append(pixels.max(axis=0))
+    (left, top), (right, bottom) = np.min(lows, axis=0), np.max(highs, axis=0)
+    return (
+        max(0, int(left) - radius),
+        max(0, int(top) - radius),
+        min(width, int(right) + radius + 1),
+        min(height, int(bottom) + radius + 1)
+    )
+
+
+def _segment_samples(scaled: np.ndarray) -> np.ndarray:
+    """Number of samples per segment of a stroke in pixel coordinates"""
+    deltas = np.diff(scaled, axis=0)
+    lengths = np.hypot(deltas[:, 0], deltas[:, 1])
+    return np.ceil(lengths * SAMPLES_PER_PIXEL).astype(np.int64) + 1
+
+
+def _stroke_centerline(points: np.ndarray, width: int, height: int) -> Iterator[np.ndarray]:
+    """Sample every segment at sub-pixel spacing, yielding (x, y) pixel coordinates in chunks"""
+    scaled = _to_pixels(points, width, height)
+
+    if len(scaled) == 1:
+        yield np.rint(scaled).astype(np.int64)
+        return
+
+    starts = scaled[:-1]
+    deltas = np.diff(scaled, axis=0)
+    samples = _segment_samples(scaled)
+    ends = np.cumsum(samples)
+
+    # Consecutive segments up to CHUNK_SAMPLES samples at a time (a single
+    # segment is at most a canvas diagonal long)
+    first = 0
+    while first < len(samples):
+        last = max(first + 1, int(np.searchsorted(ends, ends[first] - samples[first] + CHUNK_SAMPLES, side="right")))
+        yield _sample_segments(starts[first:last], deltas[first:last], samples[first:last])
+        first = last
+
+
+def _sample_segments(starts: np.ndarray, deltas: np.ndarray, samples: np.ndarray) -> np.ndarray:
+    segment_index = np.repeat(np.arange(len(starts)), samples)
+    first_sample = np.repeat(np.cumsum(samples) - samples, samples)
+    t = (np.arange(samples.sum()) - first_sample) / np.maximum(samples[segment_index] - 1, 1)
+
+    line = starts[segment_index] + deltas[segment_index] * t[:, None].astype(np.float32)
+    return np.rint(line).astype(np.int64)
+
+
+def _dilate_disc(mask: np.ndarray, radius: int) -> np.ndarray:
+    """Binary dilation with a disc, built from O(radius) shifted ORs"""
+    height, width = mask.shape
+    padded = np.pad(mask, radius)
+
+    # Disc rows by half width, so the mask only needs widening once per width
+    rows_by_half_width: Dict[int, List[int]] = defaultdict(list)
+    for dy in range(-radius, radius + 1):
+        rows_by_half_width[int(np.sqrt(radius * radius - dy * dy))].append(dy)
+
+    result = np.zeros((height, width), dtype=bool)
+    widened = padded.copy()  # mask dilated horizontally by w pixels
+    for w in range(radius + 1):
+        if w:
+            widened[:, w:] |= padded[:, :-w]
+            widened[:, :-w] |= padded[:, w:]
+        for dy in rows_by_half_width.get(w, ()):
+            result |= widened[radius + dy:radius + dy + height, radius:radius + width]
+    return result
+
+
+def _validate(drawing: StrokeDrawing) -> None:
+    if not (1 <= drawing.width <= MAX_CANVAS_SIDE and 1 <= drawing.height <= MAX_CANVAS_SIDE):
+        raise ValueError(f"Canvas must be between 1 and {MAX_CANVAS_SIDE} pixels per side")
+    if drawing.point_count > MAX_TOTAL_POINTS:
+        raise ValueError(f"Drawing has more than {MAX_TOTAL_POINTS} points")
+    for stroke in drawing.strokes:
+        if not 0 < stroke.thickness <= MAX_THICKNESS:
+            raise ValueError(f"Stroke thickness must be between 0 and {MAX_THICKNESS}")
+
+    # Checked before anything canvas-sized is allocated
+    width, height = drawing.width, drawing.height
+    total_samples = sum(
+        int(_segment_samples(_to_pixels(stroke.points, width, height)).sum())
+        for stroke in drawing.strokes if len(stroke.points) > 1
+    )
+    if total_samples > MAX_TOTAL_SAMPLES:
+        raise ValueError("Drawing strokes are too long")
+
+    dilation_work = 0
+    for radius, strokes in _strokes_by_radius(drawing).items():
+        left, top, right, bottom = _ink_bounds(strokes, width, height, radius)
+        dilation_work += 3 * (radius + 1) * (right - left) * (bottom - top)
+    if dilation_work > MAX_DILATION_WORK:
+        raise ValueError("Drawing uses too many large brushes")
@@ -0,0 +1,143 @@
+"""
+Shared helpers for the backend-v2 benchmarks: environment, stats and baselines
+"""
+import json
+import os
+import platform
+import sys
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(BENCH_DIR)
+BASELINE_DIR = os.path.join(BENCH_DIR, "baselines")
+RESULTS_DIR = os.path.join(BENCH_DIR, "results")
+
+# Enough configuration for app.config.settings to load without a real .env
+BENCH_ENV = {
+    "SUPABASE_URL": "http://localhost",
+    "SUPABASE_ANON_KEY": "bench",
+    "SUPABASE_SERVICE_KEY": "bench",
+    "API_KEY": "bench",
+    "OPENAI_API_KEY": "",
+    "ANTHROPIC_API_KEY": "",
+    "FAKE_PROVIDER_ENABLED": "true",
+    "DEFAULT_AI_PROVIDER": "fake",
+    "LOG_LEVEL": "WARNING"
+}
+
+
+def bench_env(database_url: str, **overrides: str) -> Dict[str, str]:
+    """Environment for a benchmark run; real shell variables win over defaults"""
+    env = dict(os.environ)
+    for key, value in BENCH_ENV.items():
+        env.setdefault(key, value)
+    env["DATABASE_URL"] = database_url
+    env.update(overrides)
+    return env
+
+
+def use_bench_env(database_url: str, **overrides: str) -> None:
+    """Apply `bench_env` to this process; call before importing `app`"""
+    os.environ.update(bench_env(database_url, **overrides))
+    if BACKEND_DIR not in sys.path:
+        sys.path.insert(0, BACKEND_DIR)
+
+
+def prepare_database() -> None:
+    """Create tables and seed the default decks (requires `use_bench_env`)"""
+    import contextlib
+    import io
+
+    from app.models.database import Base, engine
+    sys.path.insert(0, os.path.join(BACKEND_DIR, "scripts"))
+    from seed_decks import seed_decks
+
+    Base.metadata.create_all(bind=engine)
+    with contextlib.redirect_stdout(io.StringIO()):
+        seed_decks()
+
+
+def percentile(sorted_values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    rank = max(1, int(round(pct / 100 * len(sorted_values) + 0.5)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def latency_summary(latencies_ms: List[float]) -> Dict[str, Optional[float]]:
+    ordered = sorted(latencies_ms)
+    return {
+        "mean_ms": round(sum(ordered) / len(ordered), 2) if ordered else None,
+        "p50_ms": round(percentile(ordered, 50), 2) if ordered else None,
+        "p95_ms": round(percentile(ordered, 95), 2) if ordered else None,
+        "p99_ms": round(percentile(ordered, 99), 2) if ordered else None,
+        "max_ms": round(ordered[-1], 2) if ordered else None
+    }
+
+
+def environment_info() -> Dict[str, str]:
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "generated_at": datetime.utcnow().isoformat()
+    }
+
+
+def write_results(name: str, results: Dict[str, Any]) -> str:
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    path = os.path.join(RESULTS_DIR, f"{name}-{datetime.utcnow():%Y%m%dT%H%M%S}.json")
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2)
+    return path
+
+
+def load_baseline(name: str) -> Optional[Dict[str, Any]]:
+    path = os.path.join(BASELINE_DIR, f"{name}.json")
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_baseline(name: str, results: Dict[str, Any]) -> str:
+    os.makedirs(BASELINE_DIR, exist_ok=True)
+    path = os.path.join(BASELINE_DIR, f"{name}.json")
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2)
+        f.write("\n")
+    return path
+
+
+def compare_metric(
+    label: str,
+    current: Optional[float],
+    baseline: Optional[float],
+    tolerance: float,
+    higher_is_better: bool = False
+) -> Optional[str]:
+    """Return a regression message if `current` is worse than `baseline` beyond `tolerance`"""
+    if current is None or baseline is None or baseline == 0:
+        return None
+    if higher_is_better:
+        limit = baseline * (1 - tolerance)
+        if current < limit:
+            return f"{label}: {current:.2f} < {limit:.2f} (baseline {baseline:.2f})"
+    else:
+        limit = baseline * (1 + tolerance)
+        if current > limit:
+            return f"{label}: {current:.2f} > {limit:.2f} (baseline {baseline:.2f})"
+    return None
+
+
+def report_regressions(regressions: List[str]) -> int:
+    """Print regressions and return the process exit code"""
+    if not regressions:
+        print("\n✅ No regressions against baseline")
+        return 0
+    print(f"\n❌ {len(regressions)} regression(s) against baseline:")
+    for regression in regressions:
+        print(f"  - {regression}")
+    return 1
@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+"""
+End-to-end load test: realistic game traffic against a local backend-v2
+
+Starts the app with uvicorn in a subprocess (SQLite by default, or any
+DATABASE_URL such as a local Postgres), using the fake AI provider. Each
+simulated player plays complete games: prompts -> analyze -> save for every
+round, then fetches /stats at the end of the game.
+
+Throughput and p50/p95/p99 per endpoint are compared with the committed
+baseline in benchmarks/baselines/load_test.json; the exit code is 1 on regression.
+
+Examples:
+    uv run python benchmarks/load_test.py
+    uv run python benchmarks/load_test.py --players 50 --duration 60
+    uv run python benchmarks/load_test.py --database-url postgresql://postgres@localhost/bench
+    uv run python benchmarks/load_test.py --update-baseline
+"""
+import argparse
+import asyncio
+import base64
+import io
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+from common import (
+    BACKEND_DIR,
+    bench_env,
+    compare_metric,
+    environment_info,
+    latency_summary,
+    load_baseline,
+    prepare_database,
+    report_regressions,
+    save_baseline,
+    use_bench_env,
+    write_results
+)
+
+BASELINE_NAME = "load_test"
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def sample_drawing(seed: int, size: int = 512) -> str:
+    """A sketch-like PNG comparable to what the Unity client uploads"""
+    from PIL import Image, ImageDraw
+
+    rng = random.Random(seed)
+    image = Image.new("RGBA", (size, size), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(image)
+    for _ in range(12):
+        points = [(rng.randrange(size), rng.randrange(size)) for _ in range(6)]
+        draw.line(points, fill=(0, 0, 0, 255), width=rng.choice((3, 5, 8)))
+
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG")
+    return base64.b64encode(buffer.getvalue()).decode("ascii")
+
+
+class Recorder:
+    """Collects per-endpoint latencies and failures"""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+
+    async def call(
+        self,
+        client: httpx.AsyncClient,
+        name: str,
+        method: str,
+        url: str,
+        **kwargs: Any
+    ) -> Optional[Dict[str, Any]]:
+        start = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+            elapsed = (time.perf_counter() - start) * 1000
+        except httpx.HTTPError:
+            self.errors[name] += 1
+            return None
+
+        self.latencies[name].append(elapsed)
+        if response.status_code >= 400:
+            self.errors[name] += 1
+            return None
+        return response.json()
+
+
+async def play_game(
+    client: httpx.AsyncClient,
+    recorder: Recorder,
+    rng: random.Random,
+    deck_id: int,
+    drawings: List[str],
+    rounds: int,
+    think_time: float
+) -> None:
+    """One player's game, mirroring the Unity client's call sequence"""
+    game_id = 0
+    recent: List[str] = []
+
+    for round_number in range(1, rounds + 1):
+        prompts = await recorder.call(client, "POST /decks/prompts", "POST", "/api/v2/decks/prompts", json={
+            "deck_id": deck_id,
+            "count": 4,
+            "exclude_recent": recent[-20:]
+        })
+        if not prompts:
+            return
+        options = prompts["prompts"]
+        recent.append(prompts["correct_prompt"])
+
+        drawing = rng.choice(drawings)
+        if think_time:
+            await asyncio.sleep(rng.uniform(0, think_time))
+
+        analysis = await recorder.call(client, "POST /analyze-drawing", "POST", "/api/v2/analyze-drawing", json={
+            "image_data": drawing,
+            "options": options
+        })
+
+        human_guess_index = rng.randrange(len(options))
+        saved = await recorder.call(client, "POST /save-game-round", "POST", "/api/v2/save-game-round", json={
+            "game_id": game_id,
+            "round_number": round_number,
+            "image_data": drawing,
+            "drawing_time_seconds": round(rng.uniform(10, 60), 1),
+            "all_options": options,
+            "correct_option": prompts["correct_prompt"],
+            "correct_option_index": prompts["correct_index"],
+            "human_guess": options[human_guess_index],
+            "human_guess_index": human_guess_index,
+            "human_is_correct": human_guess_index == prompts["correct_index"],
+            "ai_prompt_version": analysis["prompt_version"] if analysis else "v1"
+        })
+        if saved:
+            game_id = saved.get("game_id", game_id)
+
+    await recorder.call(client, "GET /stats", "GET", "/api/v2/stats")
+
+
+async def player(
+    index: int,
+    base_url: str,
+    recorder: Recorder,
+    deck_id: int,
+    drawings: List[str],
+    args: argparse.Namespace,
+    deadline: float
+) -> int:
+    rng = random.Random(args.seed * 1000 + index)
+    games = 0
+    headers = {"X-API-Key": os.environ["API_KEY"]}
+    async with httpx.AsyncClient(base_url=base_url, headers=headers, timeout=60) as client:
+        while time.monotonic() < deadline:
+            await play_game(client, recorder, rng, deck_id, drawings, args.rounds, args.think_time)
+            games += 1
+    return games
+
+
+def start_server(env: Dict[str, str], port: int, workers: int) -> subprocess.Popen:
+    command = [
+        sys.executable, "-m", "uvicorn", "app.main:app",
+        "--host", "127.0.0.1", "--port", str(port),
+        "--workers", str(workers), "--log-level", "warning"
+    ]
+    return subprocess.Popen(command, cwd=BACKEND_DIR, env=env)
+
+
+async def wait_until_ready(base_url: str, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        while time.monotonic() < deadline:
+            try:
+                if (await client.get("/health")).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError("Server did not become ready")
+
+
+async def find_deck_id(base_url: str) -> int:
+    async with httpx.AsyncClient(base_url=base_url, headers={"X-API-Key": os.environ["API_KEY"]}) as client:
+        decks = (await client.get("/api/v2/decks")).json()["decks"]
+    base = next((deck for deck in decks if deck["name"] == "Base Deck"), decks[0])
+    return base["id"]
+
+
+async def run_load(base_url: str, args: argparse.Namespace) -> Tuple[Recorder, float, int]:
+    await wait_until_ready(base_url)
+    deck_id = await find_deck_id(base_url)
+    drawings = [sample_drawing(seed) for seed in range(8)]
+
+    recorder = Recorder()
+    # Warm up connections, caches and the provider before measuring
+    await asyncio.gather(*(
+        player(i, base_url, Recorder(), deck_id, drawings, args, time.monotonic() + args.warmup)
+        for i in range(min(args.players, 4))
+    ))
+
+    started = time.monotonic()
+    deadline = started + args.duration
+    games = await asyncio.gather(*(
+        player(i, base_url, recorder, deck_id, drawings, args, deadline)
+        for i in range(args.players)
+    ))
+    return recorder, time.monotonic() - started, sum(games)
+
+
+def summarize(recorder: Recorder, elapsed: float, games: int, args: argparse.Namespace) -> Dict[str, Any]:
+    endpoints = {}
+    for name in sorted(set(recorder.latencies) | set(recorder.errors)):
+        latencies = recorder.latencies[name]
+        endpoints[name] = {
+            "requests": len(latencies),
+            "errors": recorder.errors[name],
+            "error_rate": round(recorder.errors[name] / max(len(latencies), 1), 4),
+            "throughput_rps": round(len(latencies) / elapsed, 2),
+            **latency_summary(latencies)
+        }
+
+    total = sum(len(latencies) for latencies in recorder.latencies.values())
+    return {
+        "config": {
+            "players": args.players,
+            "duration_s": args.duration,
+            "rounds": args.rounds,
+            "think_time_s": args.think_time,
+            "workers": args.workers,
+            "fake_latency_ms": args.fake_latency_ms,
+            "database": "postgres" if args.database_url else "sqlite",
+            "seed": args.seed
+        },
+        "environment": environment_info(),
+        "games": games,
+        "total_requests": total,
+        "throughput_rps": round(total / elapsed, 2),
+        "endpoints": endpoints
+    }
+
+
+def print_summary(results: Dict[str, Any]) -> None:
+    print(f"\n{results['games']} games, {results['total_requests']} requests, "
+          f"{results['throughput_rps']} req/s overall\n")
+    print(f"{'endpoint':<26} {'reqs':>7} {'err%':>6} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for name, stats in results["endpoints"].items():
+        print(
+            f"{name:<26} {stats['requests']:>7} {stats['error_rate']:>6.1%} {stats['throughput_rps']:>8} "
+            f"{stats['p50_ms'] or 0:>8} {stats['p95_ms'] or 0:>8} {stats['p99_ms'] or 0:>8}"
+        )
+
+
+def find_regressions(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    if baseline["config"] != results["config"]:
+        print("⚠️  Baseline was recorded with a different configuration; comparison is approximate")
+
+    regressions = []
+    message = compare_metric(
+        "overall throughput_rps", results["throughput_rps"], baseline["throughput_rps"],
+        tolerance, higher_is_better=True
+    )
+    if message:
+        regressions.append(message)
+
+    for name, base_stats in baseline["endpoints"].items():
+        stats = results["endpoints"].get(name)
+        if stats is None:
+            regressions.append(f"{name}: no requests recorded")
+            continue
+        for metric in ("p50_ms", "p95_ms", "p99_ms"):
+            message = compare_metric(f"{name} {metric}", stats[metric], base_stats[metric], tolerance)
+            if message:
+                regressions.append(message)
+        if stats["error_rate"] > base_stats["error_rate"] + 0.01:
+            regressions.append(f"{name} error_rate: {stats['error_rate']:.2%} (baseline {base_stats['error_rate']:.2%})")
+    return regressions
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--players", type=int, default=20, help="Concurrent simulated players")
+    parser.add_argument("--duration", type=float, default=30.0, help="Measured seconds")
+    parser.add_argument("--warmup", type=float, default=3.0, help="Unmeasured warm-up seconds")
+    parser.add_argument("--rounds", type=int, default=5, help="Rounds per game")
+    parser.add_argument("--think-time", type=float, default=0.0, help="Max random pause before analyzing (seconds)")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--fake-latency-ms", type=float, default=300.0, help="Median fake provider latency")
+    parser.add_argument("--database-url", help="Use this database instead of a fresh SQLite file")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative regression (default 25%%)")
+    parser.add_argument("--update-baseline", action="store_true", help="Overwrite the committed baseline")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = args.database_url or f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        overrides = {
+            "FAKE_LATENCY_MS": str(args.fake_latency_ms),
+            "FAKE_SEED": str(args.seed)
+        }
+        use_bench_env(database_url, **overrides)
+        prepare_database()
+
+        port = free_port()
+        server = start_server(bench_env(database_url, **overrides), port, args.workers)
+        try:
+            recorder, elapsed, games = asyncio.run(run_load(f"http://127.0.0.1:{port}", args))
+        finally:
+            server.terminate()
+            server.wait(timeout=10)
+
+    results = summarize(recorder, elapsed, games, args)
+    print_summary(results)
+    print(f"\nResults written to {write_results(BASELINE_NAME, results)}")
+
+    if args.update_baseline:
+        print(f"📌 Baseline updated: {save_baseline(BASELINE_NAME, results)}")
+        return 0
+
+    baseline = load_baseline(BASELINE_NAME)
+    if baseline is None:
+        print("No baseline committed yet; run with --update-baseline")
+        return 0
+    return report_regressions(find_regressions(results, baseline, args.tolerance))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Microbenchmarks for hot paths that run on every request
+
+Each case is timed with `timeit` (best-of-N repeats of an auto-sized loop) and
+reported in microseconds per call, along with the peak memory allocated by
+one call (tracemalloc). Results are compared with the committed
+baseline in benchmarks/baselines/microbench.json; the exit code is 1 on regression.
+
+Examples:
+    uv run python benchmarks/microbench.py
+    uv run python benchmarks/microbench.py --filter deck
+    uv run python benchmarks/microbench.py --update-baseline
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import timeit
+import tracemalloc
+from typing import Any, Callable, Dict, List
+
+from common import (
+    compare_metric,
+    environment_info,
+    load_baseline,
+    prepare_database,
+    report_regressions,
+    save_baseline,
+    use_bench_env,
+    write_results
+)
+
+BASELINE_NAME = "microbench"
+
+OPTIONS = ["Secret agent", "Rockstar", "Grandma", "Clown"]
+
+V2_RESPONSE = (
+    "2\nThe drawing shows a figure with curly hair, glasses and a walking stick. "
+    "These features most likely represent an elderly woman, so the answer is Grandma."
+)
+V3_RESPONSE = json.dumps({
+    "index": 2,
+    "reasoning": "Curly hair, glasses and a walking stick suggest an elderly woman.",
+    "confidence": "high",
+    "visual_elements": ["curly hair", "glasses", "walking stick"]
+}, indent=4)
+
+
+def build_cases() -> Dict[str, Callable[[], Any]]:
+    """Set up the benchmark cases; imports happen after the bench env is applied"""
+    from datetime import datetime
+
+    import numpy as np
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import JSONResponse
+    from pydantic import TypeAdapter
+
+    from app.api.routing import FastJSONResponse
+    from app.models.database import SessionLocal, Deck
+    from app.schemas.requests import PromptWeighting
+    from app.schemas.responses import DeckWithItemsResponse
+    from app.services.deck_service import DeckService
+    from app.services.guess_parser import GuessStreamParser, parse_guess_response
+    from app.services.prompt_manager import PromptManager
+    from app.services.prompt_sampler import AliasTable
+
+    prompt_manager = PromptManager()
+    db = SessionLocal()
+    deck_service = DeckService(db)
+    deck_id = db.query(Deck.id).filter(Deck.name == "Base Deck").scalar()
+    recent = deck_service.get_random_prompts(count=10, deck_id=deck_id)["prompts"]
+
+    rng = np.random.default_rng(0)
+    big_table = AliasTable(list(range(100_000)), rng.random(100_000).tolist())
+
+    deck = DeckWithItemsResponse(**deck_service.get_deck_with_items(deck_id))
+    deck_adapter = TypeAdapter(DeckWithItemsResponse)
+    logs = [
+        {"id": i, "created_at": datetime(2024, 1, 1, 12, i % 60), "ai_provider": "openai", "ai_model": "gpt-4o",
+         "prompt_version": "v1", "success": True, "guess_index": i % 4, "guess_text": "Grandma",
+         "confidence": 0.9, "response_time_ms": 812, "tokens_used": 320, "options": OPTIONS}
+        for i in range(500)
+    ]
+
+    def fastapi_model_response() -> None:
+        # What FastAPI does for a response_model route: validate, dump, json.dumps
+        JSONResponse(deck_adapter.dump_python(deck_adapter.validate_python(deck), mode="json"))
+
+    def stream_parse() -> None:
+        parser = GuessStreamParser()
+        for i in range(0, len(V2_RESPONSE), 4):
+            parser.feed(V2_RESPONSE[i:i + 4])
+
+    return {
+        "prompt_manager.get_drawing_analysis_prompt[v1]":
+            lambda: prompt_manager.get_drawing_analysis_prompt("v1", OPTIONS),
+        "prompt_manager.get_drawing_analysis_prompt[v3]":
+            lambda: prompt_manager.get_drawing_analysis_prompt("v3", OPTIONS),
+        "parse_guess_response[v2 text]":
+            lambda: parse_guess_response(V2_RESPONSE),
+        "parse_guess_response[v3 json]":
+            lambda: parse_guess_response(V3_RESPONSE),
+        "guess_stream_parser[v2, 4-char deltas]":
+            stream_parse,
+        "deck_service.get_random_prompts[base deck]":
+            lambda: deck_service.get_random_prompts(count=4, deck_id=deck_id),
+        "deck_service.get_random_prompts[base deck, exclude 10]":
+            lambda: deck_service.get_random_prompts(count=4, deck_id=deck_id, exclude_recent=recent),
+        "deck_service.get_random_prompts[base deck, session shuffle]":
+            lambda: deck_service.get_random_prompts(count=4, deck_id=deck_id, session_key="bench"),
+        "deck_service.get_random_prompts[base deck, human_over_ai]":
+            lambda: deck_service.get_random_prompts(count=4, deck_id=deck_id, weighting=PromptWeighting.HUMAN_OVER_AI),
+        "alias_table.sample_distinct[100k items, k=4]":
+            lambda: big_table.sample_distinct(rng, 4),
+        f"response.deck_with_items[{len(deck.items)} items, fastapi default]":
+            fastapi_model_response,
+        f"response.deck_with_items[{len(deck.items)} items, fast json]":
+            lambda: FastJSONResponse(deck),
+        "response.analysis_logs[500 dicts, fastapi default]":
+            lambda: JSONResponse(jsonable_encoder(logs)),
+        "response.analysis_logs[500 dicts, fast json]":
+            lambda: FastJSONResponse(logs)
+    }
+
+
+def time_case(func: Callable[[], Any], repeat: int, min_time: float) -> Dict[str, float]:
+    timer = timeit.Timer(func)
+    number, elapsed = timer.autorange()
+    # Scale the loop so each repeat runs for at least `min_time`
+    if elapsed < min_time:
+        number = max(1, int(number * min_time / max(elapsed, 1e-9)))
+    runs = [total / number * 1e6 for total in timer.repeat(repeat=repeat, number=number)]
+    runs.sort()
+
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "best_us": round(runs[0], 3),
+        "median_us": round(runs[len(runs) // 2], 3),
+        "peak_kib": round(peak / 1024, 1),
+        "loops": number
+    }
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--filter", help="Only run cases whose name contains this text")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.2, help="Minimum seconds per repeat")
+    parser.add_argument("--tolerance", type=float, default=0.30, help="Allowed relative regression (default 30%%)")
+    parser.add_argument("--update-baseline", action="store_true", help="Overwrite the committed baseline")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        use_bench_env(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        prepare_database()
+
+        cases = build_cases()
+        if args.filter:
+            cases = {name: func for name, func in cases.items() if args.filter in name}
+
+        timings: Dict[str, Dict[str, float]] = {}
+        print(f"{'case':<60} {'best µs':>10} {'median µs':>10} {'peak KiB':>10}")
+        for name, func in cases.items():
+            timings[name] = time_case(func, args.repeat, args.min_time)
+            stats = timings[name]
+            print(f"{name:<60} {stats['best_us']:>10} {stats['median_us']:>10} {stats['peak_kib']:>10}")
+
+    results = {"environment": environment_info(), "cases": timings}
+    print(f"\nResults written to {write_results(BASELINE_NAME, results)}")
+
+    if args.update_baseline:
+        baseline = load_baseline(BASELINE_NAME) or {"cases": {}}
+        baseline["environment"] = results["environment"]
+        baseline["cases"].update(timings)  # Keep cases skipped by --filter
+        print(f"📌 Baseline updated: {save_baseline(BASELINE_NAME, baseline)}")
+        return 0
+
+    baseline = load_baseline(BASELINE_NAME)
+    if baseline is None:
+        print("No baseline committed yet; run with --update-baseline")
+        return 0
+
+    regressions: List[str] = []
+    for name, stats in timings.items():
+        base_stats = baseline["cases"].get(name)
+        if base_stats:
+            # Best-of-N is the most stable estimate of the true cost
+            message = compare_metric(name, stats["best_us"], base_stats["best_us"], args.tolerance)
+            if message:
+                regressions.append(message)
+    return report_regressions(regressions)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,23 +6,21 @@ import sys
 import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
-from app.models.database import SessionLocal, Deck, DeckItem
+from app.models.database import SessionLocal
+from app.services.deck_cache import deck_cache
+from app.services.deck_seeding import clear_decks
 
 
 def clear_existing_decks():
-    """Remove all existing decks and deck items"""
+    """Remove all existing decks and deck items (TRUNCATE on Postgres)"""
     db = SessionLocal()
     
     try:
-        # Delete all deck items first (foreign key constraint)
-        deleted_items = db.query(DeckItem).delete()
+        deleted_decks, deleted_items = clear_decks(db)
+        db.commit()
+        deck_cache.invalidate()
         print(f"Deleted {deleted_items} deck items")
-        
-        # Delete all decks
-        deleted_decks = db.query(Deck).delete()
         print(f"Deleted {deleted_decks} decks")
-        
-        db.commit()
         print("✅ Successfully cleared all existing deck data from Supabase")
         
     except Exception as e:
@@ -33,4 +31,4 @@ def clear_existing_decks():
 
 
 if __name__ == "__main__":
-    clear_existing_decks()
\ No newline at end of file
+    clear_existing_decks()
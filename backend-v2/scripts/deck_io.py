@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Bulk import and export of deck items as CSV or NDJSON
+
+Imports stream the file in multi-row INSERT batches inside one transaction and
+skip prompts the deck already has, so re-running an import is harmless. A deck
+created with --create is part of the same transaction: a failed import leaves
+no empty deck behind. The format follows the file extension unless --format is
+given; a CSV header is detected unless --header or --no-header is given.
+
+Examples:
+    python scripts/deck_io.py import ../backend/clues.csv --deck "Base Deck" --create --difficulty mixed
+    python scripts/deck_io.py import extra.ndjson --deck-id 3
+    python scripts/deck_io.py import words.csv --deck-id 3 --no-header
+    python scripts/deck_io.py export --deck "Base Deck" -o base.csv
+    python scripts/deck_io.py export --deck-id 3 --format ndjson > deck3.ndjson
+"""
+import argparse
+import sys
+import os
+import time
+from typing import Optional
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app.config import settings
+from app.models.database import SessionLocal, Deck
+from app.schemas.requests import CreateDeckRequest
+from app.services.deck_service import DeckService
+from app.services.deck_transfer import FORMATS, DeckImportError, detect_format
+
+
+def resolve_deck(db, args: argparse.Namespace) -> Optional[Deck]:
+    if args.deck_id is not None:
+        return db.query(Deck).filter(Deck.id == args.deck_id).first()
+    return db.query(Deck).filter(Deck.name == args.deck).first()
+
+
+def run_import(args: argparse.Namespace) -> int:
+    fmt = args.format or detect_format(filename=args.path)
+    db = SessionLocal()
+    created = False
+    try:
+        deck = resolve_deck(db, args)
+        if deck is None:
+            if not (args.create and args.deck):
+                print("❌ Deck not found (use --create with --deck to create it)", file=sys.stderr)
+                return 1
+            # Staged only: committed by import_items together with the items
+            deck = DeckService(db).add_deck(CreateDeckRequest(
+                name=args.deck,
+                description=args.description,
+                category=args.category,
+                difficulty="medium"
+            ))
+            if args.difficulty:
+                # CreateDeckRequest only allows easy/medium/hard; the seed decks use "mixed"
+                deck.difficulty = args.difficulty
+            created = True
+
+        start = time.perf_counter()
+        with open(args.path, encoding="utf-8-sig", newline="") as source:
+            result = DeckService(db).import_items(deck.id, source, fmt, args.batch_size, args.header)
+        elapsed = time.perf_counter() - start
+    except DeckImportError as e:
+        print(f"❌ {args.path}: {e} (nothing imported)", file=sys.stderr)
+        return 1
+    finally:
+        db.close()
+
+    if created:
+        print(f"Created deck: {result['deck'].name} (id {result['deck'].id})")
+    print(
+        f"✅ {result['items_added']} items added to {result['deck'].name}, "
+        f"{result['duplicates_skipped']} duplicates skipped, "
+        f"{result['rows_read']} rows read in {elapsed:.2f}s "
+        f"({result['deck'].total_items} items total)"
+    )
+    return 0
+
+
+def run_export(args: argparse.Namespace) -> int:
+    fmt = args.format or detect_format(filename=args.output)
+    db = SessionLocal()
+    try:
+        deck = resolve_deck(db, args)
+        if deck is None:
+            print("❌ Deck not found", file=sys.stderr)
+            return 1
+
+        output = open(args.output, "wb") if args.output else sys.stdout.buffer
+        try:
+            for chunk in DeckService(db).export_items(deck.id, fmt, args.batch_size):
+                output.write(chunk)
+        finally:
+            if args.output:
+                output.close()
+    finally:
+        db.close()
+
+    if args.output:
+        print(f"✅ Exported {deck.name} to {args.output}", file=sys.stderr)
+    return 0
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    for name in ("import", "export"):
+        command = commands.add_parser(name)
+        target = command.add_mutually_exclusive_group(required=True)
+        target.add_argument("--deck", help="Deck name")
+        target.add_argument("--deck-id", type=int, help="Deck ID")
+        command.add_argument("--format", choices=FORMATS, help="Default: from the file extension, else csv")
+        command.add_argument("--batch-size", type=int, default=settings.deck_import_batch_size)
+        if name == "import":
+            command.add_argument("path", help="CSV or NDJSON file")
+            command.add_argument("--create", action="store_true", help="Create the deck named by --deck if missing")
+            command.add_argument("--description", help="Description of a created deck")
+            command.add_argument("--category", default="custom", help="Category of a created deck")
+            command.add_argument("--difficulty", help="Difficulty of a created deck and its items (default medium)")
+            header = command.add_mutually_exclusive_group()
+            header.add_argument("--header", dest="header", action="store_const", const=True,
+                                help="The first CSV row is a header")
+            header.add_argument("--no-header", dest="header", action="store_const", const=False,
+                                help="The first CSV row is a prompt")
+        else:
+            command.add_argument("-o", "--output", help="Output file (default: stdout)")
+
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    sys.exit(run_import(args) if args.command == "import" else run_export(args))
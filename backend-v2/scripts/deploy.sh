@@ -26,16 +26,22 @@ if [ "$ENVIRONMENT" = "development" ] && [ ! -f ".env" ]; then
     exit 1
 fi
 
-# Function to run database migrations/seeding
+# Function to run database migrations (production does not create tables at startup)
+run_migrations() {
+    echo "📦 Migrating database schema..."
+    # Stamps a database created before migrations existed, then upgrades to head
+    docker-compose -f docker-compose.prod.yml exec backend-v2 uv run python scripts/migrate.py
+}
+
+# Function to run database seeding
 run_database_setup() {
     echo "📦 Setting up database..."
     
+    # Sync only applies what changed, keeping play statistics and session orders
     if [ "$ENVIRONMENT" = "production" ]; then
-        docker-compose -f docker-compose.prod.yml exec backend-v2 uv run python scripts/clear_decks.py
-        docker-compose -f docker-compose.prod.yml exec backend-v2 uv run python scripts/seed_decks.py
+        docker-compose -f docker-compose.prod.yml exec backend-v2 uv run python scripts/seed_decks.py --sync
     else
-        docker-compose exec backend-v2 uv run python scripts/clear_decks.py
-        docker-compose exec backend-v2 uv run python scripts/seed_decks.py
+        docker-compose exec backend-v2 uv run python scripts/seed_decks.py --sync
     fi
     
     echo "✅ Database setup completed"
@@ -81,6 +87,8 @@ deploy_production() {
     echo "⏳ Waiting for service to start..."
     sleep 15
     
+    run_migrations
+    
     # Check health
     if curl -f http://localhost/api/v2/health > /dev/null 2>&1; then
         echo "✅ Production deployment successful!"
@@ -109,7 +117,7 @@ case $ENVIRONMENT in
 esac
 
 # Optionally run database setup
-read -p "🗄️ Do you want to seed the database with default decks? (y/n): " -n 1 -r
+read -p "🗄️ Do you want to sync the default decks (keeps play statistics)? (y/n): " -n 1 -r
 echo
 if [[ $REPLY =~ ^[Yy]$ ]]; then
     run_database_setup
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Export game rounds or analysis logs for a time range as Parquet or Arrow IPC
+
+Rows are read with a server-side cursor and written batch by batch, so memory
+stays flat whatever the range. Base64 images are left out unless
+--include-images is given. Needs the "analytics" extra (pyarrow).
+
+Examples:
+    python scripts/export_analytics.py game_rounds --start 2026-09-01 --end 2026-10-01 -o rounds.parquet
+    python scripts/export_analytics.py analysis_logs --start 2026-10-01 --format arrow -o logs.arrows
+    python scripts/export_analytics.py game_rounds --since-days 7 > last_week.parquet
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app.models.database import SessionLocal
+from app.services.analytics_export import DATASETS, write_export
+from app.services.columnar import FORMATS
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("dataset", choices=list(DATASETS))
+    range_group = parser.add_mutually_exclusive_group()
+    range_group.add_argument("--start", type=datetime.fromisoformat, help="Inclusive, ISO date or datetime (UTC)")
+    range_group.add_argument("--since-days", type=float, help="Start this many days ago")
+    parser.add_argument("--end", type=datetime.fromisoformat, help="Exclusive, ISO date or datetime (UTC)")
+    parser.add_argument("--format", choices=FORMATS, help="Default: from the output extension, else parquet")
+    parser.add_argument("--include-images", action="store_true", help="Also export base64 image_data")
+    parser.add_argument("-o", "--output", help="Output file (default: stdout)")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    start = args.start
+    if args.since_days is not None:
+        start = datetime.utcnow() - timedelta(days=args.since_days)
+    fmt = args.format or ("arrow" if args.output and args.output.endswith((".arrow", ".arrows")) else "parquet")
+
+    began = time.perf_counter()
+    db = SessionLocal()
+    try:
+        rows = write_export(
+            db, args.dataset, args.output or sys.stdout.buffer, fmt,
+            start=start, end=args.end, include_images=args.include_images
+        )
+    finally:
+        db.close()
+
+    print(
+        f"✅ Exported {rows} {args.dataset} rows as {fmt}"
+        f"{' to ' + args.output if args.output else ''} in {time.perf_counter() - began:.1f}s",
+        file=sys.stderr
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
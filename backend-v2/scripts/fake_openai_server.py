@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Stand-in server speaking the OpenAI chat-completions wire format
+
+Point the real OpenAIProvider at it to load test the full stack, including the
+OpenAI client and HTTP connection handling, without keys or cost:
+
+    python scripts/fake_openai_server.py --port 9000 --latency-ms 600 --error-rate 0.02
+    OPENAI_API_KEY=fake OPENAI_BASE_URL=http://localhost:9000/v1 uv run python -m app.main
+
+Responses come from the same FakeCompletionGenerator as FakeProvider, so
+replaying the same traffic gives the same latencies, guesses, errors and token
+counts. Needs the backend's .env (it imports app settings).
+"""
+import argparse
+import asyncio
+import json
+import os
+import re
+import sys
+import time
+import uuid
+from collections import Counter
+from typing import Any, Dict, List
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from app.services.fake_provider import FakeCompletionGenerator, LATENCY_DISTRIBUTIONS
+
+# Options are listed as "0: cat" lines by PromptManager
+OPTION_LINE = re.compile(r"^(\d+): (.+)$", re.MULTILINE)
+
+
+def prompt_text(messages: List[Dict[str, Any]]) -> str:
+    """Concatenate the text parts of the chat messages"""
+    parts = []
+    for message in messages:
+        content = message.get("content")
+        if isinstance(content, str):
+            parts.append(content)
+        elif isinstance(content, list):
+            parts.extend(part.get("text", "") for part in content if part.get("type") == "text")
+    return "\n".join(parts)
+
+
+def image_fingerprint(messages: List[Dict[str, Any]]) -> str:
+    """The image URLs make each request's randomness depend on the drawing"""
+    urls = []
+    for message in messages:
+        content = message.get("content")
+        if isinstance(content, list):
+            urls.extend(part["image_url"]["url"] for part in content if part.get("type") == "image_url")
+    return "|".join(urls)
+
+
+def create_app(generator: FakeCompletionGenerator) -> FastAPI:
+    app = FastAPI(title="Fake OpenAI")
+    # Client retries resend the same body; count attempts so a retry gets a fresh draw
+    attempts: Counter = Counter()
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        messages = body.get("messages", [])
+        model = body.get("model", "fake-vision")
+        text = prompt_text(messages)
+        options = [option for _, option in OPTION_LINE.findall(text)]
+
+        key = f"{model}:{text}:{image_fingerprint(messages)}"
+        attempts[key] += 1
+        completion = generator.generate(
+            key=f"{key}:{attempts[key]}",
+            options=options,
+            json_format="JSON object" in text
+        )
+
+        if completion.error:
+            await asyncio.sleep(completion.latency_ms / 1000)
+            return JSONResponse(
+                status_code=500,
+                content={"error": {"message": completion.error, "type": "server_error", "code": None}}
+            )
+
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+        created = int(time.time())
+        usage = {
+            "prompt_tokens": completion.prompt_tokens,
+            "completion_tokens": completion.completion_tokens,
+            "total_tokens": completion.total_tokens
+        }
+
+        if not body.get("stream"):
+            await asyncio.sleep(completion.latency_ms / 1000)
+            return {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": completion.content},
+                    "finish_reason": "stop"
+                }],
+                "usage": usage
+            }
+
+        include_usage = (body.get("stream_options") or {}).get("include_usage", False)
+
+        async def event_stream():
+            def chunk(delta: Dict[str, Any], finish_reason=None, chunk_usage=None, choices=True) -> str:
+                payload = {
+                    "id": completion_id,
+                    "object": "chat.completion.chunk",
+                    "created": created,
+                    "model": model,
+                    "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}] if choices else []
+                }
+                if chunk_usage is not None:
+                    payload["usage"] = chunk_usage
+                return f"data: {json.dumps(payload)}\n\n"
+
+            pieces = [completion.content[i:i + 8] for i in range(0, len(completion.content), 8)]
+            # Roughly a third of the latency is time-to-first-token
+            await asyncio.sleep(completion.latency_ms * 0.3 / 1000)
+            yield chunk({"role": "assistant", "content": ""})
+            for piece in pieces:
+                await asyncio.sleep(completion.latency_ms * 0.7 / 1000 / len(pieces))
+                yield chunk({"content": piece})
+            yield chunk({}, finish_reason="stop")
+            if include_usage:
+                yield chunk({}, chunk_usage=usage, choices=False)
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+    @app.get("/v1/models")
+    async def models():
+        return {"object": "list", "data": [{"id": "fake-vision", "object": "model", "owned_by": "fake"}]}
+
+    return app
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--latency-distribution", choices=LATENCY_DISTRIBUTIONS, default="lognormal")
+    parser.add_argument("--latency-ms", type=float, default=800.0, help="Median/center latency")
+    parser.add_argument("--latency-jitter", type=float, default=0.35, help="Lognormal sigma or uniform +/- fraction")
+    parser.add_argument("--latencies-file", help="JSON list of recorded latencies for --latency-distribution replay")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with HTTP 500")
+    parser.add_argument("--prompt-tokens", type=int, default=850)
+    parser.add_argument("--completion-tokens", type=int, default=60)
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    args = parse_args()
+    recorded = None
+    if args.latencies_file:
+        with open(args.latencies_file) as f:
+            recorded = json.load(f)
+
+    generator = FakeCompletionGenerator(
+        latency_distribution=args.latency_distribution,
+        latency_ms=args.latency_ms,
+        latency_jitter=args.latency_jitter,
+        error_rate=args.error_rate,
+        prompt_tokens=args.prompt_tokens,
+        completion_tokens=args.completion_tokens,
+        seed=args.seed,
+        recorded_latencies=recorded
+    )
+    uvicorn.run(create_app(generator), host=args.host, port=args.port, log_level="warning")
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Recompute round scores and game totals from the stored round outcomes
+
+Each round's `round_score` is recomputed with the rule of
+`calculate_round_score` (+1 human right and AI wrong, -1 AI right and human
+wrong, 0 otherwise) and each game's `final_score` becomes the sum of its
+rounds. Both are set-based: per chunk of game ids one UPDATE fixes the rounds
+and one grouped aggregate feeds an `UPDATE ... FROM` for the games, each chunk
+in its own transaction. Only rows whose value actually changes are written, so
+re-running is cheap and an interrupted run can simply be started again.
+
+Examples:
+    python scripts/fix_scores.py --dry-run
+    python scripts/fix_scores.py --chunk-size 20000
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from sqlalchemy import and_, case, func, not_, select, update
+from sqlalchemy.engine import Connection
+
+from app.models.database import engine, Game, GameRound
+
+games = Game.__table__
+rounds = GameRound.__table__
+
+# Same rule as app.api.endpoints.calculate_round_score
+human_correct = func.coalesce(rounds.c.human_is_correct, False)
+ai_correct = func.coalesce(rounds.c.ai_is_correct, False)
+round_points = case(
+    (and_(human_correct, not_(ai_correct)), 1),
+    (and_(ai_correct, not_(human_correct)), -1),
+    else_=0
+)
+
+
+def fix_chunk(conn: Connection, low: int, high: int, dry_run: bool) -> tuple[int, int]:
+    """Fix games with low <= id < high; returns (rounds changed, games changed)"""
+    stale_rounds = and_(
+        rounds.c.game_id >= low,
+        rounds.c.game_id < high,
+        rounds.c.round_score.is_distinct_from(round_points)
+    )
+    # Left join so games without rounds get 0
+    totals = (
+        select(games.c.id.label("game_id"), func.coalesce(func.sum(round_points), 0).label("score"))
+        .select_from(games.outerjoin(rounds, rounds.c.game_id == games.c.id))
+        .where(games.c.id >= low, games.c.id < high)
+        .group_by(games.c.id)
+        .subquery()
+    )
+    stale_games = and_(games.c.id == totals.c.game_id, games.c.final_score.is_distinct_from(totals.c.score))
+
+    if dry_run:
+        return (
+            conn.execute(select(func.count()).select_from(rounds).where(stale_rounds)).scalar(),
+            conn.execute(select(func.count()).select_from(games.join(totals, games.c.id == totals.c.game_id)).where(stale_games)).scalar()
+        )
+
+    rounds_changed = conn.execute(update(rounds).values(round_score=round_points).where(stale_rounds)).rowcount
+    games_changed = conn.execute(update(games).values(final_score=totals.c.score).where(stale_games)).rowcount
+    return rounds_changed, games_changed
+
+
+def fix_scores(chunk_size: int = 50000, dry_run: bool = False) -> None:
+    start = time.perf_counter()
+    with engine.connect() as conn:
+        low_id, high_id, total_games = conn.execute(
+            select(func.min(games.c.id), func.max(games.c.id), func.count())
+        ).one()
+    if not total_games:
+        print("No games to fix")
+        return
+
+    verb = "would change" if dry_run else "fixed"
+    print(f"Fixing scores of {total_games} games (ids {low_id}-{high_id}) in chunks of {chunk_size}")
+    rounds_changed = games_changed = 0
+    for low in range(low_id, high_id + 1, chunk_size):
+        high = low + chunk_size
+        # One transaction per chunk
+        with engine.begin() as conn:
+            chunk_rounds, chunk_games = fix_chunk(conn, low, high, dry_run)
+        rounds_changed += chunk_rounds
+        games_changed += chunk_games
+        done = min(high, high_id + 1) - low_id
+        print(
+            f"  games {low}-{min(high, high_id + 1) - 1} ({done / (high_id + 1 - low_id):.0%}): "
+            f"{chunk_rounds} rounds, {chunk_games} games {verb} "
+            f"({time.perf_counter() - start:.1f}s)"
+        )
+
+    print(
+        f"✅ {'Dry run: ' if dry_run else ''}{rounds_changed} round scores and "
+        f"{games_changed} of {total_games} game scores {verb} in {time.perf_counter() - start:.1f}s"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunk-size", type=int, default=50000, help="Game ids per transaction")
+    parser.add_argument("--dry-run", action="store_true", help="Only count the scores that would change")
+    args = parser.parse_args()
+    fix_scores(args.chunk_size, args.dry_run)
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Bring the database schema to the latest Alembic revision
+
+`alembic upgrade head` alone fails on a database that has tables but no
+`alembic_version` row ("table already exists"). Before upgrading, such a
+database is stamped:
+
+- tables exactly matching the current models (created at startup with
+  DATABASE_AUTO_CREATE) are stamped at `head`;
+- only tables of the original schema (the old startup `create_all`) are
+  stamped at `baseline`, and the migrations after it then run;
+- anything else cannot be placed automatically: the run stops and the
+  revision has to be stamped by hand (see README, Database Setup).
+
+Examples:
+    python scripts/migrate.py
+    python scripts/migrate.py --dry-run
+"""
+import argparse
+import os
+import sys
+from typing import Optional
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.append(BACKEND_DIR)
+
+from alembic import command
+from alembic.autogenerate import compare_metadata
+from alembic.config import Config
+from alembic.migration import MigrationContext
+from sqlalchemy import create_engine, inspect
+from sqlalchemy.engine import Connection
+
+from app.config import settings
+from app.models.database import Base
+
+# Tables created by the `baseline` revision
+BASELINE_TABLES = {
+    "games", "game_rounds", "experiment_logs", "model_performance",
+    "api_metrics", "ai_analysis_logs", "decks", "deck_items"
+}
+
+
+def alembic_config() -> Config:
+    config = Config(os.path.join(BACKEND_DIR, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(BACKEND_DIR, "alembic"))
+    return config
+
+
+def revision_to_stamp(conn: Connection) -> Optional[str]:
+    """Revision an unversioned database with tables is at; None when no stamp is needed"""
+    context = MigrationContext.configure(conn)
+    if context.get_current_revision() is not None:
+        return None
+    tables = set(inspect(conn).get_table_names()) - {"alembic_version"}
+    if not tables:
+        return None  # Fresh database: the migrations create everything
+    if not compare_metadata(context, Base.metadata):
+        return "head"
+    if tables <= BASELINE_TABLES:
+        return "baseline"
+    raise SystemExit(
+        "❌ The database has tables but no alembic_version row, and its schema matches neither the "
+        f"baseline nor the current models (extra tables: {', '.join(sorted(tables - BASELINE_TABLES))}). "
+        "Stamp the revision it is at with `alembic stamp <revision>` and run this again."
+    )
+
+
+def migrate(dry_run: bool = False) -> None:
+    # Same URL the Alembic environment uses
+    engine = create_engine(settings.database_url)
+    try:
+        with engine.connect() as conn:
+            stamp = revision_to_stamp(conn)
+    finally:
+        engine.dispose()
+
+    config = alembic_config()
+    if stamp:
+        print(f"📌 Unversioned database: stamping {stamp}")
+        if not dry_run:
+            command.stamp(config, stamp)
+    if dry_run:
+        print("Dry run: not upgrading")
+        return
+    command.upgrade(config, "head")
+    print("✅ Database schema is at head")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dry-run", action="store_true", help="Only report the stamp that would be applied")
+    args = parser.parse_args()
+    migrate(args.dry_run)
@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+"""
+Replay stored game rounds against other providers, models and prompt versions
+
+Rounds are read from the database in keyset-paginated batches (fetched in a
+worker thread so the event loop keeps driving provider calls), analyzed with
+bounded concurrency and every result is appended to a JSONL checkpoint, so an
+interrupted run picks up where it stopped when started again with the same
+checkpoint file.
+
+Examples:
+    python scripts/reevaluate.py --combo openai:gpt-4o:v1 --combo openai:gpt-4o-mini:v3
+    python scripts/reevaluate.py --combo anthropic:claude-3-5-haiku-20241022:v2 \\
+        --since 2024-06-01 --limit 500 --concurrency 8 --checkpoint runs/haiku.jsonl
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from sqlalchemy import Text, and_, cast, or_, select
+
+from app.config import settings
+from app.core.ai_interface import AIModelInterface, AIProvider, DrawingAnalysisRequest
+from app.models.database import SessionLocal, GameRound
+from app.services.ai_providers import OpenAIProvider, AnthropicProvider
+from app.services.image_processor import image_processor
+from app.services.stroke_rasterizer import from_point_lists
+
+
+@dataclass(frozen=True)
+class Combo:
+    """One (provider, model, prompt_version) combination to evaluate"""
+    provider: AIProvider
+    model: str
+    prompt_version: str
+
+    @property
+    def label(self) -> str:
+        return f"{self.provider.value}:{self.model}:{self.prompt_version}"
+
+    @classmethod
+    def parse(cls, value: str) -> "Combo":
+        try:
+            provider, model, prompt_version = value.split(":")
+            return cls(AIProvider(provider), model, prompt_version)
+        except ValueError:
+            raise argparse.ArgumentTypeError(
+                f"Expected provider:model:prompt_version, got {value!r}"
+            )
+
+
+@dataclass
+class ComboStats:
+    """Running totals for one combination"""
+    total: int = 0
+    correct: int = 0
+    failed: int = 0
+    latencies_ms: List[int] = field(default_factory=list)
+    tokens: List[int] = field(default_factory=list)
+
+    def add(self, result: Dict[str, Any]) -> None:
+        self.total += 1
+        if not result["success"]:
+            self.failed += 1
+        if result["is_correct"]:
+            self.correct += 1
+        self.latencies_ms.append(result["response_time_ms"])
+        if result.get("tokens_used") is not None:
+            self.tokens.append(result["tokens_used"])
+
+    def summary(self) -> Dict[str, Any]:
+        latencies = sorted(self.latencies_ms)
+        return {
+            "rounds": self.total,
+            "correct": self.correct,
+            "failed": self.failed,
+            "accuracy": round(self.correct / self.total, 4) if self.total else 0.0,
+            "latency_ms": {
+                "mean": round(sum(latencies) / len(latencies), 1) if latencies else None,
+                "p50": percentile(latencies, 50),
+                "p95": percentile(latencies, 95),
+                "p99": percentile(latencies, 99)
+            },
+            "tokens": {
+                "total": sum(self.tokens),
+                "mean": round(sum(self.tokens) / len(self.tokens), 1) if self.tokens else None
+            }
+        }
+
+
+def percentile(sorted_values: List[int], pct: float) -> Optional[int]:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    rank = max(1, int(round(pct / 100 * len(sorted_values) + 0.5)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def build_providers(combos: List[Combo]) -> Dict[AIProvider, AIModelInterface]:
+    """Create one client per provider; the model is chosen per request"""
+    providers: Dict[AIProvider, AIModelInterface] = {}
+    for provider in {combo.provider for combo in combos}:
+        if provider == AIProvider.OPENAI and settings.openai_api_key:
+            providers[provider] = OpenAIProvider(settings.openai_api_key, settings.default_model)
+        elif provider == AIProvider.ANTHROPIC and settings.anthropic_api_key:
+            providers[provider] = AnthropicProvider(settings.anthropic_api_key)
+        else:
+            raise SystemExit(f"❌ Provider {provider.value} is not configured")
+    return providers
+
+
+def load_checkpoint(path: str, stats: Dict[str, ComboStats]) -> Set[Tuple[int, str]]:
+    """Rebuild stats from a previous run and return the (round_id, combo) pairs already done"""
+    done: Set[Tuple[int, str]] = set()
+    if not os.path.exists(path):
+        return done
+
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                result = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # Torn last line from an interrupted run
+            if result["combo"] in stats:
+                done.add((result["round_id"], result["combo"]))
+                stats[result["combo"]].add(result)
+    return done
+
+
+def fetch_rounds(
+    after_id: int,
+    batch_size: int,
+    since: Optional[datetime],
+    until: Optional[datetime]
+) -> List[Any]:
+    """One keyset page of historical rounds with a ground truth and a drawing"""
+    has_image = and_(GameRound.image_data.isnot(None), GameRound.image_data != "")
+    # A JSON column stores Python None as the JSON literal null, not SQL NULL
+    has_strokes = and_(GameRound.stroke_data.isnot(None), cast(GameRound.stroke_data, Text) != "null")
+    query = select(
+        GameRound.id,
+        GameRound.image_data,
+        GameRound.stroke_data,
+        GameRound.all_options,
+        GameRound.correct_option_index
+    ).where(
+        GameRound.id > after_id,
+        GameRound.correct_option_index.isnot(None),
+        GameRound.all_options.isnot(None),
+        or_(has_image, has_strokes)
+    ).order_by(GameRound.id).limit(batch_size)
+
+    if since:
+        query = query.where(GameRound.created_at >= since)
+    if until:
+        query = query.where(GameRound.created_at < until)
+
+    db = SessionLocal()
+    try:
+        return db.execute(query).all()
+    finally:
+        db.close()
+
+
+async def stream_rounds(
+    batch_size: int,
+    since: Optional[datetime],
+    until: Optional[datetime],
+    limit: Optional[int]
+) -> AsyncIterator[Any]:
+    """Yield replayable rounds, fetching each page in a thread off the event loop"""
+    after_id = 0
+    remaining = limit
+    while remaining is None or remaining > 0:
+        size = batch_size if remaining is None else min(batch_size, remaining)
+        rows = await asyncio.to_thread(fetch_rounds, after_id, size, since, until)
+        for row in rows:
+            yield row
+        if len(rows) < size:
+            return
+        after_id = rows[-1].id
+        if remaining is not None:
+            remaining -= len(rows)
+
+
+def prepare_image(row: Any):
+    """Rebuild the provider-ready image the same way the API does"""
+    if row.stroke_data:
+        drawing = from_point_lists(
+            row.stroke_data["width"],
+            row.stroke_data["height"],
+            row.stroke_data["strokes"]
+        )
+        return image_processor.process_strokes(drawing)
+    return image_processor.process(row.image_data)
+
+
+async def evaluate(
+    row: Any,
+    combo: Combo,
+    provider: AIModelInterface
+) -> Dict[str, Any]:
+    """Analyze one round with one combination"""
+    loop = asyncio.get_running_loop()
+    image = await loop.run_in_executor(image_processor.executor, prepare_image, row)
+
+    response = await provider.analyze_drawing(DrawingAnalysisRequest(
+        image_data=image.data,
+        options=row.all_options,
+        prompt_version=combo.prompt_version,
+        model_override=combo.model,
+        provider_override=combo.provider,
+        media_type=image.media_type
+    ))
+
+    return {
+        "round_id": row.id,
+        "combo": combo.label,
+        "success": response.success,
+        "guess_index": response.guess_index,
+        "correct_index": row.correct_option_index,
+        "is_correct": response.success and response.guess_index == row.correct_option_index,
+        "response_time_ms": response.response_time_ms,
+        "tokens_used": response.tokens_used,
+        "error_message": response.error_message
+    }
+
+
+async def run(args: argparse.Namespace) -> Dict[str, ComboStats]:
+    combos: List[Combo] = args.combo
+    providers = build_providers(combos)
+    stats = {combo.label: ComboStats() for combo in combos}
+    done = load_checkpoint(args.checkpoint, stats)
+    if done:
+        print(f"↩️  Resuming: {len(done)} results already in {args.checkpoint}")
+
+    queue: asyncio.Queue = asyncio.Queue(maxsize=args.concurrency * 4)
+    checkpoint = open(args.checkpoint, "a")
+    processed = 0
+    started = time.time()
+
+    async def worker() -> None:
+        nonlocal processed
+        while True:
+            item = await queue.get()
+            if item is None:
+                queue.task_done()
+                return
+            row, combo = item
+            try:
+                result = await evaluate(row, combo, providers[combo.provider])
+            except Exception as e:
+                print(f"⚠️  Round {row.id} ({combo.label}) could not be evaluated: {e}")
+            else:
+                checkpoint.write(json.dumps(result) + "\n")
+                checkpoint.flush()
+                stats[combo.label].add(result)
+                processed += 1
+                if processed % 50 == 0:
+                    rate = processed / (time.time() - started)
+                    print(f"… {processed} evaluations ({rate:.1f}/s)")
+            finally:
+                queue.task_done()
+
+    workers = [asyncio.create_task(worker()) for _ in range(args.concurrency)]
+    try:
+        async for row in stream_rounds(args.batch_size, args.since, args.until, args.limit):
+            for combo in combos:
+                if (row.id, combo.label) not in done:
+                    # Blocks when workers fall behind, so pages are fetched lazily
+                    await queue.put((row, combo))
+        for _ in workers:
+            await queue.put(None)
+        await asyncio.gather(*workers)
+    finally:
+        for task in workers:
+            task.cancel()
+        checkpoint.close()
+        image_processor.shutdown()
+
+    return stats
+
+
+def write_report(stats: Dict[str, ComboStats], path: Optional[str]) -> None:
+    report = {
+        "generated_at": datetime.utcnow().isoformat(),
+        "combos": {label: combo_stats.summary() for label, combo_stats in stats.items()}
+    }
+
+    print()
+    print(f"{'combo':<50} {'rounds':>7} {'accuracy':>9} {'p50 ms':>8} {'p95 ms':>8} {'tokens/rnd':>11}")
+    for label, summary in report["combos"].items():
+        print(
+            f"{label:<50} {summary['rounds']:>7} {summary['accuracy']:>9.1%} "
+            f"{summary['latency_ms']['p50'] or 0:>8} {summary['latency_ms']['p95'] or 0:>8} "
+            f"{summary['tokens']['mean'] or 0:>11}"
+        )
+
+    if path:
+        with open(path, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n✅ Report written to {path}")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--combo", type=Combo.parse, action="append", required=True,
+                        help="provider:model:prompt_version to evaluate (repeatable)")
+    parser.add_argument("--since", type=datetime.fromisoformat, help="Only rounds created at or after this date")
+    parser.add_argument("--until", type=datetime.fromisoformat, help="Only rounds created before this date")
+    parser.add_argument("--limit", type=int, help="Maximum number of rounds to replay")
+    parser.add_argument("--concurrency", type=int, default=4, help="Concurrent provider calls (default 4)")
+    parser.add_argument("--batch-size", type=int, default=200, help="Rows fetched per database round-trip")
+    parser.add_argument("--checkpoint", default="reevaluation_checkpoint.jsonl",
+                        help="JSONL file of per-round results; reused to resume")
+    parser.add_argument("--report", default="reevaluation_report.json", help="Where to write the JSON report")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    arguments = parse_args()
+    write_report(asyncio.run(run(arguments)), arguments.report)
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Archive and remove expired api_metrics and ai_analysis_logs rows
+
+Rows older than METRICS_RETENTION_DAYS / ANALYSIS_LOG_RETENTION_DAYS are
+exported to RETENTION_ARCHIVE_DIR as compressed Parquet (or Arrow IPC) files
+and then removed: whole monthly partitions are dropped on Postgres, other
+databases delete month by month. On Postgres the run also creates the next
+months' partitions, so schedule it at least monthly (daily is fine).
+
+Examples:
+    python scripts/retention.py --dry-run
+    python scripts/retention.py --table api_metrics
+    python scripts/retention.py --no-archive          # drop without exporting
+    python scripts/retention.py --partition           # convert plain Postgres tables
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app.config import settings
+from app.models.database import engine
+from app.services.retention import RETAINED_MODELS, apply_retention, is_postgres, partition_table, retention_days
+
+
+def describe(action: dict) -> str:
+    span = f"{action['start'] or 'beginning'} .. {action['end']}" if "end" in action else ""
+    details = [f"{key}={action[key]}" for key in ("rows", "archived_rows") if key in action]
+    return " ".join(part for part in (action["action"], action.get("partition", ""), span, *details) if part)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--table", choices=list(RETAINED_MODELS), action="append", help="Default: both tables")
+    parser.add_argument("--dry-run", action="store_true", help="Only list what would be archived and removed")
+    parser.add_argument("--no-archive", action="store_true", help="Remove expired rows without exporting them")
+    parser.add_argument("--partition", action="store_true",
+                        help="Convert plain Postgres tables to monthly partitions (a fresh database "
+                             "created by the app needs this once) and exit")
+    args = parser.parse_args()
+    tables = args.table or list(RETAINED_MODELS)
+
+    if args.partition:
+        if not is_postgres(engine):
+            print("❌ Partitioning needs Postgres", file=sys.stderr)
+            return 1
+        for table_name in tables:
+            with engine.begin() as conn:
+                converted = partition_table(conn, table_name, settings.retention_partitions_ahead)
+            print(f"{'✅ Partitioned' if converted else 'Already partitioned:'} {table_name}")
+        return 0
+
+    for table_name in tables:
+        start = time.perf_counter()
+        print(f"{table_name}: keeping {retention_days(table_name)} days{' (dry run)' if args.dry_run else ''}")
+        actions = apply_retention(engine, table_name, archive=not args.no_archive, dry_run=args.dry_run)
+        for action in actions:
+            print(f"  {describe(action)}")
+        print(f"  {len(actions)} actions in {time.perf_counter() - start:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
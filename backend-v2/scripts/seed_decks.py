@@ -2,11 +2,15 @@
 """
 Seed script to populate the database with default decks
 """
+import argparse
 import sys
 import os
+import time
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
-from app.models.database import SessionLocal, Deck, DeckItem
+from app.config import settings
+from app.models.database import SessionLocal, Deck, init_db
+from app.services.deck_seeding import reseed_decks, sync_decks
 
 # Base Deck - contains all original CSV content as the default deck
 DECK_DATA = {
@@ -131,60 +135,52 @@ DECK_DATA = {
 }
 
 
-def seed_decks():
-    """Populate database with default decks"""
+def print_summary(db):
+    print("\nDeck Summary:")
+    for deck in db.query(Deck).order_by(Deck.id).all():
+        print(f"  {deck.name}: {deck.total_items} items ({deck.difficulty})")
+
+
+def seed_decks(mode: str = "seed"):
+    """
+    Populate database with default decks
+    
+    seed:   load DECK_DATA into an empty database (skips if decks exist)
+    reseed: replace all decks with DECK_DATA (truncate and bulk load)
+    sync:   apply only the differences between DECK_DATA and the database
+    """
+    if settings.database_auto_create:
+        init_db()
     db = SessionLocal()
     
     try:
-        # Check if decks already exist
-        existing_count = db.query(Deck).count()
-        if existing_count > 0:
-            print(f"Database already has {existing_count} decks. Skipping seed.")
-            return
-        
-        print("Seeding database with default decks...")
-        
-        total_items = 0
-        for deck_name, deck_info in DECK_DATA.items():
-            print(f"Creating deck: {deck_name}")
-            
-            # Create deck
-            deck = Deck(
-                name=deck_name,
-                description=deck_info["description"],
-                category=deck_info["category"],
-                difficulty=deck_info["difficulty"],
-                is_active=True,
-                is_public=True,
-                created_by="system",
-                total_items=len(deck_info["items"])
+        start = time.perf_counter()
+        if mode == "sync":
+            counts = sync_decks(db, DECK_DATA)
+            print(
+                f"✅ Synced in {time.perf_counter() - start:.2f}s: "
+                f"{counts['decks_added']} decks added, {counts['decks_updated']} updated; "
+                f"{counts['items_added']} items added, {counts['items_updated']} updated, "
+                f"{counts['items_removed']} removed, {counts['duplicates_merged']} duplicates merged"
             )
+        else:
+            if mode == "seed":
+                # Check if decks already exist
+                existing_count = db.query(Deck).count()
+                if existing_count > 0:
+                    print(f"Database already has {existing_count} decks. Skipping seed (use --reseed or --sync).")
+                    return
             
-            db.add(deck)
-            db.commit()  # Commit to get deck ID
-            db.refresh(deck)
-            
-            # Add items to deck
-            items_added = 0
-            for item_text in deck_info["items"]:
-                deck_item = DeckItem(
-                    deck_id=deck.id,
-                    prompt=item_text,
-                    difficulty=deck_info["difficulty"]
-                )
-                db.add(deck_item)
-                items_added += 1
-            
-            db.commit()
-            print(f"  Added {items_added} items to {deck_name}")
-            total_items += items_added
-        
-        print(f"\n✅ Successfully seeded {len(DECK_DATA)} decks with {total_items} total items!")
+            print("Seeding database with default decks...")
+            counts = reseed_decks(db, DECK_DATA)
+            if counts["decks_removed"]:
+                print(f"Replaced {counts['decks_removed']} decks with {counts['items_removed']} items")
+            print(
+                f"\n✅ Successfully seeded {counts['decks_added']} decks with "
+                f"{counts['items_added']} total items in {time.perf_counter() - start:.2f}s!"
+            )
         
-        # Print summary
-        print("\nDeck Summary:")
-        for deck in db.query(Deck).all():
-            print(f"  {deck.name}: {deck.total_items} items ({deck.difficulty})")
+        print_summary(db)
             
     except Exception as e:
         print(f"❌ Error seeding database: {e}")
@@ -194,4 +190,10 @@ def seed_decks():
 
 
 if __name__ == "__main__":
-    seed_decks()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Seed the default decks")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--reseed", action="store_const", dest="mode", const="reseed",
+                      help="Replace all existing decks in one transaction")
+    mode.add_argument("--sync", action="store_const", dest="mode", const="sync",
+                      help="Apply only changed decks and items; safe to re-run")
+    seed_decks(parser.parse_args().mode or "seed")
@@ -0,0 +1,88 @@
+"""
+Shared fixtures: the app is configured for a throwaway SQLite database before
+any of its modules are imported
+"""
+import base64
+import io
+import os
+import tempfile
+
+_tmpdir = tempfile.mkdtemp(prefix="picaictionary-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmpdir, 'test.db')}"
+for name in ("SUPABASE_URL", "SUPABASE_ANON_KEY", "SUPABASE_SERVICE_KEY"):
+    os.environ.setdefault(name, "test")
+os.environ["API_KEY"] = "test-key"
+os.environ["ADMIN_API_KEY"] = "test-admin-key"
+os.environ["ENABLE_METRICS"] = "false"
+# Every AI call goes to the deterministic fake provider, instantly
+os.environ["FAKE_PROVIDER_ENABLED"] = "true"
+os.environ["DEFAULT_AI_PROVIDER"] = "fake"
+os.environ["FAKE_LATENCY_DISTRIBUTION"] = "fixed"
+os.environ["FAKE_LATENCY_MS"] = "0"
+
+import pytest  # noqa: E402
+from PIL import Image, ImageDraw  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.models.database import Base, Deck, DeckItem, SessionLocal, engine  # noqa: E402
+from app.services.deck_cache import deck_cache  # noqa: E402
+from app.services.prompt_sampler import prompt_sampler  # noqa: E402
+from app.services.prompt_shuffler import prompt_shuffler  # noqa: E402
+
+API_HEADERS = {"X-API-Key": "test-key"}
+ADMIN_HEADERS = {**API_HEADERS, "X-Admin-Key": "test-admin-key"}
+
+
+@pytest.fixture(scope="session", autouse=True)
+def schema():
+    Base.metadata.create_all(bind=engine)
+    yield
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def db():
+    """A session on an empty database; every table is emptied afterwards"""
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.rollback()
+        session.close()
+        with engine.begin() as conn:
+            for table in reversed(Base.metadata.sorted_tables):
+                conn.execute(table.delete())
+        # SQLite reuses ids, so nothing cached by deck id may survive a test
+        deck_cache.invalidate()
+        prompt_shuffler._states.clear()
+        prompt_sampler._tables.clear()
+
+
+def make_deck(db, prompts, name="Base Deck", difficulty="medium") -> Deck:
+    deck = Deck(name=name, difficulty=difficulty, total_items=len(prompts))
+    db.add(deck)
+    db.flush()
+    db.add_all(DeckItem(deck_id=deck.id, prompt=prompt, difficulty=difficulty) for prompt in prompts)
+    db.commit()
+    return deck
+
+
+@pytest.fixture
+def client(db):
+    from app.main import app
+
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+def drawing_png() -> bytes:
+    """A transparent Unity-style canvas with one red circle"""
+    image = Image.new("RGBA", (900, 700), (0, 0, 0, 0))
+    ImageDraw.Draw(image).ellipse((300, 200, 600, 500), outline=(255, 0, 0, 255), width=6)
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def drawing_base64() -> str:
+    return base64.b64encode(drawing_png()).decode()
@@ -0,0 +1,103 @@
+import asyncio
+import json
+
+import pytest
+
+from app.api import endpoints
+from app.core.ai_interface import AIStreamEvent
+from app.models.database import AIAnalysisLog
+from app.services import FakeProvider
+
+from .conftest import API_HEADERS, drawing_base64
+
+OPTIONS = ["cat", "dog", "sun", "car"]
+
+
+@pytest.fixture
+def log_writes(monkeypatch):
+    """Record every analysis log write and whether it ran on an event loop thread"""
+    writes = []
+    write = endpoints.write_analysis_logs
+
+    def recording_write(rows):
+        try:
+            asyncio.get_running_loop()
+            on_loop = True
+        except RuntimeError:
+            on_loop = False
+        writes.append((len(rows), on_loop))
+        write(rows)
+
+    monkeypatch.setattr(endpoints, "write_analysis_logs", recording_write)
+    return writes
+
+
+def parse_sse(body: str):
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def test_stream_sends_the_guess_first_and_logs_off_the_event_loop(client, db, log_writes):
+    response = client.post(
+        "/api/v2/analyze-drawing/stream",
+        headers=API_HEADERS,
+        json={"image_data": drawing_base64(), "options": OPTIONS}
+    )
+    assert response.status_code == 200
+
+    events = parse_sse(response.text)
+    names = [name for name, _ in events]
+    assert names[0] == "guess" and names[-1] == "result"
+    assert events[0][1]["guess_index"] == events[-1][1]["guess_index"]
+
+    assert log_writes == [(1, False)]
+    assert db.query(AIAnalysisLog).count() == 1
+
+
+@pytest.mark.parametrize("failure", ["raises", "no_done"])
+def test_failed_stream_ends_with_an_error_event_and_is_logged(client, db, log_writes, monkeypatch, failure):
+    async def broken_stream(self, request):
+        yield AIStreamEvent(type="guess", guess_index=1)
+        yield AIStreamEvent(type="reasoning", text="looks like a")
+        if failure == "raises":
+            raise ConnectionError("provider hung up")
+
+    monkeypatch.setattr(FakeProvider, "stream_drawing_analysis", broken_stream)
+    response = client.post(
+        "/api/v2/analyze-drawing/stream",
+        headers=API_HEADERS,
+        json={"image_data": drawing_base64(), "options": OPTIONS}
+    )
+    assert response.status_code == 200
+
+    events = parse_sse(response.text)
+    assert [name for name, _ in events] == ["guess", "reasoning", "error"]
+
+    assert log_writes == [(1, False)]
+    log = db.query(AIAnalysisLog).one()
+    assert log.success is False
+    expected = "provider hung up" if failure == "raises" else "AI stream ended without a result"
+    assert log.error_message == expected
+
+
+def test_batch_logs_every_drawing_in_one_write_off_the_event_loop(client, db, log_writes):
+    drawings = [{"id": f"d{i}", "image_data": drawing_base64(), "options": OPTIONS} for i in range(5)]
+    response = client.post("/api/v2/analyze-drawings/batch", headers=API_HEADERS, json={"drawings": drawings})
+    assert response.status_code == 200
+
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert sorted(line["id"] for line in lines) == [f"d{i}" for i in range(5)]
+    assert all(line["result"]["success"] for line in lines)
+
+    assert log_writes == [(5, False)]
+    assert db.query(AIAnalysisLog).count() == 5
+
+
+def test_batch_size_is_limited(client, monkeypatch):
+    monkeypatch.setattr(endpoints.settings, "batch_max_items", 2)
+    drawings = [{"image_data": drawing_base64(), "options": OPTIONS}] * 3
+    response = client.post("/api/v2/analyze-drawings/batch", headers=API_HEADERS, json={"drawings": drawings})
+    assert response.status_code == 413
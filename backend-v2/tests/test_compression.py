@@ -0,0 +1,128 @@
+import json
+
+import pytest
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from app.middleware import compression
+from app.middleware.compression import CompressionMiddleware, available_encodings, negotiate
+
+LIMIT = 64 * 1024
+BOMB_SIZE = 64 * 1024 * 1024
+
+
+def compress(encoding: str, body: bytes) -> bytes:
+    one_shot, _, _ = available_encodings()[encoding]
+    return one_shot(body, 9 if encoding == "gzip" else 3)
+
+
+def encodings():
+    """Every request encoding, skipping those whose optional package is missing"""
+    return [
+        pytest.param("gzip"),
+        pytest.param("br", marks=pytest.mark.skipif(compression.brotli is None, reason="brotli not installed")),
+        pytest.param("zstd", marks=pytest.mark.skipif(compression.zstandard is None, reason="zstandard not installed"))
+    ]
+
+
+async def echo_length(request: Request) -> JSONResponse:
+    return JSONResponse({"received": len(await request.body())})
+
+
+async def big(request: Request) -> JSONResponse:
+    return JSONResponse({"prompts": ["a prompt to draw"] * 500})
+
+
+async def small(request: Request) -> JSONResponse:
+    return JSONResponse({"ok": True})
+
+
+@pytest.fixture
+def client():
+    app = Starlette(routes=[
+        Route("/echo", echo_length, methods=["POST"]),
+        Route("/big", big),
+        Route("/small", small)
+    ])
+    return TestClient(CompressionMiddleware(app, max_request_bytes=LIMIT))
+
+
+@pytest.mark.parametrize("accept, expected", [
+    (None, None),
+    ("gzip", "gzip"),
+    ("gzip;q=0.5, br;q=0.9", "br"),
+    ("gzip, br, zstd", "zstd"),  # Ties go to the server's order
+    ("*", "zstd"),
+    ("*, zstd;q=0", "br"),
+    ("gzip;q=0", None),
+    ("identity", None),
+    ("gzip;q=oops", None)
+])
+def test_negotiate(accept, expected):
+    assert negotiate(accept, ["zstd", "br", "gzip"]) == expected
+
+
+def test_large_responses_are_compressed(client):
+    response = client.get("/big", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert len(response.json()["prompts"]) == 500
+
+
+def test_small_responses_are_sent_as_is(client):
+    response = client.get("/small", headers={"Accept-Encoding": "gzip"})
+
+    assert "content-encoding" not in response.headers
+    assert response.json() == {"ok": True}
+
+
+@pytest.mark.parametrize("encoding", encodings())
+def test_compressed_request_is_decoded(client, encoding):
+    body = json.dumps({"strokes": list(range(2000))}).encode()
+
+    response = client.post("/echo", content=compress(encoding, body), headers={"Content-Encoding": encoding})
+
+    assert response.status_code == 200
+    assert response.json() == {"received": len(body)}
+
+
+@pytest.mark.parametrize("encoding", encodings())
+def test_compression_bomb_is_rejected(client, encoding):
+    bomb = compress(encoding, bytes(BOMB_SIZE))
+    assert len(bomb) < LIMIT
+
+    response = client.post("/echo", content=bomb, headers={"Content-Encoding": encoding})
+
+    assert response.status_code == 413
+
+
+@pytest.mark.parametrize("encoding", encodings())
+def test_decompressor_stops_near_the_limit(encoding):
+    decompress = available_encodings()[encoding][2]()
+
+    body = decompress(compress(encoding, bytes(BOMB_SIZE)), LIMIT)
+
+    assert LIMIT < len(body) <= LIMIT + 64 * 1024
+
+
+def test_unknown_request_encoding_is_rejected(client):
+    response = client.post("/echo", content=b"data", headers={"Content-Encoding": "lzma"})
+
+    assert response.status_code == 415
+
+
+def test_rejected_encoding_is_escaped_in_the_error_body(client):
+    response = client.post("/echo", content=b"data", headers={"Content-Encoding": 'x"}, "y\\'})
+
+    assert response.status_code == 415
+    assert response.json() == {"detail": 'Unsupported Content-Encoding: x"}, "y\\'}
+
+
+def test_malformed_request_body_is_rejected(client):
+    response = client.post("/echo", content=b"not gzip at all", headers={"Content-Encoding": "gzip"})
+
+    assert response.status_code == 400
@@ -0,0 +1,75 @@
+from app.services.deck_cache import deck_cache
+from app.services.deck_seeding import sync_decks
+from app.services.deck_service import DeckService
+
+from .conftest import API_HEADERS, make_deck
+
+DECK_DATA = {
+    "Animals": {"description": "Critters", "category": "default", "difficulty": "easy",
+                "items": ["cat", "dog", "owl", "fox"]}
+}
+
+
+def revalidate(client, path, etag):
+    return client.get(path, headers={**API_HEADERS, "If-None-Match": etag})
+
+
+def test_unchanged_deck_revalidates_to_304(client, db):
+    deck = make_deck(db, ["cat", "dog", "owl", "fox"])
+    path = f"/api/v2/decks/{deck.id}"
+
+    first = client.get(path, headers=API_HEADERS)
+    assert first.status_code == 200
+    assert revalidate(client, path, first.headers["etag"]).status_code == 304
+
+
+def test_write_from_another_process_changes_the_etag(client, db, monkeypatch):
+    deck = make_deck(db, ["cat", "dog", "owl", "fox"])
+    path = f"/api/v2/decks/{deck.id}"
+    etag = client.get(path, headers=API_HEADERS).headers["etag"]
+    catalog_etag = client.get("/api/v2/decks", headers=API_HEADERS).headers["etag"]
+
+    # Another worker's write never reaches this process's cache
+    monkeypatch.setattr(deck_cache, "invalidate", lambda: None)
+    DeckService(db).add_items_to_deck(deck.id, ["emu"])
+
+    response = revalidate(client, path, etag)
+    assert response.status_code == 200
+    assert "emu" in {item["prompt"] for item in response.json()["items"]}
+    assert revalidate(client, "/api/v2/decks", catalog_etag).status_code == 200
+
+
+def test_deleted_deck_is_not_served_from_cache(client, db, monkeypatch):
+    deck = make_deck(db, ["cat", "dog", "owl", "fox"])
+    path = f"/api/v2/decks/{deck.id}"
+    assert client.get(path, headers=API_HEADERS).status_code == 200
+
+    monkeypatch.setattr(deck_cache, "invalidate", lambda: None)
+    DeckService(db).delete_deck(deck.id)
+
+    assert client.get(path, headers=API_HEADERS).status_code == 404
+
+
+def test_drawing_prompts_keeps_the_etag(client, db):
+    deck = make_deck(db, ["cat", "dog", "owl", "fox"])
+    path = f"/api/v2/decks/{deck.id}"
+    etag = client.get(path, headers=API_HEADERS).headers["etag"]
+
+    DeckService(db).get_random_prompts(count=4, deck_id=deck.id)
+
+    assert revalidate(client, path, etag).status_code == 304
+
+
+def test_sync_stamps_only_decks_it_changed(client, db, monkeypatch):
+    sync_decks(db, DECK_DATA)
+    deck_id = DeckService(db).get_all_decks()[0].id
+    path = f"/api/v2/decks/{deck_id}"
+    etag = client.get(path, headers=API_HEADERS).headers["etag"]
+    monkeypatch.setattr(deck_cache, "invalidate", lambda: None)
+
+    sync_decks(db, DECK_DATA)
+    assert revalidate(client, path, etag).status_code == 304
+
+    changed = {"Animals": {**DECK_DATA["Animals"], "items": ["cat", "dog", "owl", "yak"]}}
+    sync_decks(db, changed)
+    assert revalidate(client, path, etag).status_code == 200
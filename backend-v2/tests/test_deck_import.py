@@ -0,0 +1,119 @@
+import argparse
+
+import pytest
+
+from app.config import settings
+from app.models.database import Deck, DeckItem
+from scripts import deck_io
+
+from .conftest import API_HEADERS, make_deck
+
+
+def prompts(db, deck):
+    db.expire_all()
+    return sorted(prompt for (prompt,) in db.query(DeckItem.prompt).filter(DeckItem.deck_id == deck.id))
+
+
+def post_import(client, deck, body, fmt="csv", header=None):
+    query = f"format={fmt}" if header is None else f"format={fmt}&header={str(header).lower()}"
+    return client.post(f"/api/v2/decks/{deck.id}/import?{query}", content=body.encode(), headers=API_HEADERS)
+
+
+@pytest.mark.parametrize("batch_size", [1000, 2])
+def test_duplicates_are_skipped(client, db, monkeypatch, batch_size):
+    monkeypatch.setattr(settings, "deck_import_batch_size", batch_size)
+    deck = make_deck(db, ["Cat", "Dog"])
+    body = "prompt,difficulty\ncat,easy\n  Hot   Dog ,\nhot dog,hard\nOwl,hard\nFox,\nowl,\n,\n"
+
+    response = post_import(client, deck, body)
+
+    assert response.status_code == 200
+    result = response.json()
+    assert (result["rows_read"], result["items_added"], result["duplicates_skipped"]) == (6, 3, 3)
+    assert result["deck"]["total_items"] == 5
+    assert prompts(db, deck) == ["Cat", "Dog", "Fox", "Hot   Dog", "Owl"]
+
+
+def test_ndjson_import_keeps_row_difficulty(client, db):
+    deck = make_deck(db, ["Cat"])
+    body = '"Cat"\n{"prompt": "Owl", "difficulty": "Hard"}\n\n{"prompt": "Fox"}\n'
+
+    response = post_import(client, deck, body, fmt="ndjson")
+
+    assert response.json()["items_added"] == 2
+    db.expire_all()
+    difficulties = dict(db.query(DeckItem.prompt, DeckItem.difficulty).filter(DeckItem.deck_id == deck.id))
+    assert difficulties == {"Cat": "medium", "Owl": "hard", "Fox": "medium"}
+
+
+def test_bad_row_keeps_nothing(client, db, monkeypatch):
+    monkeypatch.setattr(settings, "deck_import_batch_size", 1)
+    deck = make_deck(db, ["Cat"])
+
+    response = post_import(client, deck, "Owl\nFox\nEmu,impossible\n")
+
+    assert response.status_code == 400
+    assert "Line 3" in response.json()["detail"]
+    assert prompts(db, deck) == ["Cat"]
+
+
+@pytest.mark.parametrize("body, header, expected", [
+    ("Concept\nOwl\nFox\n", None, ["Fox", "Owl"]),
+    ("difficulty,Prompt\neasy,Owl\n", None, ["Owl"]),
+    ("Clue\nOwl\n", None, ["Clue", "Owl"]),
+    ("Item,hard\nOwl\n", None, ["Item", "Owl"]),
+    ("Prompt\nOwl\n", False, ["Owl", "Prompt"]),
+    ("prompt\nOwl\n", True, ["Owl"])
+])
+def test_csv_header_is_only_a_row_of_column_names(client, db, body, header, expected):
+    deck = make_deck(db, [])
+
+    response = post_import(client, deck, body, header=header)
+
+    assert response.status_code == 200
+    assert prompts(db, deck) == expected
+
+
+def test_required_header_must_name_the_prompt_column(client, db):
+    deck = make_deck(db, [])
+
+    response = post_import(client, deck, "Owl\nFox\n", header=True)
+
+    assert response.status_code == 400
+    assert "Line 1" in response.json()["detail"]
+    assert prompts(db, deck) == []
+
+
+def script_import(tmp_path, body, **options):
+    path = tmp_path / "deck.csv"
+    path.write_text(body)
+    args = dict(
+        path=str(path), deck="Imported", deck_id=None, create=True, format=None, header=None,
+        batch_size=1000, description=None, category="custom", difficulty="mixed"
+    )
+    return deck_io.run_import(argparse.Namespace(**{**args, **options}))
+
+
+def test_script_creates_the_deck_with_its_items(db, tmp_path):
+    assert script_import(tmp_path, "Owl\nFox\n") == 0
+
+    deck = db.query(Deck).filter(Deck.name == "Imported").one()
+    assert (deck.total_items, deck.difficulty) == (2, "mixed")
+    assert prompts(db, deck) == ["Fox", "Owl"]
+
+
+def test_failed_script_import_does_not_create_the_deck(db, tmp_path):
+    assert script_import(tmp_path, "Owl\nFox,impossible\n") == 1
+
+    assert db.query(Deck).filter(Deck.name == "Imported").count() == 0
+
+
+def test_export_round_trips_through_import(client, db):
+    source = make_deck(db, ["Cat", "Hot, dog", 'Say "cheese"'], name="Source")
+    target = make_deck(db, [], name="Target")
+
+    exported = client.get(f"/api/v2/decks/{source.id}/export?format=csv", headers=API_HEADERS).text
+    response = post_import(client, target, exported)
+
+    assert response.json()["items_added"] == 3
+    assert prompts(db, target) == prompts(db, source)
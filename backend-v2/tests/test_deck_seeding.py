@@ -0,0 +1,118 @@
+import pytest
+from sqlalchemy import func
+
+from app.models.database import Deck, DeckItem
+from app.services.deck_seeding import reseed_decks, sync_decks
+
+DECK_DATA = {
+    "Animals": {"description": "Critters", "category": "default", "difficulty": "easy",
+                "items": ["Cat", "Dog", "Owl", "cat"]},
+    "Food": {"description": "Snacks", "category": "default", "difficulty": "medium",
+             "items": ["Pizza", "Taco"]}
+}
+
+NO_CHANGES = {
+    "decks_added": 0, "decks_updated": 0, "items_added": 0, "items_updated": 0, "items_removed": 0,
+    "duplicates_merged": 0
+}
+
+
+def snapshot(db):
+    """Every item as (deck, prompt, difficulty, id, rounds played), plus deck totals"""
+    db.expire_all()
+    items = sorted(
+        (deck.name, item.prompt, item.difficulty, item.id, item.rounds_played)
+        for item, deck in db.query(DeckItem, Deck).join(Deck)
+    )
+    totals = {deck.name: (deck.total_items, deck.updated_at) for deck in db.query(Deck)}
+    return items, totals
+
+
+def test_first_sync_adds_everything(db):
+    counts = sync_decks(db, DECK_DATA)
+
+    assert counts == {**NO_CHANGES, "decks_added": 2, "items_added": 5}
+    items, totals = snapshot(db)
+    assert [item[:2] for item in items] == [
+        ("Animals", "Cat"), ("Animals", "Dog"), ("Animals", "Owl"), ("Food", "Pizza"), ("Food", "Taco")
+    ]
+    assert {name: total for name, (total, _) in totals.items()} == {"Animals": 3, "Food": 2}
+
+
+def test_second_sync_is_a_no_op(db):
+    sync_decks(db, DECK_DATA)
+    before = snapshot(db)
+
+    assert sync_decks(db, DECK_DATA) == NO_CHANGES
+    assert snapshot(db) == before
+
+
+def test_sync_touches_only_what_changed(db):
+    sync_decks(db, DECK_DATA)
+    owl = db.query(DeckItem).filter(DeckItem.prompt == "Owl").one()
+    owl.rounds_played = 7
+    db.commit()
+    _, before = snapshot(db)
+
+    changed = {
+        **DECK_DATA,
+        "Animals": {**DECK_DATA["Animals"], "difficulty": "hard", "items": ["Cat", "OWL", "Emu"]}
+    }
+    counts = sync_decks(db, changed)
+
+    assert counts == {**NO_CHANGES, "decks_updated": 1, "items_added": 1, "items_updated": 2, "items_removed": 1}
+    items, totals = snapshot(db)
+    animals = {item[1]: item for item in items if item[0] == "Animals"}
+    assert set(animals) == {"Cat", "OWL", "Emu"}
+    # Renamed in place: same row, play statistics kept
+    assert animals["OWL"][3:] == (owl.id, 7)
+    assert all(item[2] == "hard" for item in animals.values())
+    assert totals["Animals"][0] == 3 and totals["Animals"][1] > before["Animals"][1]
+    assert totals["Food"] == before["Food"]
+
+
+def test_sync_merges_duplicate_rows(db):
+    sync_decks(db, DECK_DATA)
+    animals = db.query(Deck).filter(Deck.name == "Animals").one()
+    owl = db.query(DeckItem).filter(DeckItem.prompt == "Owl").one()
+    owl.rounds_played, owl.human_correct_count, owl.ai_guess_count, owl.ai_correct_count = 2, 2, 2, 0
+    owl.usage_count = 3
+    # Left by an older seed or import: the same prompt twice more, with its own plays
+    db.add_all([
+        DeckItem(deck_id=animals.id, prompt="owl", difficulty="easy", usage_count=1,
+                 rounds_played=2, human_correct_count=0, ai_guess_count=1, ai_correct_count=1),
+        DeckItem(deck_id=animals.id, prompt=" OWL ", difficulty="easy", usage_count=0,
+                 rounds_played=0, human_correct_count=0, ai_guess_count=0, ai_correct_count=0)
+    ])
+    db.commit()
+
+    counts = sync_decks(db, DECK_DATA)
+
+    assert counts == {**NO_CHANGES, "duplicates_merged": 2}
+    db.expire_all()
+    owls = db.query(DeckItem).filter(func.lower(func.trim(DeckItem.prompt)) == "owl").all()
+    assert [item.id for item in owls] == [owl.id]
+    merged = owls[0]
+    assert (merged.usage_count, merged.rounds_played, merged.human_correct_count) == (4, 4, 2)
+    assert (merged.ai_guess_count, merged.ai_correct_count) == (3, 1)
+    assert merged.avg_human_correct_rate == pytest.approx(0.5)
+    assert merged.avg_ai_correct_rate == pytest.approx(1 / 3)
+    assert db.get(Deck, animals.id).total_items == 3
+    assert sync_decks(db, DECK_DATA) == NO_CHANGES
+
+
+def test_sync_leaves_other_decks_alone(db):
+    sync_decks(db, DECK_DATA)
+
+    sync_decks(db, {"Food": DECK_DATA["Food"]})
+
+    assert {name for name, _ in snapshot(db)[1].items()} == {"Animals", "Food"}
+
+
+def test_reseed_replaces_everything(db):
+    sync_decks(db, DECK_DATA)
+
+    counts = reseed_decks(db, {"Food": DECK_DATA["Food"]})
+
+    assert counts == {"decks_removed": 2, "items_removed": 5, "decks_added": 1, "items_added": 2}
+    assert [item[:2] for item in snapshot(db)[0]] == [("Food", "Pizza"), ("Food", "Taco")]
@@ -0,0 +1,43 @@
+import io
+
+import pytest
+
+from app.config import settings
+from app.models.database import GameRound
+
+from .conftest import ADMIN_HEADERS, API_HEADERS
+
+pq = pytest.importorskip("pyarrow.parquet")
+
+
+def test_export_requires_the_admin_key(client, db):
+    assert client.get("/api/v2/export/game_rounds", headers=API_HEADERS).status_code == 403
+    wrong = {**API_HEADERS, "X-Admin-Key": "not-it"}
+    assert client.get("/api/v2/export/game_rounds", headers=wrong).status_code == 403
+
+
+def test_export_needs_the_api_key_too(client, db):
+    response = client.get("/api/v2/export/game_rounds", headers={"X-Admin-Key": "test-admin-key"})
+
+    assert response.status_code == 422
+
+
+def test_export_is_disabled_without_an_admin_key(client, db, monkeypatch):
+    monkeypatch.setattr(settings, "admin_api_key", None)
+
+    assert client.get("/api/v2/export/game_rounds", headers=ADMIN_HEADERS).status_code == 403
+
+
+def test_admin_can_export(client, db):
+    db.add_all(
+        GameRound(round_number=number, image_data="aW1hZ2U=", all_options=["a", "b"], correct_option_index=0)
+        for number in range(1, 4)
+    )
+    db.commit()
+
+    response = client.get("/api/v2/export/game_rounds", headers=ADMIN_HEADERS)
+
+    assert response.status_code == 200
+    exported = pq.read_table(io.BytesIO(response.content))
+    assert exported.num_rows == 3
+    assert "image_data" not in exported.column_names
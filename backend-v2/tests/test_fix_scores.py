@@ -0,0 +1,66 @@
+import pytest
+
+from app.api.endpoints import calculate_round_score
+from app.models.database import Game, GameRound
+from scripts import fix_scores
+
+
+@pytest.mark.parametrize("human, ai, expected", [
+    (True, False, 1),
+    (False, True, -1),
+    (True, True, 0),
+    (False, False, 0)
+])
+def test_round_score_rule(human, ai, expected):
+    assert calculate_round_score(human, ai) == expected
+
+
+def add_game(db, outcomes, final_score=0, round_score=5):
+    """A game whose stored scores are wrong on purpose"""
+    game = Game(total_rounds=len(outcomes), final_score=final_score)
+    db.add(game)
+    db.flush()
+    db.add_all(
+        GameRound(game_id=game.id, round_number=number, human_is_correct=human, ai_is_correct=ai, round_score=round_score)
+        for number, (human, ai) in enumerate(outcomes, start=1)
+    )
+    db.commit()
+    return game.id
+
+
+def scores(db, game_id):
+    db.expire_all()
+    game = db.get(Game, game_id)
+    return game.final_score, sorted(r.round_score for r in db.query(GameRound).filter(GameRound.game_id == game_id))
+
+
+def test_scores_follow_the_api_rule(db):
+    # NULL outcomes count as wrong, like the API's falsy booleans
+    outcomes = [(True, False), (True, False), (False, True), (True, True), (None, None), (True, None)]
+    game_id = add_game(db, outcomes)
+    empty_id = add_game(db, [], final_score=9)
+
+    fix_scores.fix_scores(chunk_size=1)
+
+    expected = [calculate_round_score(bool(human), bool(ai)) for human, ai in outcomes]
+    assert scores(db, game_id) == (sum(expected), sorted(expected))
+    assert scores(db, empty_id) == (0, [])
+
+
+def test_dry_run_counts_without_writing(db, capsys):
+    game_id = add_game(db, [(True, False), (False, True)], final_score=3)
+
+    fix_scores.fix_scores(dry_run=True)
+
+    assert "Dry run: 2 round scores and 1 of 1 game scores would change" in capsys.readouterr().out
+    assert scores(db, game_id) == (3, [5, 5])
+
+
+def test_second_run_changes_nothing(db, capsys):
+    add_game(db, [(True, False), (False, False)])
+    fix_scores.fix_scores()
+    capsys.readouterr()
+
+    fix_scores.fix_scores()
+
+    assert "0 round scores and 0 of 1 game scores fixed" in capsys.readouterr().out
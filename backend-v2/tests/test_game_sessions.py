@@ -0,0 +1,92 @@
+import asyncio
+import time
+
+import pytest
+
+from app.api.endpoints import ai_providers
+from app.core.ai_interface import AIProvider
+from app.models.database import AIAnalysisLog, GameRound
+
+from .conftest import API_HEADERS, drawing_base64, make_deck
+
+PROMPTS = ["cat", "dog", "sun", "car", "tree", "boat", "house", "fish"]
+
+
+def connect(client, session_id="unity-1"):
+    return client.websocket_connect(f"/api/v2/sessions/{session_id}/ws", headers=API_HEADERS)
+
+
+def test_invalid_frames_are_reported_without_closing_the_socket(client, db):
+    with connect(client) as ws:
+        assert ws.receive_json()["type"] == "session_joined"
+
+        ws.send_text("not json {")
+        assert ws.receive_json() == {"type": "error", "detail": "Messages must be JSON text"}
+        ws.send_bytes(b"\x00\x01")
+        assert ws.receive_json()["type"] == "error"
+
+        ws.send_json({"type": "ping"})
+        assert ws.receive_json() == {"type": "pong"}
+
+
+@pytest.mark.parametrize("count", [0, 1, 11, 10_000, "many"])
+def test_prompt_count_is_validated(client, db, count):
+    make_deck(db, PROMPTS)
+    with connect(client) as ws:
+        ws.receive_json()
+        ws.send_json({"type": "request_prompts", "count": count})
+        event = ws.receive_json()
+        assert event["type"] == "error" and event["request"] == "request_prompts"
+
+
+def test_full_round_is_scored_and_stored(client, db):
+    make_deck(db, PROMPTS)
+    with connect(client) as ws:
+        ws.receive_json()
+        ws.send_json({"type": "request_prompts", "count": 4})
+        prompts = ws.receive_json()
+        assert prompts["type"] == "prompts" and len(prompts["prompts"]) == 4
+
+        ws.send_json({"type": "analyze", "image_data": drawing_base64()})
+        guess = ws.receive_json()
+        assert guess["type"] == "ai_guess" and guess["round_number"] == prompts["round_number"]
+
+        ws.send_json({"type": "submit_round", "human_is_correct": True})
+        score = ws.receive_json()
+        assert score["type"] == "score_update"
+        assert score["correct_option_index"] == prompts["correct_index"]
+
+    assert db.query(GameRound).count() == 1
+    assert db.query(AIAnalysisLog).count() == 1
+
+
+def test_slow_ai_call_does_not_block_other_players(client, db, monkeypatch):
+    make_deck(db, PROMPTS)
+    provider = ai_providers[AIProvider.FAKE]
+    analyze = provider.analyze_drawing
+
+    async def slow_analyze(request):
+        await asyncio.sleep(1.0)
+        return await analyze(request)
+
+    monkeypatch.setattr(provider, "analyze_drawing", slow_analyze)
+
+    with connect(client) as drawer, connect(client) as other:
+        drawer.receive_json()
+        other.receive_json()
+
+        drawer.send_json({"type": "analyze", "image_data": drawing_base64(), "options": PROMPTS[:4]})
+        time.sleep(0.1)  # Let the analysis reach the provider
+
+        started = time.perf_counter()
+        other.send_json({"type": "request_prompts"})
+        assert other.receive_json()["type"] == "prompts"
+        assert time.perf_counter() - started < 0.8
+
+        # The drawer's round was replaced while the model was busy
+        assert drawer.receive_json()["type"] == "round_started"
+        stale = drawer.receive_json()
+        assert stale["type"] == "error" and stale["request"] == "analyze"
+
+    # The analysis is still logged
+    assert db.query(AIAnalysisLog).count() == 1
@@ -0,0 +1,51 @@
+import pytest
+
+from app.services.guess_parser import GuessStreamParser, parse_guess_response
+
+RESPONSES = [
+    "2",
+    "2\nThe drawing shows a sun with rays.",
+    "\n\n  3: a car, because of the wheels",
+    "I think this is\n1 - a dog",
+    '{"index": 2, "reasoning": "round with rays"}',
+    '  {"reasoning": "wheels", "index": 3}',
+    '{"index": 12, "reasoning": "two digits"}',
+    "No idea what this is",
+]
+
+
+def feed_in_chunks(content: str, size: int):
+    parser = GuessStreamParser()
+    found = [parser.feed(content[i:i + size]) for i in range(0, len(content), size)]
+    return parser, [index for index in found if index is not None]
+
+
+@pytest.mark.parametrize("content", RESPONSES)
+@pytest.mark.parametrize("size", [1, 2, 5, 1000])
+def test_streamed_index_matches_the_full_parse(content, size):
+    parser, found = feed_in_chunks(content, size)
+    expected, _ = parse_guess_response(content)
+
+    assert parser.guess_index == expected
+    # Reported exactly once, or never
+    assert found == ([] if expected is None else [expected])
+
+
+def test_index_is_reported_before_the_reasoning_finishes():
+    parser = GuessStreamParser()
+    assert parser.feed("I would say\n") is None
+    assert parser.feed("2") == 2
+    assert parser.feed(" because it has rays") is None
+    assert parser.guess_index == 2
+
+
+def test_json_index_waits_for_the_number_to_end():
+    parser = GuessStreamParser()
+    assert parser.feed('{"index": 1') is None
+    assert parser.feed('2, "reasoning": ') == 12
+
+
+def test_leading_whitespace_does_not_decide_the_format():
+    parser = GuessStreamParser()
+    assert parser.feed("   \n") is None
+    assert parser.feed('{"index": 0}') == 0
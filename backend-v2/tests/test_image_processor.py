@@ -0,0 +1,80 @@
+import base64
+import io
+
+from PIL import Image, ImageDraw
+
+from app.services.image_processor import ImageProcessor, detect_media_type, strip_data_url
+
+
+def drawing_png(size=(1024, 768), box=(400, 300, 600, 500), mode="RGBA") -> bytes:
+    background = (0, 0, 0, 0) if mode == "RGBA" else (255, 255, 255)
+    image = Image.new(mode, size, background)
+    ImageDraw.Draw(image).rectangle(box, outline=(0, 0, 0, 255) if mode == "RGBA" else (0, 0, 0), width=4)
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def decode(processed) -> Image.Image:
+    return Image.open(io.BytesIO(base64.b64decode(processed.data)))
+
+
+def test_strip_data_url():
+    assert strip_data_url("data:image/png;base64,AAAA") == "AAAA"
+    assert strip_data_url("AAAA") == "AAAA"
+
+
+def test_detect_media_type():
+    assert detect_media_type(b"\xff\xd8\xff\xe0") == "image/jpeg"
+    assert detect_media_type(b"RIFF\x00\x00\x00\x00WEBPVP8 ") == "image/webp"
+    assert detect_media_type(b"GIF89a") == "image/gif"
+    assert detect_media_type(b"\x89PNG\r\n") == "image/png"
+
+
+def test_crops_to_strokes_and_flattens_transparency():
+    processor = ImageProcessor(max_side=512, crop_padding=16)
+    processed = processor.process(base64.b64encode(drawing_png()).decode())
+
+    assert processed.preprocessed
+    assert (processed.width, processed.height) == (201 + 2 * 16, 201 + 2 * 16)
+    image = decode(processed)
+    assert image.mode == "L"
+    # Transparent background became white, not black
+    assert image.getpixel((0, 0)) == 255
+
+
+def test_downscales_to_max_side():
+    processor = ImageProcessor(max_side=128, crop_padding=0)
+    processed = processor.process_bytes(drawing_png(box=(0, 0, 1023, 767), mode="RGB"))
+
+    assert max(processed.width, processed.height) == 128
+    assert processed.processed_bytes < processed.original_bytes
+
+
+def test_blank_canvas_is_not_cropped():
+    processor = ImageProcessor(max_side=2048)
+    blank = Image.new("RGB", (300, 200), (255, 255, 255))
+    buffer = io.BytesIO()
+    blank.save(buffer, format="PNG")
+
+    processed = processor.process_bytes(buffer.getvalue())
+    assert (processed.width, processed.height) == (300, 200)
+
+
+def test_undecodable_image_passes_through():
+    processor = ImageProcessor()
+    data = base64.b64encode(b"not an image").decode()
+
+    processed = processor.process(data)
+    assert not processed.preprocessed
+    assert processed.data == data
+
+
+def test_disabled_processor_passes_through():
+    processor = ImageProcessor(enabled=False)
+    raw = drawing_png()
+
+    processed = processor.process(base64.b64encode(raw).decode())
+    assert not processed.preprocessed
+    assert processed.original_bytes == len(raw)
+    assert processed.media_type == "image/png"
@@ -0,0 +1,65 @@
+import pytest
+
+from app.models.database import DeckItem
+from app.services.item_stats import RoundOutcome, record_round_outcomes
+
+from .conftest import make_deck
+
+
+def item(db, deck, prompt):
+    db.expire_all()
+    return db.query(DeckItem).filter(DeckItem.deck_id == deck.id, DeckItem.prompt == prompt).one()
+
+
+def test_outcomes_increment_counters_and_rates(db):
+    deck = make_deck(db, ["cat", "dog"])
+
+    record_round_outcomes(db, [
+        RoundOutcome("cat", deck.id, human_correct=True, ai_correct=False),
+        RoundOutcome("cat", deck.id, human_correct=True, ai_correct=True),
+        RoundOutcome("cat", deck.id, human_correct=False, ai_correct=None),
+        RoundOutcome("dog", deck.id, human_correct=False, ai_correct=True)
+    ])
+    db.commit()
+
+    cat = item(db, deck, "cat")
+    assert (cat.rounds_played, cat.human_correct_count, cat.ai_guess_count, cat.ai_correct_count) == (3, 2, 2, 1)
+    assert cat.avg_human_correct_rate == pytest.approx(2 / 3)
+    assert cat.avg_ai_correct_rate == pytest.approx(1 / 2)
+    dog = item(db, deck, "dog")
+    assert (dog.rounds_played, dog.avg_human_correct_rate, dog.avg_ai_correct_rate) == (1, 0.0, 1.0)
+
+
+def test_increments_add_to_existing_counters(db):
+    deck = make_deck(db, ["cat"])
+    for human, ai in ((True, True), (True, False), (False, False)):
+        record_round_outcomes(db, [RoundOutcome("cat", deck.id, human_correct=human, ai_correct=ai)])
+        db.commit()
+
+    cat = item(db, deck, "cat")
+    assert (cat.rounds_played, cat.human_correct_count, cat.ai_guess_count, cat.ai_correct_count) == (3, 2, 3, 1)
+    assert cat.avg_ai_correct_rate == pytest.approx(1 / 3)
+
+
+def test_round_without_an_ai_guess_keeps_the_ai_rate(db):
+    deck = make_deck(db, ["cat"])
+    record_round_outcomes(db, [RoundOutcome("cat", deck.id, human_correct=True, ai_correct=True)])
+    record_round_outcomes(db, [RoundOutcome("cat", deck.id, human_correct=True, ai_correct=None)])
+    db.commit()
+
+    cat = item(db, deck, "cat")
+    assert (cat.rounds_played, cat.ai_guess_count, cat.avg_ai_correct_rate) == (2, 1, 1.0)
+
+
+def test_deck_scoping(db):
+    first = make_deck(db, ["cat"], name="First")
+    second = make_deck(db, ["cat"], name="Second")
+
+    record_round_outcomes(db, [RoundOutcome("cat", first.id, human_correct=True, ai_correct=False)])
+    db.commit()
+    assert (item(db, first, "cat").rounds_played, item(db, second, "cat").rounds_played) == (1, 0)
+
+    # Explicit options carry no deck: every deck with the prompt gets the round
+    record_round_outcomes(db, [RoundOutcome("cat", None, human_correct=True, ai_correct=False)])
+    db.commit()
+    assert (item(db, first, "cat").rounds_played, item(db, second, "cat").rounds_played) == (2, 1)
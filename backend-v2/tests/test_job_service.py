@@ -0,0 +1,120 @@
+import asyncio
+
+import pytest
+
+from app.services.job_service import InMemoryJobStore, Job, JobQueueFullError, JobService, JobStatus
+
+
+@pytest.fixture
+async def service():
+    service = JobService(InMemoryJobStore(ttl_seconds=600), workers=1, queue_size=1)
+    yield service
+    await service.stop()
+
+
+def returning(result, calls=None, release=None):
+    async def work():
+        if calls is not None:
+            calls.append(result)
+        if release is not None:
+            await release.wait()
+        return result
+    return work
+
+
+async def finished(service, job_id):
+    async for job in service.updates(job_id, heartbeat=1.0):
+        if job is not None and job.finished:
+            return job
+
+
+async def test_finished_jobs_expire_after_the_ttl():
+    store = InMemoryJobStore(ttl_seconds=600)
+    done = Job(id="done", key="k1", status=JobStatus.COMPLETED)
+    running = Job(id="running", key="k2", status=JobStatus.RUNNING)
+    await store.save(done)
+    await store.save(running)
+
+    done.updated_at -= 601
+    running.updated_at -= 601
+
+    assert await store.get("done") is None
+    assert await store.find_by_key("k1") is None
+    # Only finished jobs expire; a long-running one stays visible
+    assert await store.get("running") is running
+
+
+async def test_identical_submissions_share_one_job(service):
+    calls = []
+    first = await service.submit("same-request", returning({"n": 1}, calls))
+    second = await service.submit("same-request", returning({"n": 2}, calls))
+    assert second.id == first.id
+
+    job = await finished(service, first.id)
+    assert job.result == {"n": 1}
+    assert calls == [{"n": 1}]
+    assert (await service.submit("same-request", returning({"n": 3}, calls))).id == first.id
+
+
+async def test_failed_jobs_are_resubmitted(service):
+    async def failing():
+        raise RuntimeError("provider down")
+
+    failed = await service.submit("same-request", failing)
+    job = await finished(service, failed.id)
+    assert job.status == JobStatus.FAILED and job.error_message == "provider down"
+
+    retried = await service.submit("same-request", returning({"ok": True}))
+    assert retried.id != failed.id
+    assert (await finished(service, retried.id)).result == {"ok": True}
+
+
+async def test_full_queue_rejects_new_jobs(service):
+    release = asyncio.Event()
+    running = await service.submit("a", returning({}, release=release))
+    await asyncio.sleep(0)  # The worker takes the first job off the queue
+    queued = await service.submit("b", returning({}, release=release))
+
+    with pytest.raises(JobQueueFullError):
+        await service.submit("c", returning({}))
+    assert await service.store.find_by_key("c") is None
+
+    release.set()
+    assert (await finished(service, running.id)).status == JobStatus.COMPLETED
+    assert (await finished(service, queued.id)).status == JobStatus.COMPLETED
+
+
+async def test_subscribers_are_woken_on_every_change(service):
+    release = asyncio.Event()
+    job = await service.submit("a", returning({"done": True}, release=release))
+
+    seen = []
+
+    async def subscribe():
+        async for update in service.updates(job.id, heartbeat=5.0):
+            if update is not None:
+                seen.append(update.status)
+
+    await asyncio.sleep(0.05)  # The worker picks the job up and blocks on `release`
+    subscriber = asyncio.create_task(subscribe())
+    await asyncio.sleep(0.05)
+    release.set()
+    # Well within the heartbeat: the store pushes changes instead of waiting it out
+    await asyncio.wait_for(subscriber, timeout=1.0)
+
+    assert seen == [JobStatus.RUNNING, JobStatus.COMPLETED]
+
+
+async def test_wait_for_update_returns_when_the_job_is_saved():
+    store = InMemoryJobStore()
+    job = Job(id="j", key="k")
+    await store.save(job)
+    since = job.updated_at
+
+    waiter = asyncio.create_task(store.wait_for_update("j", since, timeout=5.0))
+    await asyncio.sleep(0)
+    job.status = JobStatus.RUNNING
+    await store.save(job)
+
+    updated = await asyncio.wait_for(waiter, timeout=1.0)
+    assert updated.status == JobStatus.RUNNING
@@ -0,0 +1,86 @@
+import os
+
+import pytest
+from alembic import command
+from alembic.autogenerate import compare_metadata
+from alembic.config import Config
+from alembic.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy import create_engine, inspect, text
+
+from app.config import settings
+from app.models.database import Base
+from scripts import migrate
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def alembic_config() -> Config:
+    config = Config(os.path.join(BACKEND_DIR, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(BACKEND_DIR, "alembic"))
+    return config
+
+
+def test_migrations_build_the_model_schema_from_scratch(tmp_path, monkeypatch):
+    url = f"sqlite:///{tmp_path / 'migrated.db'}"
+    monkeypatch.setattr(settings, "database_url", url)
+
+    command.upgrade(alembic_config(), "head")
+
+    engine = create_engine(url)
+    with engine.connect() as conn:
+        assert compare_metadata(MigrationContext.configure(conn), Base.metadata) == []
+
+    command.downgrade(alembic_config(), "base")
+    assert inspect(engine).get_table_names() == ["alembic_version"]
+    engine.dispose()
+
+
+def unversioned_database(tmp_path, monkeypatch, build):
+    """A database whose tables exist without an alembic_version row"""
+    url = f"sqlite:///{tmp_path / 'legacy.db'}"
+    monkeypatch.setattr(settings, "database_url", url)
+    engine = create_engine(url)
+    build(engine)
+    with engine.begin() as conn:
+        conn.execute(text("DROP TABLE IF EXISTS alembic_version"))
+    return engine
+
+
+def assert_at_head(engine):
+    with engine.connect() as conn:
+        context = MigrationContext.configure(conn)
+        assert context.get_current_revision() == ScriptDirectory.from_config(alembic_config()).get_current_head()
+        assert compare_metadata(context, Base.metadata) == []
+    engine.dispose()
+
+
+def test_legacy_database_is_stamped_at_baseline_and_upgraded(tmp_path, monkeypatch):
+    # What the old startup create_all left behind: the original tables, no version row
+    engine = unversioned_database(tmp_path, monkeypatch, lambda _: command.upgrade(alembic_config(), "baseline"))
+
+    migrate.migrate()
+
+    assert_at_head(engine)
+
+
+def test_database_created_from_current_models_is_stamped_at_head(tmp_path, monkeypatch):
+    engine = unversioned_database(tmp_path, monkeypatch, Base.metadata.create_all)
+
+    migrate.migrate()
+
+    assert_at_head(engine)
+
+
+def test_unrecognized_schema_is_refused(tmp_path, monkeypatch):
+    def build(engine):
+        with engine.begin() as conn:
+            conn.execute(text("CREATE TABLE games (id INTEGER PRIMARY KEY)"))
+            conn.execute(text("CREATE TABLE prompt_shuffle_states (id INTEGER PRIMARY KEY)"))
+
+    engine = unversioned_database(tmp_path, monkeypatch, build)
+
+    with pytest.raises(SystemExit, match="prompt_shuffle_states"):
+        migrate.migrate()
+    assert "alembic_version" not in inspect(engine).get_table_names()
+    engine.dispose()
@@ -0,0 +1,97 @@
+from collections import Counter
+
+import numpy as np
+import pytest
+
+from app.models.database import DeckItem
+from app.schemas.requests import PromptWeighting
+from app.services.deck_service import DeckService
+from app.services.prompt_sampler import MIN_WEIGHT, AliasTable, item_weight, prompt_sampler
+
+from .conftest import make_deck
+
+PROMPTS = [f"prompt {i}" for i in range(12)]
+
+
+def test_alias_table_draws_in_proportion_to_weight():
+    table = AliasTable([10, 20, 30, 40], [1.0, 2.0, 3.0, 4.0])
+
+    counts = Counter(table.sample(np.random.default_rng(7), 100_000).tolist())
+
+    for item_id, expected in ((10, 0.1), (20, 0.2), (30, 0.3), (40, 0.4)):
+        assert counts[item_id] / 100_000 == pytest.approx(expected, abs=0.01)
+
+
+@pytest.mark.parametrize("exclude", [set(), {1, 2}, set(range(1, 18))])
+def test_sample_distinct_skips_excluded_ids(exclude):
+    table = AliasTable(list(range(1, 21)), [1.0] * 10 + [50.0] * 10)
+    rng = np.random.default_rng(3)
+
+    for _ in range(200):
+        drawn = table.sample_distinct(rng, 3, exclude)
+        assert len(set(drawn)) == 3
+        assert not set(drawn) & exclude
+
+
+def test_sample_distinct_fallback_keeps_weights():
+    # Most of the table excluded: the O(n) path must still follow the weights
+    table = AliasTable(list(range(1, 11)), [1.0] * 8 + [1.0, 9.0])
+    rng = np.random.default_rng(5)
+
+    counts = Counter(table.sample_distinct(rng, 1, set(range(1, 9)))[0] for _ in range(5000))
+
+    assert counts[10] / 5000 == pytest.approx(0.9, abs=0.03)
+
+
+def test_unplayed_prompts_get_a_neutral_prior():
+    unplayed = item_weight(PromptWeighting.HUMAN_OVER_AI, "medium", None, None, 0)
+    ideal = item_weight(PromptWeighting.HUMAN_OVER_AI, "medium", 1.0, 0.0, 10)
+    too_hard = item_weight(PromptWeighting.HUMAN_OVER_AI, "medium", 0.0, 0.0, 10)
+
+    assert unplayed == pytest.approx(MIN_WEIGHT + 0.25)
+    assert too_hard < unplayed < ideal
+
+
+def test_sampler_treats_zero_counters_as_unplayed(db):
+    deck = make_deck(db, ["played", "fresh"])
+    played = db.query(DeckItem).filter(DeckItem.prompt == "played").one()
+    played.rounds_played = played.human_correct_count = played.ai_guess_count = 4
+    played.avg_human_correct_rate = 1.0
+    played.avg_ai_correct_rate = 0.0
+    db.commit()
+
+    table = prompt_sampler._table(db, deck.id, PromptWeighting.HUMAN_OVER_AI, None)
+    weights = dict(zip(table.item_ids.tolist(), table.weights.tolist()))
+
+    assert weights[played.id] == pytest.approx(MIN_WEIGHT + 1.0)
+    assert min(weights.values()) == pytest.approx(MIN_WEIGHT + 0.25)
+
+
+@pytest.mark.parametrize("weighting", [PromptWeighting.HUMAN_OVER_AI, PromptWeighting.LEAST_USED])
+def test_weighted_session_draws_do_not_repeat_within_a_pass(db, weighting):
+    deck = make_deck(db, PROMPTS)
+    service = DeckService(db)
+
+    rounds = [
+        service.get_random_prompts(count=4, deck_id=deck.id, session_key="game:1", weighting=weighting)["prompts"]
+        for _ in range(3)
+    ]
+    assert sorted(prompt for prompts in rounds for prompt in prompts) == sorted(PROMPTS)
+
+    # The pass is used up, so the next round starts a new one
+    assert len(set(service.get_random_prompts(
+        count=4, deck_id=deck.id, session_key="game:1", weighting=weighting
+    )["prompts"])) == 4
+
+
+def test_weighted_and_uniform_draws_share_the_pass(db):
+    deck = make_deck(db, PROMPTS)
+    service = DeckService(db)
+
+    drawn = service.get_random_prompts(count=4, deck_id=deck.id, session_key="game:1", target_difficulty="medium")["prompts"]
+    drawn += service.get_random_prompts(count=4, deck_id=deck.id, session_key="game:1")["prompts"]
+    drawn += service.get_random_prompts(
+        count=4, deck_id=deck.id, session_key="game:1", weighting=PromptWeighting.LEAST_USED
+    )["prompts"]
+
+    assert sorted(drawn) == sorted(PROMPTS)
@@ -0,0 +1,85 @@
+from array import array
+
+from app.models.database import DeckItem
+from app.services.deck_service import DeckService
+from app.services.prompt_shuffler import PromptShuffler, ShuffleState, prompt_shuffler
+
+from .conftest import make_deck
+
+PROMPTS = [f"prompt {i}" for i in range(12)]
+
+
+def test_draws_do_not_repeat_until_the_deck_is_exhausted(db):
+    deck = make_deck(db, PROMPTS)
+    shuffler = PromptShuffler()
+
+    first_pass = [item_id for _ in range(3) for item_id in shuffler.draw(db, "game:1", deck.id, 4)]
+    assert len(set(first_pass)) == 12
+
+    # 12 is not a multiple of 5: the round crossing into the next pass has no repeats either
+    for _ in range(10):
+        assert len(set(shuffler.draw(db, "game:1", deck.id, 5))) == 5
+
+
+def test_sessions_have_independent_orders(db):
+    deck = make_deck(db, PROMPTS)
+    shuffler = PromptShuffler()
+
+    one = [item_id for _ in range(3) for item_id in shuffler.draw(db, "game:1", deck.id, 4)]
+    two = [item_id for _ in range(3) for item_id in shuffler.draw(db, "game:2", deck.id, 4)]
+
+    assert sorted(one) == sorted(two)
+
+
+def test_persisted_order_survives_a_restart(db):
+    deck = make_deck(db, PROMPTS)
+    first = PromptShuffler(persist=True)
+    drawn = first.draw(db, "game:1", deck.id, 4) + first.draw(db, "game:1", deck.id, 4)
+    db.commit()
+
+    # A new process (or another worker) picks up the saved order
+    restarted = PromptShuffler(persist=True)
+    drawn += restarted.draw(db, "game:1", deck.id, 4)
+    db.commit()
+
+    assert len(set(drawn)) == 12
+
+
+def test_persisted_order_follows_deck_changes(db):
+    deck = make_deck(db, PROMPTS)
+    drawn = PromptShuffler(persist=True).draw(db, "game:1", deck.id, 8)
+    db.commit()
+
+    db.query(DeckItem).filter(DeckItem.id == drawn[0]).delete()
+    db.add_all(DeckItem(deck_id=deck.id, prompt=f"new {i}") for i in range(4))
+    db.commit()
+
+    rest = PromptShuffler(persist=True).draw(db, "game:1", deck.id, 7)
+
+    assert not set(rest) & set(drawn)
+    assert len(set(rest)) == 7
+
+
+def test_workers_sharing_a_session_do_not_repeat(db):
+    deck = make_deck(db, PROMPTS)
+    workers = [PromptShuffler(persist=True), PromptShuffler(persist=True)]
+
+    drawn = []
+    for round_number in range(6):
+        # Alternate workers, each holding its own (soon outdated) copy of the state
+        drawn += workers[round_number % 2].draw(db, "game:1", deck.id, 2)
+        db.commit()
+
+    assert len(set(drawn)) == 12
+
+
+def test_stale_order_never_serves_another_decks_items(db):
+    deck = make_deck(db, PROMPTS[:6], name="Mine")
+    other = make_deck(db, PROMPTS[6:], name="Other")
+    other_ids = [item.id for item in db.query(DeckItem).filter(DeckItem.deck_id == other.id)]
+    # An order built before a reseed, now naming ids that belong to another deck
+    prompt_shuffler._states[("game:1", deck.id)] = ShuffleState(array("I", other_ids))
+
+    result = DeckService(db).get_random_prompts(count=4, deck_id=deck.id, session_key="game:1")
+
+    assert set(result["prompts"]) <= set(PROMPTS[:6])
@@ -0,0 +1,58 @@
+import threading
+
+from app.models.database import GameRound
+from scripts import reevaluate
+
+
+def add_rounds(db, drawings):
+    """One scored round per entry: "image", "strokes" or None for no drawing"""
+    strokes = {"width": 10, "height": 10, "strokes": [[[1, 1], [5, 5]]]}
+    db.add_all(
+        GameRound(
+            round_number=number,
+            image_data="aW1hZ2U=" if drawing == "image" else None,
+            stroke_data=strokes if drawing == "strokes" else None,
+            all_options=["cat", "dog", "sun", "car"],
+            correct_option_index=0
+        )
+        for number, drawing in enumerate(drawings, start=1)
+    )
+    db.commit()
+
+
+async def collect(**kwargs):
+    return [row async for row in reevaluate.stream_rounds(**kwargs)]
+
+
+async def test_limit_counts_only_replayable_rounds(db):
+    add_rounds(db, [None, "image", None, None, "strokes", "image", None, "image"])
+
+    rows = await collect(batch_size=2, since=None, until=None, limit=3)
+
+    assert len(rows) == 3
+    assert all(row.image_data or row.stroke_data for row in rows)
+
+
+async def test_pages_through_every_round(db):
+    add_rounds(db, ["image"] * 5 + [None] + ["strokes"] * 4)
+
+    rows = await collect(batch_size=3, since=None, until=None, limit=None)
+
+    assert [row.id for row in rows] == sorted({row.id for row in rows})
+    assert len(rows) == 9
+
+
+async def test_pages_are_fetched_off_the_event_loop(db, monkeypatch):
+    add_rounds(db, ["image"] * 4)
+    threads = []
+    fetch = reevaluate.fetch_rounds
+
+    def recording_fetch(*args):
+        threads.append(threading.current_thread())
+        return fetch(*args)
+
+    monkeypatch.setattr(reevaluate, "fetch_rounds", recording_fetch)
+    rows = await collect(batch_size=2, since=None, until=None, limit=None)
+
+    assert len(rows) == 4
+    assert threads and threading.main_thread() not in threads
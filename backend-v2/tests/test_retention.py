@@ -0,0 +1,127 @@
+import os
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import func, select, text
+
+from app.config import settings
+from app.models.database import APIMetrics, engine
+from app.services import retention
+
+pytest.importorskip("pyarrow")
+
+TABLE = APIMetrics.__tablename__
+
+
+@pytest.fixture
+def archive_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "retention_archive_dir", str(tmp_path))
+    monkeypatch.setattr(settings, "retention_archive_format", "parquet")
+    monkeypatch.setattr(settings, "metrics_retention_days", 30)
+    return tmp_path
+
+
+def add_metrics(db, days_ago):
+    now = datetime.utcnow()
+    db.add_all(
+        APIMetrics(endpoint="/api/v2/decks", method="GET", status_code=200, created_at=now - timedelta(days=days))
+        for days in days_ago
+    )
+    db.commit()
+
+
+def remaining_days(db):
+    now = datetime.utcnow()
+    return sorted(round((now - created_at).total_seconds() / 86400) for (created_at,) in db.query(APIMetrics.created_at))
+
+
+def archived_files(archive_dir):
+    return sorted(os.listdir(archive_dir / TABLE)) if (archive_dir / TABLE).exists() else []
+
+
+def test_expired_rows_are_archived_then_deleted(db, archive_dir):
+    add_metrics(db, [100, 70, 45, 10, 1])
+
+    actions = retention.apply_retention(engine, TABLE)
+
+    assert remaining_days(db) == [1, 10]
+    assert sum(action["archived_rows"] for action in actions) == 3
+    assert sum(action["rows"] for action in actions) == 3
+    assert all(name.endswith(".parquet") for name in archived_files(archive_dir))
+
+
+def test_dry_run_changes_nothing(db, archive_dir):
+    add_metrics(db, [100, 1])
+
+    actions = retention.apply_retention(engine, TABLE, dry_run=True)
+
+    assert actions
+    assert remaining_days(db) == [1, 100]
+    assert archived_files(archive_dir) == []
+
+
+@pytest.fixture
+def partitions(db):
+    """Create stand-ins for Postgres partitions, read and dropped or swept by name"""
+    names = []
+
+    def create(name):
+        with engine.begin() as conn:
+            conn.execute(text(f"CREATE TABLE {name} AS SELECT * FROM {TABLE} WHERE 0"))
+        names.append(name)
+        return name
+
+    yield create
+    with engine.begin() as conn:
+        for name in names:
+            conn.execute(text(f"DROP TABLE IF EXISTS {name}"))
+
+
+@pytest.fixture
+def default_partition(partitions):
+    """A stand-in for Postgres' `<table>_default` partition"""
+    return partitions(f"{TABLE}_default")
+
+
+def test_default_partition_is_swept(db, archive_dir, default_partition):
+    add_metrics(db, [400, 200, 5])
+    with engine.begin() as conn:
+        conn.execute(text(f"INSERT INTO {default_partition} SELECT * FROM {TABLE}"))
+        conn.execute(text(f"DELETE FROM {TABLE}"))
+    cutoff = datetime.utcnow() - timedelta(days=30)
+
+    action = retention.sweep_partition(engine, TABLE, default_partition, cutoff)
+
+    assert action["rows"] == 2 and action["archived_rows"] == 2
+    assert archived_files(archive_dir)[0].endswith(f"_{default_partition}.parquet")
+    with engine.connect() as conn:
+        assert conn.execute(select(func.count()).select_from(text(default_partition))).scalar() == 1
+    # Nothing left to expire: no action, no empty archive
+    assert retention.sweep_partition(engine, TABLE, default_partition, cutoff) is None
+    assert len(archived_files(archive_dir)) == 1
+
+
+def test_dropped_partition_archives_only_its_own_rows(db, archive_dir, partitions, default_partition, monkeypatch):
+    now = datetime.utcnow()
+    legacy = partitions(f"{TABLE}_legacy")
+    # The parent table holds every row, as it reads on Postgres; the late write
+    # dated inside the legacy range went to the default partition
+    add_metrics(db, [300, 200])
+    with engine.begin() as conn:
+        conn.execute(text(f"INSERT INTO {legacy} SELECT * FROM {TABLE}"))
+    add_metrics(db, [250])
+    with engine.begin() as conn:
+        conn.execute(text(f"INSERT INTO {default_partition} SELECT * FROM {TABLE} EXCEPT SELECT * FROM {legacy}"))
+
+    monkeypatch.setattr(retention, "is_postgres", lambda bind: True)
+    monkeypatch.setattr(retention, "is_partitioned", lambda conn, name: True)
+    monkeypatch.setattr(retention, "ensure_partitions", lambda conn, name, months_ahead: [])
+    monkeypatch.setattr(retention, "list_partitions", lambda conn, name: [
+        retention.Partition(legacy, None, retention.month_start(now - timedelta(days=100)))
+    ])
+
+    dropped, swept = retention.apply_retention(engine, TABLE)
+
+    assert (dropped["action"], dropped["archived_rows"]) == ("dropped", 2)
+    assert (swept["partition"], swept["archived_rows"]) == (default_partition, 1)
+    assert sum(name.endswith(f"_{legacy}.parquet") for name in archived_files(archive_dir)) == 1
@@ -0,0 +1,95 @@
+import struct
+
+import numpy as np
+import pytest
+
+from app.services.stroke_rasterizer import (
+    MAX_CANVAS_SIDE,
+    MAX_TOTAL_POINTS,
+    STREAM_MAGIC,
+    decode_stroke_stream,
+    from_point_lists,
+    rasterize,
+)
+
+
+def encode_stream(width, height, strokes):
+    data = struct.pack("<4sHHH", STREAM_MAGIC, width, height, len(strokes))
+    for points, thickness in strokes:
+        data += struct.pack("<Hf", len(points), thickness)
+        for x, y in points:
+            data += struct.pack("<HH", round(x * 65535), round(y * 65535))
+    return data
+
+
+def test_horizontal_line_is_drawn_with_unity_orientation():
+    # y = 0.25 from the bottom is row 0.75 * (height - 1) from the top
+    drawing = from_point_lists(101, 101, [{"points": [0.1, 0.25, 0.9, 0.25], "thickness": 1}])
+    canvas = rasterize(drawing)
+
+    inked_rows = np.flatnonzero((canvas == 0).any(axis=1))
+    assert inked_rows.min() == 74 and inked_rows.max() == 76
+    assert (canvas[75, 10:91] == 0).all()
+    assert canvas[75, 5] == 255
+
+
+def test_single_point_is_stamped_as_a_disc():
+    drawing = from_point_lists(64, 64, [{"points": [0.5, 0.5], "thickness": 5}])
+    canvas = rasterize(drawing)
+
+    ys, xs = np.nonzero(canvas == 0)
+    assert xs.max() - xs.min() == 10 and ys.max() - ys.min() == 10
+
+
+def test_stream_and_point_lists_render_the_same():
+    # Multiples of 1/5 survive the stream's 16-bit quantization exactly
+    points = [(0.2, 0.2), (0.6, 0.8), (0.8, 0.2)]
+    from_stream = decode_stroke_stream(encode_stream(128, 96, [(points, 3.0)]))
+    from_lists = from_point_lists(128, 96, [{"points": [c for p in points for c in p], "thickness": 3.0}])
+
+    assert (rasterize(from_stream) == rasterize(from_lists)).all()
+
+
+def test_long_strokes_are_sampled_in_chunks_without_gaps():
+    # Far more samples than one chunk; every column along the diagonal is inked
+    zigzag = [c for i in range(200) for c in ((0.0, 0.0) if i % 2 == 0 else (1.0, 1.0))]
+    drawing = from_point_lists(512, 512, [{"points": zigzag, "thickness": 1}])
+    canvas = rasterize(drawing)
+
+    assert all(canvas[511 - x, x] == 0 for x in range(512))
+
+
+@pytest.mark.parametrize("data, message", [
+    (b"PK", "too short"),
+    (b"XXXX" + bytes(6), "unknown format"),
+    (struct.pack("<4sHHH", STREAM_MAGIC, 64, 64, 1) + struct.pack("<Hf", 10, 2.0), "truncated"),
+])
+def test_malformed_streams_are_rejected(data, message):
+    with pytest.raises(ValueError, match=message):
+        decode_stroke_stream(data)
+
+
+def test_rejects_oversized_canvas_and_point_count():
+    with pytest.raises(ValueError, match="Canvas"):
+        from_point_lists(MAX_CANVAS_SIDE + 1, 10, [])
+    with pytest.raises(ValueError, match="too many points|more than"):
+        from_point_lists(64, 64, [{"points": [0.5] * 2 * (MAX_TOTAL_POINTS + 1)}])
+
+
+def test_rejects_zigzag_bombs_before_rasterizing():
+    # 8000 corner-to-corner segments: ~48 KB of JSON, ~23M pixels of stroke
+    zigzag = [c for i in range(8000) for c in ((0.0, 0.0) if i % 2 == 0 else (1.0, 1.0))]
+    with pytest.raises(ValueError, match="too long"):
+        from_point_lists(MAX_CANVAS_SIDE, MAX_CANVAS_SIDE, [{"points": zigzag, "thickness": 1}])
+
+
+def test_rejects_many_large_brushes_over_the_whole_canvas():
+    strokes = [{"points": [0.0, 0.0, 1.0, 1.0], "thickness": t} for t in range(1, 65)]
+    with pytest.raises(ValueError, match="brushes"):
+        from_point_lists(MAX_CANVAS_SIDE, MAX_CANVAS_SIDE, strokes)
+
+
+def test_many_small_brush_sizes_in_a_small_area_are_fine():
+    strokes = [{"points": [0.5, 0.5], "thickness": t} for t in range(1, 65)]
+    canvas = rasterize(from_point_lists(MAX_CANVAS_SIDE, MAX_CANVAS_SIDE, strokes))
+    assert (canvas == 0).sum() > 0
@@ -0,0 +1,50 @@
+import base64
+import json
+
+from app.config import settings
+from app.models.database import GameRound
+
+from .conftest import API_HEADERS, drawing_png
+
+
+def round_metadata(game_id: int) -> dict:
+    return {
+        "game_id": game_id,
+        "round_number": 1,
+        "all_options": ["cat", "dog", "sun", "car"],
+        "correct_option": "sun",
+        "correct_option_index": 2,
+        "human_is_correct": True
+    }
+
+
+def test_upload_and_json_rounds_store_the_same_original_image(client, db):
+    raw = drawing_png()
+    encoded = base64.b64encode(raw).decode()
+
+    response = client.post(
+        "/api/v2/save-game-round/upload",
+        headers=API_HEADERS,
+        files={"image": ("drawing.png", raw, "image/png")},
+        data={"metadata": json.dumps(round_metadata(1))}
+    )
+    assert response.status_code == 200, response.text
+    response = client.post(
+        "/api/v2/save-game-round",
+        headers=API_HEADERS,
+        json={**round_metadata(2), "image_data": encoded}
+    )
+    assert response.status_code == 200, response.text
+
+    stored = {row.game_id: row.image_data for row in db.query(GameRound)}
+    assert stored[1] == stored[2] == encoded
+
+
+def test_raw_body_is_limited_and_must_not_be_empty(client, monkeypatch):
+    monkeypatch.setattr(settings, "max_upload_bytes", 1000)
+    headers = {**API_HEADERS, "Content-Type": "application/octet-stream"}
+
+    response = client.post("/api/v2/analyze-drawing/raw", headers=headers, content=b"\x00" * 1001)
+    assert response.status_code == 413
+    response = client.post("/api/v2/analyze-drawing/raw", headers=headers, content=b"")
+    assert response.status_code == 400
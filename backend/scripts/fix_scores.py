@@ -1,55 +1,110 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from models import Game, GameRound
+"""
+Recompute every game's final_score from its rounds, set-based.
+
+Scoring matches save_game_round: +1 when the player is right and the AI is
+wrong, -1 when the AI is right and the player is wrong, 0 otherwise. Scores
+come from one grouped aggregate over game_rounds and are written with one
+UPDATE ... FROM per chunk of game ids, each chunk in its own transaction, so
+millions of rounds take seconds and an interrupted run can simply be restarted.
+
+Usage:
+    python scripts/fix_scores.py [--database-url URL] [--chunk-size 50000] [--dry-run]
+"""
+import argparse
 import logging
 import os
+import time
+
+from sqlalchemy import (
+    Boolean, Integer, and_, case, column, create_engine, func, not_, select, table, update
+)
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Create SQLAlchemy engine and session
-DATABASE_URL = "sqlite:///" + os.path.join(os.path.dirname(__file__), "data/game.db")
-engine = create_engine(DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+DEFAULT_DATABASE_URL = os.getenv("DATABASE_URL") or "sqlite:///" + os.path.join(os.path.dirname(__file__), "data/game.db")
+
+# Only the columns the scores need (importing the models would create tables)
+games = table("games", column("id", Integer), column("final_score", Integer))
+game_rounds = table(
+    "game_rounds",
+    column("game_id", Integer),
+    column("is_correct", Boolean),
+    column("ai_guess_index", Integer),
+    column("drawer_choice_index", Integer),
+)
+
+ai_correct = func.coalesce(game_rounds.c.ai_guess_index == game_rounds.c.drawer_choice_index, False)
+player_correct = func.coalesce(game_rounds.c.is_correct, False)
+round_points = case(
+    (and_(player_correct, not_(ai_correct)), 1),
+    (and_(ai_correct, not_(player_correct)), -1),
+    else_=0,
+)
+
 
-def fix_game_scores():
+def fix_chunk(conn, low, high, dry_run):
+    """Correct the scores of games with low <= id < high; returns games changed"""
+    # Left join so games without rounds get 0
+    scores = (
+        select(games.c.id.label("game_id"), func.coalesce(func.sum(round_points), 0).label("score"))
+        .select_from(games.outerjoin(game_rounds, game_rounds.c.game_id == games.c.id))
+        .where(games.c.id >= low, games.c.id < high)
+        .group_by(games.c.id)
+        .subquery()
+    )
+    stale = and_(games.c.id == scores.c.game_id, games.c.final_score.is_distinct_from(scores.c.score))
+
+    if dry_run:
+        return conn.execute(select(func.count()).select_from(games.join(scores, games.c.id == scores.c.game_id)).where(stale)).scalar()
+    return conn.execute(update(games).values(final_score=scores.c.score).where(stale)).rowcount
+
+
+def fix_game_scores(database_url=DEFAULT_DATABASE_URL, chunk_size=50000, dry_run=False):
     """
-    Fix the scores of all games by counting correct rounds.
+    Fix the scores of all games from their rounds.
     """
-    db = SessionLocal()
+    engine = create_engine(database_url)
+    start = time.perf_counter()
     try:
-        # Get all games
-        games = db.query(Game).all()
-        logger.info(f"Found {len(games)} games to fix")
-        
-        for game in games:
-            # Count correct rounds for this game
-            correct_rounds = db.query(GameRound).filter(
-                GameRound.game_id == game.id,
-                GameRound.is_correct.is_(True)
-            ).count()
-            
-            # Log the current and new score
+        with engine.connect() as conn:
+            low_id, high_id, total_games = conn.execute(
+                select(func.min(games.c.id), func.max(games.c.id), func.count())
+            ).one()
+        if not total_games:
+            logger.info("No games to fix")
+            return 0
+
+        logger.info(f"Found {total_games} games (ids {low_id}-{high_id})")
+        changed = 0
+        for low in range(low_id, high_id + 1, chunk_size):
+            high = low + chunk_size
+            # One transaction per chunk
+            with engine.begin() as conn:
+                changed += fix_chunk(conn, low, high, dry_run)
             logger.info(
-                f"Game {game.id}: "
-                f"Previous score: {game.final_score}, "
-                f"Correct rounds: {correct_rounds}, "
-                f"Total rounds: {game.total_rounds}"
+                f"Games {low}-{min(high, high_id + 1) - 1}: "
+                f"{changed} {'would change' if dry_run else 'fixed'} so far "
+                f"({time.perf_counter() - start:.1f}s)"
             )
-            
-            # Update the score
-            game.final_score = correct_rounds
-        
-        # Commit all changes
-        db.commit()
-        logger.info("Successfully fixed all game scores")
-        
+
+        logger.info(
+            f"{'Dry run: ' if dry_run else ''}{changed} of {total_games} game scores "
+            f"{'would change' if dry_run else 'fixed'} in {time.perf_counter() - start:.1f}s"
+        )
+        return changed
     except Exception as e:
         logger.error(f"Error fixing scores: {str(e)}")
-        db.rollback()
+        raise
     finally:
-        db.close()
+        engine.dispose()
+
 
 if __name__ == "__main__":
-    fix_game_scores() 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Recompute game scores from their rounds")
+    parser.add_argument("--database-url", default=DEFAULT_DATABASE_URL)
+    parser.add_argument("--chunk-size", type=int, default=50000, help="Game ids per transaction")
+    parser.add_argument("--dry-run", action="store_true", help="Only count the scores that would change")
+    args = parser.parse_args()
+    fix_game_scores(args.database_url, args.chunk_size, args.dry_run)
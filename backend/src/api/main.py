@@ -1,5 +1,6 @@
 from fastapi import FastAPI, HTTPException, Request, Depends
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from pydantic import BaseModel
 from ..services.image_analysis import analyze_drawing, generate_witty_response
 import os
@@ -40,6 +41,9 @@ app.add_middleware(
     expose_headers=["*"]
 )
 
+# /games returns every round with its drawing; gzip anything sizeable
+app.add_middleware(GZipMiddleware, minimum_size=1000)
+
 @app.middleware("http")
 async def verify_request(request: Request, call_next):
     # Skip all verification for OPTIONS requests